@@ -0,0 +1,355 @@
+import ast
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+from analysis.scopes import FUNCTION_NODES, ScopeIndex
+from analysis.type_inference import TypeInference, attribute_chain
+
+if TYPE_CHECKING:
+    from analysis.project import ProjectIndex
+
+# Library functions that create an array whose content only depends on their arguments
+ARRAY_ALLOCATORS = frozenset({
+    'arange', 'zeros', 'ones', 'empty', 'full', 'linspace', 'meshgrid', 'eye', 'identity', 'tri', 'vander'
+})
+
+# Device recorded when a transfer targets a device that is only known at runtime (e.g., x.to(device))
+UNKNOWN_DEVICE = "?"
+
+# Builtins and modules whose functions read or write files, the console or the clock, or draw random numbers
+STATEFUL_BUILTINS = frozenset({'open', 'input', 'print'})
+STATEFUL_MODULES = (
+    'random', 'numpy.random', 'torch.random', 'tensorflow.random', 'os', 'io', 'sys', 'time', 'datetime',
+    'pickle', 'shutil', 'socket', 'urllib', 'requests'
+)
+
+# Library functions doing the same (e.g., np.load, pd.read_csv, torch.randn), recognized by their name
+STATEFUL_FUNCTIONS = re.compile(r"^(load\w*|save\w*|genfromtxt|fromfile|read_\w+|rand\w*|manual_seed)$")
+
+@dataclass(frozen=True)
+class FunctionSummary:
+    """
+    What a function does, directly or through the functions it calls.
+
+    Attributes:
+        - transfers (frozenset): The devices it moves tensors or models to ('cpu', 'cuda', ... or UNKNOWN_DEVICE).
+        - fits_model (bool): Whether it fits a model (e.g., model.fit(X, y)).
+        - allocates_array (bool): Whether it creates arrays or tensors with a library allocator (e.g., np.zeros).
+        - computes_gradients (bool): Whether it computes gradients (loss.backward(), tape.gradient(), ...).
+        - reads_state (bool): Whether what it returns may depend on more than the values of its arguments: it
+          reads an attribute of, or calls a method on, one of its parameters (e.g., model.predict(X)), does I/O
+          or draws random numbers.
+    """
+    transfers: frozenset = frozenset()
+    fits_model: bool = False
+    allocates_array: bool = False
+    computes_gradients: bool = False
+    reads_state: bool = False
+
+    @property
+    def does_transfer(self) -> bool:
+        """
+        Whether the function moves tensors or models between devices.
+        """
+        return bool(self.transfers)
+
+    def merge(self, other: "FunctionSummary") -> "FunctionSummary":
+        """
+        Returns the summary of doing both what this summary and the other one do.
+        """
+        return FunctionSummary(
+            transfers=self.transfers | other.transfers,
+            fits_model=self.fits_model or other.fits_model,
+            allocates_array=self.allocates_array or other.allocates_array,
+            computes_gradients=self.computes_gradients or other.computes_gradients,
+            reads_state=self.reads_state or other.reads_state
+        )
+
+class CallGraph:
+    """
+    The calls between the functions of a module, and a summary of every function that accounts for the
+    functions it calls, so that rules looking at a loop can see through the helpers it calls.
+
+    Calls are resolved to functions of the module (including nested functions and methods called on self)
+    and, when a ProjectIndex is given, to functions imported from other modules of the project.
+    Summaries are computed for the whole module the first time one is requested.
+
+    Attributes:
+        - callees (dict): Maps every function definition to the functions it calls (definitions of the
+          module, or qualified names of imported functions).
+    """
+
+    def __init__(
+        self,
+        tree: ast.Module,
+        scope_index: ScopeIndex,
+        types: TypeInference,
+        project: Optional["ProjectIndex"] = None,
+        filepath: Optional[str] = None
+    ):
+        """
+        Resolves the calls made by every function of the module.
+
+        :param tree: The parsed module.
+        :param scope_index: The scopes of the module.
+        :param types: The type inference of the module, used to resolve imported names.
+        :param project: The project the module belongs to, to resolve calls to other modules.
+        :param filepath: The path of the module, to resolve imports of sibling modules.
+        """
+        self.tree = tree
+        self.scope_index = scope_index
+        self.types = types
+        self.project = project
+        self.filepath = filepath
+
+        # Methods of the module's classes, and functions defined directly in each scope
+        self._classes: Dict[str, ast.ClassDef] = {}
+        self._owner: Dict[ast.AST, ast.ClassDef] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                self._classes.setdefault(node.name, node)
+                for stmt in node.body:
+                    if isinstance(stmt, FUNCTION_NODES):
+                        self._owner[stmt] = node
+        self._defined_in: Dict[ast.AST, Dict[str, ast.AST]] = {}
+        for function, scope in scope_index.parent_scope.items():
+            if function not in self._owner:
+                self._defined_in.setdefault(scope, {}).setdefault(function.name, function)
+
+        self.callees: Dict[ast.AST, List[Union[ast.AST, str]]] = {}
+        self._local: Dict[ast.AST, FunctionSummary] = {}
+        for function in scope_index.parent_scope:
+            self._collect(function)
+        self._summaries: Optional[Dict[ast.AST, FunctionSummary]] = None
+
+    def summary(self, function: ast.AST) -> FunctionSummary:
+        """
+        Returns the summary of a function definition of the module.
+        """
+        return self._solve().get(function, FunctionSummary())
+
+    def call_summary(self, call: ast.Call) -> Optional[FunctionSummary]:
+        """
+        Returns the summary of the function a call invokes, or None if it cannot be resolved.
+
+        :param call: A call of the module.
+        """
+        target = self.resolve(call)
+        if target is None:
+            return None
+        if isinstance(target, str):
+            return self._external_summary(target)
+        return self.summary(target)
+
+    def resolve(self, call: ast.Call) -> Optional[Union[ast.AST, str]]:
+        """
+        Returns the function definition a call invokes, the qualified name of an imported function,
+        or None if it is unknown (e.g., a method of an object or a library function).
+        """
+        func = call.func
+        scope = self.scope_index.enclosing(call)
+        if isinstance(func, ast.Name):
+            # Functions defined in the enclosing scopes, innermost first
+            current = scope
+            while True:
+                function = self._defined_in.get(current, {}).get(func.id)
+                if function is not None:
+                    return function
+                if current not in self.scope_index.parent_scope:
+                    break
+                current = self.scope_index.parent_scope[current]
+            return self._imported(func)
+
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            # self.method() inside a method of the same class (or of a base class of the module)
+            if scope in self._owner and scope.args.args and func.value.id == scope.args.args[0].arg:
+                return self._method(self._owner[scope], func.attr)
+            return self._imported(func)
+        return None
+
+    def function_summaries(self) -> Dict[str, FunctionSummary]:
+        """
+        Returns the summaries of the module-level functions and of the methods of module-level classes,
+        keyed by their name within the module (e.g., 'train' or 'Trainer.fit').
+        """
+        summaries = {name: self.summary(function) for name, function in self.scope_index.functions.items()}
+        for stmt in self.tree.body:
+            if isinstance(stmt, ast.ClassDef):
+                for method in stmt.body:
+                    if isinstance(method, FUNCTION_NODES):
+                        summaries[f"{stmt.name}.{method.name}"] = self.summary(method)
+        return summaries
+
+    def module_summary(self) -> FunctionSummary:
+        """
+        Returns the summary of the statements of the module outside its functions and classes (e.g., the training
+        loop of a script), through the functions they call.
+        """
+        summary = FunctionSummary()
+        stack = list(self.tree.body)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, FUNCTION_NODES + (ast.ClassDef,)):
+                continue
+            stack.extend(ast.iter_child_nodes(node))
+            if isinstance(node, ast.Call):
+                summary = summary.merge(self._call_effects(node)).merge(self.call_summary(node) or FunctionSummary())
+        return summary
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the summaries of the module's functions, which includes what they learned from
+        functions of other modules.
+        """
+        facts = sorted(
+            (name, sorted(summary.transfers), summary.fits_model, summary.allocates_array, summary.computes_gradients,
+             summary.reads_state)
+            for name, summary in self.function_summaries().items()
+        )
+        return hashlib.blake2b(repr(facts).encode("utf-8"), digest_size=16).hexdigest()
+
+    def _collect(self, function: ast.AST):
+        """
+        Records the calls a function makes and what it does by itself, ignoring nested functions and classes.
+        """
+        local = FunctionSummary()
+        callees = []
+        arguments = function.args
+        parameters = {arg.arg for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs}
+        parameters.update(arg.arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None)
+        stack = list(function.body)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, FUNCTION_NODES + (ast.ClassDef,)):
+                continue
+            stack.extend(ast.iter_child_nodes(node))
+            if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                    and node.value.id in parameters and not local.reads_state):
+                local = local.merge(FunctionSummary(reads_state=True))
+            if not isinstance(node, ast.Call):
+                continue
+            local = local.merge(self._call_effects(node))
+            target = self.resolve(node)
+            if target is not None and target not in callees:
+                callees.append(target)
+        self._local[function] = local
+        self.callees[function] = callees
+
+    def _call_effects(self, call: ast.Call) -> FunctionSummary:
+        """
+        Returns what a single call does by itself.
+        """
+        func = call.func
+        qualified = self.types.qualified_name(func)
+        if self._is_stateful(func, qualified):
+            return FunctionSummary(reads_state=True)
+        if qualified == "torch.autograd.grad":
+            return FunctionSummary(computes_gradients=True)
+        if qualified and qualified.split(".")[-1] in ARRAY_ALLOCATORS:
+            return FunctionSummary(allocates_array=True)
+        if not isinstance(func, ast.Attribute):
+            return FunctionSummary()
+        if func.attr in ('backward', 'gradient'):
+            return FunctionSummary(computes_gradients=True)
+        if func.attr in ('fit', 'partial_fit'):
+            return FunctionSummary(fits_model=True)
+        if func.attr in ('cpu', 'cuda'):
+            return FunctionSummary(transfers=frozenset({func.attr}))
+        if func.attr == 'to':
+            device = self._target_device(call)
+            return FunctionSummary(transfers=frozenset({device})) if device else FunctionSummary()
+        return FunctionSummary()
+
+    @staticmethod
+    def _is_stateful(func: ast.AST, qualified: Optional[str]) -> bool:
+        """
+        Checks if a called function does I/O or draws random numbers, given its qualified name if imported.
+        """
+        if qualified is None:
+            return isinstance(func, ast.Name) and func.id in STATEFUL_BUILTINS
+        return (any(qualified == module or qualified.startswith(f"{module}.") for module in STATEFUL_MODULES)
+                or STATEFUL_FUNCTIONS.match(qualified.split(".")[-1]) is not None)
+
+    def _target_device(self, call: ast.Call) -> Optional[str]:
+        """
+        Returns the device of a x.to(...) call, UNKNOWN_DEVICE if it is a variable, or None if the call
+        does not move data (e.g., x.to(torch.float32)).
+        """
+        for keyword in call.keywords:
+            if keyword.arg == 'device':
+                return self._device(keyword.value) or UNKNOWN_DEVICE
+        return self._device(call.args[0]) if call.args else None
+
+    def _device(self, expr: ast.AST) -> Optional[str]:
+        """
+        Returns the device an expression designates, UNKNOWN_DEVICE if it looks like a device only known
+        at runtime, or None if it does not look like a device.
+        """
+        if isinstance(expr, ast.Constant) and isinstance(expr.value, str):
+            return expr.value.split(":")[0]
+        if isinstance(expr, ast.Call) and self.types.qualified_name(expr.func) == "torch.device":
+            return self._device(expr.args[0]) if expr.args else UNKNOWN_DEVICE
+        chain = attribute_chain(expr)
+        if chain and "device" in chain[-1].lower():
+            return UNKNOWN_DEVICE
+        return None
+
+    def _method(self, cls: ast.ClassDef, name: str, seen: Optional[set] = None) -> Optional[ast.AST]:
+        """
+        Looks a method up in a class of the module and in its base classes defined in the module.
+        """
+        seen = seen if seen is not None else set()
+        if cls.name in seen:
+            return None
+        seen.add(cls.name)
+        for stmt in cls.body:
+            if isinstance(stmt, FUNCTION_NODES) and stmt.name == name:
+                return stmt
+        for base in cls.bases:
+            if isinstance(base, ast.Name) and base.id in self._classes:
+                method = self._method(self._classes[base.id], name, seen)
+                if method is not None:
+                    return method
+        return None
+
+    def _imported(self, func: ast.AST) -> Optional[str]:
+        """
+        Returns the qualified name of an imported function, if calls to other modules are resolved.
+        """
+        if self.project is None:
+            return None
+        qualified = self.types.qualified_name(func)
+        return qualified if qualified and self.project.is_project_name(qualified, self.filepath) else None
+
+    def _external_summary(self, qualified: str) -> FunctionSummary:
+        """
+        Returns the summary of a function of another module of the project.
+        """
+        return self.project.summary(qualified, self.filepath) or FunctionSummary()
+
+    def _solve(self) -> Dict[ast.AST, FunctionSummary]:
+        """
+        Propagates the summaries of callees to their callers until they no longer change.
+        """
+        if self._summaries is None:
+            summaries = dict(self._local)
+            external = {}
+            changed = True
+            while changed:
+                changed = False
+                for function, callees in self.callees.items():
+                    merged = summaries[function]
+                    for callee in callees:
+                        if isinstance(callee, str):
+                            if callee not in external:
+                                external[callee] = self._external_summary(callee)
+                            merged = merged.merge(external[callee])
+                        else:
+                            merged = merged.merge(summaries.get(callee, FunctionSummary()))
+                    if merged != summaries[function]:
+                        summaries[function] = merged
+                        changed = True
+            self._summaries = summaries
+        return self._summaries
@@ -0,0 +1,80 @@
+import ast
+import hashlib
+from functools import cached_property
+from typing import Dict, Optional
+from analysis.call_graph import CallGraph
+from analysis.dataflow import DefUse
+from analysis.loops import LoopIndex
+from analysis.project import ProjectIndex
+from analysis.scopes import FUNCTION_NODES, ScopeIndex
+from analysis.type_inference import TypeInference
+
+class AnalysisContext:
+    """
+    The analyses of a module shared by all rules, so that each of them runs at most once per analysis
+    instead of once per rule. Every analysis is computed lazily, the first time a rule asks for it.
+
+    Attributes:
+        - tree (ast.Module): The module being analyzed.
+        - project (ProjectIndex): The project the module belongs to, or None to analyze it on its own.
+        - filepath (str): The path of the module, or None if unknown.
+    """
+
+    def __init__(self, tree: ast.Module, project: Optional[ProjectIndex] = None, filepath: Optional[str] = None):
+        """
+        :param tree: The parsed module.
+        :param project: The project the module belongs to, to see through functions imported from it.
+        :param filepath: The path of the module.
+        """
+        self.tree = tree
+        self.project = project
+        self.filepath = filepath
+        self._dataflows: Dict[ast.AST, DefUse] = {}
+
+    @cached_property
+    def scopes(self) -> ScopeIndex:
+        """
+        The scope (module or function) every node belongs to.
+        """
+        return ScopeIndex(self.tree)
+
+    @cached_property
+    def types(self) -> TypeInference:
+        """
+        The kinds of values (arrays, DataFrames, tensors, models, ...) held by the module's variables.
+        """
+        return TypeInference(self.tree, self.scopes)
+
+    @cached_property
+    def calls(self) -> CallGraph:
+        """
+        The calls between functions, and what each function does through the functions it calls.
+        """
+        return CallGraph(self.tree, self.scopes, self.types, self.project, self.filepath)
+
+    @cached_property
+    def loops(self) -> LoopIndex:
+        """
+        The loop nests of the module and estimates of their trip counts.
+        """
+        return LoopIndex(self.tree)
+
+    def dataflow(self, node: ast.AST) -> DefUse:
+        """
+        Returns the def-use chains of a scope, built the first time they are requested.
+
+        :param node: A function definition or the module, or any node, in which case its enclosing scope is used.
+        :return: The def-use chains of the scope.
+        """
+        scope = node if isinstance(node, FUNCTION_NODES + (ast.Module,)) else self.scopes.enclosing(node)
+        if scope not in self._dataflows:
+            self._dataflows[scope] = DefUse(scope)
+        return self._dataflows[scope]
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the module-level facts the shared analyses derived. Results of a single
+        unit that relied on these analyses stay valid as long as the unit and this hash are unchanged.
+        """
+        facts = self.types.fingerprint() + self.calls.fingerprint()
+        return hashlib.blake2b(facts.encode("utf-8"), digest_size=16).hexdigest()
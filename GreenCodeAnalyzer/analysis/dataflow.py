@@ -0,0 +1,361 @@
+import ast
+import hashlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from analysis.scopes import FUNCTION_NODES
+
+# Kinds of definitions
+BIND = "bind"      # The name is (re)bound, e.g., 'x = ...', 'for x in ...', 'del x' or a parameter
+MUTATE = "mutate"  # The object the name refers to is modified in place, e.g., 'x[i] = ...', 'x.append(...)'
+
+# Methods that modify their receiver in place. PyTorch in-place methods (e.g., 'add_') are recognized by their suffix.
+MUTATING_METHODS = {
+    'append', 'extend', 'insert', 'pop', 'remove', 'clear', 'update', 'sort', 'reverse', 'add',
+    'discard', 'setdefault', 'popitem', 'fill', 'resize', 'put', 'itemset'
+}
+
+@dataclass(frozen=True)
+class Definition:
+    """
+    A point of a scope where a name is defined or modified.
+
+    Attributes:
+        - name (str): The defined name.
+        - node (ast.AST): The statement defining it (or the function, for parameters, or the except handler).
+        - kind (str): BIND if the name is rebound, MUTATE if its object is modified in place.
+    """
+    name: str
+    node: ast.AST
+    kind: str
+
+    @property
+    def line(self) -> int:
+        """
+        The line of the defining node.
+        """
+        return getattr(self.node, "lineno", 0)
+
+class DefUse:
+    """
+    Def-use chains of a single scope (a function or the module), computed with a reaching-definitions
+    analysis over a lightweight control-flow graph whose nodes are statements. Compound statements contribute
+    a node for their header (e.g., the test of an 'if', the target of a 'for') and the nodes of their blocks.
+    Exceptions may leave a 'try' block after any of its statements.
+
+    Queries are answered from precomputed bit sets, so that rules can ask them for every node they visit.
+
+    Attributes:
+        - scope (ast.AST): The function definition or module.
+        - definitions (list): Every Definition of the scope.
+    """
+
+    def __init__(self, scope: ast.AST):
+        """
+        Builds the control-flow graph of the scope and solves the reaching definitions.
+
+        :param scope: A function definition or the module.
+        """
+        self.scope = scope
+        self.definitions: List[Definition] = []
+        self._nodes: List[ast.AST] = []
+        self._successors: List[List[int]] = []
+        self._index_of: Dict[ast.AST, int] = {}
+        self._definition_nodes: List[int] = []
+        self._gen: List[int] = []
+        self._bound: List[set] = []
+        self._loops: List[tuple] = []
+        self._reachable: Dict[int, int] = {}
+        self._uses: Optional[Dict[int, List[ast.Name]]] = None
+
+        entry = self._add(scope, [scope.args] if isinstance(scope, FUNCTION_NODES) else [], [])
+        self._build_block(scope.body, [entry])
+        self._solve()
+
+    def reaching_definitions(self, node: ast.AST, name: str) -> List[Definition]:
+        """
+        Returns the definitions of a name that may reach the statement containing the node.
+
+        :param node: A node of the scope.
+        :param name: The name used.
+        :return: The reaching definitions, in source order. Empty if there are none or the node is not part of the scope.
+        """
+        index = self._index_of.get(node)
+        if index is None:
+            return []
+        bits = self._reach_in[index] & self._name_masks.get(name, 0)
+        return [self.definitions[i] for i in self._bits(bits)]
+
+    def uses(self, definition: Definition) -> List[ast.Name]:
+        """
+        Returns the loads of the defined name that the definition may reach.
+        """
+        if self._uses is None:
+            self._uses = {}
+            for node, index in self._index_of.items():
+                if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                    for i in self._bits(self._reach_in[index] & self._name_masks.get(node.id, 0)):
+                        self._uses.setdefault(i, []).append(node)
+        position = self.definitions.index(definition)
+        return self._uses.get(position, [])
+
+    def is_reachable(self, start: ast.AST, end: ast.AST) -> bool:
+        """
+        Checks if the statement containing end may execute after the statement containing start.
+        """
+        start_index, end_index = self._index_of.get(start), self._index_of.get(end)
+        if start_index is None or end_index is None:
+            return False
+        return bool(self._reachable_from(start_index) >> end_index & 1)
+
+    def is_modified_between(self, name: str, start: ast.AST, end: ast.AST) -> bool:
+        """
+        Checks if a name may be rebound or modified in place on a path from the statement containing start
+        to the statement containing end (both excluded, unless they are repeated by a loop).
+        Nodes that are not part of the scope are conservatively considered modified.
+
+        :param name: The name to check.
+        :param start: A node of the scope.
+        :param end: A node of the scope.
+        :return: True if the name may be modified between the two statements.
+        """
+        start_index, end_index = self._index_of.get(start), self._index_of.get(end)
+        if start_index is None or end_index is None:
+            return True
+        after_start = self._reachable_from(start_index)
+        bits = self._reach_in[end_index] & self._name_masks.get(name, 0)
+        return any(after_start >> self._definition_nodes[i] & 1 for i in self._bits(bits))
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the statements, control flow and definitions of the scope, independent of their
+        positions. Results derived from the chains of the scope stay valid as long as this hash is unchanged;
+        the bodies of nested functions and classes, which are scopes of their own, are left out.
+        """
+        parts = []
+        for index, node in enumerate(self._nodes):
+            if index == 0:
+                text = type(node).__name__
+            elif isinstance(node, FUNCTION_NODES + (ast.ClassDef,)):
+                text = f"{type(node).__name__} {node.name}"
+            else:
+                text = ast.dump(node)
+            parts.append(f"{text} -> {self._successors[index]}")
+        return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+    def _build_block(self, stmts: List[ast.stmt], preds: List[int]) -> List[int]:
+        """
+        Adds the statements of a block. Returns the nodes control leaves the block from.
+        """
+        for stmt in stmts:
+            preds = self._build_statement(stmt, preds)
+        return preds
+
+    def _build_statement(self, stmt: ast.stmt, preds: List[int]) -> List[int]:
+        """
+        Adds a statement. Returns the nodes control leaves it from.
+        """
+        if isinstance(stmt, ast.If):
+            head = self._add(stmt, [stmt.test], preds)
+            orelse = self._build_block(stmt.orelse, [head]) if stmt.orelse else [head]
+            return self._build_block(stmt.body, [head]) + orelse
+
+        if isinstance(stmt, (ast.For, ast.AsyncFor, ast.While)):
+            header = [stmt.test] if isinstance(stmt, ast.While) else [stmt.iter, stmt.target]
+            head = self._add(stmt, header, preds)
+            self._loops.append((head, []))
+            body_exits = self._build_block(stmt.body, [head])
+            _, breaks = self._loops.pop()
+            self._link(body_exits, head)
+            return self._build_block(stmt.orelse, [head]) + breaks
+
+        if isinstance(stmt, (ast.With, ast.AsyncWith)):
+            head = self._add(stmt, stmt.items, preds)
+            return self._build_block(stmt.body, [head])
+
+        if isinstance(stmt, (ast.Try, getattr(ast, "TryStar", ast.Try))):
+            head = self._add(stmt, [], preds)
+            first_body_node = len(self._nodes)
+            exits = self._build_block(stmt.body, [head])
+
+            # Any statement of the body may raise
+            raising = [head] + list(range(first_body_node, len(self._nodes)))
+            if stmt.orelse:
+                exits = self._build_block(stmt.orelse, exits)
+            for handler in stmt.handlers:
+                handler_node = self._add(handler, [handler.type] if handler.type else [], raising,
+                                         binds=[handler.name] if handler.name else [])
+                exits = exits + self._build_block(handler.body, [handler_node])
+            if stmt.finalbody:
+                exits = self._build_block(stmt.finalbody, exits + raising)
+            return exits
+
+        if isinstance(stmt, ast.Match):
+            head = self._add(stmt, [stmt.subject], preds)
+            exits = [head]
+            for case in stmt.cases:
+                case_node = self._add(case, [case.pattern] + ([case.guard] if case.guard else []), [head])
+                exits = exits + self._build_block(case.body, [case_node])
+            return exits
+
+        if isinstance(stmt, FUNCTION_NODES + (ast.ClassDef,)):
+            # Nested functions and classes are scopes of their own, only their name is bound here
+            own = list(stmt.decorator_list) + (list(stmt.bases) if isinstance(stmt, ast.ClassDef) else [])
+            return [self._add(stmt, own, preds, binds=[stmt.name])]
+
+        index = self._add(stmt, [stmt], preds)
+        if isinstance(stmt, (ast.Return, ast.Raise)):
+            return []
+        if isinstance(stmt, ast.Break) and self._loops:
+            self._loops[-1][1].append(index)
+            return []
+        if isinstance(stmt, ast.Continue) and self._loops:
+            self._link([index], self._loops[-1][0])
+            return []
+        return [index]
+
+    def _add(self, node: ast.AST, own: Iterable[ast.AST], preds: List[int], binds: Iterable[str] = ()) -> int:
+        """
+        Adds a control-flow node for an AST node, records the definitions made by its own subtrees and
+        links it to its predecessors.
+        """
+        index = len(self._nodes)
+        self._nodes.append(node)
+        self._successors.append([])
+        self._index_of[node] = index
+        self._link(preds, index)
+
+        found = [(name, BIND) for name in binds]
+        stack = list(own)
+        while stack:
+            child = stack.pop()
+            if child is None:
+                continue
+            self._index_of[child] = index
+            if isinstance(child, ast.comprehension):
+                # Comprehension variables belong to the comprehension's own scope
+                stack.extend([child.iter] + child.ifs)
+                continue
+            found.extend(self._definitions_in(child))
+            if not isinstance(child, FUNCTION_NODES + (ast.ClassDef, ast.Lambda)):
+                stack.extend(ast.iter_child_nodes(child))
+
+        gen = {}
+        bound = set()
+        for name, kind in found:
+            definition = Definition(name=name, node=node, kind=kind)
+            self.definitions.append(definition)
+            self._definition_nodes.append(index)
+            position = len(self.definitions) - 1
+            if kind == BIND:
+                # A later binding in the same statement hides the earlier ones
+                gen[name] = [position]
+                bound.add(name)
+            else:
+                gen.setdefault(name, []).append(position)
+        self._gen.append(sum(1 << position for positions in gen.values() for position in positions))
+        self._bound.append(bound)
+        return index
+
+    def _definitions_in(self, node: ast.AST) -> List[tuple]:
+        """
+        Returns the (name, kind) pairs defined by a single AST node.
+        """
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            return [(node.id, BIND)]
+        if isinstance(node, (ast.Subscript, ast.Attribute)) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            root = self._root_name(node)
+            return [(root, MUTATE)] if root else []
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            method = node.func.attr
+            in_place = any(
+                keyword.arg == "inplace" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True
+                for keyword in node.keywords
+            )
+            if in_place or method in MUTATING_METHODS or (method.endswith("_") and not method.startswith("_")):
+                root = self._root_name(node.func.value)
+                return [(root, MUTATE)] if root else []
+        if isinstance(node, ast.arg):
+            return [(node.arg, BIND)]
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            return [((alias.asname or alias.name).split(".")[0], BIND) for alias in node.names]
+        if isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            return [(node.name, BIND)]
+        return []
+
+    def _link(self, preds: List[int], index: int):
+        """
+        Adds control-flow edges from every predecessor to a node.
+        """
+        for pred in preds:
+            if index not in self._successors[pred]:
+                self._successors[pred].append(index)
+
+    def _solve(self):
+        """
+        Computes the definitions reaching the entry of every node, iterating to a fixed point.
+        """
+        self._name_masks: Dict[str, int] = {}
+        for position, definition in enumerate(self.definitions):
+            self._name_masks[definition.name] = self._name_masks.get(definition.name, 0) | 1 << position
+        kill = [sum(self._name_masks[name] for name in bound) for bound in self._bound]
+
+        predecessors = [[] for _ in self._nodes]
+        for index, successors in enumerate(self._successors):
+            for successor in successors:
+                predecessors[successor].append(index)
+
+        self._reach_in = [0] * len(self._nodes)
+        reach_out = list(self._gen)
+        worklist = deque(range(len(self._nodes)))
+        queued = set(worklist)
+        while worklist:
+            index = worklist.popleft()
+            queued.discard(index)
+            reach_in = 0
+            for pred in predecessors[index]:
+                reach_in |= reach_out[pred]
+            self._reach_in[index] = reach_in
+            out = self._gen[index] | (reach_in & ~kill[index])
+            if out != reach_out[index]:
+                reach_out[index] = out
+                for successor in self._successors[index]:
+                    if successor not in queued:
+                        worklist.append(successor)
+                        queued.add(successor)
+
+    def _reachable_from(self, index: int) -> int:
+        """
+        Returns the bit set of the nodes that may execute after a node, memoized per node.
+        """
+        if index not in self._reachable:
+            seen = 0
+            stack = list(self._successors[index])
+            while stack:
+                current = stack.pop()
+                if seen >> current & 1:
+                    continue
+                seen |= 1 << current
+                stack.extend(self._successors[current])
+            self._reachable[index] = seen
+        return self._reachable[index]
+
+    @staticmethod
+    def _root_name(node: ast.AST) -> Optional[str]:
+        """
+        Returns the variable at the root of a chain of attributes, subscripts and calls (e.g., 'df' for df.loc[0]).
+        """
+        while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call)):
+            node = node.func if isinstance(node, ast.Call) else node.value
+        return node.id if isinstance(node, ast.Name) else None
+
+    @staticmethod
+    def _bits(bits: int) -> Iterable[int]:
+        """
+        Yields the positions of the set bits, lowest first.
+        """
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
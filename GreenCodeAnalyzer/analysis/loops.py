@@ -0,0 +1,173 @@
+import ast
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+
+# Calls that iterate over their first argument as many times as the argument itself
+PASS_THROUGH_ITERATORS = {'enumerate', 'reversed', 'sorted', 'list', 'tuple', 'iter', 'tqdm', 'zip'}
+
+# Methods of DataFrames and Series that iterate over their rows or items
+ROW_ITERATORS = {'iterrows', 'itertuples', 'items', 'iteritems'}
+
+@dataclass
+class LoopInfo:
+    """
+    A loop of a module and an estimate of how many times its body runs per execution of the loop.
+
+    Attributes:
+        - node (ast.AST): The For or While statement.
+        - depth (int): The number of loops it is nested in, plus one.
+        - parent (Optional[LoopInfo]): The innermost loop it is nested in, if any.
+        - trip_count (Optional[int]): The number of iterations, if it is a constant.
+        - symbolic (Optional[str]): The number of iterations as an expression of the source (e.g., 'len(df)'),
+          if it is not a constant but can be expressed. None if unknown (e.g., while loops).
+    """
+    node: ast.AST
+    depth: int
+    parent: Optional["LoopInfo"]
+    trip_count: Optional[int]
+    symbolic: Optional[str]
+
+class LoopIndex:
+    """
+    The loop nests of a module, with static estimates of their trip counts, so that findings inside hot
+    loops can be told apart from findings in loops that run a few times.
+
+    Attributes:
+        - loops (List[LoopInfo]): Every loop of the module, outer loops first.
+    """
+
+    # Trip count assumed for loops whose number of iterations is not a constant, once per loop nest: the loops
+    # of unknown trip count around a line are assumed to run DEFAULT_TRIP_COUNT times in all, not each, so that
+    # guesses do not compound in deep nests
+    DEFAULT_TRIP_COUNT = 100
+
+    def __init__(self, tree: ast.Module):
+        """
+        :param tree: The parsed module.
+        """
+        self.loops: List[LoopInfo] = []
+        self._index(tree, None)
+
+    def nest_at(self, line: int) -> List[LoopInfo]:
+        """
+        Returns the loops whose span contains the line, outermost first.
+        """
+        return [
+            loop for loop in self.loops
+            if loop.node.lineno <= line <= (getattr(loop.node, "end_lineno", None) or loop.node.lineno)
+        ]
+
+    def estimate_runs(self, line: int) -> Tuple[float, Optional[str]]:
+        """
+        Estimates how many times the code of a line runs per execution of its outermost loop.
+
+        :param line: A line of the module.
+        :return: The estimated number of runs, using DEFAULT_TRIP_COUNT for the loops of unknown trip count, and
+            the estimate as an expression (e.g., '10 * len(df)'), or None if the line is not in a loop.
+        """
+        nest = self.nest_at(line)
+        if not nest:
+            return 1.0, None
+
+        runs = 1.0
+        constant = 1
+        factors = []
+        for loop in nest:
+            if loop.trip_count is not None:
+                runs *= loop.trip_count
+                constant *= loop.trip_count
+            else:
+                if not factors:
+                    runs *= self.DEFAULT_TRIP_COUNT
+                factors.append(loop.symbolic or "?")
+        if constant != 1 or not factors:
+            factors.insert(0, str(constant))
+        return runs, " * ".join(factors)
+
+    def _index(self, node: ast.AST, parent: Optional[LoopInfo]):
+        """
+        Records the loops of a node and of its descendants.
+        """
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, LOOP_NODES):
+                trip_count, symbolic = self._trip_count(child)
+                loop = LoopInfo(
+                    node=child,
+                    depth=parent.depth + 1 if parent else 1,
+                    parent=parent,
+                    trip_count=trip_count,
+                    symbolic=symbolic
+                )
+                self.loops.append(loop)
+                self._index(child, loop)
+            else:
+                self._index(child, parent)
+
+    def _trip_count(self, loop: ast.AST) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Returns the constant trip count of a loop, or None and its symbolic trip count.
+        """
+        if isinstance(loop, ast.While):
+            return None, None
+        return self._length(loop.iter)
+
+    def _length(self, iterable: ast.AST) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Returns the number of items of an iterable, as a constant or as an expression.
+        """
+        if isinstance(iterable, (ast.List, ast.Tuple, ast.Set)):
+            if not any(isinstance(element, ast.Starred) for element in iterable.elts):
+                return len(iterable.elts), None
+        if isinstance(iterable, ast.Constant) and isinstance(iterable.value, (str, bytes)):
+            return len(iterable.value), None
+        if isinstance(iterable, (ast.Name, ast.Attribute)):
+            return None, f"len({ast.unparse(iterable)})"
+        if not isinstance(iterable, ast.Call):
+            return None, None
+
+        func = iterable.func
+        if isinstance(func, ast.Name) and func.id == 'range':
+            return self._range_length(iterable.args)
+        if isinstance(func, ast.Name) and func.id in PASS_THROUGH_ITERATORS and iterable.args:
+            return self._length(iterable.args[0])
+        if isinstance(func, ast.Attribute) and func.attr in ROW_ITERATORS:
+            return None, f"len({ast.unparse(func.value)})"
+        if isinstance(func, ast.Attribute) and func.attr in ('keys', 'values'):
+            return None, f"len({ast.unparse(func.value)})"
+        return None, None
+
+    def _range_length(self, args: List[ast.AST]) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Returns the length of range(*args), as a constant when every argument is an integer literal.
+        """
+        if not 1 <= len(args) <= 3:
+            return None, None
+        values = [self._integer(arg) for arg in args]
+        if None not in values:
+            start, stop, step = (0, values[0], 1) if len(values) == 1 else (values + [1])[:3]
+            if step == 0:
+                return None, None
+            return max(0, math.ceil((stop - start) / step)), None
+
+        sources = [ast.unparse(arg) for arg in args]
+        if len(args) == 1:
+            return None, sources[0]
+        span = f"{sources[1]} - {sources[0]}" if sources[0] != "0" else sources[1]
+        if len(args) == 3:
+            return None, f"({span}) / {sources[2]}"
+        return None, span
+
+    @staticmethod
+    def _integer(node: ast.AST) -> Optional[int]:
+        """
+        Returns the value of an integer literal, including negative ones.
+        """
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = LoopIndex._integer(node.operand)
+            return -value if value is not None else None
+        if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+            return node.value
+        return None
@@ -0,0 +1,180 @@
+import ast
+import os
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterator, Optional, Set, Tuple
+
+from analysis.call_graph import CallGraph, FunctionSummary
+from analysis.scopes import ScopeIndex
+from analysis.type_inference import TypeInference
+
+# Directories that never contain the project's own sources
+SKIPPED_DIRECTORIES = {"__pycache__", "node_modules"}
+
+class ProjectIndex:
+    """
+    The modules of a project, so that the call graph of one module can use the summaries of the functions
+    it imports from the others. Summaries of a module are computed the first time they are needed and
+    reused for every module that imports it, until its file changes.
+
+    Attributes:
+        - root (str): The directory absolute imports are resolved from.
+    """
+
+    def __init__(self, root: str):
+        """
+        :param root: The root directory of the project.
+        """
+        self.root = os.path.abspath(root)
+        self._summaries: Dict[str, Tuple[Tuple[int, int], Dict[str, FunctionSummary], FrozenSet[str]]] = {}
+        self._resolved: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._unresolved: Dict[Tuple[str, str], tuple] = {}
+        self._loading: Set[str] = set()
+        self._used: Optional[Set[str]] = None
+
+    @contextmanager
+    def tracking(self) -> Iterator[Set[str]]:
+        """
+        Collects the modules whose summaries are used within the block, including the modules their
+        summaries were computed from, so that results computed within it can be invalidated when one changes.
+
+        :return: The set of the paths of the used modules, filled as the block runs.
+        """
+        outer = self._used
+        self._used = set()
+        try:
+            yield self._used
+        finally:
+            used, self._used = self._used, outer
+            if outer is not None:
+                outer.update(used)
+
+    def is_project_name(self, qualified: str, importer: Optional[str] = None) -> bool:
+        """
+        Checks if a qualified name (e.g., 'utils.preprocess') designates something in a module of the project.
+
+        :param qualified: The qualified name of an imported function.
+        :param importer: The path of the importing module, whose directory is also searched.
+        """
+        return self._resolve(qualified, importer) is not None
+
+    def summary(self, qualified: str, importer: Optional[str] = None) -> Optional[FunctionSummary]:
+        """
+        Returns the summary of a function (or 'Class.method') of a module of the project.
+
+        :param qualified: The qualified name of the function, e.g., 'utils.preprocess'.
+        :param importer: The path of the importing module, whose directory is also searched.
+        :return: The summary, or None if the function is not part of the project.
+        """
+        resolved = self._resolve(qualified, importer)
+        if resolved is None:
+            return None
+        path, name = resolved
+        return self.module_summaries(path).get(name)
+
+    def computes_gradients(self) -> bool:
+        """
+        Checks if a module of the project computes gradients (e.g., loss.backward()) in a function or in its
+        top-level statements, in which case tensors handed over to other modules may be trained on.
+        """
+        for directory, directories, files in os.walk(self.root):
+            if "pyvenv.cfg" in files:
+                # A virtual environment: its packages are not part of the project
+                directories[:] = []
+                continue
+            directories[:] = sorted(d for d in directories if not d.startswith(".") and d not in SKIPPED_DIRECTORIES)
+            for file in sorted(files):
+                if file.endswith(".py") and any(
+                        summary.computes_gradients for summary in self.module_summaries(os.path.join(directory, file)).values()):
+                    return True
+        return False
+
+    def module_summaries(self, path: str) -> Dict[str, FunctionSummary]:
+        """
+        Returns the summaries of the functions and methods of a module, keyed by their name within it, and the
+        summary of its top-level statements, keyed by ''. Modules that cannot be read or parsed, and modules
+        still being summarized because of an import cycle, have no summaries.
+
+        :param path: The path of the module.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._summaries.get(path)
+        if cached is None or cached[0] != key:
+            if path in self._loading:
+                return {}
+            self._loading.add(path)
+            try:
+                with self.tracking() as used:
+                    with open(path, "r", encoding="utf-8") as file:
+                        tree = ast.parse(file.read())
+                    scopes = ScopeIndex(tree)
+                    graph = CallGraph(tree, scopes, TypeInference(tree, scopes), self, path)
+                    summaries = graph.function_summaries()
+                    summaries[""] = graph.module_summary()
+            except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+                summaries = {}
+            finally:
+                self._loading.discard(path)
+            cached = self._summaries[path] = (key, summaries, frozenset(used))
+
+        if self._used is not None:
+            self._used.add(path)
+            self._used.update(cached[2])
+        return cached[1]
+
+    def _resolve(self, qualified: str, importer: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        Splits a qualified name into the path of the longest module of the project it starts with
+        and the name within that module.
+
+        Names that are not part of the project (e.g., 'numpy.zeros') are looked up again once a directory the
+        module could be created in changed, so that a long-running analysis sees modules created since.
+        """
+        directory = os.path.dirname(os.path.abspath(importer)) if importer else self.root
+        cache_key = (qualified, directory)
+        resolved = self._resolved.get(cache_key)
+        if resolved is not None:
+            return resolved
+        parts = qualified.split(".")
+        stamp = self._directories_stamp(parts, directory)
+        if self._unresolved.get(cache_key) == stamp:
+            return None
+        for end in range(len(parts) - 1, 0, -1):
+            path = self._module_path(parts[:end], directory)
+            if path is not None:
+                self._unresolved.pop(cache_key, None)
+                resolved = self._resolved[cache_key] = (path, ".".join(parts[end:]))
+                return resolved
+        self._unresolved[cache_key] = stamp
+        return None
+
+    def _directories_stamp(self, parts: list, directory: str) -> tuple:
+        """
+        Returns the modification times of the directories the modules a qualified name may start with would be
+        in (e.g., the root, 'pkg' and 'pkg/sub' for 'pkg.sub.f'), up to the first one that does not exist. Creating a
+        module, or a missing package directory, changes one of them.
+        """
+        stamp = []
+        for base in dict.fromkeys((self.root, directory)):
+            for end in range(len(parts)):
+                try:
+                    stamp.append(os.stat(os.path.join(base, *parts[:end])).st_mtime_ns)
+                except OSError:
+                    stamp.append(None)
+                    break
+        return tuple(stamp)
+
+    def _module_path(self, parts: list, directory: str) -> Optional[str]:
+        """
+        Returns the file of a module, looked up from the project root and then from the importer's directory.
+        """
+        for base in dict.fromkeys((self.root, directory)):
+            path = os.path.join(base, *parts)
+            for candidate in (path + ".py", os.path.join(path, "__init__.py")):
+                if os.path.isfile(candidate):
+                    return candidate
+        return None
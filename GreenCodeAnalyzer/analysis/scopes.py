@@ -0,0 +1,70 @@
+import ast
+from typing import Dict, Iterator, List
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+class ScopeIndex:
+    """
+    Maps every node of a module to its innermost enclosing scope: the module itself or a function definition.
+    Class bodies and lambdas are not scopes of their own.
+
+    Attributes:
+        - tree (ast.Module): The indexed module.
+        - scope_of (dict): Maps every node to its innermost enclosing scope.
+        - parent_scope (dict): Maps every function definition to the scope it is defined in.
+        - functions (dict): Maps the names of module-level functions to their definitions.
+    """
+
+    def __init__(self, tree: ast.Module):
+        """
+        :param tree: The parsed module.
+        """
+        self.tree = tree
+        self.scope_of: Dict[ast.AST, ast.AST] = {}
+        self.parent_scope: Dict[ast.AST, ast.AST] = {}
+        self.functions: Dict[str, ast.AST] = {
+            stmt.name: stmt for stmt in scope_statements(tree.body) if isinstance(stmt, FUNCTION_NODES)
+        }
+        self._index(tree, tree)
+
+    def scopes(self) -> List[ast.AST]:
+        """
+        Returns the module followed by every function definition, outer functions first.
+        """
+        return [self.tree] + list(self.parent_scope)
+
+    def enclosing(self, node: ast.AST) -> ast.AST:
+        """
+        Returns the innermost scope of a node, or the module for nodes that are not part of it.
+        """
+        return self.scope_of.get(node, self.tree)
+
+    def _index(self, node: ast.AST, scope: ast.AST):
+        """
+        Records the scope of a node and of its descendants.
+        """
+        self.scope_of[node] = scope
+        if isinstance(node, FUNCTION_NODES):
+            self.parent_scope[node] = scope
+
+            # Decorators and the return annotation are evaluated in the enclosing scope
+            for child in ast.iter_child_nodes(node):
+                self._index(child, node if isinstance(child, (ast.stmt, ast.arguments)) else scope)
+            return
+        for child in ast.iter_child_nodes(node):
+            self._index(child, scope)
+
+def scope_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Yields the statements of a scope, including nested blocks but not the bodies of nested functions or classes.
+    """
+    for stmt in body:
+        yield stmt
+        if isinstance(stmt, FUNCTION_NODES + (ast.ClassDef,)):
+            continue
+        for field in ('body', 'orelse', 'finalbody'):
+            yield from scope_statements(getattr(stmt, field, []))
+        for handler in getattr(stmt, 'handlers', []):
+            yield from scope_statements(handler.body)
+        for case in getattr(stmt, 'cases', []):
+            yield from scope_statements(case.body)
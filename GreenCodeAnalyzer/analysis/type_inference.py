@@ -0,0 +1,509 @@
+import ast
+import hashlib
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+from analysis.scopes import ScopeIndex, scope_statements
+
+# Kinds of values tracked by the type inference
+NUMPY_ARRAY = "numpy.ndarray"
+TORCH_TENSOR = "torch.Tensor"
+TF_TENSOR = "tensorflow.Tensor"
+ARRAY = "array"  # An array-like value created by a library that could not be resolved
+DATAFRAME = "pandas.DataFrame"
+SERIES = "pandas.Series"
+GROUPBY = "pandas.GroupBy"
+TORCH_MODEL = "torch.nn.Module"
+TF_MODEL = "tensorflow.keras.Model"
+SKLEARN_MODEL = "sklearn.Estimator"
+DATALOADER = "torch.utils.data.DataLoader"
+
+ARRAY_KINDS = frozenset({NUMPY_ARRAY, TORCH_TENSOR, TF_TENSOR, ARRAY})
+PANDAS_KINDS = frozenset({DATAFRAME, SERIES})
+MODEL_KINDS = frozenset({TORCH_MODEL, TF_MODEL, SKLEARN_MODEL})
+
+# Module aliases assumed when a snippet uses them without importing them
+DEFAULT_ALIASES = {"np": "numpy", "pd": "pandas", "torch": "torch", "tf": "tensorflow", "nn": "torch.nn"}
+
+# Constructors that create arrays whichever library they belong to (e.g., rng.normal(), cp.zeros())
+ARRAY_CONSTRUCTORS = {
+    'zeros', 'ones', 'zeros_like', 'ones_like', 'empty', 'empty_like', 'rand', 'randn', 'random',
+    'arange', 'linspace', 'array', 'tensor', 'uniform', 'normal', 'randint'
+}
+
+# Type annotations and base classes that tell the kind of a value
+ANNOTATION_KINDS = {
+    "numpy.ndarray": NUMPY_ARRAY,
+    "pandas.DataFrame": DATAFRAME,
+    "pandas.Series": SERIES,
+    "torch.Tensor": TORCH_TENSOR,
+    "tensorflow.Tensor": TF_TENSOR,
+    "torch.nn.Module": TORCH_MODEL,
+    "tensorflow.keras.Model": TF_MODEL,
+    "tensorflow.keras.layers.Layer": TF_MODEL,
+    "sklearn.base.BaseEstimator": SKLEARN_MODEL,
+    "torch.utils.data.DataLoader": DATALOADER,
+}
+
+NUMPY_NON_ARRAY = {
+    'save', 'savez', 'savez_compressed', 'savetxt', 'seed', 'default_rng', 'set_printoptions',
+    'printoptions', 'dtype', 'isscalar', 'ndim', 'shape', 'size', 'errstate', 'seterr'
+}
+PANDAS_FRAME_CONSTRUCTORS = {'DataFrame', 'concat', 'merge', 'pivot_table', 'get_dummies', 'crosstab', 'json_normalize'}
+TORCH_NON_TENSOR = {
+    'device', 'no_grad', 'enable_grad', 'inference_mode', 'set_grad_enabled', 'manual_seed', 'save',
+    'load', 'compile', 'is_tensor', 'set_num_threads'
+}
+TF_NON_TENSOR = {'function', 'device', 'GradientTape', 'print', 'name_scope', 'Module'}
+KERAS_NON_MODEL = {'optimizers', 'callbacks', 'preprocessing', 'utils', 'datasets', 'backend', 'regularizers', 'initializers'}
+
+# Methods whose result is not of the same kind as their receiver
+ARRAY_NON_ARRAY_METHODS = {'tolist', 'item', 'tobytes', 'tofile', 'dump', 'fill', 'sort', 'resize'}
+TENSOR_NON_TENSOR_METHODS = {
+    'item', 'tolist', 'size', 'dim', 'numel', 'backward', 'element_size', 'is_contiguous',
+    'data_ptr', 'get_device'
+}
+TORCH_MODEL_SELF_METHODS = {'to', 'cuda', 'cpu', 'train', 'eval', 'float', 'double', 'half', 'requires_grad_'}
+PANDAS_NON_FRAME_METHODS = {
+    'iterrows', 'itertuples', 'items', 'iteritems', 'plot', 'info', 'rolling', 'expanding',
+    'resample', 'keys', 'tolist', 'item'
+}
+
+class TypeInference:
+    """
+    A lightweight, flow-insensitive inference of the kinds of values (NumPy arrays, pandas DataFrames and
+    Series, PyTorch and TensorFlow tensors, models, DataLoaders) held by the variables of a module.
+
+    Every function is a scope of its own. Assignments, loop targets, parameter annotations and return
+    statements are interpreted over and over until no scope learns anything new, so that values flowing
+    through helper functions or across statements are followed. A variable holds the union of the kinds
+    of everything assigned to it.
+
+    Attributes:
+        - scope_index (ScopeIndex): The scopes of the module.
+        - aliases (dict): Maps the names bound by imports to the qualified name they refer to.
+        - scopes (dict): Maps the module and every function definition to their variables' kinds.
+        - attributes (dict): Maps assigned attributes (e.g., 'self.model') to their kinds, module-wide.
+        - classes (dict): Maps the names of classes defined in the module to the model kind they inherit.
+        - returns (dict): Maps the names of module-level functions to the kinds they may return.
+    """
+
+    # Upper bound on the passes over the module, as inference over recursive functions may not settle
+    MAX_PASSES = 5
+
+    def __init__(self, tree: ast.Module, scope_index: Optional[ScopeIndex] = None):
+        """
+        Runs the inference over the whole module.
+
+        :param tree: The parsed module.
+        :param scope_index: The scopes of the module, if already computed.
+        """
+        self.tree = tree
+        self.scope_index = scope_index or ScopeIndex(tree)
+        self.aliases: Dict[str, str] = dict(DEFAULT_ALIASES)
+        self.scopes: Dict[ast.AST, Dict[str, Set[str]]] = {scope: {} for scope in self.scope_index.scopes()}
+        self.attributes: Dict[str, Set[str]] = {}
+        self.classes: Dict[str, str] = {}
+        self.returns: Dict[str, Set[str]] = {}
+
+        self._collect_imports()
+        self._collect_classes()
+        self._infer()
+
+    def kinds(self, name: str, node: ast.AST) -> FrozenSet[str]:
+        """
+        Returns the kinds a variable, or a dotted attribute such as 'self.model', may hold where the node appears.
+
+        :param name: A variable name or a dotted attribute.
+        :param node: The node (of the analyzed module) where the name is used.
+        :return: The set of kinds, empty if unknown.
+        """
+        if "." in name:
+            return frozenset(self.attributes.get(name, ()))
+        return frozenset(self._lookup(name, self.scope_index.enclosing(node)))
+
+    def expr_kinds(self, expr: ast.AST) -> FrozenSet[str]:
+        """
+        Returns the kinds the value of an expression may have.
+
+        :param expr: An expression of the analyzed module.
+        :return: The set of kinds, empty if unknown.
+        """
+        return frozenset(self._eval(expr, self.scope_index.enclosing(expr)))
+
+    def is_kind(self, expr: ast.AST, kinds: Iterable[str]) -> bool:
+        """
+        Checks if the value of an expression may be of any of the given kinds.
+        """
+        return not self.expr_kinds(expr).isdisjoint(kinds)
+
+    def names_of_kind(self, kinds: Iterable[str]) -> Set[str]:
+        """
+        Returns every variable and attribute name that may hold any of the given kinds in some scope.
+        Rules can use it to cheaply skip nodes that cannot involve a value of interest.
+        """
+        kinds = set(kinds)
+        names = {name for env in self.scopes.values() for name, held in env.items() if held & kinds}
+        names.update(name for name, held in self.attributes.items() if held & kinds)
+        return names
+
+    def qualified_name(self, expr: ast.AST) -> Optional[str]:
+        """
+        Resolves a name or attribute chain through the module's imports, e.g., 'np.random.rand' to
+        'numpy.random.rand'. Returns None if its root is not an imported name.
+        """
+        chain = attribute_chain(expr)
+        if not chain or chain[0] not in self.aliases:
+            return None
+        return ".".join([self.aliases[chain[0]]] + chain[1:])
+
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the module-level facts (imports, module variables, attributes, classes and
+        function returns), which is all a function's inference depends on besides its own body.
+        """
+        facts = [
+            sorted(self.aliases.items()),
+            self._sorted_env(self.scopes[self.tree]),
+            self._sorted_env(self.attributes),
+            sorted(self.classes.items()),
+            self._sorted_env(self.returns),
+        ]
+        return hashlib.blake2b(repr(facts).encode("utf-8"), digest_size=16).hexdigest()
+
+    def _collect_imports(self):
+        """
+        Records the names bound by every import of the module.
+        """
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        self.aliases[alias.asname] = alias.name
+                    else:
+                        root = alias.name.split(".")[0]
+                        self.aliases[root] = root
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                for alias in node.names:
+                    self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def _collect_classes(self):
+        """
+        Records the classes that inherit from a model base class, directly or through another class of the module.
+        """
+        class_defs = [node for node in ast.walk(self.tree) if isinstance(node, ast.ClassDef)]
+        changed = True
+        while changed:
+            changed = False
+            for node in class_defs:
+                if node.name in self.classes:
+                    continue
+                for base in node.bases:
+                    kind = ANNOTATION_KINDS.get(self.qualified_name(base) or "")
+                    if kind is None and isinstance(base, ast.Name):
+                        kind = self.classes.get(base.id)
+                    if kind in MODEL_KINDS:
+                        self.classes[node.name] = kind
+                        changed = True
+                        break
+
+    def _infer(self):
+        """
+        Interprets every scope until the inferred kinds no longer change.
+        """
+        for scope in self.scopes:
+            if scope is not self.tree:
+                for arg in self._arguments(scope):
+                    kind = ANNOTATION_KINDS.get(self.qualified_name(arg.annotation) or "") if arg.annotation else None
+                    if kind:
+                        self.scopes[scope].setdefault(arg.arg, set()).add(kind)
+
+        for _ in range(self.MAX_PASSES):
+            changed = False
+            for scope in self.scopes:
+                changed |= self._infer_scope(scope)
+            if not changed:
+                break
+
+    def _infer_scope(self, scope: ast.AST) -> bool:
+        """
+        Interprets the statements of a scope once. Returns True if anything new was learned.
+        """
+        changed = False
+        for stmt in scope_statements(scope.body):
+            if isinstance(stmt, ast.Assign):
+                kinds = self._eval(stmt.value, scope)
+                for target in stmt.targets:
+                    if isinstance(target, ast.Tuple) and isinstance(stmt.value, ast.Tuple) \
+                            and len(target.elts) == len(stmt.value.elts):
+                        for element, value in zip(target.elts, stmt.value.elts):
+                            changed |= self._bind(element, self._eval(value, scope), scope)
+                    else:
+                        changed |= self._bind(target, kinds, scope)
+            elif isinstance(stmt, ast.AnnAssign):
+                kinds = self._eval(stmt.value, scope) if stmt.value else set()
+                kind = ANNOTATION_KINDS.get(self.qualified_name(stmt.annotation) or "")
+                changed |= self._bind(stmt.target, kinds | ({kind} if kind else set()), scope)
+            elif isinstance(stmt, ast.AugAssign):
+                kinds = self._eval(stmt.value, scope) & (ARRAY_KINDS | PANDAS_KINDS)
+                changed |= self._bind(stmt.target, kinds, scope)
+            elif isinstance(stmt, (ast.For, ast.AsyncFor)):
+                changed |= self._bind_loop_target(stmt.target, stmt.iter, scope)
+            elif isinstance(stmt, ast.Return) and stmt.value is not None and scope is not self.tree:
+                if self.scope_index.functions.get(scope.name) is scope:
+                    changed |= self._add(self.returns, scope.name, self._eval(stmt.value, scope))
+        return changed
+
+    def _bind_loop_target(self, target: ast.AST, iterable: ast.AST, scope: ast.AST) -> bool:
+        """
+        Binds the target of a for loop to the kinds of the elements of the iterable.
+        """
+        if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name) and not iterable.keywords:
+            # enumerate(x) yields (index, element) and zip(a, b) yields (element of a, element of b)
+            if iterable.func.id == "enumerate" and len(iterable.args) == 1 \
+                    and isinstance(target, ast.Tuple) and len(target.elts) == 2:
+                return self._bind_loop_target(target.elts[1], iterable.args[0], scope)
+            if iterable.func.id == "zip" and isinstance(target, ast.Tuple) and len(target.elts) == len(iterable.args):
+                changed = False
+                for element, argument in zip(target.elts, iterable.args):
+                    changed |= self._bind_loop_target(element, argument, scope)
+                return changed
+
+        # df.iterrows() and df.items() yield (label, Series)
+        if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Attribute) \
+                and iterable.func.attr in ('iterrows', 'items') \
+                and DATAFRAME in self._eval(iterable.func.value, scope) \
+                and isinstance(target, ast.Tuple) and len(target.elts) == 2:
+            return self._bind(target.elts[1], {SERIES}, scope)
+
+        kinds = self._eval(iterable, scope)
+        elements = kinds & ARRAY_KINDS
+        if DATALOADER in kinds:
+            elements.add(TORCH_TENSOR)
+            if isinstance(target, ast.Tuple):
+                changed = False
+                for element in target.elts:
+                    changed |= self._bind(element, elements, scope)
+                return changed
+        return self._bind(target, elements, scope)
+
+    def _bind(self, target: ast.AST, kinds: Set[str], scope: ast.AST) -> bool:
+        """
+        Adds kinds to an assignment target. Returns True if the target learned a new kind.
+        """
+        if not kinds:
+            return False
+        if isinstance(target, ast.Name):
+            return self._add(self.scopes[scope], target.id, kinds)
+        if isinstance(target, ast.Attribute):
+            chain = attribute_chain(target)
+            if chain:
+                return self._add(self.attributes, ".".join(chain), kinds)
+        return False
+
+    def _eval(self, expr: ast.AST, scope: ast.AST) -> Set[str]:
+        """
+        Returns the kinds the value of an expression may have in a scope.
+        """
+        if isinstance(expr, ast.Name):
+            return set(self._lookup(expr.id, scope))
+        if isinstance(expr, ast.Call):
+            return self._call_kinds(expr, scope)
+        if isinstance(expr, ast.Attribute):
+            chain = attribute_chain(expr)
+            if chain and ".".join(chain) in self.attributes:
+                return set(self.attributes[".".join(chain)])
+            return self._attribute_kinds(self._eval(expr.value, scope), expr.attr)
+        if isinstance(expr, ast.Subscript):
+            return self._subscript_kinds(self._eval(expr.value, scope), expr.slice)
+        if isinstance(expr, ast.BinOp):
+            return (self._eval(expr.left, scope) | self._eval(expr.right, scope)) & (ARRAY_KINDS | PANDAS_KINDS)
+        if isinstance(expr, ast.Compare):
+            kinds = self._eval(expr.left, scope)
+            for comparator in expr.comparators:
+                kinds |= self._eval(comparator, scope)
+            return kinds & (ARRAY_KINDS | PANDAS_KINDS)
+        if isinstance(expr, ast.UnaryOp):
+            return self._eval(expr.operand, scope) & (ARRAY_KINDS | PANDAS_KINDS)
+        if isinstance(expr, ast.IfExp):
+            return self._eval(expr.body, scope) | self._eval(expr.orelse, scope)
+        if isinstance(expr, (ast.Await, ast.NamedExpr)):
+            return self._eval(expr.value, scope)
+        return set()
+
+    def _call_kinds(self, call: ast.Call, scope: ast.AST) -> Set[str]:
+        """
+        Returns the kinds a call may return: library constructors, classes and functions of the module,
+        and methods of values of a known kind.
+        """
+        qualified = self.qualified_name(call.func)
+        if qualified:
+            kind = self._library_call_kind(qualified)
+            if kind:
+                return {kind}
+
+        func = call.func
+        if isinstance(func, ast.Name):
+            if func.id in self.classes:
+                return {self.classes[func.id]}
+            if func.id in self.returns and not self._lookup(func.id, scope):
+                return set(self.returns[func.id])
+            # Constructors imported with a wildcard or from an unknown module
+            if func.id in ('array', 'tensor'):
+                return {ARRAY}
+            if func.id == 'DataFrame':
+                return {DATAFRAME}
+            return set()
+
+        if isinstance(func, ast.Attribute):
+            kinds = self._method_kinds(self._eval(func.value, scope), func.attr)
+            if kinds or qualified:
+                return kinds
+            if func.attr in ARRAY_CONSTRUCTORS:
+                return {ARRAY}
+            if func.attr == 'DataFrame':
+                return {DATAFRAME}
+        return set()
+
+    def _library_call_kind(self, qualified: str) -> Optional[str]:
+        """
+        Returns the kind of value created by a call to a function or class of a known library.
+        """
+        parts = qualified.split(".")
+        last = parts[-1]
+        if parts[0] == "numpy":
+            return NUMPY_ARRAY if last[:1].islower() and last not in NUMPY_NON_ARRAY else None
+        if parts[0] == "pandas" and len(parts) == 2:
+            if last in PANDAS_FRAME_CONSTRUCTORS or last.startswith("read_"):
+                return DATAFRAME
+            return SERIES if last == "Series" else None
+        if qualified == "torch.utils.data.DataLoader":
+            return DATALOADER
+        if qualified.startswith("torch.nn.functional."):
+            return TORCH_TENSOR
+        if qualified.startswith("torch.nn."):
+            return TORCH_MODEL if last[:1].isupper() else None
+        if parts[0] == "torch":
+            if len(parts) == 2 and last[:1].islower() and last not in TORCH_NON_TENSOR:
+                return TORCH_TENSOR
+            return TORCH_TENSOR if qualified == "torch.Tensor" else None
+        if parts[0] == "tensorflow":
+            if len(parts) > 2 and parts[1] == "keras":
+                if parts[2] in KERAS_NON_MODEL:
+                    return None
+                return TF_MODEL if last[:1].isupper() or last == "load_model" else None
+            if len(parts) == 2 and last not in TF_NON_TENSOR:
+                return TF_TENSOR
+            return TF_TENSOR if len(parts) == 3 and parts[1] in ("math", "linalg", "random", "nn") else None
+        if parts[0] in ("sklearn", "xgboost", "lightgbm"):
+            return SKLEARN_MODEL if last[:1].isupper() else None
+        return None
+
+    def _method_kinds(self, receiver: Set[str], method: str) -> Set[str]:
+        """
+        Returns the kinds a method may return, given the kinds of its receiver.
+        """
+        kinds = set()
+        if TORCH_TENSOR in receiver:
+            if method == "numpy":
+                kinds.add(NUMPY_ARRAY)
+            elif method not in TENSOR_NON_TENSOR_METHODS:
+                kinds.add(TORCH_TENSOR)
+        if TF_TENSOR in receiver and method == "numpy":
+            kinds.add(NUMPY_ARRAY)
+        if TORCH_MODEL in receiver and method in TORCH_MODEL_SELF_METHODS:
+            kinds.add(TORCH_MODEL)
+        for kind in receiver & {NUMPY_ARRAY, ARRAY}:
+            if method not in ARRAY_NON_ARRAY_METHODS:
+                kinds.add(kind)
+        for kind in receiver & PANDAS_KINDS:
+            if method == "to_numpy":
+                kinds.add(NUMPY_ARRAY)
+            elif method == "groupby":
+                kinds.add(GROUPBY)
+            elif method not in PANDAS_NON_FRAME_METHODS and not method.startswith("to_"):
+                kinds.add(kind)
+        if GROUPBY in receiver:
+            kinds.add(DATAFRAME)
+        return kinds
+
+    def _attribute_kinds(self, receiver: Set[str], attr: str) -> Set[str]:
+        """
+        Returns the kinds of a (non-called) attribute, given the kinds of its owner.
+        """
+        kinds = set()
+        for kind in receiver & ARRAY_KINDS:
+            if attr in ('T', 'mT', 'real', 'imag', 'data', 'grad'):
+                kinds.add(kind)
+        for kind in receiver & PANDAS_KINDS:
+            if attr == 'values':
+                kinds.add(NUMPY_ARRAY)
+            elif attr in ('loc', 'iloc', 'at', 'iat', 'T'):
+                kinds.add(kind)
+        return kinds
+
+    def _subscript_kinds(self, receiver: Set[str], index: ast.AST) -> Set[str]:
+        """
+        Returns the kinds of an element or slice, given the kinds of the indexed value.
+        """
+        kinds = receiver & (ARRAY_KINDS | {SERIES})
+        if DATAFRAME in receiver:
+            if isinstance(index, ast.Constant) and isinstance(index.value, str):
+                kinds.add(SERIES)
+            elif isinstance(index, ast.Name):
+                kinds.update((DATAFRAME, SERIES))
+            else:
+                kinds.add(DATAFRAME)
+        return kinds
+
+    def _lookup(self, name: str, scope: ast.AST) -> Set[str]:
+        """
+        Looks a variable up in a scope and its enclosing scopes.
+        """
+        while True:
+            env = self.scopes.get(scope)
+            if env is not None and name in env:
+                return env[name]
+            if scope not in self.scope_index.parent_scope:
+                return set()
+            scope = self.scope_index.parent_scope[scope]
+
+    @staticmethod
+    def _arguments(function: ast.AST) -> List[ast.arg]:
+        """
+        Returns every parameter of a function.
+        """
+        args = function.args
+        extra = [arg for arg in (args.vararg, args.kwarg) if arg]
+        return args.posonlyargs + args.args + args.kwonlyargs + extra
+
+    @staticmethod
+    def _add(env: Dict[str, Set[str]], name: str, kinds: Set[str]) -> bool:
+        """
+        Adds kinds to an entry of an environment. Returns True if the entry changed.
+        """
+        held = env.setdefault(name, set())
+        if kinds <= held:
+            return False
+        held.update(kinds)
+        return True
+
+    @staticmethod
+    def _sorted_env(env: Dict[str, Set[str]]) -> list:
+        """
+        Returns an environment as a sorted list, for hashing.
+        """
+        return sorted((name, sorted(kinds)) for name, kinds in env.items())
+
+def attribute_chain(node: ast.AST) -> List[str]:
+    """
+    Returns the names of a Name or attribute chain from left to right (e.g., ['self', 'model']),
+    or an empty list if the chain does not start with a Name.
+    """
+    chain = []
+    while isinstance(node, ast.Attribute):
+        chain.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return []
+    chain.append(node.id)
+    chain.reverse()
+    return chain
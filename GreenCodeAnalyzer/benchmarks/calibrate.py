@@ -0,0 +1,125 @@
+import argparse
+import json
+import math
+import sys
+from typing import Dict, List, Optional, Tuple
+from benchmarks.run import RESULTS_VERSION
+from rules.penalty_table import PENALTY_TABLE_VERSION, POINTS_PER_DOUBLING, DEFAULT_PENALTY_TABLE
+
+DEFAULT_REFERENCE_SIZE = 10_000
+
+def geometric_mean(values: List[float]) -> Optional[float]:
+    """
+    Returns the geometric mean of positive values, which averages ratios without favoring the largest.
+    """
+    values = [value for value in values if value is not None and value > 0]
+    if not values:
+        return None
+    return math.exp(sum(math.log(value) for value in values) / len(values))
+
+def fit_speedup(speedups: Dict[int, float], reference_size: int) -> Tuple[float, float]:
+    """
+    Fits speedup ~ size ** k by least squares on a log-log scale, which evens out the noise of single sizes.
+
+    :param speedups: The measured speedup at every size.
+    :param reference_size: The size to evaluate the fit at.
+    :return: The fitted speedup at the reference size, and the exponent k. A rule measured at a single size
+        keeps its speedup and does not scale.
+    """
+    points = [(math.log(size), math.log(speedup)) for size, speedup in speedups.items()]
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return math.exp(mean_y), 0.0
+    scaling = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+    return math.exp(mean_y + scaling * (math.log(reference_size) - mean_x)), scaling
+
+def calibrate(runs: List[dict], reference_size: int) -> dict:
+    """
+    Builds a penalty table from benchmark results.
+
+    Time is taken as the proxy of energy on a given machine, so a rule's penalty is POINTS_PER_DOUBLING per
+    doubling of the time its smells take over their optimizations at the reference size, as fitted across the
+    measured sizes. The speedups of the cases of a rule are averaged geometrically. Memory ratios are
+    recorded alongside, but not scored: they are unbounded when the optimized version allocates nothing.
+    A rule whose optimization was not measured faster is left out of the table, as if it had no benchmark, and
+    listed in "no_speedup" with its speedup instead: a penalty of 0 would count its smells as scored and harmless.
+
+    :param runs: The results of one or more runs of 'python -m benchmarks.run --output'.
+    :param reference_size: The input size penalties are calibrated at.
+    :return: The penalty table, as written to JSON.
+    """
+    speedups: Dict[str, Dict[int, List[float]]] = {}
+    memory_ratios: Dict[str, Dict[int, List[float]]] = {}
+    cases: Dict[str, set] = {}
+    for run in runs:
+        for result in run["results"]:
+            rule_id, size = result["rule_id"], result["size"]
+            speedups.setdefault(rule_id, {}).setdefault(size, []).append(result["speedup"])
+            memory_ratios.setdefault(rule_id, {}).setdefault(size, []).append(result["memory_ratio"])
+            cases.setdefault(rule_id, set()).add(result["case"])
+
+    rules = {}
+    no_speedup = {}
+    for rule_id, by_size in sorted(speedups.items()):
+        mean_speedups = {size: geometric_mean(values) for size, values in by_size.items()}
+        mean_speedups = {size: speedup for size, speedup in mean_speedups.items() if speedup is not None}
+        if not mean_speedups:
+            continue
+        speedup, scaling = fit_speedup(mean_speedups, reference_size)
+        if speedup <= 1:
+            no_speedup[rule_id] = round(speedup, 2)
+            continue
+        penalty = POINTS_PER_DOUBLING * math.log2(speedup)
+        memory_ratio = geometric_mean([ratio for ratios in memory_ratios[rule_id].values() for ratio in ratios])
+        rules[rule_id] = {
+            "penalty": round(penalty, 2),
+            "size_scaling": round(scaling, 3),
+            "speedup": round(speedup, 2),
+            "memory_ratio": round(memory_ratio, 2) if memory_ratio is not None else None,
+            "cases": sorted(cases[rule_id]),
+        }
+
+    return {
+        "version": PENALTY_TABLE_VERSION,
+        "reference_size": reference_size,
+        "points_per_doubling": POINTS_PER_DOUBLING,
+        "environment": runs[0].get("environment", {}) if runs else {},
+        "rules": rules,
+        "no_speedup": no_speedup,
+    }
+
+def main(argv: List[str] = None):
+    """
+    Reads benchmark results and writes the penalty table the rules load at startup.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.calibrate",
+        description="Turn measured speedups of the benchmark cases into the rules' penalty table."
+    )
+    parser.add_argument("results", nargs="+", help="JSON results of 'python -m benchmarks.run --output'.")
+    parser.add_argument("--reference-size", type=int, default=DEFAULT_REFERENCE_SIZE,
+                        help="Input size the penalties are calibrated at; other sizes are scaled from it.")
+    parser.add_argument("--output", default=DEFAULT_PENALTY_TABLE, help="Path of the penalty table to write.")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for path in args.results:
+        with open(path, "r") as file:
+            run = json.load(file)
+        if run.get("version") != RESULTS_VERSION:
+            sys.exit(f"{path}: expected benchmark results of version {RESULTS_VERSION}, got {run.get('version')}.")
+        runs.append(run)
+
+    table = calibrate(runs, args.reference_size)
+    with open(args.output, "w") as file:
+        json.dump(table, file, indent=2)
+        file.write("\n")
+    for rule_id, entry in table["rules"].items():
+        print(f"{rule_id:<28}penalty {entry['penalty']:>6.2f}  scaling {entry['size_scaling']:>6.3f}  speedup {entry['speedup']:.1f}x")
+    for rule_id, speedup in table["no_speedup"].items():
+        print(f"{rule_id:<28}not calibrated: speedup {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+@dataclass
+class BenchmarkCase:
+    """
+    A pair of functions doing the same work, one with the code smell a rule detects and one with its optimization.
+
+    Attributes:
+        - rule_id (str): The ID of the rule detecting the smelly version.
+        - name (str): The name of the case, unique among the cases of the rule.
+        - setup (Callable[[int], tuple]): Builds the arguments of both functions for an input size. It is called
+          before every run, as the functions may modify their arguments.
+        - smelly (Callable): The version with the smell, mirroring the rule's sample in data/samples.
+        - optimized (Callable): The version with the rule's optimization applied.
+        - same_result (Optional[Callable[[object, object], bool]]): Checks that both versions returned the same
+          result. Defaults to numerical closeness.
+    """
+    rule_id: str
+    name: str
+    setup: Callable[[int], tuple]
+    smelly: Callable
+    optimized: Callable
+    same_result: Optional[Callable[[object, object], bool]] = None
@@ -0,0 +1,330 @@
+import argparse
+import glob
+import json
+import math
+import os
+import shlex
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+from benchmarks.run import load_cases, environment
+
+# Version of the energy results format
+ENERGY_RESULTS_VERSION = 1
+
+# Where Linux exposes RAPL energy counters
+POWERCAP_ROOT = "/sys/class/powercap"
+
+# Package power assumed by the CPU-time estimate when neither RAPL nor --tdp gives it: a common desktop TDP
+DEFAULT_TDP_WATTS = 65.0
+
+# Two-sided 95% quantiles of Student's t distribution, by degrees of freedom
+T_QUANTILES_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+@dataclass
+class RaplDomain:
+    """
+    An energy counter of the powercap interface.
+
+    Attributes:
+        - name (str): The kind of domain: 'package' or 'dram'.
+        - path (str): The directory of the counter (e.g., /sys/class/powercap/intel-rapl:0).
+        - max_range (int): The value, in microjoules, at which the counter wraps around to 0.
+    """
+    name: str
+    path: str
+    max_range: int
+
+class RaplMeter:
+    """
+    Measures the energy of the CPU packages and their DRAM with the RAPL counters of the Linux powercap
+    interface. The counters cover the whole machine, so other processes running at the same time are
+    measured too.
+    """
+
+    source = "rapl"
+
+    def __init__(self, domains: List[RaplDomain]):
+        """
+        :param domains: The counters to read. Use RaplMeter.open() to find the counters of the machine.
+        """
+        self.domains = domains
+
+    @classmethod
+    def open(cls, root: str = POWERCAP_ROOT) -> Optional["RaplMeter"]:
+        """
+        Finds the package and DRAM counters of every CPU package.
+
+        :param root: The powercap directory.
+        :return: The meter, or None if there are no counters or they are not readable (e.g., only root
+            can read them on most distributions).
+        """
+        domains = []
+        for path in sorted(glob.glob(os.path.join(root, "intel-rapl:*"))):
+            try:
+                with open(os.path.join(path, "name")) as file:
+                    name = file.read().strip()
+                with open(os.path.join(path, "max_energy_range_uj")) as file:
+                    max_range = int(file.read())
+                with open(os.path.join(path, "energy_uj")) as file:
+                    int(file.read())
+            except (OSError, ValueError):
+                continue
+            if name.startswith("package"):
+                domains.append(RaplDomain("package", path, max_range))
+            elif name == "dram":
+                domains.append(RaplDomain("dram", path, max_range))
+        if not any(domain.name == "package" for domain in domains):
+            return None
+        return cls(domains)
+
+    def read(self) -> List[int]:
+        """
+        Returns the current value of every counter, in microjoules.
+        """
+        values = []
+        for domain in self.domains:
+            with open(os.path.join(domain.path, "energy_uj")) as file:
+                values.append(int(file.read()))
+        return values
+
+    def joules(self, start: List[int], end: List[int]) -> Dict[str, float]:
+        """
+        Returns the joules spent by every kind of domain between two readings.
+        A counter that is lower at the end wrapped around once in between.
+        """
+        spent = {}
+        for domain, before, after in zip(self.domains, start, end):
+            delta = after - before if after >= before else after + domain.max_range - before
+            spent[domain.name] = spent.get(domain.name, 0.0) + delta / 1e6
+        return spent
+
+class CpuTimeMeter:
+    """
+    Estimates energy from CPU time when RAPL is not readable: every CPU-second of the process and its
+    children costs the TDP divided by the number of logical CPUs, as the TDP is what the package draws
+    with all of them busy. This ignores DRAM and idle power, so only compare estimates with each other.
+    """
+
+    source = "cpu-time estimate"
+
+    def __init__(self, tdp_watts: float):
+        """
+        :param tdp_watts: The thermal design power of the CPU package.
+        """
+        self.tdp_watts = tdp_watts
+        self.watts_per_cpu = tdp_watts / (os.cpu_count() or 1)
+
+    def read(self) -> List[float]:
+        """
+        Returns the CPU seconds of the process and of its terminated children.
+        """
+        # process_time() is finer than the clock ticks of os.times(), which only the children's times need
+        times = os.times()
+        return [time.process_time() + times.children_user + times.children_system]
+
+    def joules(self, start: List[float], end: List[float]) -> Dict[str, float]:
+        """
+        Returns the estimated joules of the package between two readings.
+        """
+        return {"package": (end[0] - start[0]) * self.watts_per_cpu}
+
+def open_meter(tdp_watts: Optional[float] = None, root: str = POWERCAP_ROOT):
+    """
+    Returns a RAPL meter if the counters are readable, or else a CPU-time meter.
+
+    :param tdp_watts: The TDP of the CPU package for the CPU-time estimate. Defaults to the package power
+        limit of the powercap interface, which is often readable when the counters are not, or DEFAULT_TDP_WATTS.
+    :param root: The powercap directory.
+    """
+    meter = RaplMeter.open(root)
+    if meter is not None:
+        return meter
+    if tdp_watts is None:
+        tdp_watts = package_power_limit(root) or DEFAULT_TDP_WATTS
+    return CpuTimeMeter(tdp_watts)
+
+def package_power_limit(root: str = POWERCAP_ROOT) -> Optional[float]:
+    """
+    Returns the summed long-term power limits of the CPU packages, in watts, if they are readable.
+    """
+    total = 0.0
+    for path in glob.glob(os.path.join(root, "intel-rapl:*")):
+        try:
+            with open(os.path.join(path, "name")) as file:
+                if not file.read().startswith("package"):
+                    continue
+            with open(os.path.join(path, "constraint_0_power_limit_uw")) as file:
+                total += int(file.read()) / 1e6
+        except (OSError, ValueError):
+            continue
+    return total or None
+
+@dataclass
+class EnergyEstimate:
+    """
+    The energy of one run of some code, averaged over samples.
+
+    Attributes:
+        - joules (float): The mean joules of a run (package and DRAM).
+        - margin (float): The half-width of the 95% confidence interval of the mean.
+        - samples (int): The number of samples the mean is computed from.
+        - runs_per_sample (int): How many runs each sample measured, so that it lasts long enough for the counters.
+        - domains (Dict[str, float]): The mean joules of a run, by kind of domain.
+    """
+    joules: float
+    margin: float
+    samples: int
+    runs_per_sample: int
+    domains: Dict[str, float]
+
+def confidence_interval(values: List[float]) -> Tuple[float, float]:
+    """
+    Returns the mean of values and the half-width of its 95% confidence interval, using Student's t distribution.
+    """
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, math.inf
+    deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / (len(values) - 1))
+    quantile = T_QUANTILES_95[len(values) - 2] if len(values) - 1 <= len(T_QUANTILES_95) else 1.96
+    return mean, quantile * deviation / math.sqrt(len(values))
+
+def measure_function(
+    meter,
+    function: Callable,
+    setup: Callable[[], tuple],
+    samples: int,
+    min_sample_seconds: float
+) -> EnergyEstimate:
+    """
+    Measures the energy of a function, repeating it within every sample until the sample lasts long enough
+    for the counters to resolve it (RAPL counters update about every millisecond).
+
+    :param meter: The meter to read (see open_meter()).
+    :param function: The function to measure.
+    :param setup: Builds fresh arguments of the function. It is called before a sample starts, once per run.
+    :param samples: The number of samples to take.
+    :param min_sample_seconds: The shortest duration of a sample.
+    :return: The energy of one run.
+    """
+    # Find how many runs make a sample long enough, doubling from one run
+    runs = 1
+    while True:
+        arguments = [setup() for _ in range(runs)]
+        started = time.perf_counter()
+        for argument in arguments:
+            function(*argument)
+        if time.perf_counter() - started >= min_sample_seconds or runs >= 2 ** 20:
+            break
+        runs *= 2
+
+    totals = []
+    domains: Dict[str, float] = {}
+    for _ in range(samples):
+        arguments = [setup() for _ in range(runs)]
+        start = meter.read()
+        for argument in arguments:
+            function(*argument)
+        spent = meter.joules(start, meter.read())
+        totals.append(sum(spent.values()) / runs)
+        for name, joules in spent.items():
+            domains[name] = domains.get(name, 0.0) + joules / runs / samples
+    mean, margin = confidence_interval(totals)
+    return EnergyEstimate(joules=mean, margin=margin, samples=samples, runs_per_sample=runs, domains=domains)
+
+def measure_script(meter, command: List[str], samples: int) -> EnergyEstimate:
+    """
+    Measures the energy of running a script in a separate Python process.
+
+    :param meter: The meter to read (see open_meter()).
+    :param command: The script followed by its arguments.
+    :param samples: The number of runs to measure.
+    :return: The energy of one run, including the interpreter's startup.
+    """
+    return measure_function(
+        meter,
+        lambda: subprocess.run([sys.executable] + command, check=True, stdout=subprocess.DEVNULL),
+        lambda: (),
+        samples,
+        min_sample_seconds=0.0
+    )
+
+def compare(smelly: EnergyEstimate, optimized: EnergyEstimate) -> Dict[str, object]:
+    """
+    Returns the energies of both versions and how many times more the smelly one spends.
+    """
+    return {
+        "smelly": asdict(smelly),
+        "optimized": asdict(optimized),
+        "energy_ratio": smelly.joules / optimized.joules if optimized.joules > 0 else None,
+    }
+
+def format_result(label: str, smelly: EnergyEstimate, optimized: EnergyEstimate) -> str:
+    """
+    Formats the energies of both versions in millijoules, with their confidence intervals.
+    """
+    ratio = f"{smelly.joules / optimized.joules:.1f}x" if optimized.joules > 0 else "-"
+    return (f"{label:<56}{1000 * smelly.joules:>12.3g} ± {1000 * smelly.margin:<8.2g}"
+            f"{1000 * optimized.joules:>12.3g} ± {1000 * optimized.margin:<8.2g}{ratio:>10}")
+
+def main(argv: List[str] = None):
+    """
+    Measures the energy of the benchmark cases, or of a pair of scripts, and prints and writes the results.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.energy",
+        description="Measure the energy of smelly code and of its optimization, with RAPL or a CPU-time estimate."
+    )
+    parser.add_argument("--scripts", nargs=2, metavar=("SMELLY", "OPTIMIZED"),
+                        help="Compare two scripts (each quoted with its arguments) instead of the benchmark cases.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000], help="Input sizes to run every case at.")
+    parser.add_argument("--rules", nargs="+", help="Only measure the cases of these rule IDs.")
+    parser.add_argument("--samples", type=int, default=10, help="Samples per version, for the confidence interval.")
+    parser.add_argument("--min-sample-seconds", type=float, default=0.1,
+                        help="Shortest duration of a sample; short functions are repeated within it.")
+    parser.add_argument("--tdp", type=float,
+                        help="Package TDP in watts for the CPU-time estimate, used when RAPL is not readable.")
+    parser.add_argument("--output", help="Path of the JSON file to write the results to.")
+    args = parser.parse_args(argv)
+
+    meter = open_meter(args.tdp)
+    if isinstance(meter, CpuTimeMeter):
+        print(f"RAPL counters are not readable; estimating energy from CPU time at {meter.tdp_watts:g} W TDP.",
+              file=sys.stderr)
+
+    print(f"{'Case':<56}{'Smelly mJ':>23}{'Optimized mJ':>23}{'Ratio':>10}")
+    results = []
+    if args.scripts:
+        smelly = measure_script(meter, shlex.split(args.scripts[0]), args.samples)
+        optimized = measure_script(meter, shlex.split(args.scripts[1]), args.samples)
+        results.append(dict(scripts=args.scripts, **compare(smelly, optimized)))
+        print(format_result(" vs ".join(args.scripts), smelly, optimized))
+    else:
+        cases, missing = load_cases(args.rules)
+        for library in missing:
+            print(f"Skipping the {library} cases: {library} is not installed.", file=sys.stderr)
+        for case in cases:
+            for size in args.sizes:
+                setup = lambda: case.setup(size)
+                smelly = measure_function(meter, case.smelly, setup, args.samples, args.min_sample_seconds)
+                optimized = measure_function(meter, case.optimized, setup, args.samples, args.min_sample_seconds)
+                results.append(dict(rule_id=case.rule_id, case=case.name, size=size, **compare(smelly, optimized)))
+                print(format_result(f"{case.rule_id}/{case.name} @ {size}", smelly, optimized), flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "version": ENERGY_RESULTS_VERSION,
+                "source": meter.source,
+                "environment": environment(),
+                "results": results
+            }, file, indent=2)
+
+if __name__ == "__main__":
+    main()
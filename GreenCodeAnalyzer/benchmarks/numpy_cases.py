@@ -0,0 +1,158 @@
+import numpy as np
+from benchmarks.case import BenchmarkCase
+
+def random_array(size: int) -> tuple:
+    """
+    Returns a reproducible array of random values in [0, 1).
+    """
+    return (np.random.default_rng(42).random(size),)
+
+def reduction_loop(array):
+    """
+    Computes the sum, mean, min and max of an array with loops, as in the reduction_operations sample.
+    """
+    total = 0
+    for i in range(len(array)):
+        total += array[i]
+    min_value = array[0]
+    for i in range(1, len(array)):
+        if array[i] < min_value:
+            min_value = array[i]
+    max_value = array[0]
+    for i in range(1, len(array)):
+        if array[i] > max_value:
+            max_value = array[i]
+    return total, total / len(array), min_value, max_value
+
+def reduction_vectorized(array):
+    """
+    Computes the sum, mean, min and max of an array with NumPy reductions.
+    """
+    return array.sum(), array.mean(), array.min(), array.max()
+
+def filter_loop(array):
+    """
+    Keeps the values above 0.5 with a loop.
+    """
+    filtered_elements = []
+    for i in range(len(array)):
+        if array[i] > 0.5:
+            filtered_elements.append(array[i])
+    return filtered_elements
+
+def filter_vectorized(array):
+    """
+    Keeps the values above 0.5 with boolean indexing.
+    """
+    return array[array > 0.5]
+
+def element_wise_loop(array):
+    """
+    Adds, multiplies and takes the square root element by element.
+    """
+    for i in range(len(array)):
+        array[i] = array[i] + 1
+    for i in range(len(array)):
+        array[i] = array[i] * 3
+    for i in range(len(array)):
+        array[i] = np.sqrt(array[i])
+    return array
+
+def element_wise_vectorized(array):
+    """
+    Adds, multiplies and takes the square root of the whole array.
+    """
+    array = array + 1
+    array = array * 3
+    return np.sqrt(array)
+
+def conditional_loop(array):
+    """
+    Increments values above 0.5 and decrements the others with a loop.
+    """
+    modified_elements = []
+    for i in range(len(array)):
+        if array[i] > 0.5:
+            modified_elements.append(array[i] + 1)
+        else:
+            modified_elements.append(array[i] - 1)
+    return modified_elements
+
+def conditional_vectorized(array):
+    """
+    Increments values above 0.5 and decrements the others with np.where.
+    """
+    return np.where(array > 0.5, array + 1, array - 1)
+
+def copying_operations(array):
+    """
+    Applies arithmetic that allocates a new array at every step.
+    """
+    array = np.add(array, 2.0)
+    array = np.multiply(array, 3.0)
+    array = np.subtract(array, 1.0)
+    return np.divide(array, 2.0)
+
+def inplace_operations(array):
+    """
+    Applies the same arithmetic in place with out=.
+    """
+    np.add(array, 2.0, out=array)
+    np.multiply(array, 3.0, out=array)
+    np.subtract(array, 1.0, out=array)
+    return np.divide(array, 2.0, out=array)
+
+def matrix_and_column(size: int) -> tuple:
+    """
+    Returns a reproducible (size, 64) matrix and a (size, 1) column to combine with it.
+    """
+    rng = np.random.default_rng(42)
+    return rng.random((size, 64)), rng.random((size, 1))
+
+def tiled_sum(matrix, column):
+    """
+    Adds a column to every column of a matrix by tiling it first.
+    """
+    return matrix + np.tile(column, [1, 64])
+
+def broadcast_sum(matrix, column):
+    """
+    Adds a column to every column of a matrix by broadcasting.
+    """
+    return matrix + column
+
+def iterations(size: int) -> tuple:
+    """
+    Returns the number of iterations of the loops recreating an array.
+    """
+    return (size,)
+
+def recreated_array(iterations):
+    """
+    Recreates the same array at every iteration of a loop.
+    """
+    total = 0.0
+    for i in range(iterations):
+        arr = np.arange(0, 1000)
+        total += arr[i % 1000] * 2
+    return total
+
+def cached_array(iterations):
+    """
+    Creates the array once, before the loop.
+    """
+    arr = np.arange(0, 1000)
+    total = 0.0
+    for i in range(iterations):
+        total += arr[i % 1000] * 2
+    return total
+
+CASES = [
+    BenchmarkCase("reduction_operations", "numpy_sum_min_max", random_array, reduction_loop, reduction_vectorized),
+    BenchmarkCase("filter_operations", "numpy_threshold", random_array, filter_loop, filter_vectorized),
+    BenchmarkCase("element_wise_operations", "numpy_add_multiply_sqrt", random_array, element_wise_loop, element_wise_vectorized),
+    BenchmarkCase("conditional_operations", "numpy_threshold_update", random_array, conditional_loop, conditional_vectorized),
+    BenchmarkCase("ignoring_inplace_ops", "numpy_arithmetic", random_array, copying_operations, inplace_operations),
+    BenchmarkCase("broadcasting", "numpy_tile", matrix_and_column, tiled_sum, broadcast_sum),
+    BenchmarkCase("ineffective_array_caching", "numpy_arange_in_loop", iterations, recreated_array, cached_array),
+]
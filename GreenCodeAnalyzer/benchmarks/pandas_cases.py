@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+from benchmarks.case import BenchmarkCase
+
+def values_frame(size: int) -> tuple:
+    """
+    Returns a reproducible frame with a column of random values in [0, 1).
+    """
+    return (pd.DataFrame({"values": np.random.default_rng(42).random(size)}),)
+
+def sales_frame(size: int) -> tuple:
+    """
+    Returns a reproducible frame of sales, with a category among 100, a price, a cost and a quantity.
+    """
+    rng = np.random.default_rng(42)
+    return (pd.DataFrame({
+        "category": rng.integers(0, 100, size),
+        "price": rng.uniform(10, 100, size),
+        "cost_per_unit": rng.uniform(1, 10, size),
+        "quantity": rng.integers(1, 10, size),
+    }),)
+
+def orders_and_customers(size: int) -> tuple:
+    """
+    Returns reproducible frames of orders and of the customers (a tenth as many) who placed them.
+    """
+    rng = np.random.default_rng(42)
+    customers = pd.DataFrame({
+        "customer_id": np.arange(max(size // 10, 1)),
+        "age": rng.integers(18, 80, max(size // 10, 1)),
+    })
+    orders = pd.DataFrame({
+        "order_id": np.arange(size),
+        "customer_id": rng.integers(0, len(customers), size),
+        "amount": rng.uniform(10, 1000, size),
+    })
+    return orders, customers
+
+def reduction_loop(df):
+    """
+    Computes the sum and max of a column with loops over its values.
+    """
+    total = 0
+    for i in range(len(df)):
+        total += df['values'][i]
+    max_value = df['values'][0]
+    for i in range(1, len(df)):
+        if df['values'][i] > max_value:
+            max_value = df['values'][i]
+    return total, max_value
+
+def reduction_vectorized(df):
+    """
+    Computes the sum and max of a column with pandas reductions.
+    """
+    return df['values'].sum(), df['values'].max()
+
+def filter_loop(df):
+    """
+    Keeps the values above 0.5 with a loop.
+    """
+    filtered_elements = []
+    for i in range(len(df)):
+        if df['values'][i] > 0.5:
+            filtered_elements.append(df['values'][i])
+    return filtered_elements
+
+def filter_vectorized(df):
+    """
+    Keeps the values above 0.5 with boolean indexing.
+    """
+    return df['values'][df['values'] > 0.5]
+
+def conditional_loop(df):
+    """
+    Increments values above 0.5 and decrements the others with a loop over .loc.
+    """
+    for i in range(len(df)):
+        if df.loc[i, "values"] > 0.5:
+            df.loc[i, "values"] = df.loc[i, "values"] + 1
+        else:
+            df.loc[i, "values"] = df.loc[i, "values"] - 1
+    return df["values"]
+
+def conditional_vectorized(df):
+    """
+    Increments values above 0.5 and decrements the others with np.where.
+    """
+    df["values"] = np.where(df["values"] > 0.5, df["values"] + 1, df["values"] - 1)
+    return df["values"]
+
+def profit_iterrows(sales_df):
+    """
+    Sums the profit of every sale with iterrows.
+    """
+    total_profit = 0.0
+    for index, row in sales_df.iterrows():
+        total_profit += (row['price'] - row['cost_per_unit']) * row['quantity']
+    return total_profit
+
+def profit_vectorized(sales_df):
+    """
+    Sums the profit of every sale with column arithmetic.
+    """
+    return ((sales_df['price'] - sales_df['cost_per_unit']) * sales_df['quantity']).sum()
+
+def chained_selection(sales_df):
+    """
+    Selects a column of the filtered rows by chain indexing, copying every filtered column.
+    """
+    return sales_df[sales_df['category'] < 50]['price']
+
+def single_selection(sales_df):
+    """
+    Selects a column of the filtered rows with a single .loc.
+    """
+    return sales_df.loc[sales_df['category'] < 50, 'price']
+
+def recomputed_groupby(sales_df):
+    """
+    Groups the sales by category twice, once per aggregation.
+    """
+    category_sums = sales_df.groupby('category').sum()
+    category_means = sales_df.groupby('category').mean()
+    return category_sums, category_means
+
+def reused_groupby(sales_df):
+    """
+    Groups the sales by category once and reuses the groups for both aggregations.
+    """
+    grouped = sales_df.groupby('category')
+    return grouped.sum(), grouped.mean()
+
+def repeated_merge(orders, customers):
+    """
+    Merges orders with customers twice, once per use.
+    """
+    sales = orders.merge(customers, on='customer_id', how='left')
+    large_sales = orders.merge(customers, on='customer_id', how='left')
+    return sales['age'].sum(), large_sales[large_sales['amount'] > 500]['age'].sum()
+
+def reused_merge(orders, customers):
+    """
+    Merges orders with customers once and reuses the result.
+    """
+    sales = orders.merge(customers, on='customer_id', how='left')
+    return sales['age'].sum(), sales.loc[sales['amount'] > 500, 'age'].sum()
+
+def column_merge(orders, customers):
+    """
+    Merges orders with customers on a column.
+    """
+    return orders.merge(customers, on='customer_id', how='left')['age'].to_numpy()
+
+def index_join(orders, customers):
+    """
+    Joins orders with customers on the customers' index.
+    """
+    return orders.join(customers.set_index('customer_id'), on='customer_id', how='left')['age'].to_numpy()
+
+def copying_operations(df):
+    """
+    Applies arithmetic that creates a new frame at every step.
+    """
+    df = df.add(2.0)
+    df = df.mul(3.0)
+    df = df.sub(1.0)
+    df = df.div(2.0)
+    return df['values']
+
+def inplace_operations(df):
+    """
+    Applies the same arithmetic with augmented assignments.
+    """
+    df += 2.0
+    df *= 3.0
+    df -= 1.0
+    df /= 2.0
+    return df['values']
+
+def same_frames(smelly, optimized) -> bool:
+    """
+    Checks that both versions returned the same frames, series or values.
+    """
+    if isinstance(smelly, tuple):
+        return len(smelly) == len(optimized) and all(same_frames(a, b) for a, b in zip(smelly, optimized))
+    if isinstance(smelly, pd.DataFrame):
+        return smelly.shape == optimized.shape and np.allclose(smelly.to_numpy(), optimized.to_numpy())
+    return np.allclose(np.asarray(smelly), np.asarray(optimized))
+
+CASES = [
+    BenchmarkCase("reduction_operations", "pandas_sum_max", values_frame, reduction_loop, reduction_vectorized, same_frames),
+    BenchmarkCase("filter_operations", "pandas_threshold", values_frame, filter_loop, filter_vectorized, same_frames),
+    BenchmarkCase("conditional_operations", "pandas_threshold_update", values_frame, conditional_loop, conditional_vectorized, same_frames),
+    BenchmarkCase("inefficient_iterrows", "pandas_profit", sales_frame, profit_iterrows, profit_vectorized, same_frames),
+    BenchmarkCase("chain_indexing", "pandas_filtered_column", sales_frame, chained_selection, single_selection, same_frames),
+    BenchmarkCase("recomputing_groupby", "pandas_sum_and_mean", sales_frame, recomputed_groupby, reused_groupby, same_frames),
+    BenchmarkCase("inefficient_df_joins", "pandas_redundant_join", orders_and_customers, repeated_merge, reused_merge, same_frames),
+    BenchmarkCase("inefficient_df_joins", "pandas_missing_index", orders_and_customers, column_merge, index_join, same_frames),
+    BenchmarkCase("ignoring_inplace_ops", "pandas_arithmetic", values_frame, copying_operations, inplace_operations, same_frames),
+]
@@ -0,0 +1,169 @@
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from benchmarks.case import BenchmarkCase
+
+# Version of the results format, read by the penalty calibration
+RESULTS_VERSION = 1
+
+# Modules defining cases, and the library each one needs
+CASE_MODULES = {
+    "benchmarks.numpy_cases": "numpy",
+    "benchmarks.pandas_cases": "pandas",
+}
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+class BenchmarkError(Exception):
+    """
+    Raised when the two versions of a case do not return the same result.
+    """
+    pass
+
+def load_cases(rule_ids: List[str] = None) -> Tuple[List[BenchmarkCase], List[str]]:
+    """
+    Returns the cases of the installed libraries, optionally only those of some rules.
+
+    :param rule_ids: The IDs of the rules whose cases are returned, or None for all rules.
+    :return: The cases, and the libraries whose cases were skipped because they are not installed.
+    """
+    cases = []
+    missing = []
+    for module_name, library in CASE_MODULES.items():
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            missing.append(library)
+            continue
+        cases.extend(case for case in module.CASES if rule_ids is None or case.rule_id in rule_ids)
+    return cases, missing
+
+def time_runs(case: BenchmarkCase, function: Callable, size: int, repeats: int) -> float:
+    """
+    Returns the shortest time of several runs of a function, with fresh arguments for every run.
+    The shortest time is the least disturbed by other processes.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        arguments = case.setup(size)
+        started = time.perf_counter()
+        function(*arguments)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def peak_memory(case: BenchmarkCase, function: Callable, size: int) -> Tuple[int, object]:
+    """
+    Returns the peak of the memory allocated by a run of a function over what its arguments use, and its result.
+    It runs separately from the timed runs, as tracemalloc slows allocations down.
+    """
+    arguments = case.setup(size)
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = function(*arguments)
+        return tracemalloc.get_traced_memory()[1] - start, result
+    finally:
+        tracemalloc.stop()
+
+def run_case(case: BenchmarkCase, size: int, repeats: int) -> Dict[str, object]:
+    """
+    Runs both versions of a case at an input size, after checking that they return the same result.
+
+    :param case: The case to run.
+    :param size: The input size.
+    :param repeats: The number of timed runs of each version.
+    :return: The times and peak memory of both versions, with the speedup and memory ratio of the optimized one.
+    """
+    smelly_bytes, smelly_result = peak_memory(case, case.smelly, size)
+    optimized_bytes, optimized_result = peak_memory(case, case.optimized, size)
+    same_result = case.same_result or same_values
+    if not same_result(smelly_result, optimized_result):
+        raise BenchmarkError(f"The versions of {case.rule_id}/{case.name} returned different results at size {size}.")
+
+    smelly_seconds = time_runs(case, case.smelly, size, repeats)
+    optimized_seconds = time_runs(case, case.optimized, size, repeats)
+    return {
+        "rule_id": case.rule_id,
+        "case": case.name,
+        "size": size,
+        "smelly_seconds": smelly_seconds,
+        "optimized_seconds": optimized_seconds,
+        "speedup": smelly_seconds / optimized_seconds if optimized_seconds else None,
+        "smelly_peak_bytes": smelly_bytes,
+        "optimized_peak_bytes": optimized_bytes,
+        "memory_ratio": smelly_bytes / optimized_bytes if optimized_bytes else None,
+    }
+
+def same_values(smelly, optimized) -> bool:
+    """
+    Checks that both versions returned numerically close values, element by element.
+    """
+    import numpy as np
+    if isinstance(smelly, tuple):
+        return len(smelly) == len(optimized) and all(same_values(a, b) for a, b in zip(smelly, optimized))
+    return np.allclose(np.asarray(smelly), np.asarray(optimized))
+
+def environment() -> Dict[str, str]:
+    """
+    Describes where the benchmarks ran, as measured ratios depend on the machine and library versions.
+    """
+    described = {"python": platform.python_version(), "machine": platform.machine(), "platform": platform.platform()}
+    for library in CASE_MODULES.values():
+        try:
+            described[library] = importlib.import_module(library).__version__
+        except ImportError:
+            pass
+    return described
+
+def format_row(result: Dict[str, object]) -> str:
+    """
+    Formats the result of a case at a size as a row of the printed table.
+    """
+    speedup = f"{result['speedup']:.1f}x" if result["speedup"] is not None else "-"
+    memory = f"{result['memory_ratio']:.1f}x" if result["memory_ratio"] is not None else "-"
+    return (f"{result['rule_id']:<28}{result['case']:<28}{result['size']:>9}"
+            f"{1000 * result['smelly_seconds']:>12.2f}{1000 * result['optimized_seconds']:>12.2f}{speedup:>10}{memory:>10}")
+
+def main(argv: List[str] = None):
+    """
+    Runs the benchmark cases across input sizes, prints their speedups and memory ratios, and writes them as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Measure how much slower and memory-hungrier each smell is than its optimization."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Input sizes to run every case at.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs of each version; the shortest is kept.")
+    parser.add_argument("--rules", nargs="+", help="Only run the cases of these rule IDs.")
+    parser.add_argument("--output", help="Path of the JSON file to write the results to.")
+    args = parser.parse_args(argv)
+
+    cases, missing = load_cases(args.rules)
+    for library in missing:
+        print(f"Skipping the {library} cases: {library} is not installed.", file=sys.stderr)
+    if not cases:
+        sys.exit("No benchmark cases to run.")
+
+    print(f"{'Rule':<28}{'Case':<28}{'Size':>9}{'Smelly ms':>12}{'Optimized':>12}{'Speedup':>10}{'Memory':>10}")
+    results = []
+    for case in cases:
+        for size in args.sizes:
+            try:
+                result = run_case(case, size, args.repeats)
+            except BenchmarkError as e:
+                sys.exit(str(e))
+            results.append(result)
+            print(format_row(result), flush=True)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"version": RESULTS_VERSION, "environment": environment(), "results": results}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
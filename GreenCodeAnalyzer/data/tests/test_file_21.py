@@ -0,0 +1,54 @@
+# Gradient tracking: only calls of models running without torch.no_grad() are smells; constructing layers is not.
+# The module imports 'nn' only, so every fix adds the same 'import torch', which 'main.py --fix' makes once.
+
+from torch import nn
+
+
+class Residual(nn.Module):
+    def __init__(self, features):
+        super(Residual, self).__init__()
+        self.linear = nn.Linear(features, features)
+
+    def forward(self, x):
+        return x + self.linear(x)
+
+
+class Classifier(nn.Module):
+    def __init__(self, features, classes, layers):
+        super(Classifier, self).__init__()
+        # Constructing modules, not calling them: no smell
+        self.blocks = nn.Sequential(*[Residual(features) for _ in range(layers)])
+        self.head = Residual(features)
+        self.out = nn.Linear(features, classes)
+
+    def forward(self, x):
+        return self.out(self.head(self.blocks(x)))
+
+
+def print_predictions(batch):
+    model = Classifier(16, 4, 3)
+    # Smell: inference with gradient tracking
+    scores = model(batch)
+    print(scores.argmax(dim=1))
+
+
+def print_confidence(batch):
+    model = Classifier(16, 4, 3)
+    # Smell: inference with gradient tracking
+    probabilities = model(batch).softmax(dim=1)
+    print(probabilities.max(dim=1).values.mean())
+
+
+def print_margin(batch):
+    model = Classifier(16, 4, 3)
+    # Smell: inference with gradient tracking
+    top = model(batch).topk(2, dim=1).values
+    print((top[:, 0] - top[:, 1]).mean())
+
+
+def train_step(model, optimizer, batch, labels):
+    # Gradients are computed: no gradient tracking smell
+    optimizer.zero_grad()
+    loss = nn.functional.cross_entropy(model(batch), labels)
+    loss.backward()
+    optimizer.step()
@@ -0,0 +1,20 @@
+# Chained indexing of DataFrames built by pandas functions (e.g., pd.json_normalize), which the type inference
+# now knows are DataFrames: every df['column'][row] in the loop is a smell, df.loc / df.at lookups are not.
+
+import pandas as pd
+
+
+def summarize(records):
+    sessions = pd.json_normalize(records)
+    events = pd.read_csv("events.csv")
+
+    totals = []
+    for i in range(len(events)):
+        # Smells: two lookups per value
+        length = sessions["documentLength"][i] + sessions["promptLength"][i]
+        lines = events["numLines"][i]
+        # No smell: one lookup per value
+        elapsed = sessions.at[i, "elapsedMs"]
+        accepted = events.loc[i, "accepted"]
+        totals.append((length, lines, elapsed, accepted))
+    return totals
@@ -0,0 +1,36 @@
+# Refitting a model on the same data is a smell only when it is the same model: a name bound to a new model
+# between two fits, or a helper fitting the model it is given, fits a different model every time.
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import RandomizedSearchCV, train_test_split
+
+
+def train(model, x, y):
+    model.fit(x, y)
+    print("R2 score:", model.score(x, y))
+
+
+# Redefined, as in a notebook exported as a script
+def train(model, x, y):
+    # No smell: every call fits the model it is given
+    model.fit(x, y)
+    print("R2 score:", model.score(x, y))
+
+
+x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.2)
+
+model = LinearRegression()
+train(model, x_train, y_train)
+
+forest = RandomForestRegressor()
+forest = RandomizedSearchCV(estimator=forest, param_distributions=params, cv=5)
+forest.fit(x_train, y_train)
+
+# No smell: a new model with the best parameters is fitted
+forest = RandomForestRegressor(**forest.best_params_)
+forest.fit(x_train, y_train)
+predictions = forest.predict(x_test)
+
+# Smell: the same model is fitted again on the same data
+forest.fit(x_train, y_train)
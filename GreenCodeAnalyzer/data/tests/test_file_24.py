@@ -0,0 +1,37 @@
+# Arrays recreated in a loop are only a smell when every iteration creates the same array: helpers are seen
+# through, and helpers reading files, random generators or their arguments' state create a new array each time.
+
+import numpy as np
+
+
+def make_grid(n):
+    return np.zeros((n, n))
+
+
+def read_weights(path):
+    return np.load(path)
+
+
+def noise(n):
+    return np.zeros(n) + np.random.rand(n)
+
+
+def evaluate(model, data):
+    return np.zeros(len(data)) + model.predict(data)
+
+
+def train(model, data, epochs, path, shape):
+    for epoch in range(epochs):
+        model.fit(data)
+        # Smell: the same grid every epoch
+        grid = make_grid(8)
+        # No smell: read from a file, which may change
+        weights = read_weights(path)
+        # No smell: random every epoch
+        jitter = noise(4)
+        # No smell: depends on the model, fitted every epoch
+        scores = evaluate(model, data)
+        # No smell: the shape grows every epoch
+        shape.append(epoch)
+        buffer = np.zeros(shape)
+        print(grid.sum(), weights.sum(), jitter.sum(), scores.sum(), buffer.size)
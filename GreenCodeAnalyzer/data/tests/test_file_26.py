@@ -0,0 +1,14 @@
+# Fixes of pandas code ('main.py --diff'): a frame grouped twice by the same key is grouped once and reused, and a
+# merge repeated in a function is computed once; merges whose result is modified or returned get a copy of it.
+
+import pandas as pd
+
+
+def team_report(report, teams):
+    means = report.groupby("team").mean()
+    counts = report.groupby("team").count()
+
+    with_teams = report.merge(teams, on="team")
+    with_teams["year"] = with_teams["date"].dt.year
+    labels = report.merge(teams, on="team")
+    return means, counts, with_teams, labels
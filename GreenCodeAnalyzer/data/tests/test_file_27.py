@@ -0,0 +1,16 @@
+"""
+Helpers that plot auto-generated reports.
+
+Do not edit lightly: the report layout depends on the column order. Mentions of generated code in a docstring
+do not make a file generated; the file is analyzed completely.
+"""
+
+import pandas as pd
+
+
+def plot_report(path):
+    report = pd.read_csv(path)
+    means = report.groupby("team").mean()
+    counts = report.groupby("team").count()
+    means.plot(kind="bar")
+    counts.plot(kind="bar")
@@ -0,0 +1,109 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# What the screening of a file before parsing decides (see AnalysisLimits.screen())
+ANALYZE = "analyze"      # All rules run
+DOWNGRADE = "downgrade"  # Only the rules that look at one top-level statement at a time run
+SKIP = "skip"            # The file is not analyzed
+
+# Headers of files written by code generators, looked for in the comments a file starts with: the headers of
+# protoc and its gRPC plugin, and the markers generators write on their own, which skip the file
+GENERATED_MARKERS = re.compile(
+    r"Generated by the (protocol buffer|gRPC Python protocol) compiler|@generated\b|DO NOT EDIT\b"
+)
+# Markers that may also be written by hand (e.g., '# Helpers for auto-generated reports'), which only downgrade it
+WEAK_GENERATED_MARKERS = re.compile(r"\bauto-?generated\b|\bcode generated by\b|\bdo not edit\b", re.IGNORECASE)
+GENERATED_HEADER_LINES = 10
+
+# Names of the modules protoc and its gRPC plugin generate
+GENERATED_NAMES = re.compile(r"_pb2(_grpc)?\.pyi?$")
+
+class GeneratedFileError(ValueError):
+    """
+    Raised when a file is not analyzed because it was written by a code generator.
+    """
+    pass
+
+@dataclass(frozen=True)
+class AnalysisLimits:
+    """
+    How much work the analysis of one file may take, so that huge or generated files (protocol buffer stubs,
+    data tables of 100,000 lines, minified code) do not stall the analysis of a project. A rule going over its
+    budget is stopped and its smells in the file are left out; the file is reported as partially analyzed.
+
+    Budgets are checked between the nodes the rules process and while a rule walks a node (see
+    BaseRule.check_deadline()), but not while the analyses the rules share are computed, so they are best
+    effort. Every limit can be turned off with None.
+
+    Attributes:
+        - rule_seconds (Optional[float]): The time each rule may spend on a file.
+        - file_seconds (Optional[float]): The time all rules together may spend on a file; the rules that have
+          not finished by then are stopped.
+        - max_module_nodes (Optional[int]): Files with more AST nodes skip the rules depending on the whole
+          module, whose work may grow with the square of its size.
+        - max_lines (Optional[int]): Files with more lines are downgraded before parsing: only the rules that
+          look at one top-level statement at a time run.
+        - max_line_length (Optional[int]): Files with a longer line (e.g., minified code or a data table on one
+          line) are downgraded too.
+        - skip_generated (bool): Whether files written by code generators, recognized by their header comments
+          or name, are skipped (or downgraded, when their header only suggests it).
+    """
+    rule_seconds: Optional[float] = 10.0
+    file_seconds: Optional[float] = 60.0
+    max_module_nodes: Optional[int] = 500_000
+    max_lines: Optional[int] = 50_000
+    max_line_length: Optional[int] = 10_000
+    skip_generated: bool = True
+
+    @classmethod
+    def unlimited(cls) -> "AnalysisLimits":
+        """
+        Returns limits that let every rule analyze every file completely.
+        """
+        return cls(rule_seconds=None, file_seconds=None, max_module_nodes=None, max_lines=None,
+                   max_line_length=None, skip_generated=False)
+
+    def screen(self, source_code: str, path: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """
+        Decides how to analyze a file from its name and text, before parsing it.
+
+        :param source_code: The source of the file.
+        :param path: The path of the file, if known.
+        :return: ANALYZE, DOWNGRADE or SKIP, and why the file is not analyzed completely.
+        """
+        if self.skip_generated:
+            if path is not None and GENERATED_NAMES.search(os.path.basename(path)):
+                return SKIP, "named like the modules protoc generates"
+            header = self._header_comments(source_code)
+            marker = GENERATED_MARKERS.search(header)
+            if marker is not None:
+                return SKIP, f"'{marker.group(0)}' in its header"
+            marker = WEAK_GENERATED_MARKERS.search(header)
+            if marker is not None:
+                return DOWNGRADE, f"a header suggesting it is generated ('{marker.group(0)}')"
+
+        lines = source_code.count("\n") + 1
+        if self.max_lines is not None and lines > self.max_lines:
+            return DOWNGRADE, f"{lines} lines, more than {self.max_lines}"
+        if self.max_line_length is not None and len(source_code) > self.max_line_length:
+            longest = max(len(line) for line in source_code.split("\n"))
+            if longest > self.max_line_length:
+                return DOWNGRADE, f"a line of {longest} characters, more than {self.max_line_length}"
+        return ANALYZE, None
+
+    @staticmethod
+    def _header_comments(source_code: str) -> str:
+        """
+        Returns the comment lines a file starts with, among its first lines, where generators write their
+        header; a docstring or code mentioning generated files is not part of it.
+        """
+        comments = []
+        for line in source_code.split("\n", GENERATED_HEADER_LINES)[:GENERATED_HEADER_LINES]:
+            line = line.strip()
+            if line.startswith("#"):
+                comments.append(line)
+            elif line:
+                break
+        return "\n".join(comments)
@@ -0,0 +1,167 @@
+import json
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import IO, Optional
+from analysis.project import ProjectIndex
+from engines.notebook import NotebookSource
+from engines.rule_engine import AnalysisCancelled
+from engines.smell_engine import SmellEngine
+
+class AnalysisServer:
+    """
+    A long-running analyzer that serves requests over stdin/stdout, one JSON object per line, so that
+    the VS Code extension can reuse a single worker process (and its incremental caches) across runs.
+
+    A request looks like {"id": 1, "path": "train.py", "version": 3, "source": "..."}. The response echoes
+    the id, path and version and contains either "smells", "error" or "cancelled": true; the rules that did
+    not analyze the whole file (see AnalysisLimits) and the notebook cells that were skipped (as 'cell N') are
+    listed in "partial", with the reason. A notebook (a path ending in .ipynb) is sent as its JSON. A request
+    with "fixes": true also gets the fixes of its smells, as "fixes", when libcst is installed (except for a
+    notebook). A request for a path supersedes the pending and in-flight requests for the same path, which are
+    answered as cancelled.
+
+    Attributes:
+        input_stream (IO[str]): The stream requests are read from.
+        output_stream (IO[str]): The stream responses are written to.
+        smell_engine (SmellEngine): The engine shared by all requests.
+        fix_engine: The engine proposing fixes, created on the first request for fixes, or False if libcst
+            is not installed.
+    """
+
+    def __init__(
+        self,
+        input_stream: Optional[IO[str]] = None,
+        output_stream: Optional[IO[str]] = None,
+        project: Optional[ProjectIndex] = None
+    ):
+        """
+        Initializes the server with the streams to communicate over.
+
+        :param input_stream: The stream requests are read from. Defaults to stdin.
+        :param output_stream: The stream responses are written to. Defaults to stdout.
+        :param project: The project the analyzed files belong to, to see through functions they import.
+        """
+        self.input_stream = input_stream or sys.stdin
+        self.output_stream = output_stream or sys.stdout
+        self.smell_engine = SmellEngine(project=project)
+        self.project = project
+        self.fix_engine = None
+
+        # Latest request per path, in arrival order, and the request being analyzed
+        self.pending: OrderedDict[str, dict] = OrderedDict()
+        self.current: Optional[dict] = None
+        self.current_cancelled = False
+        self.closed = False
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+
+    def serve(self):
+        """
+        Reads requests on a background thread and analyzes them one at a time, until the input is
+        closed and the remaining requests are answered.
+        """
+        reader = threading.Thread(target=self._read_requests, daemon=True)
+        reader.start()
+
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                _, request = self.pending.popitem(last=False)
+                self.current = request
+                self.current_cancelled = False
+
+            self._handle(request)
+
+            with self.condition:
+                self.current = None
+
+    def _read_requests(self):
+        """
+        Queues incoming requests, cancelling the ones they supersede.
+        """
+        for line in self.input_stream:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                path = request["path"]
+            except (ValueError, KeyError, TypeError) as e:
+                self._respond({"id": None, "error": f"Invalid request: {e}"})
+                continue
+
+            with self.condition:
+                superseded = self.pending.pop(path, None)
+                if superseded is not None:
+                    self._respond(self._response_for(superseded, cancelled=True))
+                if self.current is not None and self.current["path"] == path:
+                    self.current_cancelled = True
+                self.pending[path] = request
+                self.condition.notify()
+
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def _handle(self, request: dict):
+        """
+        Analyzes the source of a request and writes the response.
+        """
+        try:
+            source = request.get("source", "")
+            # A notebook is sent as its JSON; its code cells are analyzed as one module
+            notebook = NotebookSource.parse(source) if request["path"].endswith(".ipynb") else None
+            smells = self.smell_engine.engine.analyze(
+                notebook.source if notebook else source,
+                cache_key=request["path"],
+                cancel_check=lambda: self.current_cancelled
+            )
+            partial = dict(self.smell_engine.engine.partial_rules)
+            if notebook:
+                smells = notebook.map_smells(smells)
+                partial.update(notebook.skipped_cells)
+            response = self._response_for(request, smells=[asdict(smell) for smell in smells])
+            if partial:
+                response["partial"] = partial
+            if request.get("fixes") and not notebook and self._load_fix_engine():
+                fixes = self.fix_engine.propose(source, smells, request["path"])
+                response["fixes"] = [asdict(fix) for fix in fixes]
+        except AnalysisCancelled:
+            response = self._response_for(request, cancelled=True)
+        except SyntaxError as e:
+            response = self._response_for(request, error=f"Syntax error on line {e.lineno}: {e.msg}")
+        except Exception as e:
+            response = self._response_for(request, error=f"{type(e).__name__}: {e}")
+        self._respond(response)
+
+    def _load_fix_engine(self) -> bool:
+        """
+        Creates the engine proposing fixes, unless libcst, which fixes are computed with, is not installed.
+        """
+        if self.fix_engine is None:
+            try:
+                from engines.fix_engine import FixEngine
+                self.fix_engine = FixEngine(project=self.project)
+            except ImportError:
+                self.fix_engine = False
+        return bool(self.fix_engine)
+
+    def _response_for(self, request: dict, **fields) -> dict:
+        """
+        Creates a response tagged with the id, path and document version of the request.
+        """
+        response = {"id": request.get("id"), "path": request.get("path"), "version": request.get("version")}
+        response.update(fields)
+        return response
+
+    def _respond(self, response: dict):
+        """
+        Writes a response as a single line.
+        """
+        with self.write_lock:
+            self.output_stream.write(json.dumps(response) + "\n")
+            self.output_stream.flush()
@@ -0,0 +1,172 @@
+import ast
+import difflib
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import libcst as cst
+from libcst.metadata import MetadataWrapper, PositionProvider
+from analysis.context import AnalysisContext
+from analysis.project import ProjectIndex
+from fixes.base_fixer import BaseFixer, FixSite
+from models.fix import Fix, TextEdit
+from models.smell import Smell
+
+from fixes.calculating_gradients_fixer import CalculatingGradientsFixer
+from fixes.data_loader_settings_fixer import DataLoaderSettingsFixer
+from fixes.element_wise_operations_fixer import ElementWiseOperationsFixer
+from fixes.filter_operations_fixer import FilterOperationsFixer
+from fixes.inefficient_df_joins_fixer import InefficientDataFrameJoinsFixer
+from fixes.recomputing_group_by_fixer import RecomputingGroupByFixer
+from fixes.reduction_operations_fixer import ReductionOperationsFixer
+
+if TYPE_CHECKING:
+    from engines.fix_verifier import FixVerifier
+
+class FixEngine:
+    """
+    An engine that proposes fixes for the smells of a Python source file, based on injected fixers, and applies them.
+
+    Fixes are computed on the concrete syntax tree of the file (libcst), so that they only rewrite the code of
+    the smells and keep the formatting and comments of the rest of the file. The fixes of a file are applied as
+    one batch; a fix touching the code of a fix applied before it is left out. With a verifier, a fix is only
+    proposed if running it against the original code on random inputs shows it is equivalent and faster.
+
+    Attributes:
+        fixers (Dict[str, BaseFixer]): The fixer of each rule ID.
+        project (Optional[ProjectIndex]): The project the files belong to, so that the shared analyses see through
+            the functions they import, as when the smells were detected.
+        verifier (Optional[FixVerifier]): Runs every fix against the original code before it is proposed, if set.
+    """
+
+    def __init__(self, project: Optional[ProjectIndex] = None, verifier: Optional["FixVerifier"] = None):
+        """
+        Initializes the engine with the fixers of the rules.
+
+        :param project: The project the fixed files belong to.
+        :param verifier: Runs every fix against the original code before it is proposed.
+        """
+        self.fixers: Dict[str, BaseFixer] = {}
+        self.project = project
+        self.verifier = verifier
+
+        # Add fixers
+        self.add_fixer(ReductionOperationsFixer())
+        self.add_fixer(FilterOperationsFixer())
+        self.add_fixer(ElementWiseOperationsFixer())
+        self.add_fixer(DataLoaderSettingsFixer("blocking_dataloaders"))
+        self.add_fixer(DataLoaderSettingsFixer("inefficient_data_transfer"))
+        self.add_fixer(RecomputingGroupByFixer())
+        self.add_fixer(InefficientDataFrameJoinsFixer())
+        self.add_fixer(CalculatingGradientsFixer())
+
+    def add_fixer(self, fixer: BaseFixer):
+        """
+        Adds a fixer, replacing the fixer of the same rule if any.
+
+        :param fixer: A fixer that inherits from BaseFixer.
+        """
+        self.fixers[fixer.rule_id] = fixer
+
+    def propose(self, source_code: str, smells: List[Smell], filepath: Optional[str] = None) -> List[Fix]:
+        """
+        Proposes a fix for every smell that can be fixed safely.
+
+        :param source_code: The source the smells were detected in.
+        :param smells: The smells of the source.
+        :param filepath: The path of the source.
+        :return: The fixes, ordered by line. Fixes may overlap; see apply().
+        """
+        fixable = [smell for smell in smells if smell.rule_id in self.fixers]
+        if not fixable:
+            return []
+
+        tree = ast.parse(source_code)
+        context = AnalysisContext(tree, self.project, filepath)
+        wrapper = MetadataWrapper(cst.parse_module(source_code))
+        positions = wrapper.resolve(PositionProvider)
+        nodes = {}
+        for node, position in positions.items():
+            nodes.setdefault((position.start.line, position.start.column, position.end.line, position.end.column), []).append(node)
+        lines = source_code.split("\n")
+
+        fixes = []
+        statements = [node for node in ast.walk(tree) if isinstance(node, ast.stmt)]
+        for smell in fixable:
+            fixer = self.fixers[smell.rule_id]
+            node = next((stmt for stmt in statements
+                         if stmt.lineno == smell.start_line and isinstance(stmt, fixer.statement_types)), None)
+            if node is None:
+                continue
+            site = FixSite(smell=smell, node=node, statement=None, context=context, module=wrapper.module,
+                           positions=positions, nodes=nodes, lines=lines)
+            site.statement = site.cst_node(node)
+            if site.statement is None:
+                continue
+            fix = fixer.fix(site)
+
+            # Only propose fixes that leave valid Python, and that compute the same values faster when verified
+            if fix is None or not self._parses(self.apply(source_code, [fix])[0]):
+                continue
+            if self.verifier is not None:
+                fix.verification = self.verifier.verify(site, fix)
+                if not fix.verification.passed:
+                    continue
+            fixes.append(fix)
+        return sorted(fixes, key=lambda fix: fix.start_line)
+
+    @staticmethod
+    def apply(source_code: str, fixes: List[Fix]) -> Tuple[str, List[Fix], List[Fix]]:
+        """
+        Applies fixes as one batch. Fixes are taken in order; a fix overlapping one taken before it is left out,
+        so that it can be proposed again on the fixed source. A fix making the same edits as one taken before it
+        (e.g., the fixes of two smells of the same call) is applied along with it, and a shared edit made by
+        several fixes (e.g., the import they all need) is made once.
+
+        :param source_code: The source to fix.
+        :param fixes: The fixes of the source.
+        :return: The fixed source, the applied fixes, and the fixes left out because of a conflict.
+        """
+        applied: List[Fix] = []
+        conflicting: List[Fix] = []
+        edits: List[TextEdit] = []
+        for fix in fixes:
+            if any(fix.edits == other.edits for other in applied):
+                applied.append(fix)
+            elif any(fix.overlaps(other) for other in applied):
+                conflicting.append(fix)
+            else:
+                applied.append(fix)
+                edits.extend(edit for edit in fix.edits if not (edit.shared and edit in edits))
+
+        # Offsets of the start of every line, to turn positions into indices of the source
+        starts = [0]
+        for line in source_code.split("\n"):
+            starts.append(starts[-1] + len(line) + 1)
+
+        def offset(line: int, column: int) -> int:
+            return starts[min(line, len(starts)) - 1] + column
+
+        edits.sort(key=lambda edit: (edit.start_line, edit.start_column), reverse=True)
+        fixed = source_code
+        for edit in edits:
+            fixed = fixed[:offset(edit.start_line, edit.start_column)] + edit.new_text + fixed[offset(edit.end_line, edit.end_column):]
+        return fixed, applied, conflicting
+
+    @staticmethod
+    def diff(path: str, source_code: str, fixed_source: str) -> str:
+        """
+        Returns the changes between a source and its fixed version, as a unified diff.
+        """
+        return "".join(difflib.unified_diff(
+            source_code.splitlines(keepends=True), fixed_source.splitlines(keepends=True),
+            fromfile=f"a/{path}", tofile=f"b/{path}"
+        ))
+
+    @staticmethod
+    def _parses(source_code: str) -> bool:
+        """
+        Checks that a source is valid Python.
+        """
+        try:
+            ast.parse(source_code)
+        except SyntaxError:
+            return False
+        return True
@@ -0,0 +1,322 @@
+import ast
+import builtins
+import copy
+import textwrap
+import time
+import warnings
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+import numpy as np
+from analysis.dataflow import BIND
+from analysis.type_inference import ARRAY, NUMPY_ARRAY, SERIES
+from fixes.base_fixer import BaseFixer, FixSite
+from models.fix import Fix, Verification
+
+# Modules the snippets may use, under the name the file imports them as
+SNIPPET_MODULES = ("numpy", "pandas", "math")
+
+# Inputs both versions are run on: every shape, with every dtype and distribution of values. Series take the
+# first dimension of the shape. Centered values exercise signs, positive values the functions that are not defined
+# for negative numbers (e.g., math.sqrt), and a few small integers the edges of comparisons (e.g., '>' and '>=').
+TRIAL_SHAPES = [(0,), (1,), (17,), (1_000,), (40, 3)]
+TRIAL_DTYPES = ["float64", "float32", "int64"]
+TRIAL_DISTRIBUTIONS = ["centered", "positive", "ties"]
+
+# Relative tolerance of each dtype. Values are also compared with an absolute tolerance scaled to the size and
+# magnitude of the inputs, as reductions add their elements in another order.
+TOLERANCES = {"float64": 1e-9, "float32": 1e-4, "int64": 1e-9}
+
+# Input the versions are timed on, with the shortest of several runs kept
+TIMING_SHAPE = (100_000,)
+TIMING_REPEATS = 3
+
+# Roles of the variables the snippets share, which tell what random value they are given
+ARRAY_ROLE = "array"
+SERIES_ROLE = "series"
+LIST_ROLE = "list"
+SCALAR_ROLE = "scalar"
+
+class FixVerifier:
+    """
+    Checks a fix by running the code of its smell and the fixed code on the same random inputs, on CPU, in this
+    process. Both versions are extracted into standalone functions taking the variables they share, which are
+    given random NumPy arrays (or pandas Series), empty lists or scalars according to the shared type inference.
+    A fix passes if both versions leave the same values in every variable, within tolerances, on every input
+    the original code runs on, and if the fixed version is faster on a large input.
+
+    Snippets that use anything else (e.g., attributes of objects, or functions of the project) are not verified,
+    and their fixes do not pass.
+
+    Attributes:
+        - seed (int): The seed of the random inputs, so that verifications are reproducible.
+        - shapes (List[tuple]): The shapes of the random arrays.
+        - dtypes (List[str]): The dtypes of the random arrays.
+        - timing_shape (tuple): The shape of the arrays the versions are timed on.
+        - repeats (int): The number of timed runs of each version.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        shapes: List[tuple] = None,
+        dtypes: List[str] = None,
+        timing_shape: tuple = TIMING_SHAPE,
+        repeats: int = TIMING_REPEATS
+    ):
+        self.seed = seed
+        self.shapes = shapes or TRIAL_SHAPES
+        self.dtypes = dtypes or TRIAL_DTYPES
+        self.timing_shape = timing_shape
+        self.repeats = repeats
+
+    def verify(self, site: FixSite, fix: Fix) -> Verification:
+        """
+        Runs the code of a smell and its fix on random inputs, and times both.
+
+        :param site: The smell the fix was proposed for.
+        :param fix: The fix, whose single edit replaces the statement of the smell.
+        :return: The outcome; see Verification.passed.
+        """
+        snippets = self._snippets(site, fix)
+        if isinstance(snippets, str):
+            return Verification(equivalent=False, reason=snippets)
+        original_code, fixed_code = snippets
+
+        modules = self._modules(site)
+        roles = self._roles(site, ast.parse(original_code), ast.parse(fixed_code), modules)
+        if isinstance(roles, str):
+            return Verification(equivalent=False, reason=roles)
+        names = list(roles)
+        original = self._compile(original_code, names, modules)
+        fixed = self._compile(fixed_code, names, modules)
+
+        # Compare both versions on every input the original code runs on
+        rng = np.random.default_rng(self.seed)
+        trials = 0
+        for dtype in self.dtypes:
+            for distribution in TRIAL_DISTRIBUTIONS:
+                for shape in self.shapes:
+                    arguments = self._arguments(roles, shape, dtype, distribution, rng)
+                    expected, error = self._run(original, arguments)
+                    if error is not None:
+                        continue
+                    actual, error = self._run(fixed, arguments)
+                    if error is not None:
+                        return Verification(equivalent=False, trials=trials,
+                                            reason=f"the fix raises {type(error).__name__} on {dtype} arrays of shape {shape}")
+                    tolerance = TOLERANCES[dtype]
+                    scale = self._magnitude(arguments) * max(1, int(np.prod(shape)))
+                    for name, before, after in zip(names, expected, actual):
+                        if not self._same(before, after, tolerance, tolerance * scale):
+                            return Verification(equivalent=False, trials=trials,
+                                                reason=f"'{name}' differs on {dtype} arrays of shape {shape}")
+                    trials += 1
+        if not trials:
+            return Verification(equivalent=False, reason="the original code failed on every input")
+
+        # Time both versions on a large input
+        arguments = self._arguments(roles, self.timing_shape, "float64", "positive", rng)
+        original_seconds = self._time(original, arguments)
+        fixed_seconds = self._time(fixed, arguments)
+        verification = Verification(equivalent=True, trials=trials, original_seconds=original_seconds, fixed_seconds=fixed_seconds)
+        if original_seconds is None or fixed_seconds is None:
+            verification.reason = f"the code could not be timed on arrays of shape {self.timing_shape}"
+        elif fixed_seconds >= original_seconds:
+            verification.reason = "the fix is not faster"
+        return verification
+
+    @staticmethod
+    def _snippets(site: FixSite, fix: Fix) -> Union[Tuple[str, str], str]:
+        """
+        Returns the code of the smell's statement and of its replacement, both unindented, or why they cannot
+        be extracted.
+        """
+        position = site.positions[site.statement]
+        if len(fix.edits) != 1:
+            return "the fix has several edits"
+        edit = fix.edits[0]
+        if ((edit.start_line, edit.start_column, edit.end_line, edit.end_column)
+                != (position.start.line, position.start.column, position.end.line, position.end.column)):
+            return "the fix does not replace a single statement"
+        fixed_code = textwrap.dedent(" " * edit.start_column + edit.new_text)
+        try:
+            ast.parse(fixed_code)
+        except SyntaxError:
+            return "the fix cannot be extracted"
+        return ast.unparse(site.node), fixed_code
+
+    @staticmethod
+    def _modules(site: FixSite) -> Dict[str, object]:
+        """
+        Returns the modules the snippets may use, by the name the file imports them as.
+        """
+        modules = {}
+        for module in SNIPPET_MODULES:
+            alias = BaseFixer.module_alias(site, module)
+            if alias is None:
+                continue
+            try:
+                modules[alias] = __import__(module)
+            except ImportError:
+                pass
+        return modules
+
+    @staticmethod
+    def _roles(site: FixSite, original: ast.Module, fixed: ast.Module, modules: Dict[str, object]) -> Union[Dict[str, str], str]:
+        """
+        Returns the role of every variable the snippets share, in order of appearance, or why they cannot be run
+        on their own. Loop variables are left out, as they only exist in the original code.
+        """
+        statement = site.node
+        dataflow = site.context.dataflow(statement)
+        loop_variables = {node.id for loop in ast.walk(original) if isinstance(loop, (ast.For, ast.comprehension))
+                          for node in ast.walk(loop.target) if isinstance(node, ast.Name)}
+
+        def is_builtin(name: str) -> bool:
+            return hasattr(builtins, name) and not dataflow.reaching_definitions(statement, name)
+
+        roles: Dict[str, str] = {}
+        for tree in (original, fixed):
+            for node in ast.walk(tree):
+                if not isinstance(node, ast.Name) or node.id in modules or node.id in loop_variables or is_builtin(node.id):
+                    continue
+                if node.id in roles:
+                    continue
+                if tree is fixed:
+                    return f"the fix uses '{node.id}', which the original code does not"
+                kinds = FixVerifier._incoming_kinds(site, node.id)
+                if kinds and kinds <= {NUMPY_ARRAY, ARRAY}:
+                    roles[node.id] = ARRAY_ROLE
+                elif kinds == {SERIES} and any(module.__name__ == "pandas" for module in modules.values()):
+                    roles[node.id] = SERIES_ROLE
+                elif kinds:
+                    return f"'{node.id}' holds a {', '.join(sorted(kinds))}"
+                elif BaseFixer.is_new_list(site, node.id, statement):
+                    roles[node.id] = LIST_ROLE
+                else:
+                    roles[node.id] = SCALAR_ROLE
+
+        # Only modules, arrays, Series and lists have attributes the random inputs provide
+        for tree in (original, fixed):
+            for node in ast.walk(tree):
+                if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                        and node.value.id not in modules and roles.get(node.value.id, SCALAR_ROLE) == SCALAR_ROLE):
+                    return f"the code uses the attribute '{node.attr}' of '{node.value.id}'"
+        return roles
+
+    @staticmethod
+    def _incoming_kinds(site: FixSite, name: str) -> FrozenSet[str]:
+        """
+        Returns the kinds a variable may hold when the statement of the smell starts: the kinds of the values
+        bound to it before the statement. The shared type inference does not tell them apart from the values
+        the statement binds to it (e.g., 'lowest = values[i]' in the loop).
+        """
+        statement = site.node
+        types = site.context.types
+        kinds = set()
+        for definition in site.context.dataflow(statement).reaching_definitions(statement, name):
+            if definition.kind != BIND or statement.lineno <= definition.line <= (statement.end_lineno or statement.lineno):
+                continue
+            stmt = definition.node
+            if isinstance(stmt, (ast.Assign, ast.AnnAssign)) and stmt.value is not None:
+                kinds |= types.expr_kinds(stmt.value)
+            else:
+                kinds |= types.kinds(name, statement)
+        return frozenset(kinds)
+
+    @staticmethod
+    def _compile(code: str, names: List[str], modules: Dict[str, object]) -> Callable:
+        """
+        Wraps a snippet into a function taking the shared variables and returning their final values.
+        """
+        parameters = ", ".join(names)
+        source = f"def snippet({parameters}):\n{textwrap.indent(code, '    ')}\n    return ({parameters}{',' if names else ''})\n"
+        namespace = dict(modules)
+        exec(compile(source, "<fix verification>", "exec"), namespace)
+        return namespace["snippet"]
+
+    @staticmethod
+    def _arguments(roles: Dict[str, str], shape: tuple, dtype: str, distribution: str, rng: np.random.Generator) -> List[object]:
+        """
+        Returns random values for the shared variables, drawing every array of the same shape.
+        """
+        def values(size) -> np.ndarray:
+            if distribution == "ties":
+                return rng.integers(-1, 3, size=size).astype(dtype)
+            if dtype.startswith("int"):
+                low = 1 if distribution == "positive" else -20
+                return rng.integers(low, 20, size=size).astype(dtype)
+            if distribution == "positive":
+                return rng.uniform(0.1, 10, size=size).astype(dtype)
+            return rng.normal(0, 10, size=size).astype(dtype)
+
+        arguments = []
+        for role in roles.values():
+            if role == ARRAY_ROLE:
+                arguments.append(values(shape))
+            elif role == SERIES_ROLE:
+                import pandas as pd
+                arguments.append(pd.Series(values(shape[:1])))
+            elif role == LIST_ROLE:
+                arguments.append([])
+            else:
+                arguments.append(values(()).item())
+        return arguments
+
+    @staticmethod
+    def _run(function: Callable, arguments: List[object]) -> Tuple[Optional[tuple], Optional[Exception]]:
+        """
+        Runs a snippet on a copy of its arguments, returning the final values of the shared variables or the
+        exception it raised.
+        """
+        arguments = copy.deepcopy(arguments)
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                return function(*arguments), None
+            except Exception as e:
+                return None, e
+
+    def _time(self, function: Callable, arguments: List[object]) -> Optional[float]:
+        """
+        Returns the shortest time of several runs of a snippet, with fresh arguments for every run, or None if it fails.
+        """
+        best = float("inf")
+        for _ in range(self.repeats):
+            fresh = copy.deepcopy(arguments)
+            with np.errstate(all="ignore"), warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                started = time.perf_counter()
+                try:
+                    function(*fresh)
+                except Exception:
+                    return None
+                best = min(best, time.perf_counter() - started)
+        return best
+
+    @staticmethod
+    def _magnitude(arguments: List[object]) -> float:
+        """
+        Returns the largest absolute value of the arguments, and at least 1.
+        """
+        largest = 1.0
+        for argument in arguments:
+            values = np.asarray(argument, dtype=float) if not isinstance(argument, list) else np.zeros(0)
+            if values.size:
+                largest = max(largest, float(np.nanmax(np.abs(values))))
+        return largest
+
+    @staticmethod
+    def _same(before: object, after: object, rtol: float, atol: float) -> bool:
+        """
+        Checks that two versions of a variable hold the same values, element by element.
+        """
+        if hasattr(before, "to_numpy"):
+            before = before.to_numpy()
+        if hasattr(after, "to_numpy"):
+            after = after.to_numpy()
+        before, after = np.asarray(before), np.asarray(after)
+        if before.shape != after.shape:
+            return False
+        if before.dtype.kind in "biuf" and after.dtype.kind in "biuf":
+            return bool(np.allclose(before.astype(float), after.astype(float), rtol=rtol, atol=atol, equal_nan=True))
+        return bool(np.array_equal(before, after))
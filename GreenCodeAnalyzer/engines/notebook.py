@@ -0,0 +1,194 @@
+import ast
+import json
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+from models.smell import Smell
+
+# Cell magics whose body is still Python run by the kernel (e.g., '%%time'); the body of other cell magics
+# (e.g., '%%bash' or '%%writefile') is not analyzed
+PYTHON_CELL_MAGICS = {"time", "timeit", "prun", "capture", "debug", "snakeviz", "memit", "mprun"}
+
+# Keys of a notebook that are never analyzed, dropped as soon as they are decoded
+IGNORED_KEYS = {"outputs", "attachments"}
+
+# An IPython line magic or shell command (e.g., '%matplotlib inline' or '!pip install torch'), or a help request ('df?')
+MAGIC_LINE = re.compile(r"^(\s*)(?:[%!]|[\w.]+\?{1,2}\s*$)")
+# The result of a line magic or shell command assigned to variables (e.g., 'files = !ls')
+MAGIC_ASSIGNMENT = re.compile(r"^(\s*)([\w.]+(?:\s*,\s*[\w.]+)*)\s*=\s*[%!]")
+# A line of the module referred to by the description of a smell (e.g., 'first used on line 10')
+LINE_REFERENCE = re.compile(r"\bline (\d+)")
+
+@dataclass
+class NotebookCell:
+    """
+    A code cell of a notebook, as it appears in the module the notebook is analyzed as.
+
+    Attributes:
+        - number (int): The position of the cell in the notebook, from 1, counting every kind of cell.
+        - execution_count (Optional[int]): The execution count saved with the cell, if it was run.
+        - source (str): The source of the cell, with IPython magics replaced by Python statements of the same lines.
+        - start_line (int): The line of the module the cell starts at.
+        - skipped (Optional[str]): Why the cell is not analyzed (e.g., a syntax error), in which case its lines are blank.
+    """
+    number: int
+    execution_count: Optional[int]
+    source: str
+    start_line: int = 1
+    skipped: Optional[str] = None
+
+class NotebookSource:
+    """
+    A Jupyter notebook turned into a single Python module, with its code cells in execution order, so that
+    rules see the state the cells share (e.g., a DataFrame grouped in one cell and again in a later one).
+
+    Every top-level statement of a cell is a unit of the rule engine, whose results are cached by the hash of
+    its source: when one cell is edited, only its statements and the rules depending on the whole module run
+    again. Smells are mapped back to the cell and line they were found at.
+
+    Attributes:
+        - cells (List[NotebookCell]): The code cells, in the order they are analyzed.
+        - source (str): The module the code cells form.
+    """
+
+    def __init__(self, cells: List[NotebookCell]):
+        """
+        :param cells: The code cells in document order; their source is already stripped of magics.
+        """
+        # Cells that ran come first, in the order they ran; the others would run after them, in document order
+        self.cells = sorted(cells, key=lambda cell: (cell.execution_count is None, cell.execution_count or 0, cell.number))
+
+        chunks = []
+        line = 1
+        for cell in self.cells:
+            source = self._checked(cell)
+            if not source.endswith("\n"):
+                source += "\n"
+            cell.start_line = line
+            chunks.append(source)
+            line += source.count("\n")
+        self.source = "".join(chunks)
+        self._starts = [cell.start_line for cell in self.cells]
+
+    @classmethod
+    def load(cls, path: str) -> "NotebookSource":
+        """
+        Reads a notebook file (nbformat 4).
+
+        :param path: The path of the .ipynb file.
+        :raises ValueError: If the file is not a notebook.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            return cls.parse(file.read())
+
+    @classmethod
+    def parse(cls, text: str) -> "NotebookSource":
+        """
+        Parses the JSON of a notebook. Outputs, which make up most of a notebook (e.g., images), are dropped
+        as the JSON is decoded, so that at most one cell's outputs are held in memory at a time.
+
+        :param text: The JSON of the notebook.
+        :raises ValueError: If the text is not a notebook.
+        """
+        notebook = json.loads(text, object_pairs_hook=lambda pairs: {
+            key: value for key, value in pairs if key not in IGNORED_KEYS
+        })
+        if not isinstance(notebook, dict) or not isinstance(notebook.get("cells"), list):
+            raise ValueError("not a Jupyter notebook: no list of cells")
+
+        cells = []
+        for number, cell in enumerate(notebook["cells"], start=1):
+            if cell.get("cell_type") != "code":
+                continue
+            source = cell.get("source", "")
+            if isinstance(source, list):
+                source = "".join(source)
+            cells.append(NotebookCell(number=number, execution_count=cell.get("execution_count"),
+                                      source=strip_magics(source)))
+        return cls(cells)
+
+    @property
+    def lines(self) -> int:
+        """
+        The number of lines of the module the code cells form.
+        """
+        return self.source.count("\n") + 1
+
+    @property
+    def skipped_cells(self) -> Dict[str, str]:
+        """
+        The cells that are not analyzed, as 'cell N', with the reason, to be reported with the rules that did
+        not analyze the whole notebook.
+        """
+        return {f"cell {cell.number}": cell.skipped for cell in self.cells if cell.skipped is not None}
+
+    def cell_at(self, line: int) -> Tuple[NotebookCell, int]:
+        """
+        Returns the cell a line of the module belongs to, and the line within that cell (from 1).
+        """
+        cell = self.cells[max(bisect_right(self._starts, line) - 1, 0)]
+        return cell, line - cell.start_line + 1
+
+    def map_smells(self, smells: List[Smell]) -> List[Smell]:
+        """
+        Returns copies of smells of the module with their cell set and their lines relative to it, including
+        the lines their descriptions refer to. A smell ending in a later cell is cut at the end of its first cell.
+        """
+        mapped = []
+        for smell in smells:
+            cell, start_line = self.cell_at(smell.start_line)
+            end_line = None
+            if smell.end_line is not None:
+                end_cell, end_line = self.cell_at(smell.end_line)
+                if end_cell is not cell:
+                    end_line = cell.source.count("\n") + 1
+            description = LINE_REFERENCE.sub(self._cell_reference, smell.description)
+            mapped.append(replace(smell, cell=cell.number, start_line=start_line, end_line=end_line, description=description))
+        return mapped
+
+    def _cell_reference(self, match: re.Match) -> str:
+        """
+        Rewrites a reference to a line of the module as a reference to a line of a cell.
+        """
+        cell, line = self.cell_at(int(match.group(1)))
+        return f"cell {cell.number}, line {line}"
+
+    @staticmethod
+    def _checked(cell: NotebookCell) -> str:
+        """
+        Returns the source of a cell if it parses on its own, or blank lines in its place, so that a cell that
+        is being edited does not prevent the analysis of the others.
+        """
+        try:
+            ast.parse(cell.source)
+        except (SyntaxError, ValueError) as e:
+            cell.skipped = f"{type(e).__name__}: {e}"
+            return "\n" * cell.source.count("\n")
+        return cell.source
+
+def strip_magics(source: str) -> str:
+    """
+    Replaces the IPython syntax of a cell with Python statements of the same lines, keeping their indentation:
+    line magics and shell commands become 'pass', and their assigned results become None. The body of a cell
+    magic is blanked, unless the magic runs it as Python (e.g., '%%time').
+
+    :param source: The source of a code cell.
+    :return: The source, with as many lines.
+    """
+    lines = source.split("\n")
+    if lines and lines[0].startswith("%%"):
+        magic = lines[0][2:].split(maxsplit=1)
+        if not magic or magic[0] not in PYTHON_CELL_MAGICS:
+            return "\n" * (len(lines) - 1)
+        lines[0] = ""
+
+    stripped = []
+    for line in lines:
+        assignment = MAGIC_ASSIGNMENT.match(line)
+        if assignment:
+            stripped.append(f"{assignment.group(1)}{assignment.group(2)} = None")
+            continue
+        magic = MAGIC_LINE.match(line)
+        stripped.append(f"{magic.group(1)}pass" if magic else line)
+    return "\n".join(stripped)
@@ -0,0 +1,177 @@
+import os
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from analysis.project import ProjectIndex
+from engines.analysis_limits import AnalysisLimits, GeneratedFileError
+from engines.notebook import NotebookSource
+from engines.result_cache import ResultCache
+from engines.smell_engine import SmellEngine
+from engines.worker_pool import WorkerPool
+from models.smell import Smell
+
+@dataclass
+class ScanResult:
+    """
+    The outcome of analyzing one file of a project.
+
+    Attributes:
+        - path (str): The path of the file.
+        - smells (List[Smell]): The smells of the file, each once; empty if it could not be analyzed.
+        - lines (int): The number of lines of the file.
+        - error (Optional[str]): Why the file could not be analyzed (e.g., a syntax error), if it could not.
+        - skipped (Optional[str]): Why the file was left out on purpose (it was written by a code generator), if it was.
+        - cached (bool): Whether the smells were reused from the result cache.
+        - partial_rules (Dict[str, str]): The rules that did not analyze the whole file, by ID, with the reason.
+    """
+    path: str
+    smells: List[Smell]
+    lines: int
+    error: Optional[str] = None
+    skipped: Optional[str] = None
+    cached: bool = False
+    partial_rules: Dict[str, str] = field(default_factory=dict)
+
+class ProjectScanner:
+    """
+    Analyzes the files of a project, reusing cached results of unchanged files and spreading the others
+    over worker processes. Each worker keeps its own engine, so that summaries of the project's modules
+    are computed once per worker; workers can be replaced as they age to bound their memory (see WorkerPool).
+    """
+
+    def __init__(self, root: str, jobs: int = 1, cache: Optional[ResultCache] = None,
+                 limits: Optional[AnalysisLimits] = None, max_tasks_per_worker: Optional[int] = None,
+                 max_worker_memory: Optional[int] = None):
+        """
+        :param root: The directory imports between the project's modules are resolved from.
+        :param jobs: The number of worker processes; 1 analyzes files in this process.
+        :param cache: The cache of results across runs, if any.
+        :param limits: How much work the analysis of a file may take. Defaults to AnalysisLimits().
+        :param max_tasks_per_worker: The number of files a worker analyzes before it is replaced, if limited.
+        :param max_worker_memory: The bytes of resident memory above which a worker is replaced, if limited.
+        """
+        self.root = root
+        self.jobs = jobs
+        self.cache = cache
+        self.limits = limits
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_memory = max_worker_memory
+        self._engine: Optional[Tuple[SmellEngine, ProjectIndex]] = None
+
+    def scan(self, paths: List[str]) -> Iterator[ScanResult]:
+        """
+        Analyzes files, yielding their results in the order of the paths as soon as they are available.
+
+        :param paths: The files to analyze.
+        """
+        cached = {}
+        if self.cache is not None:
+            for path in paths:
+                source_code = self._read(path)
+                hit = self.cache.get(path, source_code) if source_code is not None else None
+                if hit is not None:
+                    cached[path] = ScanResult(path=path, smells=hit[0], lines=hit[1], cached=True, partial_rules=hit[2])
+        missing = [path for path in paths if path not in cached]
+
+        if self.jobs > 1 and len(missing) > 1:
+            pool = WorkerPool(self.jobs, _start_worker, (self.root, self.limits), _analyze_in_worker, _failed,
+                              max_tasks=self.max_tasks_per_worker, max_memory=self.max_worker_memory)
+            yield from self._merge(paths, cached, pool.imap(missing))
+        else:
+            yield from self._merge(paths, cached, (self._analyze_here(path) for path in missing))
+
+    def _merge(self, paths: List[str], cached: dict, analyzed: Iterator[tuple]) -> Iterator[ScanResult]:
+        """
+        Yields the cached and analyzed results in the order of the paths, caching the analyzed ones.
+        """
+        for path in paths:
+            if path in cached:
+                yield cached[path]
+                continue
+            _, smells, lines, error, skipped, dependencies, partial_rules, stopped, source_hash = next(analyzed)
+            result = ScanResult(path=path, smells=[Smell(**smell) for smell in smells], lines=lines, error=error,
+                                skipped=skipped, partial_rules=partial_rules)
+
+            # Results of rules stopped by their time budget depend on how fast this run was, and are not cached;
+            # those of files downgraded for their size or header are, under the same limits. They are cached
+            # for the source that was analyzed, so that a file changed since is analyzed again next time
+            if self.cache is not None and error is None and skipped is None and not stopped:
+                self.cache.put(path, source_hash, lines, result.smells, dependencies, partial_rules)
+            yield result
+
+    def _analyze_here(self, path: str) -> tuple:
+        """
+        Analyzes a file in this process.
+        """
+        if self._engine is None:
+            project = ProjectIndex(self.root)
+            self._engine = (SmellEngine(project=project, limits=self.limits), project)
+        return _analyze(*self._engine, path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[str]:
+        """
+        Returns the source of a file, or None if it cannot be read. The source of a notebook is the module
+        its code cells form, so that its cached results survive changes to its outputs.
+        """
+        try:
+            if path.endswith(".ipynb"):
+                return NotebookSource.load(path).source
+            with open(path, "r", encoding="utf-8") as file:
+                return file.read()
+        except (OSError, ValueError):
+            return None
+
+# The engine of a worker process, created once when it starts
+_worker_engine: Optional[Tuple[SmellEngine, ProjectIndex]] = None
+
+def _start_worker(root: str, limits: Optional[AnalysisLimits]):
+    """
+    Creates the engine of a worker process.
+    """
+    global _worker_engine
+    project = ProjectIndex(root)
+    _worker_engine = (SmellEngine(project=project, limits=limits), project)
+
+def _analyze_in_worker(path: str) -> tuple:
+    """
+    Analyzes a file in a worker process.
+    """
+    return _analyze(*_worker_engine, path)
+
+def _failed(path: str, error: str) -> tuple:
+    """
+    Returns the result of a file that could not be analyzed, as _analyze() does.
+    """
+    return path, [], 0, error, None, [], {}, False, None
+
+def _analyze(engine: SmellEngine, project: ProjectIndex, path: str) -> tuple:
+    """
+    Analyzes a file, returning its path, its smells as dicts (to cross process boundaries), its number of lines,
+    the error that prevented its analysis if any, why it was skipped if it was, the project modules whose
+    summaries it used, the rules that did not analyze the whole file, whether some of them were stopped by
+    their time budget, and the hash of the source that was analyzed (see ResultCache).
+    """
+    notebook = None
+    try:
+        if path.endswith(".ipynb"):
+            notebook = NotebookSource.load(path)
+            source_code = notebook.source
+        else:
+            with open(path, "r", encoding="utf-8") as file:
+                source_code = file.read()
+    except (OSError, ValueError) as e:
+        return _failed(path, str(e))
+    lines = source_code.count("\n") + 1
+    try:
+        with project.tracking() as used:
+            smells = engine.analyze_notebook(notebook, path) if notebook else engine.analyze_smells(source_code, path)
+    except GeneratedFileError as e:
+        return path, [], lines, None, str(e), [], {}, False, None
+    except (SyntaxError, ValueError) as e:
+        return path, [], lines, str(e), None, [], {}, False, None
+    except Exception as e:
+        # A bug of a rule or analysis on one file should not end the scan of the project
+        return path, [], lines, f"{type(e).__name__}: {e}", None, [], {}, False, None
+    dependencies = sorted(used - {os.path.abspath(path)})
+    return (path, [asdict(smell) for smell in smells], lines, None, None, dependencies, dict(engine.partial_rules),
+            bool(engine.engine.stopped_rules), ResultCache.source_hash(source_code))
@@ -0,0 +1,137 @@
+import glob
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from engines.analysis_limits import AnalysisLimits
+from models.smell import Smell
+from rules.host_resources import HostResources
+
+# Version of the cache entries, bumped when their fields change
+RESULT_CACHE_VERSION = 2
+
+# The files the results depend on, besides the analyzed file and the project modules it uses
+ANALYZER_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYZER_SOURCES = ["analysis/*.py", "engines/*.py", "models/*.py", "rules/*.py", "rules/penalties.json"]
+
+class ResultCache:
+    """
+    The smells of analyzed files, kept on disk across runs so that unchanged files are not analyzed again.
+
+    An entry is reused if the file has the same content, the analyzer is the same, and none of the project
+    modules whose summaries its analysis used changed (checked by modification time and size, without
+    reading them). Each file has its own entry, written atomically, so that separate processes can share
+    the cache. Entries are only reused under the limits they were computed with (see AnalysisLimits), which
+    decide which files are skipped or only partially analyzed.
+    """
+
+    def __init__(self, directory: str, limits: Optional[AnalysisLimits] = None):
+        """
+        :param directory: The directory of the cache, created if needed.
+        :param limits: How much work the analysis of a file may take. Defaults to AnalysisLimits().
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.analyzer = self._analyzer_fingerprint()
+        self.limits = asdict(limits if limits is not None else AnalysisLimits())
+
+    def get(self, path: str, source_code: str) -> Optional[Tuple[List[Smell], int, Dict[str, str]]]:
+        """
+        Returns the cached smells of a file, its number of lines and the rules that did not analyze the whole
+        file, by ID, with the reason, if they are still valid.
+
+        :param path: The path of the file.
+        :param source_code: The current source of the file.
+        """
+        try:
+            with open(self._entry_path(path), "r") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if (entry.get("version") != RESULT_CACHE_VERSION or entry.get("analyzer") != self.analyzer
+                or entry.get("source") != self.source_hash(source_code) or entry.get("limits") != self.limits):
+            return None
+        for dependency, stamp in entry["dependencies"].items():
+            if self._stamp(dependency) != stamp:
+                return None
+        return [Smell(**smell) for smell in entry["smells"]], entry["lines"], entry["partial_rules"]
+
+    def put(self, path: str, source_hash: str, lines: int, smells: List[Smell], dependencies: Iterable[str],
+            partial_rules: Optional[Dict[str, str]] = None):
+        """
+        Stores the smells of a file. Results cut short by a time budget should not be stored, as they depend
+        on how fast the analysis ran rather than on the file.
+
+        :param path: The path of the file.
+        :param source_hash: The source_hash() of the source the smells were detected in, which may differ from
+            the file's current content if it changed during the analysis.
+        :param lines: The number of lines of that source.
+        :param smells: The smells of the file, each once.
+        :param dependencies: The paths of the project modules whose summaries the analysis used.
+        :param partial_rules: The rules that did not analyze the whole file (e.g., as it is huge), by ID, with
+            the reason.
+        """
+        entry = {
+            "version": RESULT_CACHE_VERSION,
+            "path": os.path.abspath(path),
+            "analyzer": self.analyzer,
+            "source": source_hash,
+            "lines": lines,
+            "dependencies": {dependency: self._stamp(dependency) for dependency in sorted(dependencies)},
+            "smells": [asdict(smell) for smell in smells],
+            "partial_rules": dict(partial_rules or {}),
+            "limits": self.limits,
+        }
+        entry_path = self._entry_path(path)
+        temporary = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(entry, file)
+        os.replace(temporary, entry_path)
+
+    @classmethod
+    def source_hash(cls, source_code: str) -> str:
+        """
+        Returns the hash identifying the source of a file in its entry.
+        """
+        return cls._hash(source_code)
+
+    def _entry_path(self, path: str) -> str:
+        """
+        Returns the path of the entry of a file, named after the hash of its absolute path.
+        """
+        return os.path.join(self.directory, self._hash(os.path.abspath(path)) + ".json")
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[List[int]]:
+        """
+        Returns the modification time and size of a file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        """
+        Returns a stable content hash of the text.
+        """
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    @classmethod
+    def _analyzer_fingerprint(cls) -> str:
+        """
+        Hashes the sources of the rules and analyses, and the penalty table, so that entries computed by
+        another version of the analyzer are not reused, and the resources of the machine, which the DataLoader
+        suggestions of some smells depend on, so that a cache shared between machines is not either.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(HostResources.probe().describe().encode("utf-8"))
+        for pattern in ANALYZER_SOURCES:
+            for path in sorted(glob.glob(os.path.join(ANALYZER_DIRECTORY, pattern))):
+                with open(path, "rb") as file:
+                    digest.update(os.path.relpath(path, ANALYZER_DIRECTORY).encode("utf-8"))
+                    digest.update(file.read())
+        return digest.hexdigest()
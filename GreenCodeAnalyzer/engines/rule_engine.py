@@ -1,43 +1,456 @@
 import ast
-from typing import List, Type
-from rules.base_rule import BaseRule
+import hashlib
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+from rules.base_rule import BaseRule, RuleBudgetExceeded, UNIT_DEPENDENCY, IMPORTS_DEPENDENCY, FACTS_DEPENDENCY, MODULE_DEPENDENCY
+from analysis.context import AnalysisContext
+from analysis.scopes import FUNCTION_NODES
+from analysis.project import ProjectIndex
+from engines.analysis_limits import AnalysisLimits, DOWNGRADE, SKIP, GeneratedFileError
+from rules.penalty_table import PenaltyTable
 from models.smell import Smell
 
+class AnalysisCancelled(Exception):
+    """
+    Raised when an analysis is cancelled before it completed, e.g., because a newer version of the file arrived.
+    """
+    pass
+
+@dataclass
+class AnalysisUnit:
+    """
+    A top-level statement of a module (function, class or any other statement), which is
+    the granularity at which rule results are cached.
+
+    Attributes:
+        - node (ast.stmt): The top-level statement.
+        - start_line (int): The first line of the unit, including decorators.
+        - key (str): A hash of the unit's source, independent of its position in the file.
+    """
+    node: ast.stmt
+    start_line: int
+    key: str
+
+@dataclass
+class FileCache:
+    """
+    Cached rule results of the previous analysis of a file. Smell lines are stored relative
+    to the start of the unit they belong to, so that units that only moved can be reused.
+
+    Attributes:
+        - unit_smells (dict): Maps a unit key to the smells of the unit-dependent rules.
+        - import_smells (dict): Maps (unit key, imports fingerprint) to the smells of the import-dependent rules.
+        - fact_smells (dict): Maps (unit key, facts fingerprint) to the smells of the fact-dependent rules.
+        - module_fingerprint (Optional[tuple]): The unit keys and positions of the module the module-dependent rules last ran on
+          (and the summaries of its functions, when analyzed as part of a project).
+        - module_smells (list): (unit index, smell) pairs found by the module-dependent rules.
+    """
+    unit_smells: dict = field(default_factory=dict)
+    import_smells: dict = field(default_factory=dict)
+    fact_smells: dict = field(default_factory=dict)
+    module_fingerprint: Optional[tuple] = None
+    module_smells: list = field(default_factory=list)
+
 class RuleEngine:
     """
     A modular engine for detecting energy-related code smells of Python source code.
+
+    Analysis is incremental: every top-level function, class and statement is hashed, and rules only
+    run again on the units whose hash changed since the previous analysis of the same file. Whether a
+    rule can be rerun on a single unit is decided by its declared dependency (see BaseRule).
+
+    The work spent on a file is bounded (see AnalysisLimits): rules that go over their time budget, or that
+    are skipped because the file is too large for them, are listed in partial_rules after the analysis, and
+    their smells in the file are left out.
     """
-    def __init__(self, rules: List[Type[BaseRule]] = None):
+    def __init__(
+        self,
+        rules: List[Type[BaseRule]] = None,
+        max_cached_files: int = 32,
+        project: Optional[ProjectIndex] = None,
+        penalties: Optional[PenaltyTable] = None,
+        limits: Optional[AnalysisLimits] = None
+    ):
         """
         Initializes the engine with a list of rules.
-        
+
         :param rules: A list of rules.
+        :param max_cached_files: The number of files whose results are kept for incremental analysis.
+        :param project: The project the analyzed files belong to, so that rules see through the functions
+            they import from each other. If None, every file is analyzed on its own.
+        :param penalties: The calibrated penalties smells are scaled with. Defaults to the table shipped with the rules.
+        :param limits: How much work the analysis of a file may take. Defaults to AnalysisLimits().
         """
         self.rules = rules if rules else []
-    
+        self.penalties = penalties if penalties is not None else PenaltyTable.default()
+        self.max_cached_files = max_cached_files
+        self.project = project
+        self.file_caches: OrderedDict[str, FileCache] = OrderedDict()
+        self.cancel_check: Optional[Callable[[], bool]] = None
+        self.limits = limits if limits is not None else AnalysisLimits()
+
+        # Rules of the last analyzed file that were stopped or skipped, by ID, with the reason, and those of them
+        # stopped by their time budget, whose results depend on how fast the analysis ran rather than on the file
+        self.partial_rules: Dict[str, str] = {}
+        self.stopped_rules: Set[str] = set()
+        self._rule_times: Dict[str, float] = {}
+        self._file_started = 0.0
+
     def add_rule(self, rule: Type[BaseRule]):
         """
         Adds a new rule to the engine.
-        
+
         :param rule: A rule that inherits from BaseRule.
         """
         self.rules.append(rule)
-    
-    def analyze(self, source_code: str) -> List[Smell]:
+
+        # Cached results were computed without this rule
+        self.file_caches.clear()
+
+    # Number of nodes processed (by any rule) between two cancellation checks
+    CANCEL_CHECK_INTERVAL = 256
+
+    def analyze(
+        self,
+        source_code: str,
+        cache_key: Optional[str] = None,
+        cancel_check: Optional[Callable[[], bool]] = None
+    ) -> List[Smell]:
         """
         Parses the source code into an AST and applies all injected rules.
-        
+
         :param source_code: The Python source code to analyze.
-        :return: A list of detected Smell objects.
+        :param cache_key: Identifies the file (e.g., its path) to reuse results of its previous analysis.
+            If None, every rule runs on the whole module.
+        :param cancel_check: Called periodically during the analysis; if it returns True, AnalysisCancelled is raised.
+            Results that were already computed stay cached.
+        :return: A list of detected Smell objects, ordered by line and rule. The rules that did not analyze the
+            whole file are listed in partial_rules.
+        :raises GeneratedFileError: If the file was written by a code generator, and such files are skipped.
         """
+        self.cancel_check = cancel_check
+        self.partial_rules = {}
+        self.stopped_rules = set()
+        self._rule_times = {}
+        self._file_started = time.perf_counter()
+
+        # Huge and generated files are screened before parsing, which may be slow on its own
+        verdict, reason = self.limits.screen(source_code, cache_key)
+        if verdict == SKIP:
+            raise GeneratedFileError(reason)
         tree = ast.parse(source_code)
+        if verdict == DOWNGRADE:
+            self._skip_rules([FACTS_DEPENDENCY, MODULE_DEPENDENCY], f"skipped for a file with {reason}")
+        elif self.limits.max_module_nodes is not None:
+            nodes = sum(1 for _ in ast.walk(tree))
+            if nodes > self.limits.max_module_nodes:
+                self._skip_rules([MODULE_DEPENDENCY], f"skipped for a module of {nodes} nodes, more than {self.limits.max_module_nodes}")
+        units = self._split_units(tree, source_code.splitlines())
+        cache = self._get_file_cache(cache_key)
+
+        # Analyses shared by the rules are computed lazily, at most once for this version of the file
+        context = AnalysisContext(tree, self.project, cache_key)
+        for rule in self.rules:
+            rule.bind(context)
+
         detected_smells = []
-        
-        # Traverse the AST nodes
-        for node in ast.walk(tree):
-            # Apply rules to detect smells
-            for rule in self.rules:
-                smells = rule.process_node(node)
-                detected_smells.extend(smells)
-        
-        return detected_smells
\ No newline at end of file
+        detected_smells.extend(self._analyze_unit_rules(units, cache))
+        detected_smells.extend(self._analyze_import_rules(tree, units, cache))
+        detected_smells.extend(self._analyze_fact_rules(context, units, cache))
+        detected_smells.extend(self._analyze_module_rules(context, units, cache))
+
+        if self.partial_rules:
+            # The results of the stopped rules are incomplete: leave them out, and analyze the file afresh next time
+            detected_smells = [smell for smell in detected_smells if smell.rule_id not in self.partial_rules]
+            if cache_key is not None:
+                self.file_caches.pop(cache_key, None)
+
+        # Report smells of the same line in the order the rules were added
+        rule_order = {}
+        for index, rule in enumerate(self.rules):
+            rule_order.setdefault(rule.id, index)
+        detected_smells.sort(key=lambda smell: (smell.start_line, rule_order.get(smell.rule_id, len(self.rules))))
+
+        # Costs depend on the enclosing loops, which may have changed even if the smell's unit did not
+        return [self._with_cost(smell, context) for smell in detected_smells]
+
+    def _analyze_unit_rules(self, units: List[AnalysisUnit], cache: FileCache) -> List[Smell]:
+        """
+        Applies the rules that only depend on a single unit, reusing the results of unchanged units.
+        """
+        rules = self._rules_with_dependency(UNIT_DEPENDENCY)
+        if not rules:
+            return []
+
+        for rule in rules:
+            rule.reset()
+
+        smells = []
+        unit_smells = {}
+        for unit in units:
+            relative = cache.unit_smells.get(unit.key)
+            if relative is None:
+                found = self._apply_rules(rules, ast.walk(unit.node))
+                relative = [self._relative_to(smell, unit.start_line) for smell in found]
+            unit_smells[unit.key] = relative
+            smells.extend(self._relative_to(smell, -unit.start_line) for smell in relative)
+
+        # Only keep the units of the current version of the file
+        cache.unit_smells = unit_smells
+        return smells
+
+    def _analyze_import_rules(self, tree: ast.Module, units: List[AnalysisUnit], cache: FileCache) -> List[Smell]:
+        """
+        Applies the rules that depend on a single unit and the module's imports. Their results are
+        reused for unchanged units as long as the imports of the module did not change either.
+        """
+        rules = self._rules_with_dependency(IMPORTS_DEPENDENCY)
+        if not rules:
+            return []
+
+        import_nodes = [node for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))]
+        imports_fingerprint = self._hash("\n".join(ast.dump(node) for node in import_nodes))
+
+        # Let the rules see every import of the module before analyzing the first changed unit
+        smells, cache.import_smells = self._analyze_fingerprinted_rules(
+            rules, units, lambda unit: imports_fingerprint, cache.import_smells, preamble=import_nodes
+        )
+        return smells
+
+    def _analyze_fact_rules(self, context: AnalysisContext, units: List[AnalysisUnit], cache: FileCache) -> List[Smell]:
+        """
+        Applies the rules that depend on a single unit and the module-level facts of the shared analyses
+        (e.g., the inferred types of module variables). Their results are reused for unchanged units as
+        long as these facts did not change either.
+
+        The code of top-level statements other than functions and classes belongs to the module's scope,
+        whose def-use chains also come from the other units (e.g., the definitions reaching a top-level loop),
+        so the results of these units also depend on the fingerprint of the module's chains.
+        """
+        rules = self._rules_with_dependency(FACTS_DEPENDENCY)
+        if not rules:
+            return []
+
+        facts = context.fingerprint()
+        module_facts = []
+
+        def fingerprint(unit: AnalysisUnit) -> str:
+            if isinstance(unit.node, FUNCTION_NODES + (ast.ClassDef,)):
+                return facts
+            if not module_facts:
+                module_facts.append(f"{facts}:{context.dataflow(context.tree).fingerprint()}")
+            return module_facts[0]
+
+        smells, cache.fact_smells = self._analyze_fingerprinted_rules(rules, units, fingerprint, cache.fact_smells)
+        return smells
+
+    def _analyze_fingerprinted_rules(
+        self,
+        rules: List[BaseRule],
+        units: List[AnalysisUnit],
+        fingerprint: Callable[[AnalysisUnit], str],
+        previous: dict,
+        preamble: Iterable[ast.AST] = ()
+    ) -> Tuple[List[Smell], dict]:
+        """
+        Applies rules to every unit whose (unit key, fingerprint of the unit) pair has no previous results.
+        The preamble nodes are processed once, before the first unit that is analyzed again.
+
+        :return: The smells of all units, and the results to cache for the next analysis.
+        """
+        smells = []
+        unit_results = {}
+        prepared = False
+        for unit in units:
+            key = (unit.key, fingerprint(unit))
+            relative = previous.get(key)
+            if relative is None:
+                if not prepared:
+                    for rule in rules:
+                        rule.reset()
+                    self._apply_rules(rules, preamble)
+                    prepared = True
+                found = self._apply_rules(rules, ast.walk(unit.node))
+                relative = [self._relative_to(smell, unit.start_line) for smell in found]
+            unit_results[key] = relative
+            smells.extend(self._relative_to(smell, -unit.start_line) for smell in relative)
+
+        # Only keep the units of the current version of the file
+        return smells, unit_results
+
+    def _analyze_module_rules(self, context: AnalysisContext, units: List[AnalysisUnit], cache: FileCache) -> List[Smell]:
+        """
+        Applies the rules that depend on the whole module. They only run again if any unit changed or moved,
+        or if the summaries of the functions the module imports from the project changed.
+        """
+        rules = self._rules_with_dependency(MODULE_DEPENDENCY)
+        if not rules:
+            return []
+
+        # Positions are part of the fingerprint, as smells may refer to other lines (e.g., "first used on line 10")
+        fingerprint = tuple((unit.key, unit.start_line) for unit in units)
+        if self.project is not None:
+            fingerprint += (context.calls.fingerprint(),)
+        if cache.module_fingerprint != fingerprint:
+            for rule in rules:
+                rule.reset()
+            found = self._apply_rules(rules, ast.walk(context.tree))
+
+            # Store every smell relative to the unit it starts in
+            unit_starts = [unit.start_line for unit in units]
+            module_smells = []
+            for smell in found:
+                index = max(bisect_right(unit_starts, smell.start_line) - 1, 0)
+                module_smells.append((index, self._relative_to(smell, unit_starts[index])))
+
+            cache.module_fingerprint = fingerprint
+            cache.module_smells = module_smells
+
+        return [self._relative_to(smell, -units[index].start_line) for index, smell in cache.module_smells]
+
+    # Number of nodes a rule processes between two checks of its time budget
+    BUDGET_CHECK_INTERVAL = 32
+
+    def _apply_rules(self, rules: List[BaseRule], nodes: Iterable[ast.AST]) -> List[Smell]:
+        """
+        Applies the given rules to every node, in order, stopping the rules that go over their time budget.
+        Rules keep their own state, so each of them goes through all the nodes before the next one starts.
+        The budget is checked between nodes and, through the rule's deadline, while a rule walks a large node
+        (e.g., the module); the shared analyses of the AnalysisContext are not interrupted once started.
+        """
+        nodes = list(nodes)
+        smells = []
+        processed = 0
+        for rule in rules:
+            if rule.id in self.partial_rules:
+                continue
+            started = time.perf_counter()
+            rule.deadline = self._deadline(rule, started)
+            try:
+                for count, node in enumerate(nodes):
+                    if self.cancel_check and processed % self.CANCEL_CHECK_INTERVAL == 0 and self.cancel_check():
+                        raise AnalysisCancelled()
+                    processed += 1
+                    if count % self.BUDGET_CHECK_INTERVAL == 0 and self._over_budget(rule, time.perf_counter() - started):
+                        break
+                    smells.extend(rule.process_node(node))
+            except RuleBudgetExceeded:
+                self._over_budget(rule, time.perf_counter() - started)
+            finally:
+                rule.deadline = None
+            self._rule_times[rule.id] = self._rule_times.get(rule.id, 0.0) + time.perf_counter() - started
+        return smells
+
+    def _deadline(self, rule: BaseRule, started: float) -> Optional[float]:
+        """
+        Returns the time at which a rule started at the given time goes over its budget on the file, or the file
+        over its own, if either is limited.
+        """
+        deadlines = []
+        if self.limits.rule_seconds is not None:
+            deadlines.append(started + self.limits.rule_seconds - self._rule_times.get(rule.id, 0.0))
+        if self.limits.file_seconds is not None:
+            deadlines.append(self._file_started + self.limits.file_seconds)
+        return min(deadlines) if deadlines else None
+
+    def _over_budget(self, rule: BaseRule, elapsed: float) -> bool:
+        """
+        Checks if a rule went over its time budget on the file, or the file over its own, and records why.
+        """
+        now = time.perf_counter()
+        spent = self._rule_times.get(rule.id, 0.0) + elapsed
+        if self.limits.rule_seconds is not None and spent > self.limits.rule_seconds:
+            self.partial_rules[rule.id] = f"stopped after {spent:.3g}s, more than its budget of {self.limits.rule_seconds:g}s"
+        elif self.limits.file_seconds is not None and now - self._file_started > self.limits.file_seconds:
+            self.partial_rules[rule.id] = f"stopped when the file took more than {self.limits.file_seconds:g}s"
+        else:
+            return False
+        self.stopped_rules.add(rule.id)
+        return True
+
+    def _rules_with_dependency(self, dependency: str) -> List[BaseRule]:
+        """
+        Returns the rules that declare the given dependency model, except those skipped for the file.
+        """
+        return [rule for rule in self.rules if getattr(rule, "dependency", MODULE_DEPENDENCY) == dependency
+                and rule.id not in self.partial_rules]
+
+    def _skip_rules(self, dependencies: List[str], reason: str):
+        """
+        Skips the rules that declare one of the given dependency models for the file being analyzed.
+        """
+        for rule in self.rules:
+            if getattr(rule, "dependency", MODULE_DEPENDENCY) in dependencies:
+                self.partial_rules[rule.id] = reason
+
+    def _get_file_cache(self, cache_key: Optional[str]) -> FileCache:
+        """
+        Returns the cached results for the given file, evicting the least recently analyzed files.
+        Without a cache key, a fresh cache that is not stored is returned.
+        """
+        if cache_key is None:
+            return FileCache()
+
+        cache = self.file_caches.pop(cache_key, None) or FileCache()
+        self.file_caches[cache_key] = cache
+        while len(self.file_caches) > self.max_cached_files:
+            self.file_caches.popitem(last=False)
+        return cache
+
+    def _split_units(self, tree: ast.Module, lines: List[str]) -> List[AnalysisUnit]:
+        """
+        Splits a module into its top-level statements and hashes the source of each of them.
+        """
+        units = []
+        for node in tree.body:
+            start_line = min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])])
+            end_line = getattr(node, "end_lineno", None) or node.lineno
+            source = "\n".join(lines[start_line - 1:end_line])
+
+            # Columns tell apart statements sharing a line (e.g., 'a = 1; b = 2')
+            key = self._hash(f"{node.col_offset}:{getattr(node, 'end_col_offset', None)}:{source}")
+            units.append(AnalysisUnit(node=node, start_line=start_line, key=key))
+        return units
+
+    def _with_cost(self, smell: Smell, context: AnalysisContext) -> Smell:
+        """
+        Returns a copy of the smell with the estimated number of runs of its first line, and its cost.
+        The penalty of a calibrated rule is scaled to the number of items the smell processes, as the work
+        it wastes grows with it: when the smell is a loop (e.g., a reduction written as a loop), this is the
+        loop's trip count, if it is a constant. The runs the loop itself accounts for are recorded too, so that
+        the energy score does not weigh the loop's size twice (see smell_weight()).
+        """
+        runs, expression = context.loops.estimate_runs(smell.start_line)
+        penalty = smell.penalty
+        own_loop_runs = None
+        calibrated = self.penalties.rules.get(smell.rule_id)
+        if calibrated is not None:
+            nest = context.loops.nest_at(smell.start_line)
+            own_loop = nest[-1] if nest and nest[-1].node.lineno == smell.start_line else None
+            size = own_loop.trip_count if own_loop is not None else None
+            if size is not None:
+                penalty = calibrated.at_size(size)
+            elif penalty is None:
+                penalty = calibrated.at_size()
+            if own_loop is not None:
+                own_loop_runs = float(size) if size is not None else float(context.loops.DEFAULT_TRIP_COUNT)
+        cost = runs * penalty if penalty is not None else runs
+        return replace(smell, penalty=penalty, cost=cost, runs=expression, own_loop_runs=own_loop_runs)
+
+    @staticmethod
+    def _relative_to(smell: Smell, start_line: int) -> Smell:
+        """
+        Returns a copy of the smell with its lines shifted up by start_line (or down, if negative).
+        """
+        end_line = smell.end_line - start_line if smell.end_line is not None else None
+        return replace(smell, start_line=smell.start_line - start_line, end_line=end_line)
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        """
+        Returns a stable content hash of the text.
+        """
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
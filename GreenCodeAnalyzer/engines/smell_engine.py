@@ -1,5 +1,8 @@
 from collections import OrderedDict
-from typing import List
+from typing import Dict, List, Optional
+from analysis.project import ProjectIndex
+from engines.analysis_limits import AnalysisLimits
+from engines.notebook import NotebookSource
 from engines.rule_engine import RuleEngine
 from models.smell import Smell
 
@@ -31,16 +34,28 @@ class SmellEngine:
     Attributes:
         filepath (str): The path to the Python source file to be analyzed.
         engine (RuleEngine): The rule engine that processes the AST and applies rules.
+        skipped_cells (Dict[str, str]): The cells of the last analyzed notebook that were skipped, with the reason.
     """
 
-    def __init__(self, filepath: str):
+    def __init__(
+        self,
+        filepath: Optional[str] = None,
+        project: Optional[ProjectIndex] = None,
+        limits: Optional[AnalysisLimits] = None
+    ):
         """
         Initializes the class with the given source file path.
 
-        :param filepath: Path to the Python source file to be analyzed.
+        :param filepath: Path to the Python source file to be analyzed. Can be omitted if the source is
+            passed to analyze_source() instead.
+        :param project: The project the analyzed files belong to, so that calls to functions of other
+            modules of the project are seen through. Summaries of these modules are cached across files.
+        :param limits: How much work the analysis of a file may take. Defaults to AnalysisLimits().
         """
         self.filepath = filepath
-        self.engine = RuleEngine()
+        self.engine = RuleEngine(project=project, limits=limits)
+        # The cells of the last analyzed notebook that could not be analyzed
+        self.skipped_cells: Dict[str, str] = {}
 
         # Add rules
         self.engine.add_rule(ElementWiseOperartionsRule())
@@ -64,27 +79,76 @@ class SmellEngine:
         self.engine.add_rule(InefficientDataFrameJoinsRule())
         self.engine.add_rule(ExcessiveTrainingRule())
 
-    def collect(self) -> List[Smell]:
+    def collect(self) -> OrderedDict:
         """
         Reads and parses the source file, then applies registered rules to detect code smells.
+        Jupyter notebooks (.ipynb) are analyzed cell by cell, see analyze_notebook().
 
-        :return: A list of Smell objects representing detected inefficiencies.
+        :return: An OrderedDict mapping line numbers (or (cell, line) pairs for a notebook) to lists of
+            Smell objects representing detected inefficiencies.
         """
+        if self.filepath.endswith(".ipynb"):
+            return self.organize_smells_by_line(self.analyze_notebook(NotebookSource.load(self.filepath)))
+
         with open(self.filepath, "r") as file:
             source_code = file.read()
-        
-        # Collect all detected smells
-        smells = self.engine.analyze(source_code)
 
-        return self.organize_smells_by_line(smells)
+        return self.analyze_source(source_code)
+
+    def analyze_source(self, source_code: str, filepath: Optional[str] = None) -> OrderedDict:
+        """
+        Applies registered rules to source code that is already in memory (e.g., an unsaved editor buffer),
+        without reading the file from disk.
+
+        :param source_code: The Python source code to analyze.
+        :param filepath: The path the source belongs to. Defaults to the engine's file path.
+        :return: An OrderedDict mapping line numbers to lists of Smell objects representing detected inefficiencies.
+        """
+        return self.organize_smells_by_line(self.analyze_smells(source_code, filepath))
+
+    def analyze_smells(self, source_code: str, filepath: Optional[str] = None) -> List[Smell]:
+        """
+        Applies registered rules to source code that is already in memory, and returns every smell once.
+
+        :param source_code: The Python source code to analyze.
+        :param filepath: The path the source belongs to. Defaults to the engine's file path.
+        :return: The detected smells, ordered by line and rule.
+        """
+        # Collect all detected smells, reusing results of unchanged units if analyzed before
+        self.skipped_cells = {}
+        return self.engine.analyze(source_code, cache_key=filepath or self.filepath)
+
+    def analyze_notebook(self, notebook: NotebookSource, filepath: Optional[str] = None) -> List[Smell]:
+        """
+        Applies registered rules to the code cells of a notebook, in execution order, and returns every smell
+        once with the cell it occurs in. The results of the statements of unchanged cells are reused from the
+        previous analysis of the same notebook.
+
+        :param notebook: The notebook to analyze.
+        :param filepath: The path of the notebook. Defaults to the engine's file path.
+        :return: The detected smells, with their lines relative to their cell.
+        """
+        smells = notebook.map_smells(self.analyze_smells(notebook.source, filepath))
+        self.skipped_cells = notebook.skipped_cells
+        return smells
+
+    @property
+    def partial_rules(self) -> Dict[str, str]:
+        """
+        The rules that did not analyze the whole of the last analyzed file, by ID, with the reason, and the
+        cells of a notebook that were skipped (e.g., for a syntax error), as 'cell N'.
+        """
+        return {**self.engine.partial_rules, **self.skipped_cells}
 
-    def organize_smells_by_line(self, smells: List[Smell]) -> OrderedDict:
+    @staticmethod
+    def organize_smells_by_line(smells: List[Smell]) -> OrderedDict:
         """
         Reorganizes a list of Smell objects into an OrderedDict where keys are line numbers
         and values are lists of all smells affecting that line.
         
         :param smells: A list of Smell objects from the smell engine.
-        :return: An OrderedDict mapping line numbers to lists of Smell objects.
+        :return: An OrderedDict mapping line numbers to lists of Smell objects. Smells of a notebook
+            are keyed by (cell, line) pairs instead.
         """
         # Temporary dict to collect smells by line
         line_dict = {}
@@ -92,7 +156,8 @@ class SmellEngine:
         for smell in smells:
             end_line = smell.end_line if smell.end_line is not None else smell.start_line
             for line in range(smell.start_line, end_line + 1):
-                line_dict.setdefault(line, []).append(smell)
+                key = (smell.cell, line) if smell.cell is not None else line
+                line_dict.setdefault(key, []).append(smell)
 
         # Convert the dictionary to an OrderedDict, sorted by line number
         return OrderedDict(sorted(line_dict.items(), key=lambda item: item[0]))
\ No newline at end of file
@@ -0,0 +1,241 @@
+import multiprocessing
+import os
+import sys
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Seconds between two checks of the memory of the busy workers
+MONITOR_INTERVAL = 1.0
+
+# Times a file is analyzed again after the worker analyzing it was stopped or died
+MAX_RETRIES = 1
+
+def resident_memory(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Returns the bytes of physical memory a process uses (its resident set size), read from /proc.
+    For this process, where /proc is not available, its peak resident set size is returned instead.
+
+    :param pid: The process, or None for this process.
+    :return: The bytes, or None if they cannot be read.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if pid is not None or resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+@dataclass
+class _Worker:
+    """
+    A worker process and the file it is analyzing.
+
+    Attributes:
+        - process (multiprocessing.Process): The process.
+        - connection (Connection): The end of the pipe files are sent and results received through.
+        - task (Optional[int]): The index of the file being analyzed, if any.
+    """
+    process: multiprocessing.Process
+    connection: Connection
+    task: Optional[int] = None
+
+class WorkerPool:
+    """
+    Analyzes files in worker processes, which are replaced as they age, so that the memory of a long scan
+    stays flat: the state rules and analyses keep across files, and the objects they leak, go away with
+    the worker.
+
+    A worker retires after analyzing max_tasks files, or after a file leaving it above max_memory. A worker
+    going above max_memory while analyzing a file is stopped, and one dying (e.g., killed by the system for
+    lack of memory) is replaced too; the file it was analyzing is retried in a fresh worker, and reported as
+    failed if it is lost again. An exception raised while analyzing a file is not a loss of the worker: the
+    file is reported as failed right away, as it would be in this process. Files are sent to workers one at
+    a time, so that a worker that stops loses at most one file.
+
+    Attributes:
+        - recycled (int): The number of workers replaced so far.
+    """
+
+    def __init__(
+        self,
+        jobs: int,
+        initializer: Callable,
+        initargs: tuple,
+        function: Callable,
+        failure: Callable,
+        max_tasks: Optional[int] = None,
+        max_memory: Optional[int] = None
+    ):
+        """
+        :param jobs: The number of worker processes.
+        :param initializer: Called in every worker, with initargs, before its first file.
+        :param initargs: The arguments of the initializer.
+        :param function: Analyzes a file in a worker, returning a picklable result.
+        :param failure: Returns the result of a file that could not be analyzed, given its path and why.
+        :param max_tasks: The number of files a worker analyzes before it is replaced, if limited.
+        :param max_memory: The bytes of resident memory above which a worker is replaced, if limited.
+        """
+        self.jobs = jobs
+        self.initializer = initializer
+        self.initargs = initargs
+        self.function = function
+        self.failure = failure
+        self.max_tasks = max_tasks
+        self.max_memory = max_memory
+        self.recycled = 0
+        self._workers: List[_Worker] = []
+
+    def imap(self, paths: List[str]) -> Iterator[tuple]:
+        """
+        Analyzes files, yielding their results in the order of the paths as soon as they are available.
+
+        :param paths: The files to analyze.
+        """
+        pending = list(range(len(paths)))
+        pending.reverse()
+        results: Dict[int, tuple] = {}
+        attempts: Dict[int, int] = {}
+        next_result = 0
+        try:
+            while next_result < len(paths):
+                # Keep every worker busy while files are left
+                while len(self._workers) < min(self.jobs, len(pending) + self._busy()):
+                    self._workers.append(self._start())
+                for worker in list(self._workers):
+                    if worker.task is None and pending:
+                        index = pending.pop()
+                        try:
+                            worker.connection.send((index, paths[index]))
+                        except OSError:
+                            # The worker died while idle; a new one takes the file on the next round
+                            pending.append(index)
+                            self._replace(worker, stop=True)
+                            continue
+                        worker.task = index
+                        attempts[index] = attempts.get(index, 0) + 1
+
+                while next_result in results:
+                    yield results.pop(next_result)
+                    next_result += 1
+                if next_result == len(paths):
+                    break
+
+                busy = [worker for worker in self._workers if worker.task is not None]
+                if not busy:
+                    continue
+                ready = wait([worker.connection for worker in busy] + [worker.process.sentinel for worker in busy],
+                             timeout=MONITOR_INTERVAL)
+                for worker in busy:
+                    index = worker.task
+                    reason = None
+                    if worker.connection in ready or worker.process.sentinel in ready:
+                        try:
+                            received, result, retire = worker.connection.recv()
+                            results[received] = result
+                            worker.task = None
+                            if retire:
+                                self._replace(worker, stop=False)
+                            continue
+                        except (EOFError, OSError):
+                            worker.process.join()
+                            reason = f"the worker analyzing it died (exit code {worker.process.exitcode})"
+                    elif self.max_memory is not None:
+                        memory = resident_memory(worker.process.pid)
+                        if memory is not None and memory > self.max_memory:
+                            reason = f"the worker analyzing it used more than {self.max_memory // 2 ** 20} MiB of memory"
+                    if reason is None:
+                        continue
+                    self._replace(worker, stop=True)
+                    if attempts[index] > MAX_RETRIES:
+                        results[index] = self.failure(paths[index], reason)
+                    else:
+                        pending.append(index)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stops the workers: idle ones are asked to exit, busy ones are terminated.
+        """
+        for worker in self._workers:
+            if worker.task is None and worker.process.is_alive():
+                try:
+                    worker.connection.send(None)
+                except (OSError, ValueError):
+                    pass
+            else:
+                worker.process.terminate()
+        for worker in self._workers:
+            worker.process.join()
+            worker.connection.close()
+        self._workers = []
+
+    def _busy(self) -> int:
+        """
+        Returns the number of workers analyzing a file.
+        """
+        return sum(1 for worker in self._workers if worker.task is not None)
+
+    def _start(self) -> _Worker:
+        """
+        Starts a worker process.
+        """
+        connection, worker_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_serve,
+            args=(worker_connection, self.initializer, self.initargs, self.function, self.failure, self.max_tasks,
+                  self.max_memory),
+            daemon=True
+        )
+        process.start()
+        worker_connection.close()
+        return _Worker(process=process, connection=connection)
+
+    def _replace(self, worker: _Worker, stop: bool):
+        """
+        Drops a worker, once it exited after retiring or was stopped, so that a new one is started in its place.
+        """
+        if stop and worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join()
+        worker.connection.close()
+        self._workers.remove(worker)
+        self.recycled += 1
+
+def _serve(connection: Connection, initializer: Callable, initargs: tuple, function: Callable, failure: Callable,
+           max_tasks: Optional[int], max_memory: Optional[int]):
+    """
+    Analyzes the files sent by the pool until it is told to stop, or until it should retire: after max_tasks
+    files, or when a file left it above max_memory. The result of every file says whether the worker retires;
+    a file whose analysis raised an exception gets the failure result, with the exception.
+    """
+    initializer(*initargs)
+    tasks = 0
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        index, path = task
+        try:
+            result = function(path)
+        except Exception as e:
+            result = failure(path, f"{type(e).__name__}: {e}")
+        tasks += 1
+        memory = resident_memory() if max_memory is not None else None
+        retire = (max_tasks is not None and tasks >= max_tasks) or (memory is not None and memory > max_memory)
+        connection.send((index, result, retire))
+        if retire:
+            return
@@ -0,0 +1,181 @@
+import ast
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Mapping, Optional
+import libcst as cst
+from libcst.metadata import CodeRange
+from analysis.context import AnalysisContext
+from analysis.dataflow import BIND
+from analysis.scopes import FUNCTION_NODES
+from analysis.type_inference import ARRAY, NUMPY_ARRAY
+from models.fix import Fix, TextEdit
+from models.smell import Smell
+
+@dataclass
+class FixSite:
+    """
+    Where a smell is in both trees of its module: the AST the rules analyzed, and the concrete syntax tree
+    (libcst) that keeps its formatting and comments, so that fixes only rewrite the code they change.
+
+    Attributes:
+        - smell (Smell): The smell to fix.
+        - node (ast.stmt): The statement the smell starts at.
+        - statement (cst.CSTNode): The same statement in the concrete syntax tree.
+        - context (AnalysisContext): The shared analyses of the module (types, scopes, def-use chains).
+        - module (cst.Module): The concrete syntax tree of the module.
+        - positions (Mapping[cst.CSTNode, CodeRange]): The range of every node of the concrete syntax tree.
+        - nodes (Mapping[tuple, List[cst.CSTNode]]): Maps the range of code (start line, start column, end line,
+          end column) to the nodes of the concrete syntax tree spanning it, to find the counterpart of any AST node.
+        - lines (List[str]): The lines of the module's source.
+    """
+    smell: Smell
+    node: ast.stmt
+    statement: cst.CSTNode
+    context: AnalysisContext
+    module: cst.Module
+    positions: Mapping[cst.CSTNode, CodeRange]
+    nodes: Mapping[tuple, List[cst.CSTNode]]
+    lines: List[str]
+
+    def cst_node(self, node: ast.AST) -> Optional[cst.CSTNode]:
+        """
+        Returns the node of the concrete syntax tree an AST node corresponds to: the node spanning the same code
+        with the same type name, or else the outermost expression spanning it (e.g., a cst.Comparison for an
+        ast.Compare), if any.
+        """
+        candidates = self.nodes.get((node.lineno, self._column(node.lineno, node.col_offset),
+                                     node.end_lineno, self._column(node.end_lineno, node.end_col_offset)), [])
+        for candidate in candidates:
+            if type(candidate).__name__ == type(node).__name__:
+                return candidate
+        if isinstance(node, ast.expr):
+            return next((candidate for candidate in candidates if isinstance(candidate, cst.BaseExpression)), None)
+        return None
+
+    def _column(self, line: int, offset: int) -> int:
+        """
+        Converts the UTF-8 byte offset of an AST position into the character column of libcst positions.
+        """
+        return len(self.lines[line - 1].encode("utf-8")[:offset].decode("utf-8", errors="ignore"))
+
+    def code(self, node: cst.CSTNode) -> str:
+        """
+        Returns the source of a node of the concrete syntax tree, as written.
+        """
+        return self.module.code_for_node(node)
+
+class BaseFixer(ABC):
+    """
+    Abstract base class of the fixers, which rewrite the code of the smells of one rule.
+
+    A fixer only proposes a fix when it is sure the rewrite does the same work; otherwise the smell is
+    left for the developer to fix.
+
+    Attributes:
+    - rule_id (str): The ID of the rule whose smells are fixed.
+    - statement_types (tuple): The AST types of the statements the smells of the rule start at (e.g., ast.For).
+    """
+    rule_id: str
+    statement_types: tuple = (ast.stmt,)
+
+    @abstractmethod
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        """
+        Proposes a fix for a smell.
+
+        :param site: The smell and its statement.
+        :return: The fix, or None if the smell cannot be fixed safely.
+        """
+        pass
+
+    @staticmethod
+    def replace(site: FixSite, node: cst.CSTNode, code: str) -> TextEdit:
+        """
+        Returns the edit replacing a node of the concrete syntax tree with code. Lines of the code
+        after the first are indented like the node.
+
+        :param site: The site of the fix.
+        :param node: The replaced node.
+        :param code: The replacing code, not indented.
+        """
+        position = site.positions[node]
+        indentation = " " * position.start.column
+        new_text = code.replace("\n", "\n" + indentation)
+        return TextEdit(position.start.line, position.start.column, position.end.line, position.end.column, new_text)
+
+    @staticmethod
+    def module_alias(site: FixSite, module: str) -> Optional[str]:
+        """
+        Returns the name a library module is imported under at module level (e.g., 'np' for numpy), if it is.
+        """
+        for stmt in site.context.tree.body:
+            if isinstance(stmt, ast.Import):
+                for alias in stmt.names:
+                    if alias.name == module:
+                        return alias.asname or alias.name
+        return None
+
+    @staticmethod
+    def holds_numpy_array(site: FixSite, name: str, node: ast.AST) -> bool:
+        """
+        Checks that a variable holds a NumPy array where the node appears, and nothing else (e.g., a tensor or
+        a Series, whose reductions and indexing behave differently), according to the shared type inference.
+        """
+        kinds = site.context.types.kinds(name, node)
+        return bool(kinds) and kinds <= {NUMPY_ARRAY, ARRAY}
+
+    @staticmethod
+    def is_range_of_len(iterable: ast.expr) -> bool:
+        """
+        Checks if a loop goes through the indices of an array, as in 'range(len(values))'.
+        """
+        return (isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name) and iterable.func.id == 'range'
+                and len(iterable.args) == 1 and not iterable.keywords and isinstance(iterable.args[0], ast.Call)
+                and isinstance(iterable.args[0].func, ast.Name) and iterable.args[0].func.id == 'len'
+                and len(iterable.args[0].args) == 1 and isinstance(iterable.args[0].args[0], ast.Name))
+
+    @staticmethod
+    def loop_variable_is_local(site: FixSite, loop: ast.For) -> bool:
+        """
+        Checks that the target of a loop is a name whose values bound by the loop are only read within it, so that
+        removing the loop does not change the value another statement sees. Names that nested functions may read,
+        or that are declared global or nonlocal, are not local.
+        """
+        if not isinstance(loop.target, ast.Name):
+            return False
+        name = loop.target.id
+        scope = site.context.scopes.enclosing(loop)
+        for node in ast.walk(scope):
+            if isinstance(node, (ast.Global, ast.Nonlocal)) and name in node.names:
+                return False
+            if isinstance(node, FUNCTION_NODES + (ast.Lambda,)) and node is not scope:
+                if any(isinstance(inner, ast.Name) and inner.id == name for inner in ast.walk(node)):
+                    return False
+
+        dataflow = site.context.dataflow(loop)
+        inside = {id(node) for node in ast.walk(loop)}
+        for definition in dataflow.definitions:
+            if definition.name == name and definition.node is loop:
+                if any(id(use) not in inside for use in dataflow.uses(definition)):
+                    return False
+        return True
+
+    @staticmethod
+    def is_new_list(site: FixSite, name: str, loop: ast.For) -> bool:
+        """
+        Checks that every definition of a variable reaching a loop, from outside it, creates a list (e.g.,
+        'kept = []'), so that it is a list and not an array, which has no extend() method.
+        """
+        definitions = [definition for definition in site.context.dataflow(loop).reaching_definitions(loop, name)
+                       if not loop.lineno <= definition.line <= (loop.end_lineno or loop.lineno)]
+        if not definitions:
+            return False
+        for definition in definitions:
+            stmt = definition.node
+            if definition.kind != BIND or not isinstance(stmt, ast.Assign):
+                return False
+            value = stmt.value
+            if not (isinstance(value, ast.List)
+                    or (isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == 'list')):
+                return False
+        return True
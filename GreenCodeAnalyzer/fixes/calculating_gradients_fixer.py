@@ -0,0 +1,338 @@
+import ast
+from typing import List, Optional, Set, Tuple
+from analysis.scopes import FUNCTION_NODES
+from analysis.type_inference import TF_MODEL, TORCH_MODEL, attribute_chain
+from fixes.base_fixer import BaseFixer, FixSite
+from fixes.hoisting import Hoisting
+from models.fix import Fix, TextEdit
+
+# Calls computing gradients, besides 'loss.backward()'
+GRADIENT_FUNCTIONS = {'torch.autograd.grad', 'torch.autograd.backward'}
+
+# Context managers (and decorators) disabling gradient tracking in PyTorch
+NO_GRAD_CONTEXTS = {'torch.no_grad', 'torch.inference_mode'}
+
+GRADIENT_TAPE = 'tensorflow.GradientTape'
+
+class CalculatingGradientsFixer(BaseFixer):
+    """
+    Disables gradient tracking where models are only used for inference:
+
+    - PyTorch: the statements calling models outside 'torch.no_grad()' are wrapped in a 'with' block, the
+      smallest one containing all such calls of the function; when that is the whole function, it is
+      decorated instead.
+
+            def predict(model, x):                  @torch.inference_mode()
+                scores = model(x)                   def predict(model, x):
+                print(scores.argmax())                  scores = model(x)
+                                                        print(scores.argmax())
+
+      'torch.inference_mode()' is used when the tensors it creates are only read afterwards, in code the
+      analysis sees. Tensors made in inference mode cannot be modified in place or recorded by autograd
+      later, so 'torch.no_grad()' is used when they are returned, handed over, or modified in place.
+      No fix is made in a function that computes gradients, nor, when its tensors leave it, in a project
+      that does anywhere (e.g., 'loss.backward()' on the output of the function in a training script). Methods
+      of models and the functions they call are never fixed, as they run when the model is trained too.
+
+    - TensorFlow: a 'tf.GradientTape()' whose tape is never used is removed, and its body dedented.
+    """
+    rule_id = "calculating_gradients"
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        call = next((node for node in ast.walk(site.node) if isinstance(node, ast.Call)
+                     and node.lineno == site.smell.start_line and self._model_kinds(site, node)), None)
+        if call is None:
+            return None
+        hoisting = Hoisting(site, call)
+        if TF_MODEL in self._model_kinds(site, call):
+            tape = self._enclosing_tape(site, hoisting, call)
+            if tape is not None:
+                return self._remove_tape(site, hoisting, tape)
+        if TORCH_MODEL in self._model_kinds(site, call):
+            return self._disable_gradients(site, hoisting, call)
+        return None
+
+    @staticmethod
+    def _model_kinds(site: FixSite, call: ast.Call) -> Set[str]:
+        """
+        Returns the kinds of models (PyTorch or TensorFlow) a call may call.
+        """
+        name = ".".join(attribute_chain(call.func))
+        return site.context.types.kinds(name, call) & {TORCH_MODEL, TF_MODEL} if name else set()
+
+    def _disable_gradients(self, site: FixSite, hoisting: Hoisting, call: ast.Call) -> Optional[Fix]:
+        """
+        Proposes to run the model calls of the function (or module) of a call without gradient tracking.
+        """
+        scope = hoisting.scope
+        if isinstance(scope, ast.AsyncFunctionDef) or self._computes_gradients(site, scope):
+            return None
+        if self._run_by_models(site, scope):
+            return None
+        calls = [node for node in hoisting.occurrences(lambda node: isinstance(node, ast.Call))
+                 if TORCH_MODEL in self._model_kinds(site, node) and not self._tracks_nothing(site, hoisting, node)]
+        if call not in calls:
+            return None
+        run = self._run(hoisting, calls)
+        if run is None:
+            return None
+        block, first, last = run
+
+        returns = isinstance(scope, ast.Module) or any(
+            isinstance(node, (ast.Yield, ast.YieldFrom)) or (isinstance(node, ast.Return) and node.value is not None)
+            for node in ast.walk(scope) if site.context.scopes.enclosing(node) is scope)
+        if returns and (self._computes_gradients(site, site.context.tree)
+                        or (site.context.project is not None and site.context.project.computes_gradients())):
+            return None
+
+        torch = self.module_alias(site, "torch") or "torch"
+        edits = self._import_torch(site)
+        body = block[self._docstring_count(scope):] if block is getattr(scope, "body", None) else None
+        if isinstance(scope, ast.FunctionDef) and body and body[0] is block[first] and body[-1] is block[last]:
+            # The whole function runs the models: decorate it
+            mode = "no_grad" if returns else "inference_mode"
+            start = min([scope.lineno] + [decorator.lineno for decorator in scope.decorator_list])
+            column = scope.col_offset
+            edits.append(TextEdit(start, column, start, column, f"@{torch}.{mode}()\n{' ' * column}"))
+            return Fix(self.rule_id, f"Decorate '{scope.name}' with {torch}.{mode}()", site.smell.start_line, edits)
+
+        run = block[first:last + 1]
+        mode = "no_grad" if self._returns_from(run) or self._outlived(site, hoisting, run) else "inference_mode"
+        wrap = self._wrap(site, run, f"with {torch}.{mode}():", self._indent_unit(site, scope))
+        if wrap is None:
+            return None
+        edits.append(wrap)
+        return Fix(self.rule_id, f"Run the model calls in {torch}.{mode}()", site.smell.start_line, edits)
+
+    def _remove_tape(self, site: FixSite, hoisting: Hoisting, tape: ast.With) -> Optional[Fix]:
+        """
+        Proposes to remove a GradientTape whose tape is not used, keeping its body.
+        """
+        target = tape.items[0].optional_vars
+        if target is not None:
+            if not isinstance(target, ast.Name):
+                return None
+            if any(isinstance(node, ast.Name) and node.id == target.id and isinstance(node.ctx, ast.Load)
+                   for node in ast.walk(hoisting.scope)):
+                return None
+        header_end = tape.items[0].context_expr.end_lineno
+        if tape.body[0].lineno <= header_end or not self._owns_lines(site, tape.lineno, tape.col_offset, tape):
+            return None
+        if self._has_multiline_strings(tape):
+            return None
+
+        indentation = site.lines[tape.lineno - 1][:tape.col_offset]
+        body_indentation = site.lines[tape.body[0].lineno - 1][:tape.body[0].col_offset]
+        if not body_indentation.startswith(indentation) or body_indentation == indentation:
+            return None
+        lines = site.lines[header_end:tape.end_lineno]
+        if not all(line.startswith(body_indentation) or not line.strip() for line in lines):
+            return None
+        extra = len(body_indentation) - len(indentation)
+        dedented = "\n".join(line[extra:] if line.strip() else "" for line in lines)
+        last = site.lines[tape.end_lineno - 1]
+        return Fix(self.rule_id, "Remove the unused GradientTape", site.smell.start_line,
+                   [TextEdit(tape.lineno, 0, tape.end_lineno, len(last), dedented)])
+
+    @staticmethod
+    def _enclosing_tape(site: FixSite, hoisting: Hoisting, node: ast.AST) -> Optional[ast.With]:
+        """
+        Returns the innermost 'with tf.GradientTape()' block containing a node, if it only opens the tape.
+        """
+        parent = hoisting.parents.get(node)
+        while parent is not None and parent is not hoisting.scope:
+            if isinstance(parent, ast.With) and any(
+                    isinstance(item.context_expr, ast.Call)
+                    and site.context.types.qualified_name(item.context_expr.func) == GRADIENT_TAPE
+                    for item in parent.items):
+                return parent if len(parent.items) == 1 else None
+            parent = hoisting.parents.get(parent)
+        return None
+
+    @staticmethod
+    def _computes_gradients(site: FixSite, node: ast.AST) -> bool:
+        """
+        Checks if code calls backward() or the gradient functions of torch.autograd, directly or through the
+        functions it calls (including those of other modules of the project).
+        """
+        for call in ast.walk(node):
+            if not isinstance(call, ast.Call):
+                continue
+            if isinstance(call.func, ast.Attribute) and call.func.attr == 'backward':
+                return True
+            if site.context.types.qualified_name(call.func) in GRADIENT_FUNCTIONS:
+                return True
+            summary = site.context.calls.call_summary(call)
+            if summary is not None and summary.computes_gradients:
+                return True
+        return False
+
+    @staticmethod
+    def _run_by_models(site: FixSite, scope: ast.AST) -> bool:
+        """
+        Checks if a function is (or is nested in) a method of a PyTorch model, or is called from one: it runs when
+        the model is trained too, where disabling gradient tracking would silently stop the training.
+        """
+        types, calls = site.context.types, site.context.calls
+        stack = [method for node in ast.walk(site.context.tree)
+                 if isinstance(node, ast.ClassDef) and types.classes.get(node.name) == TORCH_MODEL
+                 for method in node.body if isinstance(method, FUNCTION_NODES)]
+        reached = set()
+        while stack:
+            function = stack.pop()
+            if function not in reached:
+                reached.add(function)
+                stack.extend(callee for callee in calls.callees.get(function, []) if not isinstance(callee, str))
+
+        parent_scope = site.context.scopes.parent_scope
+        while scope in parent_scope:
+            if scope in reached:
+                return True
+            scope = parent_scope[scope]
+        return False
+
+    @staticmethod
+    def _returns_from(statements: List[ast.stmt]) -> bool:
+        """
+        Checks if statements return or yield out of their function, handing over the tensors they computed.
+        """
+        return any(isinstance(node, (ast.Return, ast.Yield, ast.YieldFrom))
+                   for statement in statements for node in ast.walk(statement))
+
+    @staticmethod
+    def _tracks_nothing(site: FixSite, hoisting: Hoisting, node: ast.AST) -> bool:
+        """
+        Checks if a node runs with gradient tracking disabled: in a 'with torch.no_grad()' block, or in a
+        function decorated with it (or with torch.inference_mode()).
+        """
+        def disables(expr: ast.expr) -> bool:
+            func = expr.func if isinstance(expr, ast.Call) else expr
+            return site.context.types.qualified_name(func) in NO_GRAD_CONTEXTS
+
+        parent = hoisting.parents.get(node)
+        while parent is not None:
+            if isinstance(parent, (ast.With, ast.AsyncWith)) and any(disables(item.context_expr) for item in parent.items):
+                return True
+            if isinstance(parent, (ast.FunctionDef, ast.AsyncFunctionDef)) and any(map(disables, parent.decorator_list)):
+                return True
+            parent = hoisting.parents.get(parent)
+        return False
+
+    @staticmethod
+    def _run(hoisting: Hoisting, calls: List[ast.Call]) -> Optional[Tuple[List[ast.stmt], int, int]]:
+        """
+        Returns the smallest run of statements of a block that contains all the calls: the block, and the
+        indices of the first and last statements of the run.
+        """
+        statement = hoisting.statement_of(calls[0])
+        while statement is not None:
+            parent = hoisting.parents.get(statement)
+            block = next((value for _, value in ast.iter_fields(parent)
+                          if isinstance(value, list) and any(item is statement for item in value)), None) if parent else None
+            if block is None:
+                return None
+            indices = []
+            for call in calls:
+                index = next((i for i, item in enumerate(block) if any(node is call for node in ast.walk(item))), None)
+                if index is None:
+                    break
+                indices.append(index)
+            else:
+                return block, min(indices), max(indices)
+            if parent is hoisting.scope:
+                return None
+            statement = hoisting.statement_of(parent)
+        return None
+
+    @staticmethod
+    def _outlived(site: FixSite, hoisting: Hoisting, statements: List[ast.stmt]) -> bool:
+        """
+        Checks if the values bound by statements may be used after them in ways that need gradient tracking or
+        in-place changes: they are returned, handed over, or modified, or they are module variables.
+        """
+        if isinstance(hoisting.scope, ast.Module):
+            return True
+        dataflow = site.context.dataflow(statements[0])
+        inside = {id(node) for statement in statements for node in ast.walk(statement)}
+        bound = set()
+        for definition in dataflow.definitions:
+            if id(definition.node) not in inside:
+                continue
+            bound.add(definition.name)
+            if any(id(use) not in inside and hoisting.escapes(use) for use in dataflow.uses(definition)):
+                return True
+        return any(isinstance(node, ast.AugAssign) and id(node) not in inside
+                   and isinstance(node.target, ast.Name) and node.target.id in bound for node in ast.walk(hoisting.scope))
+
+    @staticmethod
+    def _docstring_count(scope: ast.AST) -> int:
+        """
+        Returns 1 if the body of a function or module starts with a docstring, 0 otherwise.
+        """
+        body = getattr(scope, "body", [])
+        return int(bool(body) and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                   and isinstance(body[0].value.value, str))
+
+    @staticmethod
+    def _indent_unit(site: FixSite, scope: ast.AST) -> str:
+        """
+        Returns the indentation a block adds to its statements, as written in a function of the file.
+        """
+        functions = [scope] if isinstance(scope, ast.FunctionDef) else [
+            node for node in ast.walk(site.context.tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        for function in functions:
+            outer = site.lines[function.lineno - 1][:function.col_offset]
+            inner = site.lines[function.body[0].lineno - 1][:function.body[0].col_offset]
+            if inner.startswith(outer) and len(inner) > len(outer) and not inner.strip():
+                return inner[len(outer):]
+        return "    "
+
+    def _wrap(self, site: FixSite, statements: List[ast.stmt], header: str, unit: str) -> Optional[TextEdit]:
+        """
+        Returns the edit putting statements, which must fill their lines, in a block opened by a header.
+        """
+        first, last = statements[0], statements[-1]
+        start = min([first.lineno] + [decorator.lineno for decorator in getattr(first, "decorator_list", [])])
+        if not self._owns_lines(site, start, first.col_offset, last):
+            return None
+        if any(self._has_multiline_strings(statement) for statement in statements):
+            return None
+        indentation = site.lines[start - 1][:first.col_offset]
+        lines = site.lines[start - 1:last.end_lineno]
+        indented = "\n".join(unit + line if line.strip() else "" for line in lines)
+        return TextEdit(start, 0, last.end_lineno, len(lines[-1]), f"{indentation}{header}\n{indented}")
+
+    @staticmethod
+    def _owns_lines(site: FixSite, start: int, column: int, last: ast.stmt) -> bool:
+        """
+        Checks that code starting at a line and column, and ending with a statement, is alone on its lines
+        (a comment after it aside).
+        """
+        if site.lines[start - 1][:column].strip():
+            return False
+        rest = site.lines[last.end_lineno - 1][last.end_col_offset:].strip()
+        return not rest or rest.startswith("#")
+
+    @staticmethod
+    def _has_multiline_strings(node: ast.AST) -> bool:
+        """
+        Checks if code contains a string spanning several lines, whose text would change if it were reindented.
+        """
+        return any(isinstance(child, (ast.Constant, ast.JoinedStr)) and child.lineno != child.end_lineno
+                   and (isinstance(child, ast.JoinedStr) or isinstance(child.value, (str, bytes)))
+                   for child in ast.walk(node))
+
+    @staticmethod
+    def _import_torch(site: FixSite) -> List[TextEdit]:
+        """
+        Returns the edit importing torch before the first import of the module, if it is not imported. The edit
+        is shared by the fixes of every function of the module, so that they can be applied together.
+        """
+        if BaseFixer.module_alias(site, "torch") is not None:
+            return []
+        body = site.context.tree.body
+        anchor = next((stmt for stmt in body if isinstance(stmt, (ast.Import, ast.ImportFrom))
+                       and not (isinstance(stmt, ast.ImportFrom) and stmt.module == "__future__")), None)
+        if anchor is None:
+            anchor = body[CalculatingGradientsFixer._docstring_count(site.context.tree)]
+        return [TextEdit(anchor.lineno, 0, anchor.lineno, 0, "import torch\n", shared=True)]
@@ -0,0 +1,122 @@
+import ast
+from typing import Dict, List, Optional
+import libcst as cst
+from fixes.base_fixer import BaseFixer, FixSite
+from models.fix import Fix, TextEdit
+from rules.host_resources import HostResources
+
+DATALOADER = "torch.utils.data.DataLoader"
+
+class DataLoaderSettingsFixer(BaseFixer):
+    """
+    Sets the arguments of a DataLoader to the values suited to this machine (see HostResources): the number
+    of workers, whether they persist across epochs, how many batches they prefetch, and whether batches are
+    pinned. Only missing arguments, 'num_workers=0' and 'pin_memory=False' are changed; values the developer
+    chose are kept, and persistent_workers and prefetch_factor are only added when there are workers. Workers
+    are not added on a machine with a single usable CPU, nor pinned memory on one without a CUDA GPU.
+
+        DataLoader(dataset, batch_size=32)      DataLoader(dataset, batch_size=32, num_workers=7,
+                                                           persistent_workers=True, prefetch_factor=2,
+                                                           pin_memory=True)
+
+    The smells of a DataLoader call (e.g., no workers and unpinned memory) get the same fix, so one instance of
+    the fixer handles each rule, and applying the fixes of a file applies it once.
+
+    Attributes:
+    - rule_id (str): The ID of the rule whose smells are fixed.
+    """
+    statement_types = (ast.stmt,)
+
+    def __init__(self, rule_id: str):
+        self.rule_id = rule_id
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        call = next((node for node in ast.walk(site.node) if isinstance(node, ast.Call)
+                     and node.lineno == site.smell.start_line
+                     and site.context.types.qualified_name(node.func) == DATALOADER), None)
+        if call is None or any(isinstance(arg, ast.Starred) for arg in call.args) or any(k.arg is None for k in call.keywords):
+            return None
+        node = site.cst_node(call)
+        if not isinstance(node, cst.Call) or not node.args:
+            return None
+
+        settings = HostResources.probe().loader_settings().keywords()
+        keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+        arguments = {arg.keyword.value: arg for arg in node.args if arg.keyword is not None}
+        replaced: Dict[str, str] = {}
+        added: Dict[str, str] = {}
+
+        # Workers: only set when missing or zero, and only configured further when there are some
+        workers = keywords.get("num_workers")
+        if workers is None and settings["num_workers"] != "0":
+            added["num_workers"] = settings["num_workers"]
+        elif workers is not None and self._constant(workers) == 0 and settings["num_workers"] != "0":
+            replaced["num_workers"] = settings["num_workers"]
+        has_workers = "num_workers" in added or "num_workers" in replaced or self._is_positive(workers)
+        for keyword in ("persistent_workers", "prefetch_factor"):
+            if has_workers and keyword not in keywords and keyword in settings:
+                added[keyword] = settings[keyword]
+
+        # Pinned memory only pays off when batches go to a GPU
+        pin_memory = keywords.get("pin_memory")
+        if "pin_memory" in settings:
+            if pin_memory is None:
+                added["pin_memory"] = settings["pin_memory"]
+            elif self._constant(pin_memory) is False:
+                replaced["pin_memory"] = settings["pin_memory"]
+
+        if not replaced and not added:
+            return None
+        edits = [self.replace(site, arguments[keyword].value, value) for keyword, value in replaced.items()]
+        edits.extend(self._insert(site, node, added))
+        changed = {**replaced, **added}
+        title = "Set " + ", ".join(f"{keyword}={value}" for keyword, value in changed.items()) + " for this machine"
+        return Fix(self.rule_id, title, site.smell.start_line, edits)
+
+    @staticmethod
+    def _constant(value: ast.expr) -> object:
+        """
+        Returns the value of a constant argument, or None if it is not a constant.
+        """
+        return value.value if isinstance(value, ast.Constant) else None
+
+    def _is_positive(self, value: Optional[ast.expr]) -> bool:
+        """
+        Checks that an argument is a positive number, so that the loader has workers to configure.
+        """
+        constant = self._constant(value) if value is not None else None
+        return isinstance(constant, int) and not isinstance(constant, bool) and constant > 0
+
+    @staticmethod
+    def _insert(site: FixSite, call: cst.Call, added: Dict[str, str]) -> List[TextEdit]:
+        """
+        Returns the edits adding keyword arguments after the last argument of a call. When the arguments are on
+        their own lines, every new argument gets a line, indented like them; a comment after the last argument
+        stays on its line.
+        """
+        if not added:
+            return []
+        last = call.args[-1]
+        position = site.positions[last.value]
+        end_line, end_column = position.end.line, position.end.column
+        has_comma = isinstance(last.comma, cst.Comma)
+        line = site.lines[end_line - 1].rstrip("\r")
+        start = site.positions[last].start
+        own_lines = (site.positions[call].end.line > end_line
+                     and not site.lines[start.line - 1][:start.column].strip())
+
+        if not own_lines:
+            code = "".join(f", {keyword}={value}" for keyword, value in added.items())
+            return [TextEdit(end_line, end_column, end_line, end_column, code)]
+
+        indentation = " " * start.column
+        code = "\n" + ",\n".join(f"{indentation}{keyword}={value}" for keyword, value in added.items())
+        if has_comma:
+            # Keep the trailing comma style; the existing comma already separates the new arguments
+            return [TextEdit(end_line, len(line), end_line, len(line), code + ",")]
+
+        # The comma separating the last argument from the new ones goes right after it, before any comment
+        if len(line) == end_column:
+            return [TextEdit(end_line, end_column, end_line, end_column, "," + code)]
+        return [TextEdit(end_line, end_column, end_line, end_column, ","),
+                TextEdit(end_line, len(line), end_line, len(line), code)]
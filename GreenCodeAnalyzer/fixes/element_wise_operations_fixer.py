@@ -0,0 +1,48 @@
+import ast
+from typing import Optional
+from fixes.base_fixer import BaseFixer, FixSite
+from fixes.vectorize import Vectorizer
+from models.fix import Fix
+
+class ElementWiseOperationsFixer(BaseFixer):
+    """
+    Replaces a loop assigning every element of a NumPy array from the elements of the same index of other
+    arrays with a single vectorized assignment:
+
+        for i in range(len(values)):                values[:] = np.sqrt(values) * scale[:len(values)]
+            values[i] = math.sqrt(values[i]) * scale[i]
+
+    Arrays other than the one whose length is iterated over are sliced to that length, so that the same
+    elements are read and written. The loop must do nothing else, its variable must not be used after it,
+    and the elements must only be read at the current index, so that no iteration depends on another.
+    """
+    rule_id = "element_wise_operations"
+    statement_types = (ast.For,)
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        loop = site.node
+        numpy = self.module_alias(site, "numpy")
+        if (numpy is None or loop.orelse or len(loop.body) != 1 or not self.is_range_of_len(loop.iter)
+                or not self.loop_variable_is_local(site, loop)):
+            return None
+        stmt = loop.body[0]
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1):
+            return None
+        index = loop.target.id
+        length = loop.iter.args[0].args[0].id
+
+        def elements(expr: ast.AST) -> Optional[str]:
+            if not (isinstance(expr, ast.Subscript) and isinstance(expr.value, ast.Name) and isinstance(expr.slice, ast.Name)
+                    and expr.slice.id == index and self.holds_numpy_array(site, expr.value.id, loop)):
+                return None
+            return expr.value.id if expr.value.id == length else f"{expr.value.id}[:len({length})]"
+
+        target = elements(stmt.targets[0])
+        if target is None:
+            return None
+        value = Vectorizer(site, numpy, elements, index).render(stmt.value, require_element=False)
+        if value is None:
+            return None
+        target = f"{length}[:]" if target == length else target
+        return Fix(self.rule_id, "Replace the loop with a vectorized assignment", site.smell.start_line,
+                   [self.replace(site, site.statement, f"{target} = {value}")])
@@ -0,0 +1,59 @@
+import ast
+from typing import Optional
+from fixes.base_fixer import BaseFixer, FixSite
+from fixes.vectorize import Vectorizer
+from models.fix import Fix
+
+class FilterOperationsFixer(BaseFixer):
+    """
+    Replaces a loop appending the elements of a NumPy array that meet a condition to a list with a boolean mask:
+
+        for x in values:                    kept.extend(values[(values > 0) & (values < limit)])
+            if x > 0 and x < limit:
+                kept.append(x)
+
+    The list keeps the same elements, in the same order. The loop must do nothing else, its variable must not
+    be used after it, and the list must be created before it (e.g., 'kept = []').
+    """
+    rule_id = "filter_operations"
+    statement_types = (ast.For,)
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        loop = site.node
+        numpy = self.module_alias(site, "numpy")
+        if numpy is None or loop.orelse or len(loop.body) != 1 or not self.loop_variable_is_local(site, loop):
+            return None
+        stmt = loop.body[0]
+        if not (isinstance(stmt, ast.If) and not stmt.orelse and len(stmt.body) == 1
+                and isinstance(stmt.body[0], ast.Expr) and isinstance(stmt.body[0].value, ast.Call)):
+            return None
+        append = stmt.body[0].value
+        if not (isinstance(append.func, ast.Attribute) and append.func.attr == 'append'
+                and isinstance(append.func.value, ast.Name) and len(append.args) == 1 and not append.keywords):
+            return None
+        kept = append.func.value.id
+
+        # Elements are the loop variable, or the array indexed with it when looping over its indices
+        target = loop.target.id
+        if isinstance(loop.iter, ast.Name):
+            array = loop.iter.id
+            index = None
+            elements = lambda expr: array if isinstance(expr, ast.Name) and expr.id == target else None
+        elif self.is_range_of_len(loop.iter):
+            array = loop.iter.args[0].args[0].id
+            index = target
+            elements = lambda expr: array if (isinstance(expr, ast.Subscript) and isinstance(expr.value, ast.Name)
+                                              and expr.value.id == array and isinstance(expr.slice, ast.Name)
+                                              and expr.slice.id == target) else None
+        else:
+            return None
+        if (kept == array or elements(append.args[0]) is None or not self.holds_numpy_array(site, array, loop)
+                or not self.is_new_list(site, kept, loop)):
+            return None
+
+        mask = Vectorizer(site, numpy, elements, index).render(stmt.test)
+        if mask is None:
+            return None
+        code = f"{kept}.extend({array}[{mask}])"
+        return Fix(self.rule_id, "Filter with a boolean mask", site.smell.start_line,
+                   [self.replace(site, site.statement, code)])
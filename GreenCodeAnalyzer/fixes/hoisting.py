@@ -0,0 +1,199 @@
+import ast
+import re
+from keyword import iskeyword
+from typing import Callable, Dict, List, Optional, Tuple
+from analysis.dataflow import MUTATING_METHODS
+from fixes.base_fixer import BaseFixer, FixSite
+from models.fix import TextEdit
+
+# Builtins that read the objects they are given without modifying or keeping them
+READ_ONLY_FUNCTIONS = {'print', 'len', 'repr', 'str', 'type', 'isinstance', 'id', 'display'}
+
+# DataFrame methods that read the frames they are given, and return new ones (e.g., 'orders.merge(customers)')
+READ_ONLY_METHODS = {'merge', 'join', 'equals', 'isin', 'compare', 'align'}
+
+class Hoisting:
+    """
+    Moves a repeated computation (e.g., 'df.groupby("key")') into a variable computed once, before the first
+    of its occurrences, that the occurrences are replaced with:
+
+        by_key = df.groupby("key")
+        sums = by_key.sum()             # was: sums = df.groupby("key").sum()
+        means = by_key.mean()           # was: means = df.groupby("key").mean()
+
+    The occurrences must be in the same function, the later ones must run after the first one whenever they
+    run (i.e., after it in its block, or nested in the statements after it), and the variables the computation
+    reads must not be rebound or modified in between. As a function may modify the objects it is given,
+    passing the variables to a function (other than a few read-only builtins and DataFrame methods) or
+    binding them to another name in between counts as a modification.
+
+    Attributes:
+        - site (FixSite): The site of the fix.
+        - scope (ast.AST): The function (or module) the occurrences are in.
+        - parents (Dict[ast.AST, ast.AST]): The parent of every node of the scope.
+    """
+
+    def __init__(self, site: FixSite, node: ast.AST):
+        """
+        :param site: The site of the fix.
+        :param node: An occurrence of the computation.
+        """
+        self.site = site
+        self.scope = site.context.scopes.enclosing(node)
+        self.parents: Dict[ast.AST, ast.AST] = {}
+        for parent in ast.walk(self.scope):
+            for child in ast.iter_child_nodes(parent):
+                self.parents[child] = parent
+
+    def occurrences(self, matches: Callable[[ast.AST], bool]) -> List[ast.AST]:
+        """
+        Returns the nodes of the scope that match, in the order of the source, leaving out those of nested functions.
+        """
+        found = [node for node in ast.walk(self.scope)
+                 if matches(node) and self.site.context.scopes.enclosing(node) is self.scope]
+        return sorted(found, key=lambda node: (node.lineno, node.col_offset))
+
+    def statement_of(self, node: ast.AST) -> Optional[ast.stmt]:
+        """
+        Returns the innermost statement containing a node.
+        """
+        while node is not None and not isinstance(node, ast.stmt):
+            node = self.parents.get(node)
+        return node
+
+    def runs_after(self, first: ast.AST, later: ast.AST) -> bool:
+        """
+        Checks that a node only runs after the statement of another node ran: it is in the same statement, or
+        in a statement after it in its block (or nested in one).
+        """
+        statement = self.statement_of(first)
+        parent = self.parents.get(statement)
+        if statement is None or parent is None:
+            return False
+        if any(node is later for node in ast.walk(statement)):
+            return True
+        for _, value in ast.iter_fields(parent):
+            if isinstance(value, list) and any(item is statement for item in value):
+                following = value[next(i for i, item in enumerate(value) if item is statement) + 1:]
+                return any(node is later for stmt in following for node in ast.walk(stmt))
+        return False
+
+    def unchanged_between(self, names: List[str], first: ast.AST, later: ast.AST) -> bool:
+        """
+        Checks that the variables are neither rebound nor modified, in place or through another reference,
+        on any path from the statement of a node to the statement of another.
+        """
+        dataflow = self.site.context.dataflow(first)
+        statement = self.statement_of(first)
+        for name in names:
+            # The statement of the first node may change the variable after it read it (e.g., 'df = df.groupby(...)')
+            if not any(node is later for node in ast.walk(statement)) and any(
+                    definition.name == name and definition.node is statement for definition in dataflow.definitions):
+                return False
+            if dataflow.is_modified_between(name, first, later):
+                return False
+            for use in ast.walk(self.scope):
+                if (isinstance(use, ast.Name) and use.id == name and isinstance(use.ctx, ast.Load)
+                        and self.escapes(use) and dataflow.is_reachable(first, use) and dataflow.is_reachable(use, later)):
+                    return False
+        return True
+
+    def escapes(self, use: ast.Name) -> bool:
+        """
+        Checks if the object a variable refers to may be modified through a use of the variable: the use
+        assigns to a column or attribute of it (e.g., 'df["x"] = ...'), calls a method that modifies it (e.g.,
+        'df.drop(..., inplace=True)'), or hands it over (e.g., 'process(df)' or 'other = df').
+        """
+        node = use
+        parent = self.parents.get(node)
+        while isinstance(parent, (ast.Attribute, ast.Subscript)) and parent.value is node:
+            if isinstance(parent.ctx, (ast.Store, ast.Del)):
+                return True
+            grandparent = self.parents.get(parent)
+            if isinstance(parent, ast.Attribute) and isinstance(grandparent, ast.Call) and grandparent.func is parent:
+                method = parent.attr
+                in_place = any(keyword.arg == "inplace" and not (isinstance(keyword.value, ast.Constant)
+                                                                and keyword.value.value is False)
+                               for keyword in grandparent.keywords)
+                if in_place or method in MUTATING_METHODS or (method.endswith("_") and not method.startswith("_")):
+                    return True
+                return False
+            node, parent = parent, grandparent
+        if node is not use:
+            # An attribute or column read (e.g., 'df.shape' or 'df["x"]')
+            return isinstance(parent, (ast.Assign, ast.AnnAssign, ast.NamedExpr)) or self._handed_over(node, parent)
+        if isinstance(parent, ast.keyword):
+            parent = self.parents.get(parent)
+        return not (isinstance(parent, ast.Call) and node is not parent.func and self._reads_only(parent))
+
+    def _handed_over(self, node: ast.AST, parent: Optional[ast.AST]) -> bool:
+        """
+        Checks if a column or attribute of a variable is handed over to a function that may modify it.
+        """
+        return isinstance(parent, ast.Call) and node is not parent.func and not self._reads_only(parent)
+
+    @staticmethod
+    def _reads_only(call: ast.Call) -> bool:
+        """
+        Checks if a call only reads the objects it is given (e.g., 'len(df)' or 'orders.merge(customers)').
+        """
+        return ((isinstance(call.func, ast.Name) and call.func.id in READ_ONLY_FUNCTIONS)
+                or (isinstance(call.func, ast.Attribute) and call.func.attr in READ_ONLY_METHODS))
+
+    def fresh_name(self, base: str) -> str:
+        """
+        Returns a variable name derived from a description (e.g., 'orders_by_customer_id') that the module
+        does not use yet.
+        """
+        name = re.sub(r"\W+", "_", base).strip("_").lower() or "hoisted"
+        if name[0].isdigit() or iskeyword(name):
+            name = f"_{name}"
+        taken = {node.id for node in ast.walk(self.site.context.tree) if isinstance(node, ast.Name)}
+        taken.update(node.arg for node in ast.walk(self.site.context.tree) if isinstance(node, ast.arg))
+        candidate, suffix = name, 2
+        while candidate in taken:
+            candidate, suffix = f"{name}_{suffix}", suffix + 1
+        return candidate
+
+    def insert_before(self, node: ast.AST, code: str) -> Optional[TextEdit]:
+        """
+        Returns the edit inserting a statement before the statement of a node, indented like it.
+        """
+        statement = self.statement_of(node)
+        cst_statement = self.site.cst_node(statement) if statement is not None else None
+        if cst_statement is None:
+            return None
+        start = self.site.positions[cst_statement].start
+        return TextEdit(start.line, start.column, start.line, start.column, f"{code}\n{' ' * start.column}")
+
+    def hoist(self, first: ast.AST, name: str, replacements: List[Tuple[ast.AST, str]],
+              value: Optional[str] = None) -> Optional[List[TextEdit]]:
+        """
+        Returns the edits assigning the code of the first occurrence to a variable before its statement, and
+        replacing the occurrences with code (e.g., the variable, or a copy of it).
+
+        :param first: The first occurrence, whose code is hoisted.
+        :param name: The name of the variable.
+        :param replacements: The occurrences and the code replacing each of them.
+        :param value: The code assigned to the variable, if not the code of the first occurrence.
+        :return: The edits, or None if an occurrence cannot be found in the concrete syntax tree.
+        """
+        if value is None:
+            first_node = self.site.cst_node(first)
+            value = self.site.code(first_node) if first_node is not None else None
+        insertion = self.insert_before(first, f"{name} = {value}") if value is not None else None
+        if insertion is None:
+            return None
+        edits = [insertion]
+        for occurrence, code in replacements:
+            node = self.site.cst_node(occurrence)
+            if node is None:
+                return None
+            edit = BaseFixer.replace(self.site, node, code)
+            # An occurrence starting its statement is replaced along with the insertion, which starts there too
+            if (edit.start_line, edit.start_column) == (insertion.start_line, insertion.start_column):
+                insertion.end_line, insertion.end_column = edit.end_line, edit.end_column
+                insertion.new_text += edit.new_text
+            else:
+                edits.append(edit)
+        return edits
@@ -0,0 +1,177 @@
+import ast
+from typing import List, Optional
+from analysis.dataflow import BIND
+from analysis.scopes import FUNCTION_NODES
+from analysis.type_inference import DATAFRAME
+from fixes.base_fixer import BaseFixer, FixSite
+from fixes.hoisting import Hoisting
+from models.fix import Fix
+
+# The ways of joining that 'join' on an indexed frame does like 'merge', given the suffixes of 'merge'
+INDEXED_JOINS = ('inner', 'left')
+
+class InefficientDataFrameJoinsFixer(BaseFixer):
+    """
+    Fixes the two smells of the rule on 'left.merge(right, ...)' calls:
+
+    - Redundant Join: the same merge of the same frames, repeated in a function, is computed once into a
+      variable that the merges are replaced with (see Hoisting). A merge whose result is modified afterwards
+      (e.g., 'sales["year"] = ...') gets a copy of the variable, so that it does not change the other results.
+
+            a = orders.merge(customers, on="id")          orders_customers = orders.merge(customers, on="id")
+            a["year"] = a["date"].dt.year                 a = orders_customers.copy()
+            b = orders.merge(customers, on="id")          a["year"] = a["date"].dt.year
+                                                          b = orders_customers
+
+    - Missing Index: a merge on one key column is made on the right frame indexed by the key, which is
+      computed before the statement, once for the merges of the frame on the key in the function. The join
+      gives the same rows, columns and suffixes as the merge, and the fresh index of the merge is restored.
+
+            a = orders.merge(customers, on="id")          customers_by_id = customers.set_index("id")
+                                                          a = orders.join(customers_by_id, on="id", how="inner",
+                                                                          lsuffix="_x", rsuffix="_y").reset_index(drop=True)
+
+    A merge repeated in its function is only indexed once the repetition is fixed, so that the index is
+    built once too.
+    """
+    rule_id = "inefficient_df_joins"
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        call = next((node for node in ast.walk(site.node) if isinstance(node, ast.Call)
+                     and node.lineno == site.smell.start_line and self._signature(node) is not None), None)
+        if call is None or not all(self._is_frame(site, name, call) for name in self._frames(call)):
+            return None
+        if site.smell.rule_name.endswith("Redundant Join"):
+            return self._reuse(site, call)
+        if site.smell.rule_name.endswith("Missing Index"):
+            return self._index(site, call)
+        return None
+
+    def _reuse(self, site: FixSite, call: ast.Call) -> Optional[Fix]:
+        """
+        Proposes to compute a repeated merge once, if the frames it reads do not change between the merges.
+        """
+        signature = self._signature(call)
+        hoisting = Hoisting(site, call)
+        occurrences = hoisting.occurrences(lambda node: isinstance(node, ast.Call) and self._signature(node) == signature)
+        if len(occurrences) < 2 or call not in occurrences:
+            return None
+        first = occurrences[0]
+        frames = self._frames(call)
+        for later in occurrences[1:]:
+            if not hoisting.runs_after(first, later) or not hoisting.unchanged_between(frames, first, later):
+                return None
+
+        name = hoisting.fresh_name("_".join(frames))
+        replacements = [(occurrence, f"{name}.copy()" if self._may_change(site, hoisting, occurrence) else name)
+                        for occurrence in occurrences]
+        edits = hoisting.hoist(first, name, replacements)
+        if edits is None:
+            return None
+        return Fix(self.rule_id, f"Reuse the merge of '{frames[0]}' and '{frames[1]}' as '{name}'", site.smell.start_line, edits)
+
+    def _index(self, site: FixSite, call: ast.Call) -> Optional[Fix]:
+        """
+        Proposes to index the right frame of a merge on one key column by the key, and to join it. The other
+        merges of the frame on the key in the function join the same index, if the frame does not change
+        between them.
+        """
+        key = self._key(call)
+        if key is None:
+            return None
+        left, right = self._frames(call)
+        hoisting = Hoisting(site, call)
+        merges = hoisting.occurrences(lambda node: isinstance(node, ast.Call) and self._signature(node) is not None
+                                      and self._frames(node)[1] == right and self._key(node) == key)
+        signatures = [self._signature(node) for node in merges]
+        if len(set(signatures)) < len(signatures) or call not in merges:
+            return None
+        if not all(hoisting.runs_after(merges[0], later) and hoisting.unchanged_between([right], merges[0], later)
+                   and self._is_frame(site, self._frames(later)[0], later) for later in merges[1:]):
+            merges = [call]
+
+        name = hoisting.fresh_name(f"{right}_by_{key}")
+        replacements = []
+        key_code = None
+        for merge in merges:
+            keywords = {keyword.arg: keyword.value for keyword in merge.keywords}
+            key_node = site.cst_node(keywords['on'])
+            how_node = site.cst_node(keywords['how']) if 'how' in keywords else None
+            if key_node is None or ('how' in keywords and how_node is None):
+                return None
+            how = site.code(how_node) if how_node is not None else repr('inner')
+            key_code = key_code or site.code(key_node)
+            replacements.append((merge, f"{self._frames(merge)[0]}.join({name}, on={site.code(key_node)}, how={how}, "
+                                        f"lsuffix='_x', rsuffix='_y').reset_index(drop=True)"))
+        edits = hoisting.hoist(merges[0], name, replacements, value=f"{right}.set_index({key_code})")
+        if edits is None:
+            return None
+        return Fix(self.rule_id, f"Join '{right}' indexed by '{key}' as '{name}'", site.smell.start_line, edits)
+
+    @staticmethod
+    def _key(call: ast.Call) -> Optional[str]:
+        """
+        Returns the key column of a merge that 'join' can make on the right frame indexed by the key: a merge
+        on one column, inner or left, without other arguments.
+        """
+        keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+        key, how = keywords.get('on'), keywords.get('how')
+        if (len(call.args) != 1 or set(keywords) - {'on', 'how'}
+                or not (isinstance(key, ast.Constant) and isinstance(key.value, str))
+                or (how is not None and not (isinstance(how, ast.Constant) and how.value in INDEXED_JOINS))):
+            return None
+        return key.value
+
+    @staticmethod
+    def _signature(call: ast.Call) -> Optional[str]:
+        """
+        Returns what identifies a 'left.merge(right, ...)' call whose frames are variables and whose other
+        arguments are constants, so that the same merges of the same frames have the same signature.
+        """
+        if not (isinstance(call.func, ast.Attribute) and call.func.attr == 'merge' and isinstance(call.func.value, ast.Name)
+                and call.args and isinstance(call.args[0], ast.Name)):
+            return None
+        if any(keyword.arg is None for keyword in call.keywords):
+            return None
+        for argument in call.args[1:] + [keyword.value for keyword in call.keywords]:
+            values = argument.elts if isinstance(argument, (ast.List, ast.Tuple)) else [argument]
+            if not all(isinstance(value, ast.Constant) for value in values):
+                return None
+        return ast.dump(call)
+
+    @staticmethod
+    def _frames(call: ast.Call) -> List[str]:
+        """
+        Returns the names of the left and right frames of a merge.
+        """
+        return [call.func.value.id, call.args[0].id]
+
+    def _is_frame(self, site: FixSite, name: str, node: ast.AST) -> bool:
+        """
+        Checks that a variable may only hold a DataFrame, as far as the shared type inference knows, in a
+        module using pandas.
+        """
+        kinds = site.context.types.kinds(name, node)
+        return kinds <= {DATAFRAME} and (bool(kinds) or self.module_alias(site, "pandas") is not None)
+
+    @staticmethod
+    def _may_change(site: FixSite, hoisting: Hoisting, occurrence: ast.AST) -> bool:
+        """
+        Checks if the result of a merge may be modified where it is used: through the variable it is assigned
+        to (e.g., 'sales = left.merge(...)' followed by 'sales["year"] = ...'), or directly.
+        """
+        statement = hoisting.statement_of(occurrence)
+        if not (isinstance(statement, ast.Assign) and statement.value is occurrence
+                and len(statement.targets) == 1 and isinstance(statement.targets[0], ast.Name)):
+            return hoisting.escapes(occurrence)
+        target = statement.targets[0].id
+        for node in ast.walk(hoisting.scope):
+            if isinstance(node, (ast.Global, ast.Nonlocal)) and target in node.names:
+                return True
+            if isinstance(node, FUNCTION_NODES + (ast.Lambda,)) and node is not hoisting.scope:
+                if any(isinstance(inner, ast.Name) and inner.id == target for inner in ast.walk(node)):
+                    return True
+        dataflow = site.context.dataflow(statement)
+        definitions = [definition for definition in dataflow.definitions
+                       if definition.node is statement and definition.name == target and definition.kind == BIND]
+        return not definitions or any(hoisting.escapes(use) for definition in definitions for use in dataflow.uses(definition))
@@ -0,0 +1,77 @@
+import ast
+from typing import Optional
+from analysis.type_inference import DATAFRAME, SERIES
+from fixes.base_fixer import BaseFixer, FixSite
+from fixes.hoisting import Hoisting
+from models.fix import Fix
+
+class RecomputingGroupByFixer(BaseFixer):
+    """
+    Computes the grouping of a DataFrame that is grouped several times by the same keys once, and reuses it:
+
+        sums = df.groupby("category").sum()             by_category = df.groupby("category")
+        means = df.groupby("category").mean()           sums = by_category.sum()
+                                                        means = by_category.mean()
+
+    Every 'groupby' of the frame with the same arguments in the function is replaced, as long as the frame
+    is not changed between the first one and the others (see Hoisting). The aggregations are kept as they are
+    rather than merged into one agg() call, which would return a single frame with other columns.
+    """
+    rule_id = "recomputing_groupby"
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        call = next((node for node in ast.walk(site.node) if isinstance(node, ast.Call)
+                     and node.lineno == site.smell.start_line and self._grouping(node) is not None), None)
+        if call is None:
+            return None
+        grouping = self._grouping(call)
+        frame = grouping.func.value.id
+        kinds = site.context.types.kinds(frame, call)
+        if not kinds <= {DATAFRAME, SERIES} or (not kinds and self.module_alias(site, "pandas") is None):
+            return None
+        signature = self._signature(grouping)
+        hoisting = Hoisting(site, grouping)
+        occurrences = hoisting.occurrences(lambda node: isinstance(node, ast.Call) and self._signature(node) == signature)
+        if len(occurrences) < 2 or grouping not in occurrences:
+            return None
+        first = occurrences[0]
+        for later in occurrences[1:]:
+            if not hoisting.runs_after(first, later) or not hoisting.unchanged_between([frame], first, later):
+                return None
+
+        keys = [element.value for element in ast.walk(grouping.args[0]) if isinstance(element, ast.Constant)]
+        name = hoisting.fresh_name(f"{frame}_by_{'_'.join(str(key) for key in keys)}")
+        edits = hoisting.hoist(first, name, [(occurrence, name) for occurrence in occurrences])
+        if edits is None:
+            return None
+        return Fix(self.rule_id, f"Reuse the grouping of '{frame}' as '{name}'", site.smell.start_line, edits)
+
+    @staticmethod
+    def _grouping(call: ast.Call) -> Optional[ast.Call]:
+        """
+        Returns the 'df.groupby(...)' call an aggregation is made on (e.g., in 'df.groupby("key").sum()'),
+        if its frame is a variable and its arguments are constants.
+        """
+        if not (isinstance(call.func, ast.Attribute) and isinstance(call.func.value, ast.Call)):
+            return None
+        grouping = call.func.value
+        if RecomputingGroupByFixer._signature(grouping) is None:
+            return None
+        return grouping
+
+    @staticmethod
+    def _signature(call: ast.Call) -> Optional[str]:
+        """
+        Returns what identifies a 'df.groupby(...)' call whose frame is a variable and whose arguments are string
+        keys and constants, so that calls grouping the same frame the same way have the same signature.
+        """
+        if not (isinstance(call.func, ast.Attribute) and call.func.attr == 'groupby'
+                and isinstance(call.func.value, ast.Name) and call.args):
+            return None
+        if any(keyword.arg is None for keyword in call.keywords):
+            return None
+        for argument in list(call.args) + [keyword.value for keyword in call.keywords]:
+            values = argument.elts if isinstance(argument, (ast.List, ast.Tuple)) else [argument]
+            if not all(isinstance(value, ast.Constant) for value in values):
+                return None
+        return ast.dump(call)
@@ -0,0 +1,117 @@
+import ast
+from typing import Callable, Optional, Tuple
+from analysis.dataflow import BIND
+from fixes.base_fixer import BaseFixer, FixSite
+from models.fix import Fix
+
+class ReductionOperationsFixer(BaseFixer):
+    """
+    Replaces a loop summing the elements of a NumPy array, or keeping their minimum or maximum, with the
+    corresponding NumPy reduction:
+
+        for x in values:            total += np.sum(values, axis=0)
+            total += x
+
+        for i in range(len(values)):        if len(values):
+            if values[i] < lowest:              lowest = min(lowest, np.min(values))
+                lowest = values[i]
+
+    The loop must do nothing else, and its variable must not be used after it. Sums of floats may differ
+    in their last digits, as NumPy adds them in another order.
+    """
+    rule_id = "reduction_operations"
+    statement_types = (ast.For,)
+
+    def fix(self, site: FixSite) -> Optional[Fix]:
+        loop = site.node
+        numpy = self.module_alias(site, "numpy")
+        if numpy is None or loop.orelse or len(loop.body) != 1 or not self.loop_variable_is_local(site, loop):
+            return None
+        iterated = self._iterated_array(site, loop)
+        if iterated is None:
+            return None
+        array, is_element = iterated
+
+        stmt = loop.body[0]
+        if (isinstance(stmt, ast.AugAssign) and isinstance(stmt.op, ast.Add) and isinstance(stmt.target, ast.Name)
+                and stmt.target.id != array and is_element(stmt.value) and self._is_numeric(site, stmt.target.id, loop)):
+            code = f"{stmt.target.id} += {numpy}.sum({array}, axis=0)"
+            return Fix(self.rule_id, f"Replace the loop with {numpy}.sum()", site.smell.start_line,
+                       [self.replace(site, site.statement, code)])
+
+        extremum = self._extremum(stmt, is_element)
+        if extremum is None:
+            return None
+        function, accumulator = extremum
+        if accumulator == array or not self._is_numeric(site, accumulator, loop):
+            return None
+        code = f"if len({array}):\n    {accumulator} = {function}({accumulator}, {numpy}.{function}({array}))"
+        return Fix(self.rule_id, f"Replace the loop with {numpy}.{function}()", site.smell.start_line,
+                   [self.replace(site, site.statement, code)])
+
+    def _iterated_array(self, site: FixSite, loop: ast.For) -> Optional[Tuple[str, Callable[[ast.AST], bool]]]:
+        """
+        Returns the name of the array a loop goes through, and a predicate telling the expressions that
+        are its current element: the loop variable for 'for x in values', and 'values[i]' for
+        'for i in range(len(values))'.
+        """
+        target = loop.target.id
+        if isinstance(loop.iter, ast.Name):
+            array = loop.iter.id
+            is_element = lambda expr: isinstance(expr, ast.Name) and expr.id == target
+        elif self.is_range_of_len(loop.iter):
+            array = loop.iter.args[0].args[0].id
+            is_element = lambda expr: (isinstance(expr, ast.Subscript) and isinstance(expr.value, ast.Name)
+                                       and expr.value.id == array and isinstance(expr.slice, ast.Name)
+                                       and expr.slice.id == target)
+        else:
+            return None
+        if not self.holds_numpy_array(site, array, loop):
+            return None
+        return array, is_element
+
+    @staticmethod
+    def _extremum(stmt: ast.stmt, is_element: Callable[[ast.AST], bool]) -> Optional[Tuple[str, str]]:
+        """
+        Recognizes 'if x < lowest: lowest = x' (or its mirrored comparison, or the maximum counterpart) and
+        returns the reduction ('min' or 'max') and the name of the accumulator.
+        """
+        if not (isinstance(stmt, ast.If) and not stmt.orelse and len(stmt.body) == 1
+                and isinstance(stmt.test, ast.Compare) and len(stmt.test.ops) == 1):
+            return None
+        assign = stmt.body[0]
+        if not (isinstance(assign, ast.Assign) and len(assign.targets) == 1 and isinstance(assign.targets[0], ast.Name)
+                and is_element(assign.value)):
+            return None
+        accumulator = assign.targets[0].id
+        left, op, right = stmt.test.left, stmt.test.ops[0], stmt.test.comparators[0]
+        if is_element(left) and isinstance(right, ast.Name) and right.id == accumulator:
+            lesser = isinstance(op, ast.Lt)
+        elif is_element(right) and isinstance(left, ast.Name) and left.id == accumulator:
+            lesser = isinstance(op, ast.Gt)
+        else:
+            return None
+        if not isinstance(op, (ast.Lt, ast.Gt)):
+            return None
+        return ("min" if lesser else "max"), accumulator
+
+    @staticmethod
+    def _is_numeric(site: FixSite, name: str, loop: ast.For) -> bool:
+        """
+        Checks that the accumulator is bound before the loop, and never to a string or a container.
+        """
+        definitions = [definition for definition in site.context.dataflow(loop).reaching_definitions(loop, name)
+                       if not loop.lineno <= definition.line <= (loop.end_lineno or loop.lineno)]
+        if not definitions:
+            return False
+        for definition in definitions:
+            if definition.kind != BIND:
+                return False
+            stmt = definition.node
+            if isinstance(stmt, ast.Assign):
+                value = stmt.value
+                if isinstance(value, (ast.List, ast.Tuple, ast.Dict, ast.Set, ast.JoinedStr)):
+                    return False
+                if isinstance(value, ast.Constant) and not isinstance(value.value, (int, float)):
+                    return False
+        return True
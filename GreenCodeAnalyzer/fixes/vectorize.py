@@ -0,0 +1,230 @@
+import ast
+from typing import Callable, Dict, Optional
+import libcst as cst
+from fixes.base_fixer import FixSite
+
+# NumPy functions that apply element-wise, so that a call on an element can be made on the whole array
+NUMPY_UFUNCS = {
+    'abs', 'absolute', 'sqrt', 'cbrt', 'square', 'exp', 'exp2', 'expm1', 'log', 'log2', 'log10', 'log1p',
+    'sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'arctan2', 'sinh', 'cosh', 'tanh', 'floor', 'ceil',
+    'trunc', 'rint', 'sign', 'power', 'maximum', 'minimum', 'fmax', 'fmin', 'hypot', 'clip', 'isnan', 'isinf'
+}
+
+# Functions of the math module and the NumPy ufuncs computing the same thing on every element
+MATH_FUNCTIONS = {
+    'sqrt': 'sqrt', 'exp': 'exp', 'expm1': 'expm1', 'log2': 'log2', 'log10': 'log10', 'log1p': 'log1p',
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan', 'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan',
+    'sinh': 'sinh', 'cosh': 'cosh', 'tanh': 'tanh', 'fabs': 'abs', 'hypot': 'hypot', 'isnan': 'isnan',
+    'isinf': 'isinf'
+}
+
+# Builtins and the NumPy ufuncs computing the same thing on every element (min and max of two values)
+BUILTIN_FUNCTIONS = {'abs': 'abs', 'min': 'minimum', 'max': 'maximum'}
+
+ARITHMETIC_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+COMPARISON_OPERATORS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+class Vectorizer:
+    """
+    Rewrites an expression computed on one element of arrays in a loop (e.g., 'x > 0 and x < t') into
+    the same expression computed on the whole arrays at once (e.g., '(values > 0) & (values < t)').
+
+    Only expressions whose meaning does not change are rewritten: arithmetic, comparisons and boolean
+    operators (turned into '&', '|' and '~'), conditional expressions (turned into np.where()), and calls
+    of functions that apply element-wise (turned into NumPy ufuncs). Other names are assumed to be scalars,
+    unless they hold arrays, in which case the expression is not rewritten.
+
+    Attributes:
+        - site (FixSite): The site of the fix.
+        - numpy (str): The name NumPy is imported under.
+        - elements (Callable): Returns the code of the whole array an AST node is an element of (e.g., 'values'
+          for 'x' in 'for x in values', or for 'values[i]' in 'for i in range(len(values))'), or None.
+        - index (Optional[str]): The name of the loop variable, which may not be used otherwise.
+    """
+
+    def __init__(self, site: FixSite, numpy: str, elements: Callable[[ast.AST], Optional[str]], index: Optional[str] = None):
+        self.site = site
+        self.numpy = numpy
+        self.elements = elements
+        self.index = index
+
+    def render(self, expr: ast.expr, require_element: bool = True) -> Optional[str]:
+        """
+        Returns the code of the expression computed on the whole arrays, keeping its formatting, or None if
+        it cannot be rewritten.
+
+        :param expr: The expression computed on one element.
+        :param require_element: Whether the expression must use an element, so that its result is an array.
+        """
+        replacements: Dict[cst.CSTNode, cst.BaseExpression] = {}
+        if not self._check(expr, replacements) or (require_element and not replacements):
+            return None
+        node = self.site.cst_node(expr)
+        if node is None:
+            return None
+        rewritten = node.visit(_ArrayRewriter(replacements, self.numpy))
+        return cst.Module(body=[]).code_for_node(rewritten)
+
+    def _check(self, expr: ast.expr, replacements: Dict[cst.CSTNode, cst.BaseExpression]) -> bool:
+        """
+        Checks that an expression can be computed on the whole arrays, collecting the elements to replace.
+        """
+        array = self.elements(expr)
+        if array is not None:
+            node = self.site.cst_node(expr)
+            if node is None:
+                return False
+            replacements[node] = cst.parse_expression(array)
+            return True
+
+        if isinstance(expr, ast.Constant):
+            return isinstance(expr.value, (int, float, bool)) and expr.value is not None
+        if isinstance(expr, ast.Name):
+            return expr.id != self.index and not self._holds_array(expr.id, expr)
+        if isinstance(expr, ast.Attribute):
+            return self._is_scalar_reference(expr)
+        if isinstance(expr, ast.Subscript):
+            return self._is_scalar_reference(expr)
+        if isinstance(expr, ast.BinOp):
+            return (isinstance(expr.op, ARITHMETIC_OPERATORS)
+                    and self._check(expr.left, replacements) and self._check(expr.right, replacements))
+        if isinstance(expr, ast.UnaryOp):
+            if isinstance(expr.op, ast.Not):
+                return self._is_boolean(expr.operand) and self._check(expr.operand, replacements)
+            return isinstance(expr.op, (ast.USub, ast.UAdd)) and self._check(expr.operand, replacements)
+        if isinstance(expr, ast.BoolOp):
+            return all(self._is_boolean(value) and self._check(value, replacements) for value in expr.values)
+        if isinstance(expr, ast.Compare):
+            return (all(isinstance(op, COMPARISON_OPERATORS) for op in expr.ops)
+                    and self._check(expr.left, replacements)
+                    and all(self._check(comparator, replacements) for comparator in expr.comparators))
+        if isinstance(expr, ast.IfExp):
+            return (self._is_boolean(expr.test) and self._check(expr.test, replacements)
+                    and self._check(expr.body, replacements) and self._check(expr.orelse, replacements))
+        if isinstance(expr, ast.Call):
+            return (self._ufunc(expr) is not None and not expr.keywords
+                    and all(not isinstance(arg, ast.Starred) and self._check(arg, replacements) for arg in expr.args))
+        return False
+
+    def _ufunc(self, call: ast.Call) -> Optional[str]:
+        """
+        Returns the NumPy ufunc a call computes on every element, if it does.
+        """
+        func = call.func
+        if isinstance(func, ast.Name) and func.id in BUILTIN_FUNCTIONS:
+            if func.id in ('min', 'max') and len(call.args) != 2:
+                return None
+            return BUILTIN_FUNCTIONS[func.id]
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            if func.value.id == self.numpy and func.attr in NUMPY_UFUNCS:
+                return func.attr
+            if func.value.id == 'math' and func.attr in MATH_FUNCTIONS:
+                return MATH_FUNCTIONS[func.attr]
+        return None
+
+    def _is_boolean(self, expr: ast.expr) -> bool:
+        """
+        Checks that an expression is a boolean, for which '&', '|' and '~' behave like 'and', 'or' and 'not'.
+        """
+        if isinstance(expr, (ast.Compare, ast.BoolOp)):
+            return True
+        if isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.Not):
+            return True
+        return isinstance(expr, ast.Call) and self._ufunc(expr) in ('isnan', 'isinf')
+
+    def _is_scalar_reference(self, expr: ast.expr) -> bool:
+        """
+        Checks that an attribute or subscript (e.g., 'self.threshold' or 'config["limit"]') does not depend
+        on the loop and does not refer to an array.
+        """
+        names = [node for node in ast.walk(expr) if isinstance(node, ast.Name)]
+        if any(name.id == self.index or self.elements(name) is not None for name in names):
+            return False
+        root = expr
+        while isinstance(root, (ast.Attribute, ast.Subscript)):
+            root = root.value
+        return not (isinstance(root, ast.Name) and self._holds_array(root.id, root) and isinstance(expr, ast.Subscript))
+
+    def _holds_array(self, name: str, node: ast.AST) -> bool:
+        """
+        Checks if a variable may hold an array, whose elements would not line up with the loop's.
+        """
+        return bool(self.site.context.types.kinds(name, node))
+
+class _ArrayRewriter(cst.CSTTransformer):
+    """
+    Replaces the elements of an expression with their arrays, and the operators and calls that only
+    apply to scalars with their element-wise equivalents.
+    """
+
+    def __init__(self, replacements: Dict[cst.CSTNode, cst.BaseExpression], numpy: str):
+        super().__init__()
+        self.replacements = replacements
+        self.numpy = numpy
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        return node not in self.replacements
+
+    def on_leave(self, original_node, updated_node):
+        replacement = self.replacements.get(original_node)
+        if replacement is None:
+            return super().on_leave(original_node, updated_node)
+        if original_node.lpar:
+            replacement = replacement.with_changes(lpar=original_node.lpar, rpar=original_node.rpar)
+        return replacement
+
+    def leave_BooleanOperation(self, original_node: cst.BooleanOperation, updated_node: cst.BooleanOperation) -> cst.BaseExpression:
+        operator = updated_node.operator
+        replacement = cst.BitAnd if isinstance(operator, cst.And) else cst.BitOr
+        return cst.BinaryOperation(
+            left=_parenthesized(updated_node.left),
+            operator=replacement(whitespace_before=operator.whitespace_before, whitespace_after=operator.whitespace_after),
+            right=_parenthesized(updated_node.right),
+            lpar=updated_node.lpar,
+            rpar=updated_node.rpar
+        )
+
+    def leave_Comparison(self, original_node: cst.Comparison, updated_node: cst.Comparison) -> cst.BaseExpression:
+        if len(updated_node.comparisons) == 1:
+            return updated_node
+
+        # A chained comparison 'a < x < b' holds where both 'a < x' and 'x < b' hold
+        pairs = []
+        left = updated_node.left
+        for target in updated_node.comparisons:
+            pairs.append(cst.Comparison(left=left, comparisons=[target], lpar=[cst.LeftParen()], rpar=[cst.RightParen()]))
+            left = target.comparator
+        combined = pairs[0]
+        for pair in pairs[1:]:
+            combined = cst.BinaryOperation(left=combined, operator=cst.BitAnd(), right=pair)
+        return combined.with_changes(lpar=updated_node.lpar, rpar=updated_node.rpar)
+
+    def leave_UnaryOperation(self, original_node: cst.UnaryOperation, updated_node: cst.UnaryOperation) -> cst.BaseExpression:
+        if not isinstance(updated_node.operator, cst.Not):
+            return updated_node
+        return updated_node.with_changes(operator=cst.BitInvert(), expression=_parenthesized(updated_node.expression))
+
+    def leave_IfExp(self, original_node: cst.IfExp, updated_node: cst.IfExp) -> cst.BaseExpression:
+        code = cst.Module(body=[]).code_for_node
+        where = cst.parse_expression(
+            f"{self.numpy}.where({code(updated_node.test)}, {code(updated_node.body)}, {code(updated_node.orelse)})"
+        )
+        return where.with_changes(lpar=updated_node.lpar, rpar=updated_node.rpar)
+
+    def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.BaseExpression:
+        func = updated_node.func
+        if isinstance(func, cst.Name) and func.value in BUILTIN_FUNCTIONS:
+            name = BUILTIN_FUNCTIONS[func.value]
+        elif isinstance(func, cst.Attribute) and isinstance(func.value, cst.Name) and func.value.value == 'math':
+            name = MATH_FUNCTIONS[func.attr.value]
+        else:
+            return updated_node
+        return updated_node.with_changes(func=cst.Attribute(value=cst.Name(self.numpy), attr=cst.Name(name)))
+
+def _parenthesized(expr: cst.BaseExpression) -> cst.BaseExpression:
+    """
+    Returns the expression in parentheses, unless it already is or cannot be split by an operator.
+    """
+    if expr.lpar or isinstance(expr, (cst.Name, cst.Attribute, cst.Call, cst.Subscript, cst.BaseNumber, cst.UnaryOperation)):
+        return expr
+    return expr.with_changes(lpar=[cst.LeftParen()], rpar=[cst.RightParen()])
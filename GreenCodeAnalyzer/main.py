@@ -1,20 +1,421 @@
+import argparse
+import io
+import json
+import os
+import shlex
 import sys
+from analysis.project import ProjectIndex, SKIPPED_DIRECTORIES
+from typing import Dict, List
+from engines.analysis_limits import AnalysisLimits, GeneratedFileError
+from engines.analysis_server import AnalysisServer
+from engines.notebook import NotebookSource
+from engines.project_scan import ProjectScanner
+from engines.result_cache import ResultCache
 from engines.smell_engine import SmellEngine
+from models.energy_score import FileScore, SCORE_BASELINE_VERSION, project_score, score_file, score_regressions
+from models.smell import Smell
+from runtime.entry_runner import EntryRunError
+from runtime.execution_trace import ExecutionProfile
+from runtime.memory_trace import MemoryProfile
+from runtime.pandas_trace import PandasProfile
+from runtime.profile_data import ProfileData, ProfileFormatError
 
-# Example
-if __name__ == "__main__":
-    # Get the file path from command line arguments or use a default
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
-    else:
-        # Throw an error if no file path is provided
-        raise ValueError("Please provide a file path as an argument.")
-        
-    collector = SmellEngine(file_path)
-    smells_dict = collector.collect()
-    
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Detect energy-related code smells in a Python file.")
+    parser.add_argument("file_path", nargs="?",
+                        help="Path to the Python file or project directory to analyze, or '-' to read the source from stdin.")
+    parser.add_argument("--stdin-filename",
+                        help="Path reported for the source read from stdin (e.g., an unsaved editor buffer).")
+    parser.add_argument("--serve", action="store_true",
+                        help="Keep running and answer JSON analysis requests on stdin, one per line.")
+    parser.add_argument("--rank", action="store_true",
+                        help="List smells by decreasing estimated cost instead of by line.")
+    parser.add_argument("--profile-data",
+                        help="Profile of a run of the analyzed code (a cProfile/pstats dump or line_profiler text output), "
+                             "to rank smells by the time measured in their code.")
+    parser.add_argument("--trace-memory", metavar="ENTRY",
+                        help="Run an entry script with its arguments (e.g., \"train.py --epochs 1\") on CPU under tracemalloc, "
+                             "to rank smells by the memory their lines allocate.")
+    parser.add_argument("--trace-pandas", metavar="ENTRY",
+                        help="Run an entry script with its arguments with pandas' groupby, merge, join and iterrows recorded, "
+                             "to confirm pandas smells and rank them by the time they waste.")
+    parser.add_argument("--project-root",
+                        help="Directory imports between the project's modules are resolved from. "
+                             "Defaults to the analyzed directory, or to the directory of the analyzed file.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of worker processes analyzing the files of a project.")
+    parser.add_argument("--rule-budget", type=float, default=AnalysisLimits.rule_seconds, metavar="SECONDS",
+                        help="Time each rule may spend on a file before it is stopped and the file reported as partially analyzed.")
+    parser.add_argument("--file-budget", type=float, default=AnalysisLimits.file_seconds, metavar="SECONDS",
+                        help="Time all rules together may spend on a file before the unfinished ones are stopped.")
+    parser.add_argument("--no-limits", action="store_true",
+                        help="Analyze every file completely, including generated and huge files, whatever it takes.")
+    parser.add_argument("--max-tasks-per-worker", type=int, metavar="N",
+                        help="With --jobs, replace every worker process after it analyzed N files, to bound its memory.")
+    parser.add_argument("--max-worker-memory", type=int, metavar="MB",
+                        help="With --jobs, replace a worker process whose resident memory exceeds MB mebibytes; "
+                             "the file it was analyzing is retried in a new worker.")
+    parser.add_argument("--cache-dir",
+                        help="Directory where the results of every file are cached across runs, to only analyze changed files.")
+    parser.add_argument("--save-score",
+                        help="Write the energy scores of the files and of the project to this JSON file, as a baseline.")
+    parser.add_argument("--max-score-regression", type=float,
+                        help="Exit with status 1 if the project's energy score, or a file's, dropped by more than "
+                             "this many points since the baseline given with --score-baseline.")
+    parser.add_argument("--score-baseline",
+                        help="Scores saved with --save-score, to check regressions against.")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rewrite the analyzed files with the fixes of the smells that can be fixed safely (requires libcst).")
+    parser.add_argument("--diff", action="store_true",
+                        help="Print the fixes of the smells that can be fixed safely as a unified diff (requires libcst).")
+    parser.add_argument("--verify-fixes", action="store_true",
+                        help="Only make the fixes that compute the same values as the original code on random inputs, and faster.")
+    args = parser.parse_args(argv)
+
+    # Throw an error if no file path is provided
+    if args.file_path is None and args.stdin_filename is None and not args.serve:
+        parser.error("Please provide a file path as an argument.")
+    if args.max_score_regression is not None and args.score_baseline is None:
+        parser.error("--max-score-regression requires --score-baseline.")
+    if args.fix and args.file_path in (None, "-"):
+        parser.error("--fix requires files to rewrite; use --diff for the source read from stdin.")
+    if args.verify_fixes and not (args.fix or args.diff):
+        parser.error("--verify-fixes requires --fix or --diff.")
+    if args.max_tasks_per_worker is not None and args.max_tasks_per_worker < 1:
+        parser.error("--max-tasks-per-worker must be at least 1.")
+    if args.max_worker_memory is not None and args.max_worker_memory < 1:
+        parser.error("--max-worker-memory must be at least 1.")
+    return args
+
+def parse_trace_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the arguments of the trace subcommand.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main.py trace",
+        description="Run an entry script and report how many times, and for how long, each detected smell ran."
+    )
+    parser.add_argument("file_path", help="Path to the Python file or project directory to analyze.")
+    parser.add_argument("entry", nargs=argparse.REMAINDER,
+                        help="The script to run, followed by its arguments (e.g., train.py --epochs 1).")
+    parser.add_argument("--project-root",
+                        help="Directory imports between the project's modules are resolved from.")
+    args = parser.parse_args(argv)
+    if not args.entry:
+        parser.error("Please provide the script to run.")
+    return args
+
+def run_trace(args: argparse.Namespace):
+    """
+    Detects the smells of the analyzed files, runs the entry script with only the code containing them
+    instrumented, and prints the smells annotated with their executions.
+    """
+    directory = os.path.isdir(args.file_path)
+    # Notebooks are not run by the entry script, so only modules are traced
+    paths = [path for path in find_python_files(args.file_path) if path.endswith(".py")] if directory else [args.file_path]
+    root = args.project_root or (args.file_path if directory else os.path.dirname(os.path.abspath(args.file_path)))
+    collector = SmellEngine(project=ProjectIndex(root))
+
+    smells_by_file = {}
+    sources = {}
+    for path in paths:
+        with open(path, "r") as file:
+            sources[path] = file.read()
+        try:
+            smells_by_file[path] = unique_smells(collector.analyze_source(sources[path], path))
+        except SyntaxError as e:
+            print(f"Skipped {path}: {e}")
+
+    try:
+        execution = ExecutionProfile.trace(shlex.join(args.entry), smells_by_file)
+    except EntryRunError as e:
+        sys.exit(f"Could not trace the entry script: {e}")
+
+    cold = total = 0
+    for path, smells in smells_by_file.items():
+        smells = execution.measure(smells, path, sources[path])
+        cold += sum(1 for smell in smells if smell.executions == 0)
+        total += len(smells)
+        if directory:
+            print(f"\n{path}")
+        print_smells(collector.organize_smells_by_line(smells))
+    print(f"\n{cold} of {total} smells never executed (cold).")
+
+def find_python_files(directory: str) -> list:
+    """
+    Returns the Python files and Jupyter notebooks of a directory and its subdirectories, skipping hidden
+    and generated directories.
+    """
+    python_files = []
+    for root, directories, files in os.walk(directory):
+        directories[:] = sorted(d for d in directories if not d.startswith(".") and d not in SKIPPED_DIRECTORIES)
+        python_files.extend(os.path.join(root, file) for file in sorted(files) if file.endswith((".py", ".ipynb")))
+    return python_files
+
+def print_smells(smells_dict, rank: bool = False):
+    """
+    Prints the smells of a file, grouped by line, or from the costliest to the cheapest if rank is set.
+    Measured allocations, wasted and measured times, when available, take precedence over estimated costs.
+    """
     print("Detected Code Smells:\n" + "=" * 30)
+    if rank:
+        ranked = sorted(unique_smells(smells_dict), key=lambda smell: (
+            -(smell.allocated_bytes or 0),
+            -(smell.wasted_time or 0),
+            smell.measured_time is None, -(smell.measured_time or 0),
+            -(smell.cost or 0)
+        ))
+        for smell in ranked:
+            print(f"  - {smell}")
+        return
     for line, smells in smells_dict.items():
-        print(f"\nLine {line}:")
+        # Smells of a notebook are keyed by (cell, line)
+        print(f"\nCell {line[0]}, Line {line[1]}:" if isinstance(line, tuple) else f"\nLine {line}:")
         for smell in smells:
             print(f"  - {smell}")
+
+def print_partial(partial_rules: Dict[str, str]):
+    """
+    Prints the rules that did not analyze the whole file and the notebook cells that were skipped, and why.
+    """
+    if not partial_rules:
+        return
+    cells = sum(1 for part in partial_rules if part.startswith("cell "))
+    rules = len(partial_rules) - cells
+    left_out = []
+    if rules:
+        left_out.append(f"{rules} rule{'s' if rules != 1 else ''} left out")
+    if cells:
+        left_out.append(f"{cells} cell{'s' if cells != 1 else ''} skipped")
+    print(f"\nPartially analyzed: {', '.join(left_out)}")
+    for rule_id, reason in partial_rules.items():
+        print(f"  - {rule_id}: {reason}")
+
+def analysis_limits(args: argparse.Namespace) -> AnalysisLimits:
+    """
+    Returns how much work the analysis of a file may take, as requested.
+    """
+    if args.no_limits:
+        return AnalysisLimits.unlimited()
+    return AnalysisLimits(rule_seconds=args.rule_budget, file_seconds=args.file_budget)
+
+def unique_smells(smells_dict) -> list:
+    """
+    Returns the smells of a line-indexed dict, once each, in order.
+    """
+    return list({id(smell): smell for smells in smells_dict.values() for smell in smells}.values())
+
+def report(
+    smells: List[Smell],
+    path: str,
+    lines: int,
+    args: argparse.Namespace,
+    profile: ProfileData = None,
+    memory: MemoryProfile = None,
+    pandas: PandasProfile = None,
+    source_code: str = None
+) -> FileScore:
+    """
+    Prints the smells of a file and its energy score, with their measured times if a profile is given,
+    the memory their lines allocated if memory was traced, and their DataFrame operations if pandas was traced.
+    The source of the file is needed to map a function-level profile, or the lines of loops, onto its smells.
+    """
+    score = score_file(path, smells, lines)
+    measured = profile is not None or memory is not None or pandas is not None
+    smelly_time = smelly_bytes = wasted_time = None
+    if profile is not None:
+        smells, smelly_time = profile.measure(smells, source_code, path)
+    if memory is not None:
+        smells, smelly_bytes = memory.measure(smells, path, source_code)
+    if pandas is not None:
+        smells, wasted_time = pandas.measure(smells, path)
+
+    print_smells(SmellEngine.organize_smells_by_line(smells), rank=args.rank or measured)
+    print(f"\n{score}")
+    if smelly_time is not None:
+        share = 100 * smelly_time / profile.total_time if profile.total_time else 0.0
+        print(f"\nTime in smelly code: {smelly_time:.3g}s of {profile.total_time:.3g}s profiled ({share:.1f}%)")
+    if smelly_bytes is not None:
+        share = 100 * smelly_bytes / memory.total_bytes if memory.total_bytes else 0.0
+        print(f"\nMemory allocated by smelly code: {smelly_bytes} of {memory.total_bytes} bytes traced ({share:.1f}%)")
+    if wasted_time is not None:
+        print(f"\nTime wasted by pandas smells: {wasted_time:.3g}s of {pandas.total_time:.3g}s in traced DataFrame operations")
+    return score
+
+def load_fix_engine(root: str, verify: bool):
+    """
+    Returns the engine proposing fixes, exiting if libcst, which fixes are computed with, is not installed,
+    or if NumPy, which verified fixes are run with, is not.
+    """
+    try:
+        from engines.fix_engine import FixEngine
+    except ImportError:
+        sys.exit("Fixing smells requires libcst: pip install libcst")
+    verifier = None
+    if verify:
+        try:
+            from engines.fix_verifier import FixVerifier
+        except ImportError:
+            sys.exit("Verifying fixes requires numpy: pip install numpy")
+        verifier = FixVerifier()
+    return FixEngine(project=ProjectIndex(root), verifier=verifier)
+
+def fix_smells(fix_engine, smells: List[Smell], path: str, source_code: str, args: argparse.Namespace):
+    """
+    Prints the fixes of the smells of a file as a diff, or rewrites the file with them, as requested.
+    """
+    fixes = fix_engine.propose(source_code, smells, path)
+    fixed_source, applied, conflicting = fix_engine.apply(source_code, fixes)
+    if not applied:
+        return
+    if args.diff:
+        print(fix_engine.diff(os.path.relpath(path) if os.path.exists(path) else path, source_code, fixed_source), end="")
+    for fix in applied:
+        if fix.verification is not None:
+            print(f"Verified fix on line {fix.start_line} ({fix.title}): same values on {fix.verification.trials} "
+                  f"random inputs, {fix.verification.speedup:.1f}x faster")
+    if args.fix:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(fixed_source)
+        later = f" ({len(conflicting)} overlapping fixes left for another run)" if conflicting else ""
+        print(f"\nFixed {len(applied)} of {len(smells)} smells in {path}{later}")
+    elif conflicting:
+        print(f"\n{len(conflicting)} overlapping fixes of {path} left out of the diff, to be proposed once it is applied")
+
+def check_scores(scores: List[FileScore], failed: List[str], root: str, args: argparse.Namespace) -> bool:
+    """
+    Saves the scores as a baseline if requested, and compares them with a baseline if a maximum regression is set.
+    Files that could not be analyzed have no score, so that they fail the comparison rather than go unnoticed.
+
+    :param failed: The paths of the files that could not be analyzed.
+    :return: False if a score regressed by more than allowed, or a file could not be analyzed for the comparison.
+    """
+    current = {os.path.relpath(score.path, root): score.score for score in scores}
+    current[""] = project_score(scores)
+    if args.save_score:
+        with open(args.save_score, "w") as file:
+            json.dump({"version": SCORE_BASELINE_VERSION, "scores": current}, file, indent=2, sort_keys=True)
+    if args.max_score_regression is None:
+        return True
+
+    with open(args.score_baseline, "r") as file:
+        baseline = json.load(file)
+    if baseline.get("version") != SCORE_BASELINE_VERSION:
+        sys.exit(f"Expected a score baseline of version {SCORE_BASELINE_VERSION}, got {baseline.get('version')}.")
+    regressions = score_regressions(baseline["scores"], current, args.max_score_regression)
+    for key, before, after in regressions:
+        print(f"Energy score regression: {key or 'project'} went from {before:.1f} to {after:.1f}")
+    for path in failed:
+        print(f"Energy score unknown: {os.path.relpath(path, root)} could not be analyzed")
+    return not regressions and not failed
+
+# Example
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["trace"]:
+        run_trace(parse_trace_args(sys.argv[2:]))
+        sys.exit(0)
+
+    args = parse_args()
+
+    if args.serve:
+        # Serve the editor extension until it closes stdin
+        project = ProjectIndex(args.project_root) if args.project_root else None
+        AnalysisServer(io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8"), project=project).serve()
+        sys.exit(0)
+
+    profile = None
+    if args.profile_data:
+        try:
+            profile = ProfileData.load(args.profile_data)
+        except (OSError, ProfileFormatError) as e:
+            sys.exit(f"Could not load profile data: {e}")
+
+    directory = args.file_path not in (None, "-") and os.path.isdir(args.file_path)
+    if args.file_path in (None, "-"):
+        paths = [args.stdin_filename or "<stdin>"]
+    elif directory:
+        paths = find_python_files(args.file_path)
+    else:
+        paths = [args.file_path]
+    root = args.project_root or (args.file_path if directory else os.path.dirname(os.path.abspath(paths[0])))
+
+    memory = None
+    if args.trace_memory:
+        try:
+            memory = MemoryProfile.trace(args.trace_memory, paths)
+        except EntryRunError as e:
+            sys.exit(f"Could not trace memory: {e}")
+
+    pandas = None
+    if args.trace_pandas:
+        try:
+            pandas = PandasProfile.trace(args.trace_pandas, paths)
+        except EntryRunError as e:
+            sys.exit(f"Could not trace pandas: {e}")
+        if not pandas.available:
+            sys.exit("Could not trace pandas: it is not installed for the entry script.")
+
+    fix_engine = load_fix_engine(root, args.verify_fixes) if args.fix or args.diff else None
+
+    scores = []
+    failed = []
+    if args.file_path in (None, "-"):
+        # Analyze the source piped on stdin, without touching the disk
+        source_code = sys.stdin.buffer.read().decode("utf-8")
+        collector = SmellEngine(paths[0], project=ProjectIndex(root), limits=analysis_limits(args))
+        try:
+            if paths[0].endswith(".ipynb"):
+                notebook = NotebookSource.parse(source_code)
+                source_code = notebook.source
+                smells = collector.analyze_notebook(notebook)
+            else:
+                smells = collector.analyze_smells(source_code)
+        except GeneratedFileError as e:
+            print(f"Skipped {paths[0]} (generated file): {e}")
+            sys.exit(0)
+        except ValueError as e:
+            sys.exit(f"Could not analyze {paths[0]}: {e}")
+        lines = source_code.count("\n") + 1
+        scores.append(report(smells, paths[0], lines, args, profile, memory, pandas, source_code))
+        print_partial(collector.partial_rules)
+        if fix_engine is not None and not paths[0].endswith(".ipynb"):
+            fix_smells(fix_engine, smells, paths[0], source_code, args)
+    else:
+        # Summaries of the functions each module imports are shared by all files of the project
+        cache = ResultCache(args.cache_dir, analysis_limits(args)) if args.cache_dir else None
+        max_worker_memory = args.max_worker_memory * 2 ** 20 if args.max_worker_memory is not None else None
+        scanner = ProjectScanner(root, jobs=args.jobs, cache=cache, limits=analysis_limits(args),
+                                 max_tasks_per_worker=args.max_tasks_per_worker, max_worker_memory=max_worker_memory)
+        for result in scanner.scan(paths):
+            if directory:
+                print(f"\n{result.path}")
+            if result.error is not None:
+                if not directory:
+                    sys.exit(f"Could not analyze {result.path}: {result.error}")
+                print(f"Skipped: {result.error}")
+                failed.append(result.path)
+                continue
+            if result.skipped is not None:
+                print(f"Skipped (generated file): {result.skipped}" if directory
+                      else f"Skipped {result.path} (generated file): {result.skipped}")
+                continue
+            source_code = None
+            if profile is not None and result.path.endswith(".ipynb"):
+                source_code = NotebookSource.load(result.path).source
+            elif profile is not None or memory is not None:
+                with open(result.path, "r", encoding="utf-8") as file:
+                    source_code = file.read()
+            scores.append(report(result.smells, result.path, result.lines, args, profile, memory, pandas, source_code))
+            print_partial(result.partial_rules)
+            if fix_engine is not None and result.path.endswith(".py"):
+                with open(result.path, "r", encoding="utf-8") as file:
+                    fix_smells(fix_engine, result.smells, result.path, file.read(), args)
+        if directory:
+            failed_info = f" ({len(failed)} more could not be analyzed)" if failed else ""
+            print(f"\nProject Energy Score: {project_score(scores):.1f}/100 over {len(scores)} files{failed_info}")
+
+    if not check_scores(scores, failed, root, args):
+        sys.exit(1)
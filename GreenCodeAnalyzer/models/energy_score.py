@@ -0,0 +1,110 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+from models.smell import Smell
+
+# Version of the score baseline format, bumped when scores are computed differently
+SCORE_BASELINE_VERSION = 3
+
+# Score of a file without smells
+MAX_SCORE = 100.0
+
+# Weighted penalty dividing the score of a file by e (about 37/100): the score decays exponentially with the
+# weighted penalty, so that it drops by about one point per point of penalty at first, and never reaches 0
+SCORE_DECAY = 100.0
+
+# Penalty assumed for the smells of rules that are not calibrated: one doubling of the time they take (the
+# points_per_doubling of rules/penalties.json), so that they lower the score without outweighing measured rules
+DEFAULT_PENALTY = 5.0
+
+@dataclass
+class FileScore:
+    """
+    The static energy score of a file.
+
+    Attributes:
+        - path (str): The path of the file.
+        - score (float): 100 decayed exponentially by the weighted penalties of its smells (see score_file()).
+        - weighted_penalty (float): The sum of the penalties of its smells, weighted by how often they run.
+        - smells (int): The number of smells of the file.
+        - uncalibrated (int): The number of smells weighed with DEFAULT_PENALTY (rules that are not calibrated).
+        - lines (int): The number of lines of the file, which weigh its score in the project's.
+    """
+    path: str
+    score: float
+    weighted_penalty: float
+    smells: int
+    uncalibrated: int
+    lines: int
+
+    def __str__(self):
+        """String representation."""
+        uncalibrated_info = f", {self.uncalibrated} at default penalty" if self.uncalibrated else ""
+        return f"Energy Score: {self.score:.1f}/100 ({self.smells} smells{uncalibrated_info})"
+
+def smell_weight(smell: Smell) -> float:
+    """
+    Returns the penalty of a smell weighted by its loop nest: one more point of weight per factor of 10 in
+    its estimated runs, so that a smell in a loop of 100 iterations weighs three times its penalty.
+    The runs of a smell's own loop are left out when its penalty is already scaled to the loop's size.
+    Smells of rules that are not calibrated weigh DEFAULT_PENALTY (their cost is then their runs).
+    """
+    if smell.penalty is None:
+        penalty = DEFAULT_PENALTY
+        runs = smell.cost if smell.cost else 1.0
+    else:
+        penalty = smell.penalty
+        runs = smell.cost / smell.penalty if smell.cost and smell.penalty else 1.0
+    if smell.own_loop_runs:
+        runs /= smell.own_loop_runs
+    return penalty * (1.0 + math.log10(max(runs, 1.0)))
+
+def score_file(path: str, smells: List[Smell], lines: int) -> FileScore:
+    """
+    Scores a file from its smells, as detected with their penalties and estimated costs: 100 times
+    exp(-weighted penalty / SCORE_DECAY), so that new smells lower the score of even the smelliest files.
+
+    :param path: The path of the file.
+    :param smells: The smells of the file, each once.
+    :param lines: The number of lines of the file.
+    :return: The score of the file.
+    """
+    weighted = sum(smell_weight(smell) for smell in smells)
+    return FileScore(
+        path=path,
+        score=MAX_SCORE * math.exp(-weighted / SCORE_DECAY),
+        weighted_penalty=round(weighted, 2),
+        smells=len(smells),
+        uncalibrated=sum(1 for smell in smells if smell.penalty is None),
+        lines=lines
+    )
+
+def project_score(scores: Iterable[FileScore]) -> float:
+    """
+    Returns the score of a project: the mean score of its files weighted by their number of lines.
+    """
+    scores = list(scores)
+    if not scores:
+        return MAX_SCORE
+    total_lines = sum(max(score.lines, 1) for score in scores)
+    return sum(score.score * max(score.lines, 1) for score in scores) / total_lines
+
+def score_regressions(
+    baseline: Dict[str, float],
+    scores: Dict[str, float],
+    max_regression: float
+) -> List[Tuple[str, float, float]]:
+    """
+    Returns the scores that dropped by more than the allowed regression since a baseline. Files missing from
+    the baseline are compared to a perfect score, so that new smelly files count as regressions.
+
+    :param baseline: The previous scores, by file (and '' for the project).
+    :param scores: The current scores, keyed the same way.
+    :param max_regression: The allowed drop in points.
+    :return: The (key, previous score, current score) of every regression.
+    """
+    return [
+        (key, baseline.get(key, MAX_SCORE), score)
+        for key, score in sorted(scores.items())
+        if baseline.get(key, MAX_SCORE) - score > max_regression
+    ]
@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+@dataclass
+class TextEdit:
+    """
+    A replacement of a range of a source file.
+
+    Attributes:
+        - start_line (int): The line the range starts at (from 1).
+        - start_column (int): The column the range starts at (from 0).
+        - end_line (int): The line the range ends at (from 1).
+        - end_column (int): The column the range ends before (from 0).
+        - new_text (str): The text replacing the range; an empty range inserts it.
+        - shared (bool): Whether other fixes may make the same edit (e.g., an import they all need), in which
+          case it is made once when they are applied together.
+    """
+    start_line: int
+    start_column: int
+    end_line: int
+    end_column: int
+    new_text: str
+    shared: bool = False
+
+    def overlaps(self, other: "TextEdit") -> bool:
+        """
+        Checks if two edits touch the same text. Insertions at the same position overlap too,
+        as the order they would be applied in is ambiguous, unless they are the same shared edit.
+        """
+        if self.shared and self == other:
+            return False
+        start, end = (self.start_line, self.start_column), (self.end_line, self.end_column)
+        other_start, other_end = (other.start_line, other.start_column), (other.end_line, other.end_column)
+        if start == other_start:
+            return True
+        return start < other_end and other_start < end
+
+@dataclass
+class Verification:
+    """
+    The outcome of running the code of a smell and its fix on the same random inputs.
+
+    Attributes:
+        - equivalent (bool): Whether both versions left the same values in every input they ran on.
+        - trials (int): The number of inputs both versions ran on; inputs the original code fails on are skipped.
+        - original_seconds (Optional[float]): The time of the original code on the timing input.
+        - fixed_seconds (Optional[float]): The time of the fixed code on the timing input.
+        - reason (Optional[str]): Why the fix was rejected, if it was.
+    """
+    equivalent: bool
+    trials: int = 0
+    original_seconds: Optional[float] = None
+    fixed_seconds: Optional[float] = None
+    reason: Optional[str] = None
+
+    @property
+    def speedup(self) -> Optional[float]:
+        """
+        How many times faster the fixed code ran, if both versions were timed.
+        """
+        if not self.original_seconds or not self.fixed_seconds:
+            return None
+        return self.original_seconds / self.fixed_seconds
+
+    @property
+    def passed(self) -> bool:
+        """
+        Whether the fix computes the same values and is faster.
+        """
+        return self.equivalent and self.reason is None and self.speedup is not None and self.speedup > 1
+
+@dataclass
+class Fix:
+    """
+    A rewrite of the code of a smell that removes it, as a batch of edits applied together.
+
+    Attributes:
+        - rule_id (str): The ID of the rule that detected the smell.
+        - title (str): What the fix does, as shown to the user (e.g., 'Replace the loop with np.sum()').
+        - start_line (int): The line of the fixed smell.
+        - edits (List[TextEdit]): The edits of the fix, which do not overlap each other.
+        - verification (Optional[Verification]): The outcome of running the fix against the original code, if it was.
+    """
+    rule_id: str
+    title: str
+    start_line: int
+    edits: List[TextEdit] = field(default_factory=list)
+    verification: Optional[Verification] = None
+
+    def overlaps(self, other: "Fix") -> bool:
+        """
+        Checks if any edit of two fixes touch the same text, in which case they cannot both be applied.
+        """
+        return any(edit.overlaps(other_edit) for edit in self.edits for other_edit in other.edits)
@@ -15,6 +15,24 @@ class Smell:
           If null, assume smell only covers single line.
         - optimization (Optional[str]): Possible solution or solutions for the energy code smell, if available.
         - penalty (Optional[float]): The penalty applied to the energy score due to the smell, if applicable.
+        - cost (Optional[float]): How costly the smell is estimated to be: the number of times its code runs per
+          execution of its enclosing loops, weighted by the penalty if any. Higher costs should be fixed first.
+        - runs (Optional[str]): The estimated number of runs as an expression of the source (e.g., '10 * len(df)'),
+          if the smell is inside a loop.
+        - own_loop_runs (Optional[float]): The part of its estimated runs its own loop accounts for (the loop's trip
+          count, or the one assumed if unknown), if the smell is a loop whose penalty is already scaled to its size.
+        - measured_time (Optional[float]): The seconds a profiled run spent in the smell's code, if profile data was given.
+        - allocated_bytes (Optional[int]): The bytes the smell's lines allocated during a traced run, if memory was traced.
+        - allocations (Optional[int]): How many executions of the smell's lines allocated memory during a traced run.
+        - executions (Optional[int]): How many times the smell's code ran during a traced run; 0 if it is cold.
+        - execution_time (Optional[float]): The seconds spent on the smell's lines during a traced run.
+        - frame_calls (Optional[int]): How many DataFrame operations (e.g., groupby) the smell's lines ran during
+          a traced run, for pandas smells.
+        - frame_rows (Optional[int]): The rows of the frames those operations were given.
+        - frame_time (Optional[float]): The seconds those operations took.
+        - wasted_time (Optional[float]): The part of those seconds spent redoing earlier work or on avoidable overhead.
+        - cell (Optional[int]): The notebook cell the smell occurs in (counted from 1), if the file is a notebook.
+          Its lines are then relative to the cell.
     """
     rule_id: str
     rule_name: str
@@ -23,13 +41,44 @@ class Smell:
     end_line: Optional[int] = None
     optimization: Optional[str] = None
     penalty: Optional[float] = None
+    cost: Optional[float] = None
+    runs: Optional[str] = None
+    own_loop_runs: Optional[float] = None
+    measured_time: Optional[float] = None
+    allocated_bytes: Optional[int] = None
+    allocations: Optional[int] = None
+    executions: Optional[int] = None
+    execution_time: Optional[float] = None
+    frame_calls: Optional[int] = None
+    frame_rows: Optional[int] = None
+    frame_time: Optional[float] = None
+    wasted_time: Optional[float] = None
+    cell: Optional[int] = None
 
     def __str__(self):
         """String representation."""
         line_info = f"Lines {self.start_line}-{self.end_line}" if self.end_line else f"Line {self.start_line}"
+        if self.cell is not None:
+            line_info = f"Cell {self.cell}, {line_info}"
         optimization_info = f", Optimization: {self.optimization}" if self.optimization else ""
         penalty_info = f", Penalty: {self.penalty:.2f}" if self.penalty is not None else ""
+        runs_info = f", Estimated Runs: {self.runs} (cost {self.cost:g})" if self.runs is not None else ""
+        time_info = f", Measured Time: {self.measured_time:.3g}s" if self.measured_time is not None else ""
+        memory_info = (f", Allocated: {self.allocated_bytes} bytes in {self.allocations} executions"
+                       if self.allocated_bytes is not None else "")
+        if self.executions is None:
+            execution_info = ""
+        elif self.executions == 0:
+            execution_info = ", Executed: never (cold)"
+        else:
+            execution_info = f", Executed: {self.executions} times / {1000 * (self.execution_time or 0):.1f} ms"
+        if self.frame_calls is None:
+            frame_info = ""
+        else:
+            wasted_info = f", {1000 * self.wasted_time:.1f} ms wasted" if self.wasted_time is not None else ""
+            frame_info = (f", Pandas Calls: {self.frame_calls} on {self.frame_rows} rows / "
+                          f"{1000 * (self.frame_time or 0):.1f} ms{wasted_info}")
         return (f"Rule ID: {self.rule_id}, Rule Name: {self.rule_name}, "
-                f"Description: {self.description}{penalty_info}"
+                f"Description: {self.description}{penalty_info}{runs_info}{time_info}{memory_info}{execution_info}{frame_info}"
                 f"{optimization_info}, "
                 f"Affected Line(s): {line_info}")
\ No newline at end of file
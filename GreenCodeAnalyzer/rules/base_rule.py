@@ -1,7 +1,22 @@
 import ast
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterator, Optional
 from models.smell import Smell
+from analysis.context import AnalysisContext
+from rules.penalty_table import PenaltyTable
+
+# Dependency models used by the RuleEngine to decide when cached results can be reused
+UNIT_DEPENDENCY = "unit"        # Results only depend on the enclosing top-level function, class or statement
+IMPORTS_DEPENDENCY = "imports"  # Results depend on the enclosing top-level unit and on the module's imports
+FACTS_DEPENDENCY = "facts"      # Results depend on the enclosing top-level unit and on the module-level facts of the AnalysisContext
+MODULE_DEPENDENCY = "module"    # Results depend on the whole module
+
+class RuleBudgetExceeded(Exception):
+    """
+    Raised when a rule goes over its time budget in the middle of a node (see BaseRule.check_deadline()).
+    """
+    pass
 
 class BaseRule(ABC):
     """
@@ -13,7 +28,15 @@ class BaseRule(ABC):
     - description (str): A default description explaining the energy code smell.
     - optimization (Optional[str]): A default suggestion for fixing the detected smell, if available.
     - penalty (Optional[float]): The penalty applied to the energy score due to the smell, which starts at 100.
+      Defaults to the rule's calibrated penalty in the penalty table, if any.
+    - dependency (str): What the results of the rule depend on (UNIT_DEPENDENCY, IMPORTS_DEPENDENCY,
+      FACTS_DEPENDENCY or MODULE_DEPENDENCY). Defaults to the whole module, which is always safe.
+    - context (Optional[AnalysisContext]): The shared analyses of the module being analyzed, bound by the engine.
+    - deadline (Optional[float]): The time.perf_counter() time at which the rule goes over its budget on the file
+      being analyzed, set by the engine while the rule runs, if its work is limited.
     """
+    dependency: str = MODULE_DEPENDENCY
+
     def __init__(
         self,
         id: str,
@@ -26,7 +49,9 @@ class BaseRule(ABC):
         self.name: str = name
         self.description: str = description
         self.optimization: Optional[str] = optimization
-        self.penalty: Optional[float] = penalty
+        self.penalty: Optional[float] = penalty if penalty is not None else PenaltyTable.default().penalty(id)
+        self.context: Optional[AnalysisContext] = None
+        self.deadline: Optional[float] = None
     
     @abstractmethod
     def should_apply(self, node: ast.AST) -> bool:
@@ -48,6 +73,21 @@ class BaseRule(ABC):
         """
         pass
     
+    def bind(self, context: AnalysisContext) -> None:
+        """
+        Gives the rule access to the shared analyses (e.g., type inference) of the module about to be analyzed.
+
+        :param context: The analysis context of the module.
+        """
+        self.context = context
+
+    def reset(self) -> None:
+        """
+        Clears any state collected while processing a module, so the rule can be applied again.
+        Only rules that keep state between nodes need to override this.
+        """
+        pass
+
     def process_node(self, node: ast.AST) -> list[Smell]:
         """
         Checks if the rule should be applied to the node, and if so, applies it.
@@ -57,4 +97,25 @@ class BaseRule(ABC):
         """
         if self.should_apply(node):
             return self.apply_rule(node)
-        return []
\ No newline at end of file
+        return []
+
+    def check_deadline(self) -> None:
+        """
+        Stops the rule if it went over its time budget, so that rules walking a large node (e.g., the module)
+        do not run past it before the engine gets to check it again between nodes.
+
+        :raises RuleBudgetExceeded: If the deadline of the rule passed.
+        """
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise RuleBudgetExceeded()
+
+    def walk(self, node: ast.AST) -> Iterator[ast.AST]:
+        """
+        Yields the node and its descendants like ast.walk(), checking the deadline of the rule as it goes.
+
+        :param node: An individual AST node.
+        :raises RuleBudgetExceeded: If the deadline of the rule passed.
+        """
+        for child in ast.walk(node):
+            self.check_deadline()
+            yield child
@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 
 class BatchMatrixMultiplicationRule(BaseRule):
     """
@@ -13,6 +13,7 @@ class BatchMatrixMultiplicationRule(BaseRule):
         "Replace loop with batch operations like numpy.matmul(A, B), torch.bmm(A, B), or tf.linalg.matmul(A, B), "
         "where A and B are higher-dimensional arrays."
     )
+    dependency = UNIT_DEPENDENCY
 
     def __init__(self):
         super().__init__(id=self.id, name=self.name, description=self.description, optimization=self.optimization)
@@ -7,7 +7,8 @@ sys.path.insert(0, root_dir)
 
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, IMPORTS_DEPENDENCY
+from rules.host_resources import HostResources
 
 class BlockingDataLoadersRule(BaseRule):
     """
@@ -19,12 +20,17 @@ class BlockingDataLoadersRule(BaseRule):
     name = "Blocking Data Loaders"
     description = "Prevent using data loading strategies that stall GPU execution (e.g., single-process or sequential data loading). If the DataLoader is set up without sufficient concurrency (num_workers=0) or uses blocking I/O, the GPU may remain idle while waiting for data. Asynchronous data loading keeps the GPU busy more consistently, reducing overall epoch time and energy."
     optimization = "Use num_workers > 0 in DataLoader. For advanced scenarios, use background threads or prefetch queues."
+    dependency = IMPORTS_DEPENDENCY
     
     def __init__(self):
         super().__init__(id=self.id,
                          name=self.name, 
                          description=self.description, 
                          optimization=self.optimization)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears the DataLoader imports tracked in the previous module"""
         self.dataloader_imports = set()  # Track DataLoader imports
 
     def should_apply(self, node: ast.AST) -> bool:
@@ -67,7 +73,7 @@ class BlockingDataLoadersRule(BaseRule):
                 rule_name=self.name,
                 description=self.description,
                 penalty=self.penalty,
-                optimization=self.optimization,
+                optimization=f"{self.optimization} {HostResources.probe().loader_suggestion()}",
                 start_line=node.lineno
             )]
         
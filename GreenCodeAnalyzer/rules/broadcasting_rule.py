@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 
 class BroadcastingRule(BaseRule):
     """
@@ -11,6 +11,7 @@ class BroadcastingRule(BaseRule):
     name = "Broadcasting"
     description = "Use of tile where broadcasting would be more memory-efficient. Broadcasting avoids storing intermediate tiled results."
     optimization = "Leverage implicit broadcasting to perform operations directly, avoiding explicit tiling. For example, use 'a + b' instead of 'a + tf.tile(b, [1, 2])' if shapes are compatible."
+    dependency = UNIT_DEPENDENCY
 
     def __init__(self):
         super().__init__(id=self.id,
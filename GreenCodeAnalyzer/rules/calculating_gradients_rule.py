@@ -1,6 +1,8 @@
 import ast
+from typing import Callable
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, MODULE_DEPENDENCY
+from analysis.type_inference import TypeInference, TORCH_MODEL, TF_MODEL, attribute_chain
 
 class CalculatingGradientsRule(BaseRule):
     """
@@ -11,6 +13,7 @@ class CalculatingGradientsRule(BaseRule):
     name = "Calculating Gradients"
     description = "Unnecessary gradient tracking during inference increases computational cost."
     optimization = "Disable gradient tracking for inference to improve energy efficiency."
+    dependency = MODULE_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -20,10 +23,6 @@ class CalculatingGradientsRule(BaseRule):
             optimization=self.optimization
         )
 
-        # Declare model bases to detect custom classes that inherit from them
-        self.pytorch_model_bases = {'nn.Module'}
-        self.tensorflow_model_bases = {'tf.keras.Model', 'tf.keras.layers.Layer'}
-
     def should_apply(self, node: ast.AST) -> bool:
         """
         Applies this rule to FunctionDef nodes and at the Module level.
@@ -34,10 +33,23 @@ class CalculatingGradientsRule(BaseRule):
         """
         Creates a GradientTrackingVisitor to walk the AST, then collects and returns any identified smells.
         """
+        types = self.context.types
+
+        # Only models assigned within the analyzed node are considered, as in a standalone script
+        models = types.names_of_kind({TORCH_MODEL, TF_MODEL})
+        if not models:
+            return []
+        assigned = {
+            ".".join(attribute_chain(target))
+            for child in self.walk(node) if isinstance(child, ast.Assign)
+            for target in child.targets
+        }
+
         visitor = self.GradientTrackingVisitor(
             is_module=isinstance(node, ast.Module),
-            pytorch_model_bases=self.pytorch_model_bases,
-            tensorflow_model_bases=self.tensorflow_model_bases
+            types=types,
+            models=models & assigned,
+            check_deadline=self.check_deadline
         )
         visitor.visit(node)
         smells = []
@@ -69,25 +81,23 @@ class CalculatingGradientsRule(BaseRule):
     class GradientTrackingVisitor(ast.NodeVisitor):
         """
         AST Visitor that tracks:
-          - PyTorch or TF model instantiations (including user-defined classes that inherit).
           - Entry and exit of torch.no_grad() and tf.GradientTape() contexts.
-          - Calls to recognized models, and whether they are inside or outside relevant contexts.
+          - Calls to models recognized by the shared type inference (including instances of user-defined
+            classes that inherit from nn.Module, tf.keras.Model or tf.keras.layers.Layer), and whether they are inside or outside relevant contexts.
           - Whether .backward() or tape.gradient() is called.
         """
 
-        def __init__(self, is_module: bool, pytorch_model_bases: set, tensorflow_model_bases: set):
+        def __init__(self, is_module: bool, types: TypeInference, models: set, check_deadline: Callable[[], None]):
             """
             :param is_module: True if analyzing the top-level module node.
-            :param pytorch_model_bases: Set of PyTorch base classes to detect inheritance.
-            :param tensorflow_model_bases: Set of TensorFlow base classes to detect inheritance.
+            :param types: The type inference of the module, which tells the kinds of models variables hold.
+            :param models: Variable or attribute names that may hold a model and are assigned in the analyzed node.
+            :param check_deadline: Stops the visit when the rule goes over its time budget.
             """
             self.is_module = is_module
-            self.pytorch_model_bases = pytorch_model_bases
-            self.tensorflow_model_bases = tensorflow_model_bases
-
-            # Sets of variable or attribute names recognized as PyTorch/TF models
-            self.pytorch_models = set()
-            self.tensorflow_models = set()
+            self.types = types
+            self.models = models
+            self.check_deadline = check_deadline
 
             # Stack counters for context managers
             self.inside_no_grad = 0
@@ -103,53 +113,23 @@ class CalculatingGradientsRule(BaseRule):
 
             super().__init__()
 
-        def visit_Module(self, node: ast.Module):
+        def visit(self, node: ast.AST):
             """
-            Scans the module body for class definitions that inherit from PyTorch/TF bases,
-            then visits child nodes.
+            Visits a node, unless the rule went over its time budget.
             """
-            for item in node.body:
-                if isinstance(item, ast.ClassDef):
-                    self.check_class_definition(item)
-            self.generic_visit(node)
-
-        def visit_ClassDef(self, node: ast.ClassDef):
-            """
-            Checks if this class inherits from nn.Module, tf.keras.Model, or tf.keras.layers.Layer.
-            """
-            self.check_class_definition(node)
-            self.generic_visit(node)
+            self.check_deadline()
+            return super().visit(node)
 
         def visit_FunctionDef(self, node: ast.FunctionDef):
             """
-            Visits a function definition.
-            Continues visiting children for assignments, calls, etc.
+            Counts functions decorated with @torch.no_grad() or @torch.inference_mode() as no_grad contexts.
             """
-            self.generic_visit(node)
-
-        def visit_Assign(self, node: ast.Assign):
-            """
-            Detects PyTorch or TF model creation assigned to variables.
-            """
-            if isinstance(node.value, ast.Call):
-                # Check if the call references a recognized framework or a custom class
-                framework = self.infer_framework_from_call(node.value)
-                
-                # Store the target name or attribute in the appropriate set
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and framework:
-                        if framework == 'pytorch':
-                            self.pytorch_models.add(target.id)
-                        else:
-                            self.tensorflow_models.add(target.id)
-                    elif isinstance(target, ast.Attribute) and framework:
-                        attr_str = self.get_full_attr_name(target)
-                        if framework == 'pytorch':
-                            self.pytorch_models.add(attr_str)
-                        else:
-                            self.tensorflow_models.add(attr_str)
-
-            self.generic_visit(node)
+            if any(self.disables_gradients(decorator) for decorator in node.decorator_list):
+                self.inside_no_grad += 1
+                self.generic_visit(node)
+                self.inside_no_grad -= 1
+            else:
+                self.generic_visit(node)
 
         def visit_With(self, node: ast.With):
             """
@@ -190,51 +170,20 @@ class CalculatingGradientsRule(BaseRule):
 
             self.generic_visit(node)
 
-        def check_class_definition(self, node: ast.ClassDef):
-            """
-            Checks if a class inherits from known PyTorch/TF bases (e.g. nn.Module),
-            then marks that class name as a recognized model class.
-            """
-            for base in node.bases:
-                base_chain = self.get_attribute_chain(base)
-                joined = ".".join(base_chain)
-                if joined in self.pytorch_model_bases:
-                    self.pytorch_models.add(node.name)
-                elif joined in self.tensorflow_model_bases:
-                    self.tensorflow_models.add(node.name)
-
-        def infer_framework_from_call(self, call_node: ast.Call) -> str | None:
+        def is_no_grad(self, node: ast.With) -> bool:
             """
-            Infers if a call is creating a PyTorch or TF model (or a subclass).
-            Returns 'pytorch', 'tensorflow', or None if not recognized.
+            Checks if this 'with' statement is 'with torch.no_grad():' or 'with torch.inference_mode():'
             """
-            func_chain = self.get_attribute_chain(call_node.func)
-            joined = ".".join(func_chain)
-
-            # If it's a user-defined class recognized as PyTorch or TF
-            if any(cls in self.pytorch_models for cls in func_chain):
-                return 'pytorch'
-            if any(cls in self.tensorflow_models for cls in func_chain):
-                return 'tensorflow'
-
-            # If it's part of torch.nn.*
-            if "torch" in func_chain or "nn" in func_chain:
-                return 'pytorch'
-
-            # If it's part of tf.keras.*
-            if func_chain[:2] == ["tf", "keras"]:
-                return 'tensorflow'
-
-            return None
+            return bool(node.items) and self.disables_gradients(node.items[0].context_expr)
 
-        def is_no_grad(self, node: ast.With) -> bool:
+        def disables_gradients(self, node: ast.expr) -> bool:
             """
-            Checks if this 'with' statement is 'with torch.no_grad():'
+            Checks if an expression is 'torch.no_grad()' or 'torch.inference_mode()', called or not (as a decorator).
             """
-            if node.items and isinstance(node.items[0].context_expr, ast.Call):
-                func_chain = self.get_attribute_chain(node.items[0].context_expr.func)
-                return func_chain == ["torch", "no_grad"]
-            return False
+            func = node.func if isinstance(node, ast.Call) else node
+            if self.types.qualified_name(func) in ("torch.no_grad", "torch.inference_mode"):
+                return True
+            return self.get_attribute_chain(func) in (["torch", "no_grad"], ["torch", "inference_mode"])
 
         def is_gradient_tape(self, node: ast.With) -> bool:
             """
@@ -249,15 +198,20 @@ class CalculatingGradientsRule(BaseRule):
             """
             Checks if this call is to a known PyTorch model variable/attribute.
             """
-            func_name = self.get_full_func_name(node.func)
-            return func_name in self.pytorch_models
+            return self.is_model_call(node, TORCH_MODEL)
 
         def is_tf_model_call(self, node: ast.Call) -> bool:
             """
             Checks if this call is to a known TF model variable/attribute.
             """
+            return self.is_model_call(node, TF_MODEL)
+
+        def is_model_call(self, node: ast.Call, kind: str) -> bool:
+            """
+            Checks if the called variable/attribute may hold a model of the given kind.
+            """
             func_name = self.get_full_func_name(node.func)
-            return func_name in self.tensorflow_models
+            return func_name in self.models and kind in self.types.kinds(func_name, node)
 
         def is_backward_call(self, node: ast.Call) -> bool:
             """
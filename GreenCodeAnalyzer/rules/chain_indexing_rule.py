@@ -1,6 +1,8 @@
 import ast
+from typing import Callable
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, MODULE_DEPENDENCY
+from analysis.type_inference import TypeInference, DATAFRAME
 
 class ChainIndexingRule(BaseRule):
     """
@@ -14,6 +16,7 @@ class ChainIndexingRule(BaseRule):
         "increasing memory and CPU usage."
     )
     optimization = "Use df.loc[:, ('one', 'two')] or a single indexing call for efficiency."
+    dependency = MODULE_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -25,49 +28,40 @@ class ChainIndexingRule(BaseRule):
 
     def should_apply(self, node: ast.AST) -> bool:
         """
-        Run this rule on the entire module node so the visitor can see:
-          - Assignments of 'df' to pd.DataFrame(...)
-          - Subscript nodes for chained indexing
+        Run this rule on the entire module node so the visitor can see every Subscript node.
         """
         return isinstance(node, ast.Module)
 
     def apply_rule(self, node: ast.AST) -> list[Smell]:
         """
         Creates a ChainIndexingVisitor to walk the entire module's AST,
-        identifying any chain indexing in recognized Pandas DataFrames.
+        identifying any chain indexing in Pandas DataFrames recognized by the shared type inference.
         """
-        visitor = self.ChainIndexingVisitor()
+        visitor = self.ChainIndexingVisitor(self.context.types, self.check_deadline)
         visitor.visit(node)
         return visitor.smells
 
     class ChainIndexingVisitor(ast.NodeVisitor):
         """
-        AST Visitor that:
-          - Identifies variables that are likely Pandas DataFrames.
-          - Flags chained indexing (df['A']['B']) on those DataFrame variables.
+        AST Visitor that flags chained indexing (df['A']['B']) on variables that may hold DataFrames.
         """
 
-        def __init__(self):
+        def __init__(self, types: TypeInference, check_deadline: Callable[[], None]):
+            """
+            :param types: The type inference of the module being visited.
+            :param check_deadline: Stops the visit when the rule goes over its time budget.
+            """
             super().__init__()
-            self.df_candidates = set()  # Variable names recognized as DataFrames
+            self.types = types
+            self.check_deadline = check_deadline
             self.smells = []
 
-        def visit_Assign(self, node: ast.Assign):
+        def visit(self, node: ast.AST):
             """
-            Attempts to identify DataFrame variables by checking if the right-hand side is:
-              - A call to pd.DataFrame(...)
-              - A call to pd.read_* (e.g. pd.read_csv, pd.read_excel, etc.)
+            Visits a node, unless the rule went over its time budget.
             """
-            if isinstance(node.value, ast.Call):
-                func_chain = self._get_attr_chain(node.value.func)
-
-                if len(func_chain) >= 2 and func_chain[0] == "pd":
-                    if func_chain[1] == "DataFrame" or func_chain[1].startswith("read_"):
-                        for target in node.targets:
-                            if isinstance(target, ast.Name):
-                                self.df_candidates.add(target.id)
-
-            self.generic_visit(node)
+            self.check_deadline()
+            return super().visit(node)
 
         def visit_Subscript(self, node: ast.Subscript):
             """
@@ -76,7 +70,7 @@ class ChainIndexingRule(BaseRule):
             if isinstance(node.value, ast.Subscript):
                 # Walk up to find the ultimate base name
                 base_name = self._get_subscript_root_name(node.value)
-                if base_name in self.df_candidates:
+                if base_name and DATAFRAME in self.types.kinds(base_name, node):
                     # Flag a smell for chained indexing
                     self.smells.append(
                         Smell(
@@ -89,20 +83,6 @@ class ChainIndexingRule(BaseRule):
                     )
             self.generic_visit(node)
             
-        def _get_attr_chain(self, node: ast.AST) -> list[str]:
-            """
-            Builds a list representing the fully qualified name of an attribute chain.
-            """
-            chain = []
-            current = node
-            while isinstance(current, ast.Attribute):
-                chain.append(current.attr)
-                current = current.value
-            if isinstance(current, ast.Name):
-                chain.append(current.id)
-            chain.reverse()
-            return chain
-
         def _get_subscript_root_name(self, node: ast.Subscript) -> str:
             """
             Walks up a chain of Subscripts to find the ultimate Name node.
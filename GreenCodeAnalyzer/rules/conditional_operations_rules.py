@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 
 class ConditionalOperationsRule(BaseRule):
     """
@@ -19,6 +19,7 @@ class ConditionalOperationsRule(BaseRule):
         "Use vectorized operations like np.where(), torch.where(), or DataFrame.loc with conditions "
         "instead of iterating through elements with loops."
     )
+    dependency = UNIT_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -157,7 +158,7 @@ class ConditionalOperationsRule(BaseRule):
         Check if the node accesses an array or DataFrame element using subscript notation
         or Pandas .loc/.iloc notation.
         """
-        for subnode in ast.walk(node):
+        for subnode in self.walk(node):
             # Standard subscript check (for lists, NumPy arrays, etc.)
             if isinstance(subnode, ast.Subscript):
                 # Check for pandas df.loc[i, "col"] pattern
@@ -7,7 +7,7 @@ sys.path.insert(0, root_dir)
 
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, IMPORTS_DEPENDENCY
 
 
 class DataParallelizationRule(BaseRule):
@@ -17,9 +17,14 @@ class DataParallelizationRule(BaseRule):
     optimization = ("Consider using torch.nn.parallel.DistributedDataParallel instead of torch.nn.DataParallel. "
                    "DDP is more efficient and scales better, even on a single node with multiple GPUs. "
                    "It provides better performance through more efficient communication and gradient synchronization.")
+    dependency = IMPORTS_DEPENDENCY
 
     def __init__(self):
         super().__init__(id=self.id, name=self.name, description=self.description, optimization=self.optimization)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears the DataParallel imports tracked in the previous module"""
         self.data_parallel_imports = set()  # Track DataParallel imports
 
     def should_apply(self, node: ast.AST) -> bool:
@@ -1,6 +1,7 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, FACTS_DEPENDENCY
+from analysis.type_inference import ARRAY_KINDS
 
 class ElementWiseOperartionsRule(BaseRule):
     """
@@ -13,6 +14,7 @@ class ElementWiseOperartionsRule(BaseRule):
     name = "Element-wise Operations"
     description = "Using loops for element-wise operations instead of vectorized operations wastes CPU/GPU cycles and memory."
     optimization = "Replace loops with vectorized operations (e.g., array + 1, tensor**2)."
+    dependency = FACTS_DEPENDENCY
     
     def __init__(self):
         super().__init__(
@@ -21,24 +23,18 @@ class ElementWiseOperartionsRule(BaseRule):
             description=self.description,
             optimization=self.optimization
         )
-        self.array_vars = set()
         
     def should_apply(self, node) -> bool:
         """
-        Applies to For loops and assignments that might create arrays/tensors.
+        Applies to For loops.
         """
-        return isinstance(node, (ast.For, ast.Assign))
+        return isinstance(node, ast.For)
     
     def apply_rule(self, node) -> list[Smell]:
         """
         Detects if the For loops perform element-wise operations on arrays/tensors.
         """
         smells = []
-        
-        # Track array/tensor variable creation
-        if isinstance(node, ast.Assign):
-            self._track_array_variables(node)
-            return smells
             
         # Check for element-wise operations in loops
         if isinstance(node, ast.For):
@@ -55,26 +51,11 @@ class ElementWiseOperartionsRule(BaseRule):
                 
         return smells
     
-    def _track_array_variables(self, node):
+    def _is_array(self, var_name: str, node: ast.AST) -> bool:
         """
-        Tracks variables that might be arrays or tensors based on their initialization.
+        Checks if the variable may hold an array or tensor where the node appears, according to the shared type inference.
         """
-        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
-            var_name = node.targets[0].id
-            value = node.value
-            
-            # Check if it's initialized with a known tensor/array constructor
-            if isinstance(value, ast.Call):
-                func = value.func
-                if isinstance(func, ast.Attribute):
-                    # Handle methods like torch.zeros_like, np.zeros, etc.
-                    if func.attr in {'zeros', 'ones', 'zeros_like', 'ones_like', 'empty', 'empty_like', 
-                                    'rand', 'randn', 'random', 'arange', 'linspace', 'array', 'tensor'}:
-                        self.array_vars.add(var_name)
-                elif isinstance(func, ast.Name):
-                    # Handle direct constructor calls
-                    if func.id in {'array', 'tensor'}:
-                        self.array_vars.add(var_name)
+        return not self.context.types.kinds(var_name, node).isdisjoint(ARRAY_KINDS)
     
     def _is_indexed_assignment_loop(self, node: ast.For) -> bool:
         """
@@ -94,7 +75,7 @@ class ElementWiseOperartionsRule(BaseRule):
                     isinstance(node.iter.args[0].args[0], ast.Name)):
                     # It's range(len(something))
                     array_name = node.iter.args[0].args[0].id
-                    if array_name in self.array_vars:
+                    if self._is_array(array_name, node):
                         is_range_iteration = True
                     
         if not is_range_iteration:
@@ -110,7 +91,7 @@ class ElementWiseOperartionsRule(BaseRule):
                     array_name = target.value.id
                     
                     # Check if we're doing assignment to a previously identified array
-                    if array_name in self.array_vars:
+                    if self._is_array(array_name, stmt):
                         # Check if we're also using the array in the right-hand side (common in element-wise ops)
                         rhs = stmt.value
                         if self._contains_same_array_access(rhs, array_name, node.target):
@@ -127,7 +108,7 @@ class ElementWiseOperartionsRule(BaseRule):
         Checks if an expression contains access to the same array with the loop variable.
         Example: `array[i] = array[i] + 1`
         """
-        for child in ast.walk(node):
+        for child in self.walk(node):
             if (isinstance(child, ast.Subscript) and
                 isinstance(child.value, ast.Name) and
                 child.value.id == array_name and
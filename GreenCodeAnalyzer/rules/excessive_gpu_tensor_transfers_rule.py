@@ -1,6 +1,9 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, FACTS_DEPENDENCY
+from analysis.call_graph import UNKNOWN_DEVICE
+from analysis.dataflow import DefUse, BIND
+from analysis.type_inference import TORCH_TENSOR, TORCH_MODEL, ARRAY
 
 class ExcessiveGPUTensorTransfersRule(BaseRule):
     """
@@ -19,6 +22,7 @@ class ExcessiveGPUTensorTransfersRule(BaseRule):
         "Minimize transfers by keeping tensors on the GPU for consecutive operations "
         "or batching transfers when possible."
     )
+    dependency = FACTS_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -37,52 +41,32 @@ class ExcessiveGPUTensorTransfersRule(BaseRule):
     def apply_rule(self, node: ast.FunctionDef) -> list[Smell]:
         """
         Analyzes the body of a function for excessive CPU-GPU tensor transfers by 
-        tracking variable lineage and device states.
+        tracking variable lineage, through the function's def-use chains, and device states.
         """
         smells = []
-        var_lineage = {}  # Maps variable names to their parent variable
+        dataflow = self.context.dataflow(node)
         origin_device_state = {}  # Tracks device states for variable origins
 
-        def find_root_origin(var_name: str) -> str:
-            """
-            Follows lineage backward to find the original ancestor variable, with cycle detection.
-            """
-            origin = var_name
-            visited = set()
-            while origin in var_lineage:
-                if origin in visited:
-                    return origin  # Break cycle and return last valid origin
-                visited.add(origin)
-                origin = var_lineage[origin]
-            return origin
-
-        for child in ast.walk(node):
+        for child in self.walk(node):
             # Process only single-target assignments
             if (
                 isinstance(child, ast.Assign)
                 and len(child.targets) == 1
                 and isinstance(child.targets[0], ast.Name)
             ):
-                target_name = child.targets[0].id
                 value = child.value
 
-                # Case A: Detect PyTorch device transfer calls
-                if (
-                    isinstance(value, ast.Call)
-                    and isinstance(value.func, ast.Attribute)
-                    and isinstance(value.func.value, ast.Name)
-                ):
-                    source_name = value.func.value.id
-                    attr_name = value.func.attr
+                # Case A: Detect PyTorch device transfer calls, and calls to helpers that move their argument
+                transfer = self._transfer_of(value)
+                if transfer is not None:
+                    source_name, current_device = transfer
 
-                    # Only process known PyTorch transfer methods
-                    current_device = self._parse_device_call(attr_name, value)
-                    if current_device is None:
-                        continue  # Skip if not a recognized device transfer
+                    # Skip values known not to live on a device (e.g., x.to() on a DataFrame)
+                    if not self._may_be_on_device(source_name, child):
+                        continue
 
-                    # Update lineage
-                    var_lineage[target_name] = source_name
-                    origin = find_root_origin(source_name)
+                    # Follow the definitions of the source back to the variable it derives from
+                    origin = self._find_root_origin(source_name, child, dataflow)
 
                     # Initialize device state for new origins
                     if origin not in origin_device_state:
@@ -112,15 +96,67 @@ class ExcessiveGPUTensorTransfersRule(BaseRule):
                     origin_device_state[origin]['last_device'] = current_device
                     origin_device_state[origin]['last_line'] = child.lineno
 
-                # Case B: Propagate lineage for binary operations
-                elif isinstance(value, ast.BinOp):
-                    if isinstance(value.left, ast.Name):
-                        src_name = value.left.id
-                        if src_name in var_lineage or src_name in origin_device_state:
-                            var_lineage[target_name] = src_name
-
         return smells
 
+    def _find_root_origin(self, var_name: str, node: ast.AST, dataflow: DefUse) -> str:
+        """
+        Follows the definitions reaching the node backward, through device transfers (y = x.cuda()) and
+        binary operations (y = x + 1), to find the original ancestor variable.
+        """
+        origin = var_name
+        visited = set()
+        while (origin, node) not in visited:
+            visited.add((origin, node))
+            definitions = [d for d in dataflow.reaching_definitions(node, origin) if d.kind == BIND]
+            if len(definitions) != 1:
+                break
+            source = self._lineage_source(definitions[0].node)
+            if source is None:
+                break
+            origin, node = source, definitions[0].node
+        return origin
+
+    def _lineage_source(self, stmt: ast.AST) -> str | None:
+        """
+        Returns the variable a single-target assignment derives its value from, if it is a device transfer or a
+        binary operation on a variable.
+        """
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)):
+            return None
+        value = stmt.value
+        transfer = self._transfer_of(value)
+        if transfer is not None:
+            return transfer[0]
+        if isinstance(value, ast.BinOp) and isinstance(value.left, ast.Name):
+            return value.left.id
+        return None
+
+    def _transfer_of(self, value: ast.AST) -> tuple[str, str] | None:
+        """
+        Returns the variable an expression moves and the device it moves it to, for PyTorch transfer calls
+        (x.cuda()) and for calls to helper functions whose summary moves data to a single known device
+        (e.g., to_gpu(x), which returns x.cuda()).
+        """
+        if not isinstance(value, ast.Call):
+            return None
+        if isinstance(value.func, ast.Attribute) and isinstance(value.func.value, ast.Name):
+            device = self._parse_device_call(value.func.attr, value)
+            if device is not None:
+                return value.func.value.id, device
+        if value.args and isinstance(value.args[0], ast.Name):
+            summary = self.context.calls.call_summary(value)
+            if summary is not None and len(summary.transfers) == 1 and UNKNOWN_DEVICE not in summary.transfers:
+                return value.args[0].id, next(iter(summary.transfers))
+        return None
+
+    def _may_be_on_device(self, var_name: str, node: ast.AST) -> bool:
+        """
+        Checks if the variable may hold a PyTorch tensor or model, according to the shared type inference.
+        Variables of unknown kind (e.g., untyped parameters) may.
+        """
+        kinds = self.context.types.kinds(var_name, node)
+        return not kinds or not kinds.isdisjoint({TORCH_TENSOR, TORCH_MODEL, ARRAY})
+
     def _parse_device_call(self, attr_name: str, call_node: ast.Call) -> str | None:
         """
         Parses the device string ('cpu', 'cuda', etc.) from a PyTorch call:
@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, FACTS_DEPENDENCY
 
 class ExcessiveTrainingRule(BaseRule):
     """
@@ -13,6 +13,7 @@ class ExcessiveTrainingRule(BaseRule):
     name = "Excessive Training"
     description = "Training loop without proper early stopping mechanism detected."
     optimization = "Implement early stopping by monitoring validation metrics and stopping when no improvement is seen for a number of epochs."
+    dependency = FACTS_DEPENDENCY
     
     def __init__(self):
         super().__init__(id=self.id,
@@ -72,8 +73,8 @@ class ExcessiveTrainingRule(BaseRule):
                     if isinstance(node.iter.args[0], ast.Constant) and node.iter.args[0].value > 20:
                         has_training = self._contains_training_terms(node)
             
-            # Check if the loop contains training-related terms in any case
-            has_training = has_training or self._contains_training_terms(node)
+            # Check if the loop contains training-related terms in any case, or calls a helper that trains
+            has_training = has_training or self._contains_training_terms(node) or self._calls_training_helper(node)
         
         # If it looks like training code, check for early stopping mechanisms
         if has_training and not self._contains_early_stopping(node):
@@ -110,6 +111,18 @@ class ExcessiveTrainingRule(BaseRule):
         # Return true only if it has training terms and no exclude terms
         return has_training and not has_exclude
     
+    def _calls_training_helper(self, node: ast.AST) -> bool:
+        """
+        Checks if the loop calls a function (of the module or the project) that computes gradients or
+        fits a model, directly or through the functions it calls.
+        """
+        for child in self.walk(node):
+            if isinstance(child, ast.Call):
+                summary = self.context.calls.call_summary(child)
+                if summary is not None and (summary.computes_gradients or summary.fits_model):
+                    return True
+        return False
+
     def _contains_early_stopping(self, node: ast.AST) -> bool:
         """
         Simple check for early stopping mechanisms.
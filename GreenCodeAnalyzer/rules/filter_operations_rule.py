@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 
 class FilterOperationsRule(BaseRule):
     """
@@ -11,6 +11,7 @@ class FilterOperationsRule(BaseRule):
     name = "Inefficient Filter Operations"
     description = "Using loops for filtering elements instead of vectorized operations causes unnecessary iterations and is energy-intensive."
     optimization = "Replace with boolean indexing (array[array > 0.5], tensor[tensor > 0.5], df[df['values'] > 0.5]) or tensor masking."   
+    dependency = UNIT_DEPENDENCY
 
     def __init__(self):
         super().__init__(id=self.id,
@@ -0,0 +1,181 @@
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+GIB = 1024 ** 3
+
+# DataLoader workers beyond this rarely speed up loading, and each one holds a copy of the dataset object
+MAX_LOADER_WORKERS = 8
+
+# Memory budgeted per DataLoader worker (its copy of the dataset object and its prefetched batches), and the
+# memory per worker above which deeper prefetching is suggested
+WORKER_MEMORY = 2 * GIB
+DEEP_PREFETCH_MEMORY = 4 * GIB
+
+# Limits of the process's cgroup (v2), which containers and CI runners set below the machine's resources
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_MEMORY_MAX = "/sys/fs/cgroup/memory.max"
+
+# The GPUs the NVIDIA driver found, one directory each, listed without loading CUDA (Linux only)
+NVIDIA_GPUS = "/proc/driver/nvidia/gpus"
+
+@dataclass(frozen=True)
+class LoaderSettings:
+    """
+    DataLoader arguments suited to the resources of a machine.
+
+    Attributes:
+        - num_workers (int): The number of worker processes loading batches in parallel.
+        - persistent_workers (bool): Whether workers are kept across epochs instead of being started again.
+        - prefetch_factor (int): The number of batches every worker loads ahead.
+        - pin_memory (bool): Whether batches are copied to page-locked memory, for faster transfers to the GPU.
+    """
+    num_workers: int
+    persistent_workers: bool
+    prefetch_factor: int
+    pin_memory: bool
+
+    def keywords(self) -> Dict[str, str]:
+        """
+        Returns the code of every argument, by keyword, in the order they are suggested in. Without workers,
+        persistent_workers and prefetch_factor are left out, as DataLoader rejects them, and pin_memory is left
+        out unless it is suggested.
+        """
+        keywords = {"num_workers": repr(self.num_workers)}
+        if self.num_workers > 0:
+            keywords["persistent_workers"] = repr(self.persistent_workers)
+            keywords["prefetch_factor"] = repr(self.prefetch_factor)
+        if self.pin_memory:
+            keywords["pin_memory"] = repr(self.pin_memory)
+        return keywords
+
+    def describe(self) -> str:
+        """
+        Describes the arguments as code (e.g., 'num_workers=7, persistent_workers=True, ...').
+        """
+        return ", ".join(f"{keyword}={value}" for keyword, value in self.keywords().items())
+
+@dataclass(frozen=True)
+class HostResources:
+    """
+    The CPUs and memory the analyzer's process may use, which training scripts are assumed to run with too.
+    The machine is probed once per process (see probe()); the totals are used rather than what is free at
+    the moment, so that suggestions, and the cached results they are part of, are stable across runs.
+
+    Attributes:
+        - cpu_count (int): The number of CPUs of the machine.
+        - usable_cpus (int): The number of CPUs the process may run on, given its CPU affinity and cgroup quota.
+        - memory (Optional[int]): The bytes of memory the process may use, given its cgroup limit, if known.
+        - gpus (int): The number of CUDA GPUs the process may use.
+    """
+    cpu_count: int
+    usable_cpus: int
+    memory: Optional[int] = None
+    gpus: int = 0
+
+    _probed = None
+
+    @classmethod
+    def probe(cls) -> "HostResources":
+        """
+        Returns the resources of this machine, probed on the first call.
+        """
+        if cls._probed is None:
+            cpu_count = os.cpu_count() or 1
+            usable_cpus = cpu_count
+            if hasattr(os, "sched_getaffinity"):
+                usable_cpus = len(os.sched_getaffinity(0)) or cpu_count
+            quota = cls._cgroup_cpu_quota()
+            if quota is not None:
+                usable_cpus = min(usable_cpus, quota)
+            cls._probed = cls(cpu_count=cpu_count, usable_cpus=usable_cpus, memory=cls._memory(), gpus=cls._gpus())
+        return cls._probed
+
+    def loader_settings(self) -> LoaderSettings:
+        """
+        Returns the DataLoader arguments suited to these resources: a worker per usable CPU, but one left for the
+        training loop (none with a single CPU, which the workers would only compete with the loop for), within
+        the memory budget of the workers, a deeper prefetch when memory allows it, and pinned memory when there
+        is a GPU to transfer batches to.
+        """
+        workers = max(0, min(self.usable_cpus - 1, MAX_LOADER_WORKERS))
+        if self.memory is not None and workers > 0:
+            workers = max(1, min(workers, self.memory // WORKER_MEMORY))
+        deep_prefetch = self.memory is not None and workers > 0 and self.memory // workers >= DEEP_PREFETCH_MEMORY
+        return LoaderSettings(
+            num_workers=workers,
+            persistent_workers=True,
+            prefetch_factor=4 if deep_prefetch else 2,
+            pin_memory=self.gpus > 0
+        )
+
+    def describe(self) -> str:
+        """
+        Describes the resources (e.g., '8 usable CPUs, 15.5 GiB of memory and 1 CUDA GPU').
+        """
+        resources = [f"{self.usable_cpus} usable CPU{'s' if self.usable_cpus != 1 else ''}"]
+        if self.memory is not None:
+            resources.append(f"{self.memory / GIB:.1f} GiB of memory")
+        resources.append(f"{self.gpus} CUDA GPU{'s' if self.gpus != 1 else ''}" if self.gpus else "no CUDA GPU")
+        return ", ".join(resources[:-1]) + " and " + resources[-1]
+
+    def loader_suggestion(self) -> str:
+        """
+        Returns the sentence suggesting the DataLoader arguments suited to these resources.
+        """
+        settings = self.loader_settings()
+        pinning = "" if settings.pin_memory else " Pinned memory only speeds up transfers to a CUDA GPU."
+        return f"On this machine ({self.describe()}), use {settings.describe()}.{pinning}"
+
+    @staticmethod
+    def _cgroup_cpu_quota() -> Optional[int]:
+        """
+        Returns the number of CPUs the cgroup's quota amounts to, rounded up, if it sets one.
+        """
+        try:
+            with open(CGROUP_CPU_MAX, "r") as file:
+                quota, period = file.read().split()[:2]
+        except (OSError, ValueError):
+            return None
+        if quota == "max":
+            return None
+        try:
+            return max(1, math.ceil(int(quota) / int(period)))
+        except (ValueError, ZeroDivisionError):
+            return None
+
+    @staticmethod
+    def _gpus() -> int:
+        """
+        Returns the number of CUDA GPUs the NVIDIA driver found, unless CUDA_VISIBLE_DEVICES hides them all.
+        """
+        visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+        if visible is not None and visible.strip() in ("", "-1"):
+            return 0
+        try:
+            gpus = len(os.listdir(NVIDIA_GPUS))
+        except OSError:
+            return 0
+        if visible is not None:
+            gpus = min(gpus, len(visible.split(",")))
+        return gpus
+
+    @staticmethod
+    def _memory() -> Optional[int]:
+        """
+        Returns the physical memory of the machine, or the cgroup's limit if it is lower.
+        """
+        memory = None
+        try:
+            memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            pass
+        try:
+            with open(CGROUP_MEMORY_MAX, "r") as file:
+                limit = file.read().strip()
+            if limit != "max":
+                memory = min(memory, int(limit)) if memory is not None else int(limit)
+        except (OSError, ValueError):
+            pass
+        return memory
@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 
 class IgnoringInplaceOperationsRule(BaseRule):
     """
@@ -11,6 +11,7 @@ class IgnoringInplaceOperationsRule(BaseRule):
     name = "Ignoring Inplace Operations"
     description = "Using non-in-place operations (e.g., add instead of add_) in PyTorch, TensorFlow, NumPy, or Pandas increases memory allocations, raising energy consumption."
     optimization = "Replace with in-place operations (e.g., add_(), inplace=True) where safe to reduce memory overhead."
+    dependency = UNIT_DEPENDENCY
     
     def __init__(self):
         super().__init__(id=self.id,
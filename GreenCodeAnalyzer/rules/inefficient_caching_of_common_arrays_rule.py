@@ -1,6 +1,7 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, FACTS_DEPENDENCY
+from analysis.call_graph import ARRAY_ALLOCATORS
 
 class IneffectiveCachingOfCommonArrays(BaseRule):
     """
@@ -14,6 +15,7 @@ class IneffectiveCachingOfCommonArrays(BaseRule):
         "and memory, increasing energy consumption."
     )
     optimization = "Cache the array outside the loop to eliminate repeated creation."
+    dependency = FACTS_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -35,24 +37,18 @@ class IneffectiveCachingOfCommonArrays(BaseRule):
         """
         smells = []
         
-        # Set of deterministic array creation function names from common libraries
-        array_funcs = {
-            'arange', 'zeros', 'ones', 'empty', 'full', 'linspace', 'meshgrid',
-            'eye', 'identity', 'tri', 'vander'
-        }
-        
         # Collect variables assigned within the loop
         assigned_vars = set()
-        if isinstance(node, ast.For) and isinstance(node.target, ast.Name):
-            assigned_vars.add(node.target.id)  # Include loop variable
-        for stmt in ast.walk(node):
+        if isinstance(node, ast.For):
+            assigned_vars.update(self._get_stored_names(node.target))  # Include loop variables (e.g., 'for x, y in ...')
+        for stmt in self.walk(node):
             if isinstance(stmt, ast.Assign):
                 for target in stmt.targets:
                     if isinstance(target, ast.Name):
                         assigned_vars.add(target.id)
         
         # Identify array creation calls within the loop
-        for stmt in ast.walk(node):
+        for stmt in self.walk(node):
             if isinstance(stmt, ast.Call):
                 func = stmt.func
                 func_name = None
@@ -61,7 +57,8 @@ class IneffectiveCachingOfCommonArrays(BaseRule):
                 elif isinstance(func, ast.Attribute):
                     func_name = func.attr
                 
-                if func_name in array_funcs:
+                # Calls to helpers that create arrays (e.g., make_grid(n) returning np.zeros((n, n))) are as costly
+                if func_name in ARRAY_ALLOCATORS or self._calls_allocating_helper(stmt):
                     # Collect variables used in the function arguments
                     dependent_vars = set()
                     for arg in stmt.args:
@@ -69,8 +66,8 @@ class IneffectiveCachingOfCommonArrays(BaseRule):
                     for kw in stmt.keywords:
                         dependent_vars.update(self._get_variables(kw.value))
                     
-                    # If no dependent variables are assigned in the loop, it's a smell
-                    if not dependent_vars.intersection(assigned_vars):
+                    # If no dependent variables are assigned or modified in the loop, it's a smell
+                    if not dependent_vars.intersection(assigned_vars) and not self._modified_in_loop(dependent_vars, stmt):
                         smells.append(Smell(
                             rule_id=self.id,
                             rule_name=self.name,
@@ -82,6 +79,30 @@ class IneffectiveCachingOfCommonArrays(BaseRule):
         
         return smells
     
+    def _calls_allocating_helper(self, node: ast.Call) -> bool:
+        """
+        Checks if the call invokes a function (of the module or the project) that creates arrays, directly or
+        through the functions it calls, and whose result only depends on its arguments: a helper reading the
+        state of an argument (e.g., evaluate(model, data) calling model.predict(data)), doing I/O or drawing
+        random numbers may return another array every time.
+        """
+        summary = self.context.calls.call_summary(node)
+        return summary is not None and summary.allocates_array and not summary.reads_state
+
+    def _modified_in_loop(self, variables: set, call: ast.Call) -> bool:
+        """
+        Checks if an argument of the call may be modified in place (e.g., shape.append(n)) on the way from the
+        call back to it in the next iteration, according to the def-use chains of its scope.
+        """
+        dataflow = self.context.dataflow(call)
+        return any(dataflow.is_modified_between(variable, call, call) for variable in variables)
+
+    def _get_stored_names(self, target):
+        """
+        Extracts the variable names bound by an assignment target, including unpacked tuples.
+        """
+        return {child.id for child in ast.walk(target) if isinstance(child, ast.Name)}
+
     def _get_variables(self, node):
         """
         Extracts variable names used in an expression.
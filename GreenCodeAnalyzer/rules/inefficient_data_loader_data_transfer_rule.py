@@ -7,7 +7,8 @@ sys.path.insert(0, root_dir)
 
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, IMPORTS_DEPENDENCY
+from rules.host_resources import HostResources
 
 class InefficientDataLoaderDataTransferRule(BaseRule):
     """
@@ -19,12 +20,17 @@ class InefficientDataLoaderDataTransferRule(BaseRule):
     name = "Inefficient Data Transfer Configuration"
     description = "Refrain from using standard (pageable) CPU memory for large data loads when transferring to GPU. When transferring data from CPU to GPU, pinned (page-locked) memory can speed up and streamline transfers in CUDA. Non-pinned memory can cause additional overhead, stalling the GPU."
     optimization = "Enable pin_memory=True in the PyTorch DataLoader, which can significantly reduce latency for GPU-bound training."
+    dependency = IMPORTS_DEPENDENCY
     
     def __init__(self):
         super().__init__(id=self.id,
                          name=self.name, 
                          description=self.description, 
                          optimization=self.optimization)
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears the DataLoader imports tracked in the previous module"""
         self.dataloader_imports = set()  # Track DataLoader imports
 
     def should_apply(self, node: ast.AST) -> bool:
@@ -67,7 +73,7 @@ class InefficientDataLoaderDataTransferRule(BaseRule):
                 rule_name=self.name,
                 description=self.description,
                 penalty=self.penalty,
-                optimization=self.optimization,
+                optimization=f"{self.optimization} {HostResources.probe().loader_suggestion()}",
                 start_line=node.lineno
             )]
         
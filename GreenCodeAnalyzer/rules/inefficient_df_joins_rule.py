@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, MODULE_DEPENDENCY
 
 class InefficientDataFrameJoinsRule(BaseRule):
     """
@@ -11,6 +11,7 @@ class InefficientDataFrameJoinsRule(BaseRule):
     name = "Inefficient DataFrame Joins"
     description = "Inefficient DataFrame join operations found, such as repeated joins or joins without proper indexing."
     optimization = "Set indexes before joins with set_index() and store join results in variables to avoid repeating the same joins."
+    dependency = MODULE_DEPENDENCY
     
     def __init__(self):
         super().__init__(
@@ -19,6 +20,12 @@ class InefficientDataFrameJoinsRule(BaseRule):
             description=self.description,
             optimization=self.optimization,
         )
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the merge operations and indexed DataFrames tracked in the previous module.
+        """
         # Store seen merge operations per function to detect redundant joins
         self.merge_operations_per_function = {}
         # Current function being analyzed
@@ -37,6 +44,16 @@ class InefficientDataFrameJoinsRule(BaseRule):
             self.merge_operations_per_function[node.name] = []
             self.indexed_dataframes = set()
             return False
+
+        # Track variables assigned an indexed DataFrame (e.g., 'customers_by_id = customers.set_index("id")')
+        if (isinstance(node, ast.Assign) and
+            isinstance(node.value, ast.Call) and
+            isinstance(node.value.func, ast.Attribute) and
+            node.value.func.attr == 'set_index'):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.indexed_dataframes.add(target.id)
+            return False
         
         # Track dataframes that have set_index called on them
         if (isinstance(node, ast.Call) and 
@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 
 class InefficientIterationWithIterrows(BaseRule):
     """
@@ -11,6 +11,7 @@ class InefficientIterationWithIterrows(BaseRule):
     name = "InefficientIterationWithIterrows"
     description = "Using iterrows for row-by-row Pandas operations is slow and energy-intensive due to Python overhead."
     optimization = "Replace with vectorized Pandas operations (e.g., apply, vector arithmetic, or groupby)."
+    dependency = UNIT_DEPENDENCY
 
     def __init__(self):
         super().__init__(id=self.id,
@@ -72,7 +73,7 @@ class InefficientIterationWithIterrows(BaseRule):
         """
         Helper method to check if a given AST node uses a specific variable name.
         """
-        for child in ast.walk(node):
+        for child in self.walk(node):
             if isinstance(child, ast.Name) and child.id == var_name:
                 return True
         return False
\ No newline at end of file
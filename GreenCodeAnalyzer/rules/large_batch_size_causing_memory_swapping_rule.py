@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, UNIT_DEPENDENCY
 from typing import Optional
 
 class LargeBatchSizesCausingMemorySwapping(BaseRule):
@@ -15,6 +15,7 @@ class LargeBatchSizesCausingMemorySwapping(BaseRule):
     
     # Threshold for what constitutes a "large" batch size
     THRESHOLD = 1024
+    dependency = UNIT_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -0,0 +1,119 @@
+import json
+import math
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Version of the penalty table format, bumped when its fields change
+PENALTY_TABLE_VERSION = 1
+
+# Penalty points per doubling of the work a smell wastes, so that NutriScore levels (5 points each) are
+# one doubling apart: a smell twice as slow as its optimization gets 5 points, 16 times as slow gets 20
+POINTS_PER_DOUBLING = 5.0
+
+# Penalties are capped past the last NutriScore level (more than 20 points)
+MAX_PENALTY = 25.0
+
+# The table generated by 'python -m benchmarks.calibrate'
+DEFAULT_PENALTY_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "penalties.json")
+
+@dataclass(frozen=True)
+class RulePenalty:
+    """
+    The calibrated penalty of a rule, from the measured cost of its smells compared to their optimizations.
+
+    Attributes:
+        - penalty (float): The penalty of a smell at the reference input size, before it is capped to MAX_PENALTY,
+          so that scaling it down to smaller sizes keeps the measured differences between rules.
+        - size_scaling (float): How the waste grows with the input size: a smell on n items wastes
+          (n / reference_size) ** size_scaling times what it wastes at the reference size.
+        - reference_size (int): The input size the penalty was calibrated at.
+        - speedup (float): The speedup of the optimization at the reference size, fitted across the measured sizes.
+        - memory_ratio (Optional[float]): The average measured ratio of peak memory of the smell over its optimization.
+    """
+    penalty: float
+    size_scaling: float
+    reference_size: int
+    speedup: float
+    memory_ratio: Optional[float] = None
+
+    def at_size(self, size: Optional[int] = None) -> float:
+        """
+        Returns the penalty of a smell on a given number of items (e.g., the trip count of its loop), or at the
+        reference size if the number of items is unknown.
+        """
+        if size is not None and size <= 0:
+            return 0.0
+        doublings = self.size_scaling * math.log2(size / self.reference_size) if size is not None else 0.0
+        return round(min(MAX_PENALTY, max(0.0, self.penalty + POINTS_PER_DOUBLING * doublings)), 1)
+
+class PenaltyTable:
+    """
+    The calibrated penalties of the rules, loaded from a versioned JSON table.
+
+    Attributes:
+        - rules (Dict[str, RulePenalty]): The penalty of every calibrated rule, by rule ID.
+        - environment (Dict[str, str]): Where the benchmarks behind the penalties ran (e.g., library versions).
+    """
+
+    _default: Optional["PenaltyTable"] = None
+
+    def __init__(self, rules: Dict[str, RulePenalty], environment: Optional[Dict[str, str]] = None):
+        """
+        :param rules: The penalty of every calibrated rule, by rule ID.
+        :param environment: Where the benchmarks behind the penalties ran.
+        """
+        self.rules = rules
+        self.environment = environment or {}
+
+    @classmethod
+    def load(cls, path: str) -> "PenaltyTable":
+        """
+        Loads a penalty table. A missing table, or one of another version, gives no penalties.
+
+        :param path: The path of the JSON table.
+        :return: The loaded table.
+        """
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return cls({})
+        if data.get("version") != PENALTY_TABLE_VERSION:
+            warnings.warn(f"Ignoring penalty table {path}: expected version {PENALTY_TABLE_VERSION}, "
+                          f"got {data.get('version')}. Regenerate it with 'python -m benchmarks.calibrate'.")
+            return cls({})
+        rules = {
+            rule_id: RulePenalty(
+                penalty=entry["penalty"],
+                size_scaling=entry["size_scaling"],
+                reference_size=data["reference_size"],
+                speedup=entry["speedup"],
+                memory_ratio=entry.get("memory_ratio")
+            )
+            for rule_id, entry in data["rules"].items()
+        }
+        return cls(rules, data.get("environment"))
+
+    @classmethod
+    def default(cls) -> "PenaltyTable":
+        """
+        Returns the table shipped with the rules, loaded once.
+        """
+        if cls._default is None:
+            cls._default = cls.load(DEFAULT_PENALTY_TABLE)
+        return cls._default
+
+    def penalty(self, rule_id: str, size: Optional[int] = None) -> Optional[float]:
+        """
+        Returns the penalty of a rule's smells, scaled to an input size if it is known.
+
+        :param rule_id: The ID of the rule.
+        :param size: The number of items the smell processes (e.g., the trip count of its loop), if known.
+        :return: The penalty, or None if the rule is not calibrated.
+        """
+        calibrated = self.rules.get(rule_id)
+        if calibrated is None:
+            return None
+        return calibrated.at_size(size)
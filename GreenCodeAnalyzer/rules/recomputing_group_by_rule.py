@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, MODULE_DEPENDENCY
 
 class RecomputingGroupByRule(BaseRule):
     """
@@ -12,6 +12,7 @@ class RecomputingGroupByRule(BaseRule):
     description = "Multiple groupby calls on the same DataFrame with identical keys cause inefficient recomputation of groupings."
     optimization = "Compute all required aggregations in a single groupby call using agg() or store the GroupBy object for reuse."
     aggregation_methods = ['sum', 'mean', 'median', 'min', 'max', 'count', 'std', 'var']
+    dependency = MODULE_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -20,7 +21,12 @@ class RecomputingGroupByRule(BaseRule):
             description=self.description,
             optimization=self.optimization
         )
+        self.reset()
 
+    def reset(self):
+        """
+        Clears the groupby operations seen in the previous module.
+        """
         # Dictionary to track seen (DataFrame_name, keys_tuple) and their first line numbers
         self.seen = {}
 
@@ -1,6 +1,8 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, FACTS_DEPENDENCY
+from analysis.dataflow import BIND
+from analysis.type_inference import ARRAY_KINDS, PANDAS_KINDS
 
 class ReductionOperationsRule(BaseRule):
     """
@@ -12,6 +14,7 @@ class ReductionOperationsRule(BaseRule):
     name = "Inefficient Reduction Operations"
     description = "Using loops for reduction operations instead of vectorized methods consumes more energy."
     optimization = "Replace with built-in reduction methods."
+    dependency = FACTS_DEPENDENCY
     
     def __init__(self):
         super().__init__(
@@ -20,34 +23,18 @@ class ReductionOperationsRule(BaseRule):
             description=self.description,
             optimization=self.optimization
         )
-        # Track array/tensor variables for detection
-        self.array_vars = set()
-        # Track known reduction variables and their operation type
-        self.reduction_vars = {}  # {var_name: operation_type}
         
     def should_apply(self, node) -> bool:
         """
-        Applies to For loops and assignments that might involve reduction operations.
+        Applies to For loops.
         """
-        return isinstance(node, (ast.For, ast.Assign, ast.AugAssign))
+        return isinstance(node, ast.For)
     
     def apply_rule(self, node) -> list[Smell]:
         """
         Detects loops that perform manual reduction operations that could be vectorized.
         """
         smells = []
-        
-        # Track array/tensor variable creation
-        if isinstance(node, ast.Assign):
-            self._track_array_variables(node)
-            # Also track initialization of reduction accumulators
-            self._track_accumulator_init(node)
-            return smells
-            
-        # Track augmented assignments that might be reduction operations
-        if isinstance(node, ast.AugAssign):
-            self._track_augmented_assignments(node)
-            return smells
             
         # Check for reduction operations in loops
         if isinstance(node, ast.For):
@@ -65,72 +52,30 @@ class ReductionOperationsRule(BaseRule):
                 
         return smells
     
-    def _track_array_variables(self, node):
-        """
-        Tracks variables that might be arrays or tensors based on their initialization.
-        """
-        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
-            var_name = node.targets[0].id
-            value = node.value
-            
-            # Check if it's initialized with a known tensor/array constructor
-            if isinstance(value, ast.Call):
-                func = value.func
-                if isinstance(func, ast.Attribute):
-                    # Handle methods like torch.zeros, np.random.rand, etc.
-                    if func.attr in {'zeros', 'ones', 'zeros_like', 'ones_like', 'empty', 'empty_like', 
-                                    'rand', 'randn', 'random', 'arange', 'linspace', 'array', 'tensor',
-                                    'uniform', 'normal', 'randint'}:
-                        self.array_vars.add(var_name)
-                        
-                    # Handle DataFrame creation
-                    elif func.attr == 'DataFrame':
-                        self.array_vars.add(var_name)
-                elif isinstance(func, ast.Name):
-                    # Handle direct constructor calls
-                    if func.id in {'array', 'tensor', 'DataFrame'}:
-                        self.array_vars.add(var_name)
-                        
-            # Handle pandas column indexing (treat as array)
-            elif isinstance(value, ast.Subscript) and isinstance(value.value, ast.Name):
-                if value.value.id in self.array_vars:  # If it's a known dataframe
-                    self.array_vars.add(var_name)  # Column access is also an array
-    
-    def _track_accumulator_init(self, node):
+    def _is_array(self, var_name: str, node: ast.AST) -> bool:
         """
-        Tracks initialization of variables that might be reduction accumulators.
+        Checks if the variable may hold an array, tensor, DataFrame or Series where the node appears,
+        according to the shared type inference.
         """
-        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
-            var_name = node.targets[0].id
-            value = node.value
-            
-            # Check for typical accumulator initialization patterns
-            if isinstance(value, ast.Constant):
-                if value.value == 0:
-                    # Possible sum or mean accumulator
-                    self.reduction_vars[var_name] = "sum"
-                elif (isinstance(value.value, (int, float)) and 
-                      (value.value == float('inf') or value.value == -float('inf'))):
-                    # Potential min/max accumulator
-                    if value.value == float('inf'):
-                        self.reduction_vars[var_name] = "min"
-                    else:
-                        self.reduction_vars[var_name] = "max"
-    
-    def _track_augmented_assignments(self, node):
+        return not self.context.types.kinds(var_name, node).isdisjoint(ARRAY_KINDS | PANDAS_KINDS)
+
+    def _is_numeric_accumulator(self, var_name: str, loop: ast.For) -> bool:
         """
-        Tracks augmented assignments that might be part of reduction operations.
+        Checks that no initialization of the accumulator reaching the loop from outside of it is a string
+        or a container, for which += concatenates instead of reducing.
         """
-        if isinstance(node.target, ast.Name):
-            var_name = node.target.id
-            
-            # Check for += pattern which is common in sum or mean
-            if isinstance(node.op, ast.Add):
-                if var_name in self.reduction_vars:
-                    if self.reduction_vars[var_name] == "sum":
-                        # Update to mean if division is detected
-                        if isinstance(node.value, ast.BinOp) and isinstance(node.value.op, ast.Div):
-                            self.reduction_vars[var_name] = "mean"
+        dataflow = self.context.dataflow(loop)
+        for definition in dataflow.reaching_definitions(loop, var_name):
+            if definition.kind != BIND or loop.lineno <= definition.line <= (loop.end_lineno or loop.lineno):
+                continue
+            stmt = definition.node
+            if isinstance(stmt, ast.Assign):
+                value = stmt.value
+                if isinstance(value, (ast.List, ast.Tuple, ast.Dict, ast.Set, ast.JoinedStr)):
+                    return False
+                if isinstance(value, ast.Constant) and isinstance(value.value, (str, bytes)):
+                    return False
+        return True
     
     def _identify_reduction_pattern(self, node: ast.For) -> str:
         """
@@ -142,7 +87,7 @@ class ReductionOperationsRule(BaseRule):
         array_name = None
         
         # Case 1: Iterating directly over an array (for x in array)
-        if isinstance(node.iter, ast.Name) and node.iter.id in self.array_vars:
+        if isinstance(node.iter, ast.Name) and self._is_array(node.iter.id, node):
             is_array_iteration = True
             array_name = node.iter.id
             
@@ -239,7 +184,8 @@ class ReductionOperationsRule(BaseRule):
                 if isinstance(stmt.target, ast.Name):
                     accumulator = stmt.target.id
                     # Check if the value is array[i] or a reference to the iterated item
-                    if self._is_array_element_access(stmt.value, array_name, node.target):
+                    if (self._is_array_element_access(stmt.value, array_name, node.target) and
+                        self._is_numeric_accumulator(accumulator, node)):
                         return accumulator
         return None
     
@@ -346,7 +292,7 @@ class ReductionOperationsRule(BaseRule):
                 # This is likely a df['column'][i] pattern
                 if isinstance(node.value.value, ast.Name):
                     # Check if it's a known DataFrame
-                    if node.value.value.id in self.array_vars:
+                    if self._is_array(node.value.value.id, node):
                         # Check if indexing with loop variable
                         if isinstance(node.slice, ast.Name) and isinstance(loop_var, ast.Name):
                             return node.slice.id == loop_var.id
@@ -359,7 +305,7 @@ class ReductionOperationsRule(BaseRule):
                         return node.slice.id == loop_var.id
             
             # Handle pandas slice pattern like df[('column', i)]
-            elif isinstance(node.value, ast.Name) and node.value.id in self.array_vars:
+            elif isinstance(node.value, ast.Name) and self._is_array(node.value.id, node):
                 if isinstance(node.slice, ast.Tuple) and len(node.slice.elts) == 2:
                     # Check if second element is the loop variable
                     if isinstance(node.slice.elts[1], ast.Name) and isinstance(loop_var, ast.Name):
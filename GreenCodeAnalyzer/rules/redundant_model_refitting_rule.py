@@ -1,6 +1,6 @@
 import ast
 from models.smell import Smell
-from rules.base_rule import BaseRule
+from rules.base_rule import BaseRule, MODULE_DEPENDENCY
 
 class RedundantModelRefittingRule(BaseRule):
     """
@@ -11,6 +11,7 @@ class RedundantModelRefittingRule(BaseRule):
     name = "Redundant Model Refitting"
     description = "Multiple .fit() calls detected on unchanged data, wasting CPU/memory resources."
     optimization = "Reuse the fitted model or use partial_fit() for incremental training."
+    dependency = MODULE_DEPENDENCY
 
     def __init__(self):
         super().__init__(
@@ -19,76 +20,84 @@ class RedundantModelRefittingRule(BaseRule):
             description=self.description,
             optimization=self.optimization
         )
+        self.reset()
 
-        # Track fit calls: {model_var: [(lineno, args_key, data_vars)]}
+    def reset(self):
+        """
+        Clears the fit calls tracked in the previous module.
+        """
+        # Track fit calls: {(scope, model_var): [(call_node, args_key, data_vars)]}
         self.fit_calls = {}
-        
-        # Track variables that might be modified: {var_name: last_modified_line}
-        self.modified_vars = {}
 
     def should_apply(self, node) -> bool:
         """
-        Applies to attribute calls (e.g., model.fit()) and assignments that might modify data.
+        Applies to calls of methods (e.g., model.fit()) and functions, which may be helpers that fit a model.
         """
-        return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)) or isinstance(node, ast.Assign)
+        return isinstance(node, ast.Call) and isinstance(node.func, (ast.Attribute, ast.Name))
 
     def apply_rule(self, node) -> list[Smell]:
         """
-        Identifies redundant .fit() calls on the same model instance with unchanged data.
+        Identifies redundant .fit() calls on the same model instance with unchanged data, and redundant calls
+        to helper functions that fit a model (e.g., train(model, X, y)) with unchanged arguments.
         """
         smells = []
 
-        # Handle assignments to track potential data modifications
-        if isinstance(node, ast.Assign):
-            for target in node.targets:
-                if isinstance(target, ast.Name):
-                    self.modified_vars[target.id] = node.lineno
-            return smells
-
-        # Check if this is a .fit() call
+        # Check if this is a .fit() call, or a call to a function that fits a model
         if (isinstance(node.func, ast.Attribute) and 
             node.func.attr == "fit" and 
             isinstance(node.func.value, ast.Name)):
-            
             model_var = node.func.value.id  # e.g., 'model' in 'model.fit()'
-            
-            if not node.args:
-                return smells
-                
-            # Extract data variables and normalize args
-            data_args = self._args_to_key(node.args)
-            data_vars = self._extract_data_vars(node.args)
-            
-            # Initialize tracking for this model variable
-            if model_var not in self.fit_calls:
-                self.fit_calls[model_var] = []
-            
-            # Check previous fit calls for this model
-            for prev_call in self.fit_calls[model_var]:
-                prev_line, prev_args, _ = prev_call
-                if prev_args == data_args:  # Syntactically same args
-                    # Check if any data variables were modified since the last fit
-                    data_unmodified = all(
-                        var not in self.modified_vars or 
-                        self.modified_vars[var] < prev_line 
-                        for var in data_vars
-                    )
-                    if data_unmodified:
-                        smells.append(Smell(
-                            rule_id=self.id,
-                            rule_name=self.name,
-                            description=self.description,
-                            penalty=self.penalty,
-                            optimization=self.optimization,
-                            start_line=node.lineno
-                        ))
-                        break
-            
-            # Record this fit call with data variables
-            self.fit_calls[model_var].append((node.lineno, data_args, data_vars))
-        
+            tracked_vars = {model_var}
+        elif self._calls_fitting_helper(node):
+            model_var = ast.unparse(node.func)  # e.g., 'train' in 'train(model, X, y)'
+            tracked_vars = set()
+        else:
+            return smells
+
+        if not node.args:
+            return smells
+
+        # Extract data variables and normalize args
+        data_args = self._args_to_key(node.args)
+        data_vars = self._extract_data_vars(node.args)
+
+        # Data flow is tracked per function, so only fit calls of the same scope are compared
+        dataflow = self.context.dataflow(node)
+        calls = self.fit_calls.setdefault((dataflow.scope, model_var), [])
+
+        # Check previous fit calls for this model
+        for prev_call in calls:
+            prev_node, prev_args, _ = prev_call
+            if prev_args == data_args and dataflow.is_reachable(prev_node, node):  # Syntactically same args
+                # Check if the data or the model (e.g., recreated with other hyperparameters)
+                # may have been modified since the last fit
+                data_unmodified = not any(
+                    dataflow.is_modified_between(var, prev_node, node) for var in data_vars | tracked_vars
+                )
+                if data_unmodified:
+                    smells.append(Smell(
+                        rule_id=self.id,
+                        rule_name=self.name,
+                        description=self.description,
+                        penalty=self.penalty,
+                        optimization=self.optimization,
+                        start_line=node.lineno
+                    ))
+                    break
+
+        # Record this fit call with data variables
+        calls.append((node, data_args, data_vars))
+
         return smells
 
+    def _calls_fitting_helper(self, node: ast.Call) -> bool:
+        """
+        Checks if the call invokes a function of the module (or of the project) that fits a model,
+        directly or through the functions it calls.
+        """
+        summary = self.context.calls.call_summary(node)
+        return summary is not None and summary.fits_model
+
     def _args_to_key(self, args: list[ast.AST]) -> str:
         """
         Converts fit() arguments to a normalized string key for comparison.
@@ -121,10 +130,4 @@ class RedundantModelRefittingRule(BaseRule):
                 for sub_arg in arg.args:
                     if isinstance(sub_arg, ast.Name):
                         data_vars.add(sub_arg.id)
-        return data_vars
-
-    def process_node(self, node: ast.AST) -> list[Smell]:
-        """
-        Override to ensure assignments are processed before fit calls in the same scope.
-        """
-        return super().process_node(node)
\ No newline at end of file
+        return data_vars
\ No newline at end of file
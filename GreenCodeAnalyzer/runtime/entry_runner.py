@@ -0,0 +1,100 @@
+import argparse
+import importlib.util
+import json
+import os
+import runpy
+import shlex
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+# This module is run as a script, in a separate process, to run the user's entry script under a tracer.
+# It and the tracer modules it loads must therefore only import the standard library: the analyzer's
+# packages (e.g., 'models') are not importable there, and could shadow the user's own packages if they were.
+
+class EntryRunError(Exception):
+    """
+    Raised when an entry script could not be run under a tracer.
+    """
+    pass
+
+def run_traced(
+    tracer_file: str,
+    tracer_class: str,
+    config: dict,
+    entry: str,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None
+) -> dict:
+    """
+    Runs an entry script as __main__ in a separate Python process, under a tracer, and returns what it recorded.
+
+    :param tracer_file: The module defining the tracer. It is loaded from its path, not imported.
+    :param tracer_class: The tracer class, built with the config as keyword arguments. It must provide start(),
+        stop() and results(), which returns what it recorded as a JSON-serializable dict.
+    :param config: The keyword arguments of the tracer.
+    :param entry: The script to run followed by its arguments, as a shell-like string (e.g., 'train.py --epochs 1').
+    :param env: Environment variables to set for the run.
+    :param timeout: The seconds after which the run is stopped.
+    :return: The results of the tracer.
+    """
+    command = shlex.split(entry)
+    if not command:
+        raise EntryRunError("No entry script given.")
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "config.json")
+        output = os.path.join(directory, "results.json")
+        with open(config_path, "w") as file:
+            json.dump(config, file)
+        arguments = [
+            sys.executable, os.path.abspath(__file__),
+            "--tracer", f"{os.path.abspath(tracer_file)}:{tracer_class}",
+            "--config", config_path,
+            "--output", output,
+            "--"
+        ]
+        try:
+            subprocess.run(arguments + command, env=dict(os.environ, **(env or {})), timeout=timeout, check=False)
+        except subprocess.TimeoutExpired:
+            raise EntryRunError(f"The entry script did not finish within {timeout} seconds.")
+        if not os.path.exists(output):
+            raise EntryRunError("The entry script stopped before its trace could be recorded.")
+        with open(output, "r") as file:
+            return json.load(file)
+
+def _main(argv: Optional[List[str]] = None):
+    """
+    Runs an entry script as 'python script.py args' would, under the given tracer, and writes its results as JSON.
+    The results are written even if the script fails, so that what ran until then is reported.
+    """
+    parser = argparse.ArgumentParser(description="Run a script under a tracer.")
+    parser.add_argument("--tracer", required=True)
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+
+    tracer_file, tracer_class = args.tracer.rsplit(":", 1)
+    spec = importlib.util.spec_from_file_location("_green_code_analyzer_tracer", tracer_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    with open(args.config, "r") as file:
+        tracer = getattr(module, tracer_class)(**json.load(file))
+
+    sys.argv = command
+    sys.path[0] = os.path.dirname(os.path.abspath(command[0]))
+    tracer.start()
+    try:
+        runpy.run_path(os.path.abspath(command[0]), run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        tracer.stop()
+        with open(args.output, "w") as file:
+            json.dump(tracer.results(), file)
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,57 @@
+import os
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+from models.smell import Smell
+from runtime import tracers
+from runtime.entry_runner import run_traced
+from runtime.smell_lines import smell_lines
+
+class ExecutionProfile:
+    """
+    How many times each line of the code objects containing smells ran during a traced run, and for how long,
+    to confirm which smells are hot and which are never executed.
+    """
+
+    def __init__(self, lines: Dict[Tuple[str, int], Tuple[int, float]]):
+        """
+        :param lines: Maps (absolute file path, line) to (executions, seconds spent on the line).
+        """
+        self.lines = lines
+
+    @classmethod
+    def trace(cls, entry: str, smells_by_file: Dict[str, List[Smell]], timeout: Optional[float] = None) -> "ExecutionProfile":
+        """
+        Runs an entry script in a separate Python process, instrumenting only the code objects that contain smells.
+
+        :param entry: The script to run followed by its arguments, as a shell-like string (e.g., 'train.py --epochs 1').
+        :param smells_by_file: The smells statically detected in each analyzed file.
+        :param timeout: The seconds after which the run is stopped.
+        :return: The execution profile of the run.
+        """
+        spans = {
+            os.path.abspath(path): [[smell.start_line, smell.end_line or smell.start_line] for smell in smells]
+            for path, smells in smells_by_file.items() if smells
+        }
+        recorded = run_traced(tracers.__file__, "ExecutionTracer", {"spans": spans}, entry, timeout=timeout)
+        return cls({(path, line): (hits, seconds) for path, line, hits, seconds in recorded["lines"]})
+
+    def measure(self, smells: List[Smell], filepath: str, source_code: Optional[str] = None) -> List[Smell]:
+        """
+        Attaches to every smell of a file how many times its code ran and the time spent on its lines,
+        including the body of a loop it is reported on (see smell_lines()). A smell ran as many times as
+        the first of its lines that ran; smells that never ran are cold.
+
+        :param smells: The smells of the file.
+        :param filepath: The path of the file.
+        :param source_code: The source the smells were detected in, to find the loops they are reported on.
+        :return: The smells with their executions and execution time.
+        """
+        path = os.path.abspath(filepath)
+        measured = []
+        for smell, lines in zip(smells, smell_lines(smells, source_code)):
+            recorded = [self.lines.get((path, line)) for line in lines]
+            recorded = [entry for entry in recorded if entry is not None]
+            executions = recorded[0][0] if recorded else 0
+            seconds = sum(entry[1] for entry in recorded)
+            measured.append(replace(smell, executions=executions, execution_time=seconds))
+        return measured
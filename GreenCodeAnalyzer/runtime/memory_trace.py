@@ -0,0 +1,60 @@
+import os
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
+from models.smell import Smell
+from runtime import tracers
+from runtime.entry_runner import run_traced
+from runtime.smell_lines import smell_lines
+
+class MemoryProfile:
+    """
+    The memory allocated by each source line during a traced run, to attribute it to smells.
+
+    Attributes:
+        - total_bytes (int): The bytes allocated by all traced lines.
+    """
+
+    def __init__(self, lines: Dict[Tuple[str, int], Tuple[int, int]]):
+        """
+        :param lines: Maps (absolute file path, line) to (allocated bytes, allocating executions).
+        """
+        self.lines = lines
+        self.total_bytes = sum(allocated for allocated, _ in lines.values())
+
+    @classmethod
+    def trace(cls, entry: str, targets: Iterable[str], timeout: Optional[float] = None) -> "MemoryProfile":
+        """
+        Runs an entry script in a separate Python process, on CPU only, and records the memory allocated by
+        the lines of the target files, including what the libraries they call (e.g., NumPy) allocate.
+
+        :param entry: The script to run followed by its arguments, as a shell-like string (e.g., 'train.py --epochs 1').
+        :param targets: The files whose lines are traced.
+        :param timeout: The seconds after which the run is stopped.
+        :return: The memory profile of the run.
+        """
+        # Hide GPUs, so that allocations happen in host memory where tracemalloc sees them
+        recorded = run_traced(
+            tracers.__file__, "LineAllocationTracer", {"targets": [os.path.abspath(target) for target in targets]},
+            entry, env={"CUDA_VISIBLE_DEVICES": ""}, timeout=timeout
+        )
+        return cls({(path, line): (allocated, count) for path, line, allocated, count in recorded["lines"]})
+
+    def measure(self, smells: List[Smell], filepath: str, source_code: Optional[str] = None) -> Tuple[List[Smell], int]:
+        """
+        Attaches to every smell of a file the bytes allocated by its lines, including the body of a loop it is
+        reported on (see smell_lines()), and how many of their executions allocated.
+
+        :param smells: The smells of the file.
+        :param filepath: The path of the file.
+        :param source_code: The source the smells were detected in, to find the loops they are reported on.
+        :return: The smells with their allocations, and the bytes allocated by the lines of all smells.
+        """
+        path = os.path.abspath(filepath)
+        measured = []
+        smelly_lines = set()
+        for smell, lines in zip(smells, smell_lines(smells, source_code)):
+            smelly_lines.update(lines)
+            allocated = sum(self.lines.get((path, line), (0, 0))[0] for line in lines)
+            count = sum(self.lines.get((path, line), (0, 0))[1] for line in lines)
+            measured.append(replace(smell, allocated_bytes=allocated, allocations=count))
+        return measured, sum(self.lines.get((path, line), (0, 0))[0] for line in smelly_lines)
@@ -0,0 +1,95 @@
+import os
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
+from models.smell import Smell
+from runtime import tracers
+from runtime.entry_runner import run_traced
+
+# The pandas operations recorded for the smells of each rule
+OPERATIONS_BY_RULE = {
+    "recomputing_groupby": ("groupby",),
+    "inefficient_df_joins": ("merge", "join"),
+    "inefficient_iterrows": ("iterrows",),
+}
+
+class PandasProfile:
+    """
+    The DataFrame operations each source line ran during a traced run, to confirm the pandas smells and
+    measure the time they waste.
+
+    Attributes:
+        - available (bool): Whether pandas was installed where the entry script ran.
+        - total_time (float): The seconds spent in all recorded operations.
+    """
+
+    def __init__(self, calls: Dict[Tuple[str, int, str], Tuple[int, int, float, int, float]], available: bool = True):
+        """
+        :param calls: Maps (absolute file path, line, operation) to (calls, rows, seconds, repeated calls, repeated seconds).
+        :param available: Whether pandas was installed where the entry script ran.
+        """
+        self.calls = calls
+        self.available = available
+        self.total_time = sum(totals[2] for totals in calls.values())
+
+    @classmethod
+    def trace(cls, entry: str, targets: Iterable[str], timeout: Optional[float] = None) -> "PandasProfile":
+        """
+        Runs an entry script in a separate Python process and records the groupby, merge, join and iterrows
+        calls made by the lines of the target files.
+
+        :param entry: The script to run followed by its arguments, as a shell-like string (e.g., 'etl.py --sample').
+        :param targets: The files whose calls are recorded.
+        :param timeout: The seconds after which the run is stopped.
+        :return: The pandas profile of the run.
+        """
+        recorded = run_traced(
+            tracers.__file__, "PandasCallRecorder", {"targets": [os.path.abspath(target) for target in targets]},
+            entry, timeout=timeout
+        )
+        calls = {(path, line, operation): tuple(totals) for path, line, operation, *totals in recorded["calls"]}
+        return cls(calls, available=recorded["available"])
+
+    def measure(self, smells: List[Smell], filepath: str) -> Tuple[List[Smell], float]:
+        """
+        Attaches to every pandas smell of a file the operations its lines ran and the time they wasted.
+
+        Repeated groupby calls and joins only waste the time of the calls that redid earlier work on the same
+        frames, while the rows produced by iterrows are all overhead compared to vectorized operations.
+        Missing indexes are reported with the time of their joins, but no wasted time, as it depends on the data.
+
+        :param smells: The smells of the file.
+        :param filepath: The path of the file.
+        :return: The smells with their recorded operations, and the seconds wasted by all of them.
+        """
+        path = os.path.abspath(filepath)
+        measured = []
+        # Smells of the same rule on the same lines measure the same calls
+        wasted_by_span = {}
+        for smell in smells:
+            operations = OPERATIONS_BY_RULE.get(smell.rule_id)
+            if operations is None:
+                measured.append(smell)
+                continue
+            calls = rows = repeated = 0
+            seconds = repeated_seconds = 0.0
+            for line in range(smell.start_line, (smell.end_line or smell.start_line) + 1):
+                for operation in operations:
+                    totals = self.calls.get((path, line, operation))
+                    if totals is not None:
+                        calls += totals[0]
+                        rows += totals[1]
+                        seconds += totals[2]
+                        repeated += totals[3]
+                        repeated_seconds += totals[4]
+
+            if smell.rule_id == "inefficient_iterrows":
+                wasted = seconds
+            elif smell.rule_id == "recomputing_groupby" or smell.rule_name.endswith("Redundant Join"):
+                wasted = repeated_seconds
+            else:
+                wasted = None
+            wasted_by_span[(smell.rule_id, smell.start_line, smell.end_line)] = max(
+                wasted or 0.0, wasted_by_span.get((smell.rule_id, smell.start_line, smell.end_line), 0.0)
+            )
+            measured.append(replace(smell, frame_calls=calls, frame_rows=rows, frame_time=seconds, wasted_time=wasted))
+        return measured, sum(wasted_by_span.values())
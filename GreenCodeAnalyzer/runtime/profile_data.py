@@ -0,0 +1,357 @@
+import ast
+import os
+import re
+import struct
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from models.smell import Smell
+from runtime.smell_lines import smell_lines
+
+class ProfileFormatError(Exception):
+    """
+    Raised when a profile file is neither a pstats dump nor line_profiler text output.
+    """
+    pass
+
+@dataclass
+class FunctionTiming:
+    """
+    The measured times of a function, as recorded by cProfile.
+
+    Attributes:
+        - first_line (int): The first line of the function's code (its first decorator, if any).
+        - name (str): The name of the function, or '<module>' for module-level code.
+        - inline_time (float): The seconds spent in the function itself, excluding the functions it called.
+        - cumulative_time (float): The seconds spent in the function, including the functions it called.
+    """
+    first_line: int
+    name: str
+    inline_time: float
+    cumulative_time: float
+
+class ProfileData:
+    """
+    Measured times of a profiled run, indexed by file and line, to map them onto smell spans.
+
+    Function-level times come from a cProfile/pstats dump and line-level times from the text output of
+    line_profiler. Both are read as a stream, keeping only the times and not, e.g., pstats' callers, so
+    that profiles of several hundred megabytes can be loaded.
+
+    Attributes:
+        - total_time (float): The seconds measured over the whole run.
+    """
+
+    def __init__(self):
+        """
+        Creates an empty profile; use load() to read one.
+        """
+        self.total_time = 0.0
+        self._functions: Dict[str, List[FunctionTiming]] = {}
+        self._lines: Dict[str, Dict[int, float]] = {}
+        self._files: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "ProfileData":
+        """
+        Loads a pstats dump (e.g., from 'python -m cProfile -o run.pstats') or the text output of
+        line_profiler (e.g., from 'python -m line_profiler run.lprof > run.txt').
+
+        :param path: The path of the profile.
+        :return: The loaded profile.
+        """
+        profile = cls()
+        with open(path, "rb") as file:
+            first = file.peek(1)[:1]
+            if first and first[0] & ~FLAG_REF == ord("{"):
+                profile._load_pstats(file)
+            else:
+                profile._load_line_profile(file)
+        for timings in profile._functions.values():
+            timings.sort(key=lambda timing: timing.first_line)
+        return profile
+
+    def measure(self, smells: List[Smell], source_code: str, filepath: str) -> Tuple[List[Smell], Optional[float]]:
+        """
+        Attaches the measured time of its code to every smell of a file.
+
+        With line-level times, a smell's time is the time spent on its lines, including the body of a loop it
+        is reported on (see smell_lines()). With function-level times, it is the cumulative time of the
+        innermost function containing its first line.
+
+        :param smells: The smells of the file.
+        :param source_code: The source the smells were detected in.
+        :param filepath: The path of the file, as the profiled run imported it.
+        :return: The smells with their measured time, and the seconds spent in smelly code (lines covered
+            by a smell, or functions containing one) or None if the profile has no data for the file.
+        """
+        key = self._file_key(filepath)
+        if key is None:
+            return smells, None
+
+        lines = self._lines.get(key)
+        if lines is not None:
+            spans = smell_lines(smells, source_code)
+            measured = [replace(smell, measured_time=sum(lines.get(line, 0.0) for line in span))
+                        for smell, span in zip(smells, spans)]
+            smelly_lines = {line for span in spans for line in span}
+            return measured, sum(lines.get(line, 0.0) for line in smelly_lines)
+
+        spans = self._function_spans(ast.parse(source_code))
+        timings = self._functions.get(key, [])
+        first_lines = [timing.first_line for timing in timings]
+        measured = []
+        smelly_functions = {}
+        for smell in smells:
+            timing = self._function_timing(timings, first_lines, spans, smell.start_line)
+            measured.append(replace(smell, measured_time=timing.cumulative_time if timing else None))
+            if timing:
+                smelly_functions[id(timing)] = timing
+
+        # Inline times do not overlap, unlike cumulative times of nested calls
+        return measured, sum(timing.inline_time for timing in smelly_functions.values())
+
+    def _file_key(self, filepath: str) -> Optional[str]:
+        """
+        Returns the profiled file matching a path: the same absolute path, or else the profiled path that
+        ends with the longest common suffix (e.g., when the run happened in another checkout).
+        """
+        if filepath in self._files:
+            return self._files[filepath]
+
+        absolute = os.path.abspath(filepath)
+        known = set(self._functions) | set(self._lines)
+        match = absolute if absolute in known else None
+        if match is None:
+            parts = absolute.split(os.sep)
+            best = 0
+            for candidate in known:
+                candidate_parts = candidate.replace("\\", "/").split("/")
+                common = 0
+                while (common < min(len(parts), len(candidate_parts))
+                       and parts[-1 - common] == candidate_parts[-1 - common]):
+                    common += 1
+                if common > best:
+                    best, match = common, candidate
+        self._files[filepath] = match
+        return match
+
+    @staticmethod
+    def _function_spans(tree: ast.Module) -> List[Tuple[int, int, int, str]]:
+        """
+        Returns the (first line, definition line, last line, name) of every function of a module, where the
+        first line is the first decorator's, as recorded by cProfile.
+        """
+        spans = []
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                first_line = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+                spans.append((first_line, node.lineno, node.end_lineno or node.lineno, node.name))
+        return spans
+
+    @staticmethod
+    def _function_timing(
+        timings: List[FunctionTiming],
+        first_lines: List[int],
+        spans: List[Tuple[int, int, int, str]],
+        line: int
+    ) -> Optional[FunctionTiming]:
+        """
+        Returns the timing of the innermost function containing a line, or of the module-level code.
+        Timings are matched by name too, as a function that never ran has none, and the module's code may
+        start on the same line as a function (e.g., a 'def' on the first line).
+
+        :param timings: The timings of the file, sorted by first line.
+        :param first_lines: The first lines of the timings, built once per file to search them.
+        :param spans: The functions of the file (see _function_spans()).
+        :param line: A line of the file.
+        """
+        containing = [span for span in spans if span[0] <= line <= span[2]]
+        if containing:
+            first_line, def_line, _, name = max(containing, key=lambda span: span[0])
+            index = bisect_right(first_lines, def_line) - 1
+            while index >= 0 and timings[index].first_line >= first_line:
+                if timings[index].name == name:
+                    return timings[index]
+                index -= 1
+            return None
+        return next((timing for timing in timings if timing.name == "<module>"), None)
+
+    def _load_pstats(self, file: BinaryIO):
+        """
+        Reads the function times of a pstats dump, entry by entry.
+        """
+        reader = MarshalReader(file)
+        for (filename, line, name), stats in reader.iter_dict():
+            _, _, inline_time, cumulative_time = stats[:4]
+            self.total_time += inline_time
+            if not filename.startswith("~"):  # Built-in functions
+                filename = os.path.normpath(filename)
+                self._functions.setdefault(filename, []).append(
+                    FunctionTiming(first_line=line, name=name, inline_time=inline_time, cumulative_time=cumulative_time)
+                )
+
+    def _load_line_profile(self, file: BinaryIO):
+        """
+        Reads the line times of line_profiler's text output, line by line.
+        """
+        unit = None
+        lines = None
+        for raw in file:
+            text = raw.decode("utf-8", errors="replace")
+            if text.startswith("Timer unit:"):
+                unit = float(text.split(":", 1)[1].strip().split()[0])
+            elif text.startswith("File:"):
+                filename = os.path.normpath(text.split(":", 1)[1].strip())
+                lines = self._lines.setdefault(filename, {})
+            elif lines is not None and unit is not None:
+                match = LINE_PROFILE_ROW.match(text)
+                if match:
+                    seconds = float(match.group(2)) * unit
+                    lines[int(match.group(1))] = lines.get(int(match.group(1)), 0.0) + seconds
+                    self.total_time += seconds
+        if unit is None:
+            raise ProfileFormatError("Expected a pstats dump or the text output of line_profiler.")
+
+# Rows of line_profiler's output with timings: line number, hits, time, per hit and % time
+LINE_PROFILE_ROW = re.compile(r"^\s*(\d+)\s+\d+\s+([\d.eE+-]+)\s+[\d.eE+-]+\s+[\d.eE+-]+")
+
+# Set on marshal type codes of objects that later objects may refer to
+FLAG_REF = 0x80
+
+class MarshalReader:
+    """
+    Reads marshal data from a stream, without loading the whole stream in memory as marshal.load does.
+    Supports the types that pstats dumps are made of.
+
+    Objects flagged as referenced are kept for later references only if they may be keys of a pstats dump
+    (strings, integers and tuples of them, such as (filename, line, name)), whose number grows with the
+    profiled functions, not with the size of the dump; a reference to any other object is an error.
+    """
+
+    # Returned for the marker that ends a dict
+    NULL = object()
+
+    # Kept in the reference slot of an object that is not kept
+    DROPPED = object()
+
+    def __init__(self, file: BinaryIO):
+        """
+        :param file: A binary stream positioned at the start of a marshalled object.
+        """
+        self.file = file
+        self.refs: list = []
+
+    def iter_dict(self) -> Iterator[Tuple[object, object]]:
+        """
+        Yields the items of a marshalled dict one at a time.
+        """
+        code = self._read(1)[0]
+        if code & ~FLAG_REF != ord("{"):
+            raise ProfileFormatError("Expected a marshalled dict.")
+        # The dict itself is not kept, so that only one item at a time is in memory
+        self._reserve(code)
+        while True:
+            key = self.read_object()
+            if key is self.NULL:
+                break
+            yield key, self.read_object()
+
+    def read_object(self):
+        """
+        Reads the next object of the stream.
+        """
+        code = self._read(1)[0]
+        kind = chr(code & ~FLAG_REF)
+        if kind == "r":
+            value = self.refs[self._int32()]
+            if value is self.DROPPED:
+                raise ProfileFormatError("Unsupported reference to a marshalled container or float.")
+            return value
+        if kind == "0":
+            return self.NULL
+        index = self._reserve(code)
+        if kind == "N":
+            value = None
+        elif kind in "FT":
+            value = kind == "T"
+        elif kind == "i":
+            value = self._int32()
+        elif kind == "l":
+            value = self._long()
+        elif kind == "g":
+            value = struct.unpack("<d", self._read(8))[0]
+        elif kind == "f":
+            value = float(self._read(self._read(1)[0]))
+        elif kind in "zZ":
+            value = self._read(self._read(1)[0]).decode("latin-1")
+        elif kind in "aA":
+            value = self._read(self._int32()).decode("latin-1")
+        elif kind in "ut":
+            value = self._read(self._int32()).decode("utf-8", errors="surrogatepass")
+        elif kind == "s":
+            value = self._read(self._int32())
+        elif kind in "()[<>":
+            size = self._read(1)[0] if kind == ")" else self._int32()
+            items = [self.read_object() for _ in range(size)]
+            value = list(items) if kind == "[" else set(items) if kind == "<" else frozenset(items) if kind == ">" else tuple(items)
+        elif kind == "{":
+            value = {}
+            while True:
+                key = self.read_object()
+                if key is self.NULL:
+                    break
+                value[key] = self.read_object()
+        else:
+            raise ProfileFormatError(f"Unsupported marshal type {kind!r}.")
+        self._fill(index, value)
+        return value
+
+    def _reserve(self, code: int) -> Optional[int]:
+        """
+        Reserves the reference slot of an object flagged as referenced, before its content is read.
+        """
+        if not code & FLAG_REF:
+            return None
+        self.refs.append(self.DROPPED)
+        return len(self.refs) - 1
+
+    def _fill(self, index: Optional[int], value):
+        """
+        Stores an object in its reserved reference slot, if it may be a key (see the class).
+        """
+        if index is not None:
+            self.refs[index] = value if self._is_key(value) else self.DROPPED
+
+    @classmethod
+    def _is_key(cls, value) -> bool:
+        """
+        Checks that an object is a string, an integer, None, or a tuple of them.
+        """
+        if isinstance(value, tuple):
+            return all(not isinstance(item, tuple) and cls._is_key(item) for item in value)
+        return value is None or isinstance(value, (str, int))
+
+    def _long(self) -> int:
+        """
+        Reads an arbitrary precision integer, stored as 15-bit digits.
+        """
+        size = self._int32()
+        digits = struct.unpack(f"<{abs(size)}H", self._read(2 * abs(size)))
+        value = sum(digit << (15 * position) for position, digit in enumerate(digits))
+        return -value if size < 0 else value
+
+    def _int32(self) -> int:
+        """
+        Reads a signed 32-bit integer.
+        """
+        return struct.unpack("<i", self._read(4))[0]
+
+    def _read(self, size: int) -> bytes:
+        """
+        Reads exactly size bytes.
+        """
+        data = self.file.read(size)
+        if len(data) != size:
+            raise ProfileFormatError("Truncated marshal data.")
+        return data
@@ -0,0 +1,37 @@
+import ast
+from typing import Dict, List, Optional
+from models.smell import Smell
+
+# Statements whose work happens on the lines of their body rather than on their header
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+
+def smell_lines(smells: List[Smell], source_code: Optional[str]) -> List[range]:
+    """
+    Returns the lines whose measurements belong to every smell: from its start line to its end line or, for
+    a smell reported on the header of a loop without an end line (e.g., a reduction written as a loop), to
+    the end of the loop, as the work it flags runs in the loop's body.
+
+    :param smells: The smells of a file.
+    :param source_code: The source the smells were detected in, or None to only use the smells' own lines.
+    :return: The lines of each smell, in the order of the smells.
+    """
+    loop_ends = _loop_ends(source_code) if source_code is not None else {}
+    spans = []
+    for smell in smells:
+        end_line = smell.end_line or loop_ends.get(smell.start_line, smell.start_line)
+        spans.append(range(smell.start_line, end_line + 1))
+    return spans
+
+def _loop_ends(source_code: str) -> Dict[int, int]:
+    """
+    Maps the first line of every loop of a module to its last line (of the outermost loop, if several start there).
+    """
+    try:
+        tree = ast.parse(source_code)
+    except (SyntaxError, ValueError):
+        return {}
+    loop_ends = {}
+    for node in ast.walk(tree):
+        if isinstance(node, LOOP_NODES):
+            loop_ends.setdefault(node.lineno, node.end_lineno or node.lineno)
+    return loop_ends
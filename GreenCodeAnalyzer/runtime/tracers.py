@@ -0,0 +1,379 @@
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Tracers are loaded by entry_runner in the process running the user's entry script,
+# so this module must only import the standard library.
+
+class LineAllocationTracer:
+    """
+    Attributes memory allocations to the lines of target files while they run.
+
+    tracemalloc only reports the memory still allocated when a snapshot is taken, which misses temporaries.
+    Instead, the peak of traced memory is reset at every line of a target file, and the growth of the peak
+    over the memory in use when the line started is attributed to it. This includes the temporaries the line
+    creates and frees, and what the functions it calls allocate, except when they are themselves targets.
+    """
+
+    def __init__(self, targets: Iterable[str]):
+        """
+        :param targets: The absolute paths of the files whose lines are traced.
+        """
+        self.targets = set(targets)
+        self.lines: Dict[Tuple[str, int], List[int]] = {}
+        self.current_line: Optional[Tuple[str, int]] = None
+        self.line_start = 0
+
+    def start(self):
+        """
+        Starts tracing allocations and line events.
+        """
+        tracemalloc.start()
+        threading.settrace(self._trace)
+        sys.settrace(self._trace)
+
+    def stop(self):
+        """
+        Stops tracing, attributing the allocations of the line that was running.
+        """
+        sys.settrace(None)
+        threading.settrace(None)
+        self._switch_to(None)
+        tracemalloc.stop()
+
+    def results(self) -> dict:
+        """
+        Returns the [path, line, allocated bytes, allocating executions] of every line that allocated.
+        """
+        return {"lines": [[path, line, totals[0], totals[1]] for (path, line), totals in self.lines.items()]}
+
+    def _trace(self, frame, event, arg):
+        """
+        Global trace function: only frames of target files get a local trace function.
+        """
+        if frame.f_code.co_filename in self.targets:
+            return self._trace_line
+        return None
+
+    def _trace_line(self, frame, event, arg):
+        """
+        Local trace function of target frames.
+        """
+        if event == 'line':
+            self._switch_to((frame.f_code.co_filename, frame.f_lineno))
+        elif event == 'return':
+            # The rest of the calling line runs after the return
+            caller = frame.f_back
+            if caller is not None and caller.f_code.co_filename in self.targets:
+                self._switch_to((caller.f_code.co_filename, caller.f_lineno))
+            else:
+                self._switch_to(None)
+        return self._trace_line
+
+    def _switch_to(self, line: Optional[Tuple[str, int]]):
+        """
+        Attributes the allocations since the previous switch to the line that was running, then starts
+        measuring the given line.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        if self.current_line is not None:
+            allocated = peak - self.line_start
+            if allocated > 0:
+                totals = self.lines.setdefault(self.current_line, [0, 0])
+                totals[0] += allocated
+                totals[1] += 1
+        self.current_line = line
+
+        # Measured after the bookkeeping above, so that it is not attributed to the line
+        tracemalloc.reset_peak()
+        self.line_start = tracemalloc.get_traced_memory()[0]
+
+class ExecutionTracer:
+    """
+    Counts the executions of the lines of flagged code objects and the time spent on them.
+
+    Only the code objects (functions or module bodies) having a line in one of the given spans are
+    instrumented. On Python 3.12+, sys.monitoring disables the start event of every other code object the
+    first time it runs, so the rest of the program runs at full speed. On older versions, sys.settrace is
+    used, whose global trace function still runs on every call.
+
+    The time of a line runs from its line event to the next line event (or return) of the same code object,
+    so it includes the functions it calls. Time of recursive calls of a flagged function is not split by frame.
+    """
+
+    def __init__(self, spans: Dict[str, List[List[int]]]):
+        """
+        :param spans: Maps the absolute path of each target file to the [start line, end line] of its smells.
+        """
+        self.lines_of_interest = {
+            path: {line for start, end in file_spans for line in range(start, end + 1)}
+            for path, file_spans in spans.items()
+        }
+        self.hits: Dict[Tuple[str, int], int] = {}
+        self.seconds: Dict[Tuple[str, int], float] = {}
+        self._flagged: Dict[object, bool] = {}
+        self._running: Dict[object, Tuple[int, float]] = {}
+        self._monitoring = getattr(sys, "monitoring", None)
+
+    def start(self):
+        """
+        Starts instrumenting flagged code objects as they start running.
+        """
+        monitoring = self._monitoring
+        if monitoring is None:
+            threading.settrace(self._trace)
+            sys.settrace(self._trace)
+            return
+
+        events = monitoring.events
+        tool = monitoring.PROFILER_ID
+        monitoring.use_tool_id(tool, "GreenCodeAnalyzer")
+        monitoring.register_callback(tool, events.PY_START, self._on_start)
+        monitoring.register_callback(tool, events.LINE, self._on_line)
+        monitoring.register_callback(tool, events.PY_RETURN, self._on_return)
+        monitoring.register_callback(tool, events.PY_YIELD, self._on_return)
+        monitoring.set_events(tool, events.PY_START)
+
+    def stop(self):
+        """
+        Stops instrumenting, attributing the time of the lines that were running.
+        """
+        monitoring = self._monitoring
+        if monitoring is None:
+            sys.settrace(None)
+            threading.settrace(None)
+        else:
+            tool = monitoring.PROFILER_ID
+            monitoring.set_events(tool, monitoring.events.NO_EVENTS)
+            for code, flagged in self._flagged.items():
+                if flagged:
+                    monitoring.set_local_events(tool, code, monitoring.events.NO_EVENTS)
+            monitoring.free_tool_id(tool)
+        for code in list(self._running):
+            self._leave(code)
+
+    def results(self) -> dict:
+        """
+        Returns the [path, line, executions, seconds] of every executed line of a flagged code object.
+        """
+        return {"lines": [[path, line, hits, self.seconds.get((path, line), 0.0)] for (path, line), hits in self.hits.items()]}
+
+    def _is_flagged(self, code) -> bool:
+        """
+        Checks if a code object has a line in one of the spans, caching the answer.
+        """
+        flagged = self._flagged.get(code)
+        if flagged is None:
+            lines = self.lines_of_interest.get(code.co_filename)
+            flagged = bool(lines) and any(line in lines for _, _, line in code.co_lines() if line is not None)
+            self._flagged[code] = flagged
+        return flagged
+
+    def _on_start(self, code, offset):
+        """
+        sys.monitoring callback: instruments the lines of flagged code objects, then stops reporting starts.
+        """
+        monitoring = self._monitoring
+        if self._is_flagged(code):
+            events = monitoring.events
+            monitoring.set_local_events(
+                monitoring.PROFILER_ID, code, events.LINE | events.PY_RETURN | events.PY_YIELD
+            )
+        return monitoring.DISABLE
+
+    def _on_line(self, code, line):
+        """
+        sys.monitoring callback (and settrace handler) of a line about to run.
+        """
+        now = time.perf_counter()
+        self._leave(code, now)
+        key = (code.co_filename, line)
+        self.hits[key] = self.hits.get(key, 0) + 1
+        self._running[code] = (line, now)
+
+    def _on_return(self, code, offset, value=None):
+        """
+        sys.monitoring callback (and settrace handler) of a return or yield.
+        """
+        self._leave(code)
+
+    def _leave(self, code, now: Optional[float] = None):
+        """
+        Attributes the time since the line of the code object that is running started to that line.
+        """
+        running = self._running.pop(code, None)
+        if running is not None:
+            line, started = running
+            key = (code.co_filename, line)
+            self.seconds[key] = self.seconds.get(key, 0.0) + (now or time.perf_counter()) - started
+
+    def _trace(self, frame, event, arg):
+        """
+        Global settrace function: only flagged code objects get a local trace function.
+        """
+        return self._trace_line if self._is_flagged(frame.f_code) else None
+
+    def _trace_line(self, frame, event, arg):
+        """
+        Local settrace function of flagged code objects.
+        """
+        if event == 'line':
+            self._on_line(frame.f_code, frame.f_lineno)
+        elif event == 'return':
+            self._on_return(frame.f_code, frame.f_lasti)
+        return self._trace_line
+
+class PandasCallRecorder:
+    """
+    Records the groupby, merge, join and iterrows calls that the lines of target files make on DataFrames.
+
+    The methods are wrapped while the entry script runs, and every call made directly from a target file is
+    recorded under its call site: how many times it ran, the rows of the frames it was given and the time it
+    took. Calls repeating an earlier call on the same frames with the same keys are counted separately, as
+    the work they redo could have been reused. A frame whose values were modified in place in between is
+    still considered the same frame.
+
+    Grouping is lazy in pandas, so groupby calls compute their groups right away, so that their time is
+    measured where they are called; aggregations then reuse the groups. The time of an iterrows call is
+    the time spent producing its rows, not the time of the loop body.
+    """
+
+    OPERATIONS = ("groupby", "merge", "join", "iterrows")
+
+    def __init__(self, targets: Iterable[str]):
+        """
+        :param targets: The absolute paths of the files whose calls are recorded.
+        """
+        self.targets = set(targets)
+        # (path, line, operation) to [calls, rows, seconds, repeated calls, repeated seconds]
+        self.calls: Dict[Tuple[str, int, str], List[float]] = {}
+        self.available = False
+        self._seen: Dict[tuple, List[object]] = {}
+        self._originals: List[Tuple[object, str, object]] = []
+
+    def start(self):
+        """
+        Wraps the DataFrame methods, if pandas is installed.
+        """
+        try:
+            import pandas
+        except ImportError:
+            return
+        self.available = True
+        for operation in self.OPERATIONS:
+            self._wrap(pandas.DataFrame, operation)
+        self._wrap(pandas, "merge")
+
+    def stop(self):
+        """
+        Restores the original methods.
+        """
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        self._seen = {}
+
+    def results(self) -> dict:
+        """
+        Returns the [path, line, operation, calls, rows, seconds, repeated calls, repeated seconds] of every
+        recorded call site, and whether pandas was available.
+        """
+        return {
+            "available": self.available,
+            "calls": [[path, line, operation] + totals for (path, line, operation), totals in self.calls.items()]
+        }
+
+    def _wrap(self, owner, operation: str):
+        """
+        Replaces a function of a class or module with a wrapper recording the calls made from target files.
+        Its first argument is the frame operated on, and the second the frame merged or joined with, if any.
+        """
+        original = getattr(owner, operation)
+        recorder = self
+        frame_count = 2 if operation in ("merge", "join") else 1
+
+        def wrapper(*args, **kwargs):
+            caller = sys._getframe(1)
+            if caller.f_code.co_filename not in recorder.targets:
+                return original(*args, **kwargs)
+            key = (caller.f_code.co_filename, caller.f_lineno, operation)
+            frames = [arg for arg in args[:frame_count] if hasattr(arg, "shape")]
+            if operation == "iterrows":
+                return recorder._record_rows(key, original(*args, **kwargs), frames)
+
+            started = time.perf_counter()
+            result = original(*args, **kwargs)
+            if operation == "groupby":
+                result.ngroups  # Computes the groups, which aggregations reuse
+            recorder._record(key, time.perf_counter() - started, frames, args[len(frames):], kwargs)
+            return result
+
+        wrapper.__name__ = operation
+        wrapper.__doc__ = original.__doc__
+        wrapper.__wrapped__ = original
+        self._originals.append((owner, operation, original))
+        setattr(owner, operation, wrapper)
+
+    def _record(self, key: Tuple[str, int, str], seconds: float, frames: list, args: tuple, kwargs: dict):
+        """
+        Records a call, and whether it repeats an earlier call on the same frames with the same other arguments.
+        """
+        totals = self.calls.setdefault(key, [0, 0, 0.0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += sum(len(frame) for frame in frames)
+        totals[2] += seconds
+
+        signature = (key[2], tuple(id(frame) for frame in frames),
+                     tuple(self._describe(arg) for arg in args),
+                     tuple(sorted((name, self._describe(value)) for name, value in kwargs.items())))
+        try:
+            references = [weakref.ref(frame) for frame in frames]
+        except TypeError:
+            return
+        # Ids are only compared while the frames are alive, as they may be reused afterwards
+        seen = self._seen.get(signature)
+        if seen is not None and all(reference() is frame for reference, frame in zip(seen, frames)):
+            totals[3] += 1
+            totals[4] += seconds
+        else:
+            self._seen[signature] = references
+
+    def _record_rows(self, key: Tuple[str, int, str], rows: Iterator, frames: list) -> Iterator:
+        """
+        Records an iterrows call when it is made, even if its rows are never consumed, and returns its rows,
+        timing their production as the loop consumes them.
+        """
+        totals = self.calls.setdefault(key, [0, 0, 0.0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += sum(len(frame) for frame in frames)
+        return self._timed_rows(totals, rows)
+
+    @staticmethod
+    def _timed_rows(totals: list, rows: Iterator) -> Iterator:
+        """
+        Yields the rows of an iterrows call, adding the time spent producing them to the totals of its call site.
+        """
+        while True:
+            started = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                totals[2] += time.perf_counter() - started
+                return
+            totals[2] += time.perf_counter() - started
+            yield row
+
+    @staticmethod
+    def _describe(value) -> object:
+        """
+        Returns a comparable description of a call argument: its value for keys (e.g., column names), or
+        its identity for other objects (e.g., a Series to group by).
+        """
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if isinstance(value, (list, tuple)) and all(isinstance(item, (str, int, float, bool)) for item in value):
+            return tuple(value)
+        return ("id", id(value))
@@ -13,18 +13,283 @@ const nutriScoreColors: { [key: string]: string } = {
   NaN: "rgba(255, 123, 0, 0.6)",
 };
 
-// Add a variable to store active decoration types
-let activeDecorationTypes: vscode.TextEditorDecorationType[] = [];
+// Decoration types for each NutriScore level, created once at activation
+const decorationTypes: { [key: string]: vscode.TextEditorDecorationType } = {};
+
+// Results of every analyzed document, kept so that editors can be restored without re-running the analyzer
+interface DocumentResult {
+  smells: SmellIndex;
+  ranges: ScoreRanges;
+  version: number;
+  fixes: AnalyzerFix[];
+}
+type ScoreRanges = { [key: string]: vscode.Range[] };
+const documentResults: Map<string, DocumentResult> = new Map();
+
+// Ranges currently applied to each editor, to only update the NutriScore levels that changed
+const appliedRanges: WeakMap<vscode.TextEditor, ScoreRanges> = new WeakMap();
+
+// A smell as reported by the analyzer worker
+interface AnalyzerSmell {
+  rule_id: string;
+  rule_name: string;
+  description: string;
+  start_line: number;
+  end_line: number | null;
+  optimization: string | null;
+  penalty: number | null;
+  cost: number | null;
+  runs: string | null;
+}
+
+// A fix of a smell as proposed by the analyzer worker; lines are 1-based and columns 0-based
+interface AnalyzerFix {
+  rule_id: string;
+  title: string;
+  start_line: number;
+  edits: {
+    start_line: number;
+    start_column: number;
+    end_line: number;
+    end_column: number;
+    new_text: string;
+  }[];
+}
+
+// A response of the analyzer worker, tagged with the document version it was computed for
+interface AnalyzerResponse {
+  id: number;
+  path?: string;
+  version?: number;
+  smells?: AnalyzerSmell[];
+  fixes?: AnalyzerFix[];
+  error?: string;
+  cancelled?: boolean;
+}
+
+// A request sent to the analyzer worker that has not been answered yet
+interface PendingRequest {
+  documentKey: string;
+  resolve: (response: AnalyzerResponse | undefined) => void;
+}
+
+// Keeps a single long-running analyzer process (main.py --serve) and routes its responses.
+// A newer request for a document supersedes the in-flight one, which resolves to undefined.
+// What the worker writes to stderr (e.g., warnings) goes to the output channel; errors are only shown
+// when a request fails or the worker exits.
+class AnalyzerWorker implements vscode.Disposable {
+  private process: childProcess.ChildProcessWithoutNullStreams | undefined;
+  private stdoutBuffer = "";
+  private nextRequestId = 1;
+  private pendingRequests: Map<number, PendingRequest> = new Map();
+  private latestRequestByDocument: Map<string, number> = new Map();
+
+  constructor(
+    private readonly mainScriptPath: string,
+    private readonly output: vscode.OutputChannel
+  ) {}
+
+  // Sends the current buffer of the document to the worker
+  analyze(document: vscode.TextDocument): Promise<AnalyzerResponse | undefined> {
+    const worker = this.ensureProcess();
+    const documentKey = document.uri.toString();
+
+    // Drop the in-flight request for the same document; the worker cancels it too
+    const previousId = this.latestRequestByDocument.get(documentKey);
+    if (previousId !== undefined) {
+      this.settle(previousId, undefined);
+    }
+
+    const id = this.nextRequestId++;
+    this.latestRequestByDocument.set(documentKey, id);
+
+    return new Promise((resolve) => {
+      this.pendingRequests.set(id, { documentKey, resolve });
+      const request = {
+        id,
+        path: document.fileName,
+        version: document.version,
+        source: document.getText(),
+        fixes: true,
+      };
+      worker.stdin.write(JSON.stringify(request) + "\n", "utf8");
+    });
+  }
+
+  dispose() {
+    const worker = this.process;
+    this.process = undefined;
+    worker?.kill();
+    this.settleAll(undefined);
+  }
+
+  // Shows an error, with a button opening the output channel where the worker's stderr is kept
+  showError(message: string) {
+    this.output.appendLine(message);
+    vscode.window.showErrorMessage(message, "Show Output").then((choice) => {
+      if (choice === "Show Output") {
+        this.output.show(true);
+      }
+    });
+  }
+
+  // Spawns the worker if it is not running yet (or exited)
+  private ensureProcess(): childProcess.ChildProcessWithoutNullStreams {
+    if (this.process) {
+      return this.process;
+    }
+
+    // Resolve imports between the files of the opened project, so that rules see through helper functions
+    const args = [this.mainScriptPath, "--serve"];
+    const workspaceFolder = vscode.workspace.workspaceFolders?.[0];
+    if (workspaceFolder) {
+      args.push("--project-root", workspaceFolder.uri.fsPath);
+    }
+
+    // Run the Python process with the extension directory as CWD
+    const worker = childProcess.spawn("python", args, {
+      cwd: path.dirname(this.mainScriptPath),
+    });
+    this.process = worker;
+    this.stdoutBuffer = "";
+
+    worker.stdout.on("data", (data) => {
+      this.handleOutput(data.toString());
+    });
+    worker.stderr.on("data", (data) => {
+      this.output.append(data.toString());
+    });
+    worker.stdin.on("error", (error) => {
+      this.output.appendLine(`Error writing to GreenCodeAnalyzer: ${error.message}`);
+    });
+    worker.on("error", (error) => {
+      this.showError(`Could not start GreenCodeAnalyzer: ${error.message}`);
+    });
+    worker.on("close", (code, signal) => {
+      // A worker stopped by dispose() exits quietly
+      if (this.process !== worker) {
+        return;
+      }
+      this.process = undefined;
+      const message = `GreenCodeAnalyzer worker exited (${signal ?? `code ${code}`}).`;
+      if (this.pendingRequests.size === 0) {
+        this.showError(message);
+      }
+      // Requests sent to a dead worker will never be answered; their failure is shown instead
+      this.settleAll({ id: -1, error: message });
+    });
+
+    return worker;
+  }
+
+  // Splits the worker output into one JSON response per line
+  private handleOutput(chunk: string) {
+    this.stdoutBuffer += chunk;
+    let newline;
+    while ((newline = this.stdoutBuffer.indexOf("\n")) >= 0) {
+      const line = this.stdoutBuffer.slice(0, newline).trim();
+      this.stdoutBuffer = this.stdoutBuffer.slice(newline + 1);
+      if (!line) {
+        continue;
+      }
+      try {
+        const response = JSON.parse(line) as AnalyzerResponse;
+        this.settle(response.id, response);
+      } catch (error) {
+        console.error("Invalid response from GreenCodeAnalyzer:", error);
+      }
+    }
+  }
 
-// Track processed lines to avoid duplicate hover messages
-interface LineMessageInfo {
-  messages: vscode.MarkdownString[];
-  nutriScore: string;
+  private settle(id: number, response: AnalyzerResponse | undefined) {
+    const request = this.pendingRequests.get(id);
+    if (!request) {
+      return;
+    }
+    this.pendingRequests.delete(id);
+    if (this.latestRequestByDocument.get(request.documentKey) === id) {
+      this.latestRequestByDocument.delete(request.documentKey);
+    }
+    request.resolve(response);
+  }
+
+  private settleAll(response: AnalyzerResponse | undefined) {
+    for (const id of Array.from(this.pendingRequests.keys())) {
+      this.settle(id, response);
+    }
+  }
+}
+
+// Interval index over the smells of a document, answering which smells cover a line
+class SmellIndex {
+  private readonly smells: AnalyzerSmell[];
+  // Largest (0-based) end line among the smells up to each position
+  private readonly maxEndLines: number[] = [];
+
+  constructor(smells: AnalyzerSmell[]) {
+    this.smells = [...smells].sort((a, b) => a.start_line - b.start_line);
+    let maxEndLine = -1;
+    for (const smell of this.smells) {
+      maxEndLine = Math.max(maxEndLine, endLineOf(smell));
+      this.maxEndLines.push(maxEndLine);
+    }
+  }
+
+  // Returns the smells whose span contains the given (0-based) line
+  at(line: number): AnalyzerSmell[] {
+    // Binary search for the last smell starting on or before the line
+    let low = 0;
+    let high = this.smells.length - 1;
+    let last = -1;
+    while (low <= high) {
+      const middle = (low + high) >> 1;
+      if (this.smells[middle].start_line - 1 <= line) {
+        last = middle;
+        low = middle + 1;
+      } else {
+        high = middle - 1;
+      }
+    }
+
+    // Walk back only while an earlier smell can still reach the line
+    const covering: AnalyzerSmell[] = [];
+    for (let i = last; i >= 0 && this.maxEndLines[i] >= line; i--) {
+      if (endLineOf(this.smells[i]) >= line) {
+        covering.push(this.smells[i]);
+      }
+    }
+    return covering.reverse();
+  }
+}
+
+// The (0-based) last line of a smell; single line smells have no end line
+function endLineOf(smell: AnalyzerSmell): number {
+  return (smell.end_line ?? smell.start_line) - 1;
 }
 
 export function activate(context: vscode.ExtensionContext) {
   console.log("GreenCodeAnalyzer is now active!");
 
+  // Use extension path instead of workspace folder
+  // This ensures the extension works in any workspace
+  const mainScriptPath = path.join(context.extensionPath, "main.py");
+  const output = vscode.window.createOutputChannel("GreenCodeAnalyzer");
+  const worker = new AnalyzerWorker(mainScriptPath, output);
+
+  // Create decoration types for each NutriScore level
+  for (const [score, color] of Object.entries(nutriScoreColors)) {
+    decorationTypes[score] = vscode.window.createTextEditorDecorationType({
+      isWholeLine: false,
+      gutterIconSize: 'contain',
+      borderColor: color,
+      borderWidth: '0 0 0 3px',
+      borderStyle: 'solid',
+      overviewRulerColor: color,
+      overviewRulerLane: vscode.OverviewRulerLane.Right,
+    });
+    context.subscriptions.push(decorationTypes[score]);
+  }
+
   // Command to run the analyzer
   const analyzerDisposable = vscode.commands.registerCommand(
     "greencodeanalyzer.runAnalyzer",
@@ -35,29 +300,40 @@ export function activate(context: vscode.ExtensionContext) {
         return;
       }
 
-      // Clear any existing decorations when analyzer is run
-      clearDecorations();
-
-      const filePath = editor.document.fileName;
-
-      // Check if the file exists
-      if (!fs.existsSync(filePath)) {
-        vscode.window.showErrorMessage(`File not found: ${filePath}`);
+      if (!fs.existsSync(mainScriptPath)) {
+        vscode.window.showErrorMessage(`main.py not found at ${mainScriptPath}`);
         return;
       }
 
+      const document = editor.document;
+
       // Show message that analysis is starting
-      const progressMessage = vscode.window.showInformationMessage(
+      vscode.window.showInformationMessage(
         "GreenCodeAnalyzer is analyzing your code...",
         { modal: false }
       );
 
-      // Use extension path instead of workspace folder
-      // This ensures the extension works in any workspace
-      const extensionPath = context.extensionPath;
-      
-      // Run the main script directly with the file path
-      runMainScript(extensionPath, filePath, context, progressMessage);
+      // Analyze the editor buffer, so unsaved edits are analyzed too
+      const response = await worker.analyze(document);
+
+      // Drop results of superseded requests and of outdated versions of the document,
+      // before they trigger the decoration rebuild
+      if (!response || response.cancelled || response.version !== document.version) {
+        return;
+      }
+      if (response.error) {
+        worker.showError(`Error: ${response.error}`);
+        return;
+      }
+
+      const smells = response.smells ?? [];
+      processAnalyzerOutput(smells, response.fixes ?? [], document);
+      if (smells.length > 0) {
+        // Show analysis completion message
+        vscode.window.showInformationMessage("GreenCodeAnalyzer analysis complete!");
+      } else {
+        vscode.window.showInformationMessage("GreenCodeAnalyzer analysis complete with no issues found.");
+      }
     }
   );
 
@@ -70,213 +346,175 @@ export function activate(context: vscode.ExtensionContext) {
     }
   );
 
-  context.subscriptions.push(analyzerDisposable, clearGuttersDisposable);
+  // Hover messages are only built for the line being hovered
+  const hoverDisposable = vscode.languages.registerHoverProvider("python", {
+    provideHover(document, position) {
+      const smells = documentResults.get(document.uri.toString())?.smells.at(position.line);
+      if (!smells || smells.length === 0) {
+        return undefined;
+      }
+      return new vscode.Hover(buildHoverMessage(smells));
+    },
+  });
+
+  // Quick fixes rewriting the smells on the selected lines, while the document has not changed since the analysis
+  const codeActionsDisposable = vscode.languages.registerCodeActionsProvider(
+    "python",
+    {
+      provideCodeActions(document, range) {
+        const result = documentResults.get(document.uri.toString());
+        if (!result || result.version !== document.version) {
+          return undefined;
+        }
+        return result.fixes
+          .filter(fix => fix.edits.some(edit => edit.start_line - 1 <= range.end.line && edit.end_line - 1 >= range.start.line))
+          .map(fix => buildCodeAction(fix, document));
+      },
+    },
+    { providedCodeActionKinds: [vscode.CodeActionKind.QuickFix] }
+  );
+
+  // Restore the results of a document when its editor becomes visible again
+  const visibleEditorsDisposable = vscode.window.onDidChangeVisibleTextEditors((editors) => {
+    editors.forEach(applyDecorations);
+  });
+
+  // Forget the results of closed documents
+  const closeDocumentDisposable = vscode.workspace.onDidCloseTextDocument((document) => {
+    documentResults.delete(document.uri.toString());
+  });
+
+  context.subscriptions.push(
+    output,
+    worker,
+    analyzerDisposable,
+    clearGuttersDisposable,
+    hoverDisposable,
+    codeActionsDisposable,
+    visibleEditorsDisposable,
+    closeDocumentDisposable
+  );
 }
 
+export function deactivate() {}
+
 // Function to clear all active decorations
 function clearDecorations() {
-  activeDecorationTypes.forEach(decorationType => {
-    decorationType.dispose();
-  });
-  activeDecorationTypes = [];
+  documentResults.clear();
+  vscode.window.visibleTextEditors.forEach(applyDecorations);
 }
 
-// Run the main script from the extension directory to analyze the file
-function runMainScript(extensionPath: string, filePath: string, context: vscode.ExtensionContext, progressMessage: Thenable<any>) {
-  // Look for main.py in the extension's src directory
-  const mainScriptPath = path.join(extensionPath, "main.py");
+// Applies the results of the editor's document, only updating NutriScore levels whose ranges changed
+function applyDecorations(editor: vscode.TextEditor) {
+  const result = documentResults.get(editor.document.uri.toString());
+  const previous = appliedRanges.get(editor) ?? {};
+  const current: ScoreRanges = {};
 
-  if (!fs.existsSync(mainScriptPath)) {
-    vscode.window.showErrorMessage(`main.py not found at ${mainScriptPath}`);
-    return;
+  for (const score of Object.keys(decorationTypes)) {
+    const ranges = result?.ranges[score] ?? [];
+    if (!sameRanges(previous[score] ?? [], ranges)) {
+      editor.setDecorations(decorationTypes[score], ranges);
+    }
+    current[score] = ranges;
   }
+  appliedRanges.set(editor, current);
+}
 
-  // Run the Python process with the extension directory as CWD
-  const pythonProcess = childProcess.spawn("python", [mainScriptPath, filePath], {
-    cwd: path.dirname(mainScriptPath), // Use the src directory as working directory
-  });
-
-  let stdoutData = "";
-  pythonProcess.stdout.on("data", (data) => {
-    stdoutData += data.toString();
-  });
+function sameRanges(a: vscode.Range[], b: vscode.Range[]): boolean {
+  return a.length === b.length && a.every((range, i) => range.isEqual(b[i]));
+}
 
-  // Process all output when the process ends
-  pythonProcess.on("close", () => {
-    // Dismiss the progress message
-    progressMessage.then(undefined, undefined);
-    
-    if (stdoutData) {
-      processAnalyzerOutput(stdoutData, context);
-      // Show analysis completion message
-      vscode.window.showInformationMessage("GreenCodeAnalyzer analysis complete!");
-    } else {
-      vscode.window.showInformationMessage("GreenCodeAnalyzer analysis complete with no issues found.");
+// We want to highlight the lines of the smells in the editor based on the NutriScore.
+// Decorations only hold ranges; hover messages are built lazily by the HoverProvider.
+function processAnalyzerOutput(
+  smells: AnalyzerSmell[],
+  fixes: AnalyzerFix[],
+  document: vscode.TextDocument
+) {
+  // Group the ranges of the smells by NutriScore
+  const ranges: ScoreRanges = {
+    A: [], B: [], C: [], D: [], E: [], NaN: []
+  };
+  for (const smell of smells) {
+    // Make sure the lines exist in the document
+    const startLine = Math.max(smell.start_line - 1, 0);
+    const endLine = Math.min(endLineOf(smell), document.lineCount - 1);
+    if (startLine > endLine) {
+      continue;
     }
-  });
+    const range = new vscode.Range(startLine, 0, endLine, document.lineAt(endLine).text.length);
+    ranges[getNutriScore(smell.penalty ?? NaN)].push(range);
+  }
+
+  // Keep ranges in a stable order so that unchanged results compare equal
+  for (const scoreRanges of Object.values(ranges)) {
+    scoreRanges.sort((a, b) => a.start.compareTo(b.start) || a.end.compareTo(b.end));
+  }
 
-  pythonProcess.stderr.on("data", (data) => {
-    // Dismiss the progress message
-    progressMessage.then(undefined, undefined);
-    vscode.window.showErrorMessage(`Error: ${data.toString()}`);
+  documentResults.set(document.uri.toString(), {
+    smells: new SmellIndex(smells),
+    ranges,
+    version: document.version,
+    fixes,
   });
+
+  // Update every editor showing the document
+  vscode.window.visibleTextEditors
+    .filter(editor => editor.document === document)
+    .forEach(applyDecorations);
 }
 
-// We want to parse the output from main.py and highlight the lines in the editor based on the NutriScore.
-function processAnalyzerOutput(
-  output: string,
-  context: vscode.ExtensionContext
-) {
-  const editor = vscode.window.activeTextEditor;
-  if (!editor) {
-    return;
+// Turns a fix into a quick fix editing the document
+function buildCodeAction(fix: AnalyzerFix, document: vscode.TextDocument): vscode.CodeAction {
+  const action = new vscode.CodeAction(`GreenCodeAnalyzer: ${fix.title}`, vscode.CodeActionKind.QuickFix);
+  action.edit = new vscode.WorkspaceEdit();
+  for (const edit of fix.edits) {
+    const range = new vscode.Range(edit.start_line - 1, edit.start_column, edit.end_line - 1, edit.end_column);
+    action.edit.replace(document.uri, range, edit.new_text);
   }
+  return action;
+}
 
-  // Regular expression to match the output from the analyzer
-  const regex =
-    /Rule ID: (.+?), Rule Name: (.+?), Description: (.+?)(?:, Penalty: (.+?))?, Optimization: (.+?), Affected Line\(s\): (?:Line (\d+)|Lines (\d+)-(\d+))/g;
-  
-  // Keep track of line info to avoid duplicate hover messages
-  const lineInfoMap: Map<number, LineMessageInfo> = new Map();
-
-  // Clear previous decorations
-  clearDecorations();
-
-  let match;
-  while ((match = regex.exec(output)) !== null) {
-    const ruleName = match[2];
-    const description = match[3];
-    const penalty = parseFloat(match[4]);
-    const optimization = match[5];
-    
-    // Get the line number(s) - handle both single line and range formats
-    let startLine, endLine;
-    if (match[6]) {
-      startLine = parseInt(match[6]) - 1;
-      endLine = startLine;
-    } else {
-      startLine = parseInt(match[7]) - 1;
-      endLine = parseInt(match[8]) - 1;
-    }
-    
+// Build the hover message for the smells covering a line, skipping duplicate messages
+function buildHoverMessage(smells: AnalyzerSmell[]): vscode.MarkdownString {
+  const hoverMessage = new vscode.MarkdownString();
+  hoverMessage.appendMarkdown(`## GreenCodeAnalyzer\n`);
+  hoverMessage.appendMarkdown(`---\n`);
+
+  const seen = new Set<string>();
+  for (const smell of smells) {
+    const penalty = smell.penalty ?? NaN;
     const nutriScore = getNutriScore(penalty);
 
-    // Create a hover message that includes the rule details
-    const hoverMessage = new vscode.MarkdownString();
-    hoverMessage.appendMarkdown(`## GreenCodeAnalyzer\n`);
-    hoverMessage.appendMarkdown(`---\n`);
+    // Create a message that includes the rule details
+    let message = "";
     if (nutriScore === "NaN") {
-      hoverMessage.appendMarkdown(`### ${ruleName}\n`);
+      message += `### ${smell.rule_name}\n`;
     } else {
-      hoverMessage.appendMarkdown(`**${ruleName}** (NutriScore: ${nutriScore})\n\n`);
+      message += `**${smell.rule_name}** (NutriScore: ${nutriScore})\n\n`;
     }
-    hoverMessage.appendMarkdown(`**Description**: ${description}\n\n`);
+    message += `**Description**: ${smell.description}\n\n`;
     if (!isNaN(penalty)) {
-      hoverMessage.appendMarkdown(`**Penalty**: ${penalty}\n\n`);
+      message += `**Penalty**: ${penalty}\n\n`;
     }
-    hoverMessage.appendMarkdown(`**Optimization**: ${optimization}`);
-
-    // Apply decorations to all lines in the range
-    for (let lineNumber = startLine; lineNumber <= endLine; lineNumber++) {
-      try {
-        // Make sure the line exists in the document
-        if (lineNumber >= 0 && lineNumber < editor.document.lineCount) {
-          // Get or create line info
-          if (!lineInfoMap.has(lineNumber)) {
-            lineInfoMap.set(lineNumber, {
-              messages: [hoverMessage],
-              nutriScore: nutriScore
-            });
-          } else {
-            // Check if this exact message is already in the array to avoid duplicates
-            const lineInfo = lineInfoMap.get(lineNumber)!;
-            const isDuplicate = lineInfo.messages.some(msg => 
-              msg.value === hoverMessage.value
-            );
-            
-            if (!isDuplicate) {
-              lineInfo.messages.push(hoverMessage);
-            }
-          }
-        }
-      } catch (error) {
-        console.error(`Error processing line ${lineNumber}:`, error);
-      }
+    if (smell.runs) {
+      message += `**Estimated Runs**: ${smell.runs} (cost ${smell.cost})\n\n`;
     }
-  }
+    message += `**Optimization**: ${smell.optimization ?? ""}`;
 
-  // Create decoration types dynamically for each NutriScore level
-  const decorationTypes: { [key: string]: vscode.TextEditorDecorationType } = {};
-  for (const [score, color] of Object.entries(nutriScoreColors)) {
-    decorationTypes[score] = vscode.window.createTextEditorDecorationType({
-      isWholeLine: false,
-      gutterIconSize: 'contain',
-      borderColor: color,
-      borderWidth: '0 0 0 3px',
-      borderStyle: 'solid',
-      overviewRulerColor: color,
-      overviewRulerLane: vscode.OverviewRulerLane.Right,
-    });
-
-    // Store the decoration type in our active decorations array
-    activeDecorationTypes.push(decorationTypes[score]);
-  }
-
-  // Process line info and apply decorations by NutriScore
-  const decorationsMap: { [key: string]: vscode.DecorationOptions[] } = {
-    A: [], B: [], C: [], D: [], E: [], NaN: []
-  };
-
-  // Convert the line info map to decoration options
-  lineInfoMap.forEach((info, lineNumber) => {
-    try {
-      const line = editor.document.lineAt(lineNumber);
-      const range = new vscode.Range(
-        lineNumber, 0, 
-        lineNumber, line.text.length
-      );
-
-      // If we have multiple messages, combine them
-      let combinedMessage: vscode.MarkdownString;
-      if (info.messages.length === 1) {
-        combinedMessage = info.messages[0];
-      } else {
-        combinedMessage = new vscode.MarkdownString();
-        combinedMessage.appendMarkdown(`## GreenCodeAnalyzer\n`);
-        combinedMessage.appendMarkdown(`---\n`);
-        
-        // Add messages with separators between them
-        for (let i = 0; i < info.messages.length; i++) {
-          const msgContent = info.messages[i].value;
-          // Strip the header from all but the first message
-          const contentWithoutHeader = msgContent.replace(/^## GreenCodeAnalyzer\n---\n/, '');
-          combinedMessage.appendMarkdown(contentWithoutHeader);
-          
-          // Add separator between messages (except after the last one)
-          if (i < info.messages.length - 1) {
-            combinedMessage.appendMarkdown(`\n\n---\n\n`);
-          }
-        }
-      }
-
-      const decoration: vscode.DecorationOptions = {
-        range: range,
-        hoverMessage: combinedMessage
-      };
-
-      // Add to decorations map based on severity
-      decorationsMap[info.nutriScore].push(decoration);
-    } catch (error) {
-      console.error(`Error creating decoration for line ${lineNumber}:`, error);
+    if (seen.has(message)) {
+      continue;
     }
-  });
 
-  // Apply all decorations
-  for (const [score, decorations] of Object.entries(decorationsMap)) {
-    if (decorations.length > 0) {
-      editor.setDecorations(decorationTypes[score], decorations);
+    // Add separator between messages
+    if (seen.size > 0) {
+      hoverMessage.appendMarkdown(`\n\n---\n\n`);
     }
+    seen.add(message);
+    hoverMessage.appendMarkdown(message);
   }
+
+  return hoverMessage;
 }
 
 // Function to map the penalty of a rule to a NutriScore level.